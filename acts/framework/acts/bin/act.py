@@ -15,7 +15,10 @@
 #   limitations under the License.
 
 import argparse
+import multiprocessing
 import os
+import pickle
+import queue
 import re
 import signal
 import sys
@@ -26,10 +29,20 @@ from mobly import config_parser as mobly_config_parser
 
 from acts import config_parser
 from acts import keys
+from acts import records
 from acts import signals
+from acts import test_class_index
 from acts import test_runner
 from acts import utils
 from acts.config_parser import ActsConfigError
+from acts.event import event_bus
+from acts.event.event import TestCaseEndEvent
+
+# The name of the file, in the log tree of each testbed run in parallel, that
+# holds the console output of its worker process.
+WORKER_OUTPUT_FILE = 'worker_output.txt'
+# The name of the file holding the merged results of testbeds run in parallel.
+PARALLEL_SUMMARY_FILE = 'parallel_run_summary.json'
 
 
 def _run_test(parsed_config, test_identifiers, repeat=1):
@@ -48,6 +61,20 @@ def _run_test(parsed_config, test_identifiers, repeat=1):
         True if all tests passed without any error, False otherwise.
     """
     runner = _create_test_runner(parsed_config, test_identifiers)
+    return _run_test_runner(runner, repeat)
+
+
+def _run_test_runner(runner, repeat=1):
+    """Runs a test_runner.TestRunner, and stops it once done.
+
+    Args:
+        runner: The test_runner.TestRunner to run.
+        repeat: Number of times to iterate the specified tests.
+
+    Returns:
+        True if all tests passed without any error, False otherwise.
+    """
+    i = 0
     try:
         for i in range(repeat):
             runner.run()
@@ -115,6 +142,207 @@ def _run_tests(parsed_configs, test_identifiers, repeat):
     return ok
 
 
+def _get_test_case_result(event):
+    """Returns the result of the test case that a TestCaseEndEvent ended."""
+    results = event.test_class.results
+    for record in reversed(results.executed + results.skipped):
+        if record.test_name == event.test_case_name:
+            return record.result
+    return None
+
+
+def _run_test_worker(parsed_config, test_identifiers, repeat, messages):
+    """Runs the tests of one testbed in a worker process.
+
+    The console output of the worker is written to WORKER_OUTPUT_FILE in the
+    log tree of its test run. The result of each test case, then the results
+    of the whole run, are sent to the parent process.
+
+    Args:
+        parsed_config: A mobly.config_parser.TestRunConfig that is a set of
+                       configs for one test_runner.TestRunner.
+        test_identifiers: A list of tuples, each identifies what test case to
+                          run on what test class.
+        repeat: Number of times to iterate the specified tests.
+        messages: A multiprocessing.Queue of the messages sent to the parent
+                  process. Each is a tuple of the message type, 'case' or
+                  'done', and the testbed name followed by the message's
+                  values.
+    """
+    testbed_name = parsed_config.testbed_name
+    ok = False
+    results = None
+    try:
+        # Only the parent receives terminal signals, and forwards them.
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        os.setpgrp()
+        # Subscriptions of the parent must not receive the worker's events.
+        event_bus.reset()
+        runner = _create_test_runner(parsed_config, test_identifiers)
+        output_path = os.path.join(runner.log_path, WORKER_OUTPUT_FILE)
+        with open(output_path, 'a') as output_file:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(output_file.fileno(), sys.stdout.fileno())
+            os.dup2(output_file.fileno(), sys.stderr.fileno())
+
+        def send_test_case_result(event):
+            messages.put(('case', testbed_name, event.test_class_name,
+                          event.test_case_name, _get_test_case_result(event)))
+
+        event_bus.register(TestCaseEndEvent, send_test_case_result)
+        ok = _run_test_runner(runner, repeat)
+        try:
+            results = pickle.dumps(runner.results)
+        except Exception as e:
+            print('Failed to send the results of test bed %s: %s' %
+                  (testbed_name, e))
+    finally:
+        messages.put(('done', testbed_name, bool(ok), results))
+
+
+def _print_parallel_summary(testbed_name, message, counts):
+    print('[%s] %s (%s)' % (testbed_name, message, ', '.join(
+        '%s %d' % (result, count) for result, count in sorted(
+            counts.items()))))
+
+
+def _run_tests_parallel(parsed_configs, test_identifiers, repeat,
+                        max_workers=None):
+    """Executes requested tests on each testbed in parallel.
+
+    Each testbed runs in its own worker process, with up to max_workers
+    running at once. The result of each test case is printed as it ends, and
+    the results of all testbeds are merged once they finish, and written to
+    PARALLEL_SUMMARY_FILE under the log path of the first testbed.
+    SIGTERM and SIGINT are forwarded to the workers.
+
+    Args:
+        parsed_configs: A list of mobly.config_parser.TestRunConfig, each is a
+                        set of configs for one test_runner.TestRunner.
+        test_identifiers: A list of tuples, each identifies what test case to
+                          run on what test class.
+        repeat: Number of times to iterate the specified tests.
+        max_workers: The maximum number of testbeds to run at once. Defaults
+                     to all of them.
+
+    Returns:
+        True if all test runs executed successfully, False otherwise.
+
+    Raises:
+        ValueError if max_workers is less than 1.
+    """
+    if max_workers is not None and max_workers < 1:
+        raise ValueError('max_workers must be at least 1, got %d.' %
+                         max_workers)
+    if not parsed_configs:
+        return True
+    if max_workers is None:
+        max_workers = len(parsed_configs)
+    messages = multiprocessing.Queue()
+    pending = list(parsed_configs)
+    # Maps the testbed name of each running worker to its process.
+    workers = {}
+    finished = set()
+    counts = {}
+    merged_results = records.TestResult()
+    ok = True
+
+    def handle_message(message):
+        nonlocal ok, merged_results
+        if message[0] == 'case':
+            _, testbed_name, class_name, case_name, result = message
+            result = result or 'UNKNOWN'
+            counts[result] = counts.get(result, 0) + 1
+            _print_parallel_summary(
+                testbed_name, '%s.%s %s' % (class_name, case_name, result),
+                counts)
+        elif message[0] == 'done':
+            _, testbed_name, testbed_ok, results = message
+            ok = ok and testbed_ok
+            finished.add(testbed_name)
+            if results is None:
+                print('[%s] Results could not be merged.' % testbed_name)
+            else:
+                results = pickle.loads(results)
+                merged_results += results
+                _print_parallel_summary(
+                    testbed_name, 'Finished: %s' % results.summary_str(),
+                    counts)
+
+    def forward_signal(signal_num, frame):
+        print('Received signal %s. Stopping %d test beds.' %
+              (signal_num, len(workers)))
+        pending.clear()
+        for worker in workers.values():
+            if worker.is_alive():
+                os.kill(worker.pid, signal_num)
+
+    previous_handlers = {
+        signal_num: signal.signal(signal_num, forward_signal)
+        for signal_num in (signal.SIGTERM, signal.SIGINT)
+    }
+    try:
+        while pending or workers:
+            while pending and len(workers) < max_workers:
+                parsed_config = pending.pop(0)
+                worker = multiprocessing.Process(
+                    target=_run_test_worker,
+                    args=(parsed_config, test_identifiers, repeat, messages))
+                worker.start()
+                workers[parsed_config.testbed_name] = worker
+                print('[%s] Started.' % parsed_config.testbed_name)
+            try:
+                message = messages.get(timeout=0.5)
+            except queue.Empty:
+                pass
+            else:
+                handle_message(message)
+            for testbed_name, worker in list(workers.items()):
+                if worker.is_alive():
+                    continue
+                # The worker may have sent its results just before exiting.
+                while testbed_name not in finished:
+                    try:
+                        message = messages.get(timeout=0.5)
+                    except queue.Empty:
+                        break
+                    handle_message(message)
+                if testbed_name not in finished:
+                    # The worker died without sending its results.
+                    print('[%s] Worker exited with code %s.' %
+                          (testbed_name, worker.exitcode))
+                    ok = False
+                    finished.add(testbed_name)
+                if testbed_name in finished:
+                    worker.join()
+                    del workers[testbed_name]
+    finally:
+        for signal_num, handler in previous_handlers.items():
+            signal.signal(signal_num, handler)
+
+    summary_path = os.path.join(parsed_configs[0].log_path,
+                                PARALLEL_SUMMARY_FILE)
+    os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    with open(summary_path, 'w') as f:
+        f.write(merged_results.json_str())
+    print('Summary for parallel test run: %s' % merged_results.summary_str())
+    return ok
+
+
+def _positive_int(value):
+    """Parses a command line argument that must be a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid int value: %r' % value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('must be at least 1, got %d' %
+                                         number)
+    return number
+
+
 def main():
     """This is the default implementation of a cli entry point for ACTS test
     execution.
@@ -180,8 +408,27 @@ def main():
                         nargs='?',
                         type=int,
                         help="Number of times to run every test case.")
+    parser.add_argument(
+        '-p',
+        '--parallel',
+        action='store_true',
+        help=("Run the tests of each test bed in parallel, each in its own "
+              "process."))
+    parser.add_argument(
+        '--max_workers',
+        type=_positive_int,
+        metavar="<MAX_WORKERS>",
+        help=("With --parallel, the maximum number of test beds to run at "
+              "once. Defaults to all of them."))
+    parser.add_argument(
+        '--rebuild-index',
+        action='store_true',
+        help=("Discard the cached index of the test classes in each test "
+              "file, and rebuild it from the test paths."))
 
     args = parser.parse_args(sys.argv[1:])
+    if args.rebuild_index:
+        test_class_index.TestClassIndex().clear()
     test_list = None
     if args.testfile:
         test_list = config_parser.parse_test_file(args.testfile[0])
@@ -222,8 +469,13 @@ def main():
     # Prepare args for test runs
     test_identifiers = config_parser.parse_test_list(test_list)
 
-    exec_result = _run_tests(parsed_configs, test_identifiers,
-                             args.campaign_iterations)
+    if args.parallel:
+        exec_result = _run_tests_parallel(parsed_configs, test_identifiers,
+                                          args.campaign_iterations,
+                                          args.max_workers)
+    else:
+        exec_result = _run_tests(parsed_configs, test_identifiers,
+                                 args.campaign_iterations)
     if exec_result is False:
         # return 1 upon test failure.
         sys.exit(1)
@@ -177,17 +177,15 @@ class AccessPoint(object):
         except job.Error:
             self.log.info('No hostapd running')
         # Bring down all wireless interfaces
-        for iface in self.wlan:
-            WLAN_DOWN = 'ifconfig {} down'.format(iface)
-            self.ssh.run(WLAN_DOWN)
+        commands = ['ifconfig {} down'.format(iface) for iface in self.wlan]
         # Bring down all bridge interfaces
         bridge_interfaces = self.interfaces.get_bridge_interface()
         if bridge_interfaces:
             for iface in bridge_interfaces:
                 BRIDGE_DOWN = 'ifconfig {} down'.format(iface)
                 BRIDGE_DEL = 'brctl delbr {}'.format(iface)
-                self.ssh.run(BRIDGE_DOWN)
-                self.ssh.run(BRIDGE_DEL)
+                commands += [BRIDGE_DOWN, BRIDGE_DEL]
+        self.ssh.run_batch(commands)
 
     def start_ap(self,
                  hostapd_config,
@@ -350,11 +348,12 @@ class AccessPoint(object):
         # the WAN and LAN/WLAN ports.  This means anyone connecting to the
         # WLAN/LAN ports will be able to access the internet if the WAN port
         # is connected to the internet.
-        self.ssh.run('iptables -t nat -F')
-        self.ssh.run('iptables -t nat -A POSTROUTING -o %s -j MASQUERADE' %
-                     self.wan)
-        self.ssh.run('echo 1 > /proc/sys/net/ipv4/ip_forward')
-        self.ssh.run('echo 1 > /proc/sys/net/ipv6/conf/all/forwarding')
+        self.ssh.run_batch([
+            'iptables -t nat -F',
+            'iptables -t nat -A POSTROUTING -o %s -j MASQUERADE' % self.wan,
+            'echo 1 > /proc/sys/net/ipv4/ip_forward',
+            'echo 1 > /proc/sys/net/ipv6/conf/all/forwarding',
+        ])
 
     def stop_nat(self):
         """Stop NAT on the AP.
@@ -365,9 +364,11 @@ class AccessPoint(object):
         Note that this is currently a global setting, since we don't have
         per-interface masquerade rules.
         """
-        self.ssh.run('iptables -t nat -F')
-        self.ssh.run('echo 0 > /proc/sys/net/ipv4/ip_forward')
-        self.ssh.run('echo 0 > /proc/sys/net/ipv6/conf/all/forwarding')
+        self.ssh.run_batch([
+            'iptables -t nat -F',
+            'echo 0 > /proc/sys/net/ipv4/ip_forward',
+            'echo 0 > /proc/sys/net/ipv6/conf/all/forwarding',
+        ])
 
     def create_bridge(self, bridge_name, interfaces):
         """Create the specified bridge and bridge the specified interfaces.
@@ -378,12 +379,14 @@ class AccessPoint(object):
         """
 
         # Create the bridge interface
-        self.ssh.run(
-            'brctl addbr {bridge_name}'.format(bridge_name=bridge_name))
+        commands = [
+            'brctl addbr {bridge_name}'.format(bridge_name=bridge_name)
+        ]
 
         for interface in interfaces:
-            self.ssh.run('brctl addif {bridge_name} {interface}'.format(
+            commands.append('brctl addif {bridge_name} {interface}'.format(
                 bridge_name=bridge_name, interface=interface))
+        self.ssh.run_batch(commands)
 
     def remove_bridge(self, bridge_name):
         """Removes the specified bridge
@@ -404,10 +407,11 @@ class AccessPoint(object):
         # If the bridge exists, we'll get an exit_status of 0, indicating
         # success, so we can continue and remove the bridge.
         if result.exit_status == 0:
-            self.ssh.run('ip link set {bridge_name} down'.format(
-                bridge_name=bridge_name))
-            self.ssh.run(
-                'brctl delbr {bridge_name}'.format(bridge_name=bridge_name))
+            self.ssh.run_batch([
+                'ip link set {bridge_name} down'.format(
+                    bridge_name=bridge_name),
+                'brctl delbr {bridge_name}'.format(bridge_name=bridge_name),
+            ])
 
     def get_bssid_from_ssid(self, ssid, band):
         """Gets the BSSID from a provided SSID
@@ -461,11 +465,12 @@ class AccessPoint(object):
         del self._aps[identifier]
         bridge_interfaces = self.interfaces.get_bridge_interface()
         if bridge_interfaces:
+            commands = []
             for iface in bridge_interfaces:
                 BRIDGE_DOWN = 'ifconfig {} down'.format(iface)
                 BRIDGE_DEL = 'brctl delbr {}'.format(iface)
-                self.ssh.run(BRIDGE_DOWN)
-                self.ssh.run(BRIDGE_DEL)
+                commands += [BRIDGE_DOWN, BRIDGE_DEL]
+            self.ssh.run_batch(commands)
 
     def stop_all_aps(self):
         """Stops all running aps on this device."""
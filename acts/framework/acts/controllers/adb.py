@@ -22,6 +22,8 @@ import shlex
 import shutil
 
 from acts.controllers.adb_lib.error import AdbError
+from acts.controllers.adb_lib.native_client import AdbNativeClient
+from acts.controllers.adb_lib.native_client import DEFAULT_SERVER_PORT
 from acts.libs.proc import job
 from acts.metrics.loggers import usage_metadata_logger
 
@@ -64,13 +66,17 @@ class AdbProxy(object):
     >> adb.devices() # will return the console output of "adb devices".
     """
 
-    def __init__(self, serial="", ssh_connection=None):
+    def __init__(self, serial="", ssh_connection=None,
+                 use_native_client=False):
         """Construct an instance of AdbProxy.
 
         Args:
             serial: str serial number of Android device from `adb devices`
             ssh_connection: SshConnection instance if the Android device is
                             connected to a remote host that we can reach via SSH.
+            use_native_client: If True, shell commands are sent to the adb
+                               server over persistent shell sessions, instead
+                               of running the adb client for each command.
         """
         self.serial = serial
         self._server_local_port = None
@@ -97,6 +103,10 @@ class AdbProxy(object):
             adb_cmd.append("-P %d" % local_port)
         self.adb_str = " ".join(adb_cmd)
         self._ssh_connection = ssh_connection
+        self._native_client = None
+        if use_native_client:
+            self._native_client = AdbNativeClient(
+                serial, port=self._server_local_port or DEFAULT_SERVER_PORT)
 
     def get_user_id(self):
         """Returns the adb user. Either 2000 (shell) or 0 (root)."""
@@ -154,6 +164,23 @@ class AdbProxy(object):
             AdbError is raised if adb cannot find the device.
         """
         result = job.run(cmd, ignore_status=True, timeout=timeout)
+        return self._get_output(cmd, result, ignore_status)
+
+    def _get_output(self, cmd, result, ignore_status=False):
+        """Returns the output of an executed adb command.
+
+        Args:
+            cmd: A string that is the adb command that was executed.
+            result: The job.Result of the command.
+            ignore_status: Whether to return the output of failed commands
+                           instead of raising.
+
+        Returns:
+            The stdout of the adb command.
+
+        Raises:
+            AdbError is raised if adb cannot find the device.
+        """
         ret, out, err = result.exit_status, result.stdout, result.stderr
 
         if DEVICE_OFFLINE_REGEX.match(err):
@@ -170,6 +197,39 @@ class AdbProxy(object):
         else:
             return out
 
+    def _exec_native_shell(self, command, ignore_status=False,
+                           timeout=DEFAULT_ADB_TIMEOUT):
+        """Executes a shell command through the native adb client.
+
+        If the adb server refuses the connection because it is not running,
+        the command is run with the adb client instead, which also starts the
+        server for the commands that follow.
+
+        Args:
+            command: The shell command to execute.
+            ignore_status: Whether to return the output of failed commands
+                           instead of raising.
+            timeout: The number of seconds to wait for the command to finish,
+                     or None to wait forever.
+
+        Returns:
+            The stdout of the shell command.
+
+        Raises:
+            AdbError is raised if adb cannot find the device.
+            job.TimeoutError is raised if the command times out.
+        """
+        cmd = ' '.join((self.adb_str, 'shell', shlex.quote(command)))
+        try:
+            result = self._native_client.shell(command, timeout=timeout)
+        except ConnectionRefusedError:
+            logging.debug('The adb server is not running. Starting it with '
+                          'the adb client.')
+            return self._exec_cmd(cmd, ignore_status=ignore_status,
+                                  timeout=timeout)
+        logging.debug(result)
+        return self._get_output(cmd, result, ignore_status)
+
     def _exec_adb_cmd(self, name, arg_str, **kwargs):
         return self._exec_cmd(' '.join((self.adb_str, name, arg_str)),
                               **kwargs)
@@ -251,6 +311,10 @@ class AdbProxy(object):
     # TODO: This should be abstracted out into an object like the other shell
     # command.
     def shell(self, command, ignore_status=False, timeout=DEFAULT_ADB_TIMEOUT):
+        if self._native_client is not None:
+            return self._exec_native_shell(command,
+                                           ignore_status=ignore_status,
+                                           timeout=timeout)
         return self._exec_adb_cmd(
             'shell',
             shlex.quote(command),
@@ -267,6 +331,12 @@ class AdbProxy(object):
         return self._exec_adb_cmd(
             'pull', command, ignore_status=ignore_status, timeout=timeout)
 
+    def close(self):
+        """Closes the persistent shell sessions of the native client, if any.
+        """
+        if self._native_client is not None:
+            self._native_client.close()
+
     def __getattr__(self, name):
         def adb_call(*args, **kwargs):
             usage_metadata_logger.log_usage(self.__module__, name)
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""A client for the adb server that runs shell commands without forking adb.
+
+The adb server listens on a local port, where each request is sent as a 4
+digit hex length followed by the request, and answered with OKAY, or FAIL
+followed by a hex length and an error message. After a host:transport request
+selects a device, a shell,v2 request turns the connection into a shell
+protocol stream, made of packets with a 1 byte id and a 4 byte little-endian
+length.
+
+Rather than opening a stream per command, AdbNativeClient keeps a pool of
+long-lived shells per device, and writes each command to the stdin of an idle
+shell. Commands are wrapped with marked_command, so their output can be told
+apart from the next one's.
+"""
+
+import socket
+import struct
+import threading
+import time
+
+from acts.libs.proc import job
+from acts.libs.proc import marked_command
+
+DEFAULT_SERVER_HOST = '127.0.0.1'
+DEFAULT_SERVER_PORT = 5037
+
+# The default maximum number of shells kept open per device.
+DEFAULT_MAX_SESSIONS = 4
+
+# The timeout used while connecting to the server and opening a shell.
+CONNECT_TIMEOUT = 10
+
+# Shell protocol packet ids.
+SHELL_STDIN = 0
+SHELL_STDOUT = 1
+SHELL_STDERR = 2
+SHELL_EXIT = 3
+SHELL_CLOSE_STDIN = 4
+
+# The exit status reported when the device closes a shell mid-command, which
+# matches the adb client.
+CLOSED_EXIT_STATUS = 255
+
+_PACKET_HEADER = struct.Struct('<BI')
+
+
+class AdbServerError(Exception):
+    """Raised when the adb server fails a request.
+
+    Attributes:
+        message: The error message sent by the server.
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class SessionClosedError(ConnectionError):
+    """Raised when a shell closes or exits before returning any output."""
+
+
+class AdbServerConnection(object):
+    """A connection to the adb server."""
+
+    def __init__(self, host=DEFAULT_SERVER_HOST, port=DEFAULT_SERVER_PORT,
+                 timeout=CONNECT_TIMEOUT):
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+
+    def send_request(self, request):
+        """Sends a request to the server.
+
+        Raises:
+            AdbServerError if the server fails the request.
+        """
+        data = request.encode('utf-8')
+        self._socket.sendall(b'%04x' % len(data) + data)
+        status = self.read_exactly(4)
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            length = int(self.read_exactly(4), 16)
+            raise AdbServerError(
+                self.read_exactly(length).decode('utf-8', errors='replace'))
+        raise AdbServerError('Unexpected response from adb server: %r' %
+                             status)
+
+    def read_exactly(self, size):
+        """Reads exactly size bytes.
+
+        Raises:
+            EOFError if the connection closes first.
+        """
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._socket.recv(size - len(data))
+            if not chunk:
+                raise EOFError('The adb connection was closed.')
+            data += chunk
+        return bytes(data)
+
+    def sendall(self, data):
+        self._socket.sendall(data)
+
+    def settimeout(self, timeout):
+        self._socket.settimeout(timeout)
+
+    def close(self):
+        self._socket.close()
+
+
+class ShellSession(object):
+    """A long-lived shell on a device that runs one command at a time.
+
+    Attributes:
+        is_open: Whether the shell can run more commands.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self.is_open = True
+
+    def _read_exactly(self, size, deadline):
+        """Reads exactly size bytes before the deadline.
+
+        Raises:
+            socket.timeout if the deadline passes first.
+        """
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise socket.timeout('The command timed out.')
+            self._connection.settimeout(remaining)
+        return self._connection.read_exactly(size)
+
+    def _read_packet(self, deadline):
+        packet_id, length = _PACKET_HEADER.unpack(
+            self._read_exactly(_PACKET_HEADER.size, deadline))
+        return packet_id, self._read_exactly(length, deadline)
+
+    def run(self, command, timeout):
+        """Runs the command.
+
+        Args:
+            command: The shell command to run.
+            timeout: The number of seconds to wait for the command to finish.
+
+        Returns:
+            A job.Result of the command. If the command times out, did_timeout
+            is set and the shell is closed.
+
+        Raises:
+            SessionClosedError if the shell was closed or exited before the
+            command returned anything.
+        """
+        start_time = time.time()
+        deadline = None if timeout is None else start_time + timeout
+        marked = marked_command.MarkedCommand(command)
+        stdout_end = marked.stdout_end
+        stderr_end = marked.stderr_end
+        stdout = bytearray()
+        stderr = bytearray()
+        stdout_index = -1
+        exit_status = None
+        stderr_done = False
+
+        def result(**kwargs):
+            return job.Result(command=command, stdout=bytes(stdout),
+                              stderr=bytes(stderr),
+                              duration=time.time() - start_time, **kwargs)
+
+        try:
+            self._connection.settimeout(timeout)
+            data = marked.script.encode('utf-8')
+            self._connection.sendall(
+                _PACKET_HEADER.pack(SHELL_STDIN, len(data)) + data)
+            while exit_status is None or not stderr_done:
+                packet_id, data = self._read_packet(deadline)
+                if packet_id == SHELL_STDOUT:
+                    if stdout_index < 0:
+                        # Only search the output that could hold the marker.
+                        search_start = max(len(stdout) - len(stdout_end), 0)
+                        stdout += data
+                        stdout_index = stdout.find(stdout_end, search_start)
+                    else:
+                        stdout += data
+                    if stdout_index >= 0 and stdout.endswith(b'\n'):
+                        exit_status = marked_command.parse_exit_status(
+                            stdout[stdout_index + len(stdout_end):-1])
+                        del stdout[stdout_index:]
+                elif packet_id == SHELL_STDERR:
+                    stderr += data
+                    if stderr.endswith(stderr_end):
+                        del stderr[-len(stderr_end):]
+                        stderr_done = True
+                elif packet_id == SHELL_EXIT:
+                    # The shell itself exited, possibly while it was idle.
+                    self.close()
+                    if not stdout and not stderr:
+                        raise SessionClosedError('The shell exited.')
+                    return result(exit_status=data[0] if data else
+                                  CLOSED_EXIT_STATUS)
+        except socket.timeout:
+            self.close()
+            return result(did_timeout=True)
+        except (EOFError, OSError) as e:
+            self.close()
+            if not stdout and not stderr:
+                raise SessionClosedError(str(e))
+            return result(exit_status=CLOSED_EXIT_STATUS)
+        return result(exit_status=exit_status)
+
+    def close(self):
+        """Closes the shell."""
+        if self.is_open:
+            self.is_open = False
+            self._connection.close()
+
+
+class AdbNativeClient(object):
+    """Runs shell commands on a device through the adb server protocol.
+
+    Up to max_sessions shells are opened on demand and kept open, so that
+    concurrent commands run on separate shells, and sequential commands reuse
+    the same one.
+
+    Attributes:
+        serial: The serial of the device. If empty, the only device attached.
+        host: The host of the adb server.
+        port: The port of the adb server.
+        max_sessions: The maximum number of shells to keep open.
+    """
+
+    def __init__(self, serial='', host=DEFAULT_SERVER_HOST,
+                 port=DEFAULT_SERVER_PORT, max_sessions=DEFAULT_MAX_SESSIONS):
+        self.serial = serial
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self._idle_sessions = []
+        self._num_sessions = 0
+        self._lock = threading.Lock()
+        self._session_available = threading.Condition(self._lock)
+
+    def _open_session(self):
+        """Opens a new shell on the device.
+
+        Raises:
+            AdbServerError if the server fails to open the shell.
+            OSError if the server cannot be reached.
+        """
+        connection = AdbServerConnection(self.host, self.port)
+        try:
+            if self.serial:
+                connection.send_request('host:transport:%s' % self.serial)
+            else:
+                connection.send_request('host:transport-any')
+            connection.send_request('shell,v2,raw:')
+        except BaseException:
+            connection.close()
+            raise
+        return ShellSession(connection)
+
+    def _acquire_session(self):
+        """Returns a tuple of (an idle shell, whether it was just opened)."""
+        with self._lock:
+            self._session_available.wait_for(
+                lambda: (self._idle_sessions or
+                         self._num_sessions < self.max_sessions))
+            if self._idle_sessions:
+                return self._idle_sessions.pop(), False
+            self._num_sessions += 1
+        try:
+            return self._open_session(), True
+        except BaseException:
+            with self._lock:
+                self._num_sessions -= 1
+                self._session_available.notify()
+            raise
+
+    def _release_session(self, session):
+        with self._lock:
+            if session.is_open:
+                self._idle_sessions.append(session)
+            else:
+                self._num_sessions -= 1
+            self._session_available.notify()
+
+    def shell(self, command, timeout=None):
+        """Runs a shell command on the device.
+
+        Failed server requests are reported the way the adb client reports
+        them, with an exit status of 1 and the error message on stderr.
+
+        Args:
+            command: The shell command to run.
+            timeout: The number of seconds to wait for the command to finish.
+
+        Returns:
+            A job.Result of the command.
+
+        Raises:
+            job.TimeoutError if the command times out.
+            OSError if the adb server cannot be reached.
+        """
+        while True:
+            try:
+                session, is_new = self._acquire_session()
+            except AdbServerError as e:
+                return job.Result(command=command,
+                                  stderr=('error: %s' % e.message).encode(),
+                                  exit_status=1)
+            try:
+                result = session.run(command, timeout)
+            except SessionClosedError:
+                if not is_new:
+                    # The shell was closed while idle, for instance because
+                    # adbd restarted. Retry on a new one.
+                    continue
+                result = job.Result(command=command,
+                                    stderr=b'error: closed',
+                                    exit_status=CLOSED_EXIT_STATUS)
+            finally:
+                self._release_session(session)
+            if result.did_timeout:
+                raise job.TimeoutError(result)
+            return result
+
+    def close(self):
+        """Closes the idle shells."""
+        with self._lock:
+            sessions = self._idle_sessions
+            self._idle_sessions = []
+            self._num_sessions -= len(sessions)
+            self._session_available.notify_all()
+        for session in sessions:
+            session.close()
@@ -15,6 +15,8 @@
 #   limitations under the License.
 
 import collections
+import contextlib
+import functools
 import logging
 import math
 import os
@@ -32,6 +34,7 @@ from acts import utils
 from acts.controllers import adb
 from acts.controllers.adb_lib.error import AdbError
 from acts.controllers import fastboot
+from acts.controllers.android_lib import dumpsys
 from acts.controllers.android_lib import errors
 from acts.controllers.android_lib import events as android_events
 from acts.controllers.android_lib import logcat
@@ -49,6 +52,8 @@ ACTS_CONTROLLER_REFERENCE_NAME = "android_devices"
 ANDROID_DEVICE_PICK_ALL_TOKEN = "*"
 # Key name for adb logcat extra params in config file.
 ANDROID_DEVICE_ADB_LOGCAT_PARAM_KEY = "adb_logcat_param"
+# Key name for writing adb logcat directly to files in config file.
+ANDROID_DEVICE_ADB_LOGCAT_DIRECT_WRITE_KEY = "adb_logcat_direct_write"
 ANDROID_DEVICE_EMPTY_CONFIG_MSG = "Configuration is empty, abort!"
 ANDROID_DEVICE_NOT_LIST_CONFIG_MSG = "Configuration should be a list, abort!"
 CRASH_REPORT_PATHS = ("/data/tombstones/", "/data/vendor/ramdump/",
@@ -95,31 +100,28 @@ def create(configs):
 
     ads[0].log.info('The primary device under test is "%s".' % ads[0].serial)
 
-    for ad in ads:
-        if not ad.is_connected():
+    connected = utils.run_concurrent_actions_no_raise(
+        *[functools.partial(_check_connected, ad) for ad in ads])
+    for ad, is_connected in zip(ads, connected):
+        if isinstance(is_connected, Exception):
+            raise is_connected
+        if not is_connected:
             raise errors.AndroidDeviceError(
                 ("Android device %s is specified in config"
                  " but is not attached.") % ad.serial,
                 serial=ad.serial)
-    _start_services_on_ads(ads)
-    for ad in ads:
-        if ad.droid:
-            utils.set_location_service(ad, False)
-            utils.sync_device_time(ad)
+    _run_on_ads_or_destroy(ads, _set_up_ad, 'Failed to set up, abort!')
     return ads
 
 
 def destroy(ads):
-    """Cleans up AndroidDevice objects.
+    """Cleans up AndroidDevice objects concurrently.
 
     Args:
         ads: A list of AndroidDevice objects.
     """
-    for ad in ads:
-        try:
-            ad.clean_up()
-        except:
-            ad.log.exception("Failed to clean up properly.")
+    utils.run_concurrent_actions_no_raise(
+        *[functools.partial(_clean_up_ad, ad) for ad in ads])
 
 
 def get_info(ads):
@@ -139,24 +141,70 @@ def get_info(ads):
     return device_info
 
 
-def _start_services_on_ads(ads):
-    """Starts long running services on multiple AndroidDevice objects.
+@contextlib.contextmanager
+def _timed_phase(ad, phase):
+    """Records the duration of a phase of setting up or cleaning up a device.
+
+    The duration is stored in ad.phase_durations, in seconds.
+    """
+    start_time = time.time()
+    try:
+        yield
+    finally:
+        ad.phase_durations[phase] = time.time() - start_time
+
+
+def _check_connected(ad):
+    with _timed_phase(ad, 'is_connected'):
+        return ad.is_connected()
+
+
+def _start_services_on_ad(ad):
+    with _timed_phase(ad, 'start_services'):
+        ad.start_services()
+
+
+def _set_up_ad(ad):
+    """Starts the services of an AndroidDevice and prepares it for tests."""
+    _start_services_on_ad(ad)
+    if ad.droid:
+        with _timed_phase(ad, 'set_location_service'):
+            utils.set_location_service(ad, False)
+        with _timed_phase(ad, 'sync_device_time'):
+            utils.sync_device_time(ad)
+    ad.log.info('Set up in %s.', ', '.join(
+        '%s %.2fs' % phase for phase in ad.phase_durations.items()))
+
+
+def _clean_up_ad(ad):
+    try:
+        with _timed_phase(ad, 'clean_up'):
+            ad.clean_up()
+    except:
+        ad.log.exception("Failed to clean up properly.")
+
 
-    If any one AndroidDevice object fails to start services, cleans up all
-    existing AndroidDevice objects and their services.
+def _run_on_ads_or_destroy(ads, func, error_message):
+    """Runs func on multiple AndroidDevice objects concurrently.
+
+    If func fails on any one AndroidDevice object, cleans up all of them and
+    their services, and raises the first error in the order of ads.
 
     Args:
-        ads: A list of AndroidDevice objects whose services to start.
+        ads: A list of AndroidDevice objects.
+        func: The function to call with each AndroidDevice object.
+        error_message: The message logged for each device func fails on.
     """
-    running_ads = []
-    for ad in ads:
-        running_ads.append(ad)
-        try:
-            ad.start_services()
-        except:
-            ad.log.exception('Failed to start some services, abort!')
-            destroy(running_ads)
-            raise
+    results = utils.run_concurrent_actions_no_raise(
+        *[functools.partial(func, ad) for ad in ads])
+    errors_raised = []
+    for ad, result in zip(ads, results):
+        if isinstance(result, Exception):
+            ad.log.error(error_message, exc_info=result)
+            errors_raised.append(result)
+    if errors_raised:
+        destroy(ads)
+        raise errors_raised[0]
 
 
 def _parse_device_list(device_list_str, key):
@@ -213,7 +261,10 @@ def get_instances(serials):
 def get_instances_with_configs(configs):
     """Create AndroidDevice instances from a list of json configs.
 
-    Each config should have the required key-value pair "serial".
+    Each config should have the required key-value pair "serial". If the
+    optional "native_adb" is true, adb shell commands are sent straight to the
+    adb server instead of through the adb client. The optional
+    "dumpsys_cache_ttl" sets the seconds dumpsys output is reused for.
 
     Args:
         configs: A list of dicts each representing the configuration of one
@@ -235,7 +286,12 @@ def get_instances_with_configs(configs):
         if ssh_config is not None:
             ssh_settings = settings.from_config(ssh_config)
             ssh_connection = connection.SshConnection(ssh_settings)
-        ad = AndroidDevice(serial, ssh_connection=ssh_connection)
+        native_adb = c.pop('native_adb', False)
+        dumpsys_cache_ttl = c.pop('dumpsys_cache_ttl',
+                                  dumpsys.DEFAULT_DUMPSYS_CACHE_TTL)
+        ad = AndroidDevice(serial, ssh_connection=ssh_connection,
+                           native_adb=native_adb,
+                           dumpsys_cache_ttl=dumpsys_cache_ttl)
         ad.load_config(c)
         results.append(ad)
     return results
@@ -355,9 +411,16 @@ class AndroidDevice:
         adb: An AdbProxy object used for interacting with the device via adb.
         fastboot: A FastbootProxy object used for interacting with the device
                   via fastboot.
+        phase_durations: An OrderedDict of the phases of setting up and
+                         cleaning up the device, such as 'start_services', to
+                         the seconds each took.
+        dumpsys_cache: A DumpsysCache of the dumpsys output of the device.
+        logcat: The LogcatPublisher of the device, to subscribe to logcat
+                lines as the adb logcat process reads them.
     """
 
-    def __init__(self, serial='', ssh_connection=None):
+    def __init__(self, serial='', ssh_connection=None, native_adb=False,
+                 dumpsys_cache_ttl=dumpsys.DEFAULT_DUMPSYS_CACHE_TTL):
         self.serial = serial
         # logging.log_path only exists when this is used in an ACTS test run.
         log_path_base = getattr(logging, 'log_path', '/tmp/logs')
@@ -368,12 +431,17 @@ class AndroidDevice:
                                        {'serial': serial}))
         self._event_dispatchers = {}
         self._services = []
+        self.phase_durations = collections.OrderedDict()
         self.register_service(services.AdbLogcatService(self))
         self.register_service(services.Sl4aService(self))
         self.adb_logcat_process = None
-        self.adb = adb.AdbProxy(serial, ssh_connection=ssh_connection)
+        self.logcat = logcat.get_logcat_publisher(serial)
+        self.adb = adb.AdbProxy(serial, ssh_connection=ssh_connection,
+                                use_native_client=native_adb)
         self.fastboot = fastboot.FastbootProxy(
             serial, ssh_connection=ssh_connection)
+        self.dumpsys_cache = dumpsys.DumpsysCache(self.adb,
+                                                  ttl=dumpsys_cache_ttl)
         if not self.is_bootloader:
             self.root_adb()
         self._ssh_connection = ssh_connection
@@ -382,6 +450,7 @@ class AndroidDevice:
         self.data_accounting = collections.defaultdict(int)
         self._sl4a_manager = sl4a_manager.Sl4aManager(self.adb)
         self.last_logcat_timestamp = None
+        self._logcat_index = None
         # Device info cache.
         self._user_added_device_info = {}
         self._sdk_api_level = None
@@ -394,6 +463,7 @@ class AndroidDevice:
         for service in self._services:
             service.unregister()
         self._services.clear()
+        self.adb.close()
         if self._ssh_connection:
             self._ssh_connection.close()
 
@@ -699,6 +769,13 @@ class AndroidDevice:
                                                         target) >= 0
         return low and high
 
+    def _get_logcat_index(self, logcat_path):
+        """Returns the LogcatIndex of the given logcat file."""
+        if (self._logcat_index is None
+                or self._logcat_index.path != logcat_path):
+            self._logcat_index = logcat.LogcatIndex(logcat_path)
+        return self._logcat_index
+
     def cat_adb_log(self,
                     tag,
                     begin_time,
@@ -713,11 +790,10 @@ class AndroidDevice:
             end_time: Epoch time of the ending of the time period, default None
             dest_path: Destination path of the excerpt file.
         """
-        log_begin_time = acts_logger.epoch_to_log_line_timestamp(begin_time)
+        log_begin_time = logcat.epoch_to_line_timestamp(begin_time)
         if end_time is None:
-            log_end_time = acts_logger.get_log_line_timestamp()
-        else:
-            log_end_time = acts_logger.epoch_to_log_line_timestamp(end_time)
+            end_time = utils.get_current_epoch_time()
+        log_end_time = logcat.epoch_to_line_timestamp(end_time)
         self.log.debug("Extracting adb log from logcat.")
         logcat_path = os.path.join(self.device_log_path,
                                    'adblog_%s_debug.txt' % self.serial)
@@ -731,25 +807,16 @@ class AndroidDevice:
         tag_len = utils.MAX_FILENAME_LEN - len(out_name)
         out_name = '%s,%s' % (tag[:tag_len], out_name)
         adb_excerpt_path = os.path.join(adb_excerpt_dir, out_name)
+        logcat_index = self._get_logcat_index(logcat_path)
         with open(adb_excerpt_path, 'w', encoding='utf-8') as out:
-            in_file = logcat_path
-            with open(in_file, 'r', encoding='utf-8', errors='replace') as f:
-                while True:
-                    line = None
-                    try:
-                        line = f.readline()
-                        if not line:
-                            break
-                    except:
-                        continue
-                    line_time = line[:acts_logger.log_line_timestamp_len]
-                    if not acts_logger.is_valid_logline_timestamp(line_time):
-                        continue
-                    if self._is_timestamp_in_range(line_time, log_begin_time,
-                                                   log_end_time):
-                        if not line.endswith('\n'):
-                            line += '\n'
-                        out.write(line)
+            for line in logcat_index.read_lines(log_begin_time, log_end_time):
+                line_time = line[:logcat.LINE_TIMESTAMP_LEN]
+                if not acts_logger.is_valid_logline_timestamp(line_time):
+                    continue
+                if log_begin_time <= line_time <= log_end_time:
+                    if not line.endswith('\n'):
+                        line += '\n'
+                    out.write(line)
         return adb_excerpt_path
 
     def search_logcat(self, matching_string, begin_time=None):
@@ -757,6 +824,8 @@ class AndroidDevice:
 
         Args:
             matching_string: matching_string to search.
+            begin_time: Epoch time in ms of the earliest message to return.
+                If None, the whole logcat is searched.
 
         Returns:
             A list of dictionaries with full log message, time stamp string
@@ -771,23 +840,29 @@ class AndroidDevice:
         if not os.path.exists(logcat_path):
             self.log.warning("Logcat file %s does not exist." % logcat_path)
             return
-        output = job.run(
-            "grep '%s' %s" % (matching_string, logcat_path),
-            ignore_status=True)
+        if begin_time:
+            log_begin_time = logcat.epoch_to_line_timestamp(begin_time)
+            start, _ = self._get_logcat_index(logcat_path).get_byte_range(
+                log_begin_time)
+            # tail counts bytes from 1.
+            output = job.run(
+                "tail -c +%d %s | grep '%s'" % (start + 1, logcat_path,
+                                                matching_string),
+                ignore_status=True)
+        else:
+            log_begin_time = None
+            output = job.run(
+                "grep '%s' %s" % (matching_string, logcat_path),
+                ignore_status=True)
         if not output.stdout or output.exit_status != 0:
             return []
-        if begin_time:
-            log_begin_time = acts_logger.epoch_to_log_line_timestamp(
-                begin_time)
-            begin_time = datetime.strptime(log_begin_time,
-                                           "%Y-%m-%d %H:%M:%S.%f")
         result = []
         logs = re.findall(r'(\S+\s\S+)(.*)', output.stdout)
         for log in logs:
             time_stamp = log[0]
-            time_obj = datetime.strptime(time_stamp, "%Y-%m-%d %H:%M:%S.%f")
-            if begin_time and time_obj < begin_time:
+            if log_begin_time and time_stamp < log_begin_time:
                 continue
+            time_obj = datetime.strptime(time_stamp, "%Y-%m-%d %H:%M:%S.%f")
             result.append({
                 "log_message": "".join(log),
                 "time_stamp": time_stamp,
@@ -813,8 +888,10 @@ class AndroidDevice:
         else:
             extra_params = "-b all"
 
+        direct_write = getattr(self, ANDROID_DEVICE_ADB_LOGCAT_DIRECT_WRITE_KEY,
+                               False)
         self.adb_logcat_process = logcat.create_logcat_keepalive_process(
-            self.serial, self.log_dir, extra_params)
+            self.serial, self.log_dir, extra_params, direct_write=direct_write)
         self.adb_logcat_process.start()
 
     def stop_adb_logcat(self):
@@ -830,6 +907,7 @@ class AndroidDevice:
         # but it does not pose a problem for our logging purposes.
         self.adb_logcat_process.stop()
         self.adb_logcat_process = None
+        logcat.close_logcat_writer(self.serial)
 
     def get_apk_uid(self, apk_name):
         """Get the uid of the given apk.
@@ -1236,10 +1314,12 @@ class AndroidDevice:
         """
         if self.is_bootloader:
             self.fastboot.reboot()
+            self.dumpsys_cache.invalidate()
             return
         self.stop_services()
         self.log.info("Rebooting")
         self.adb.reboot()
+        self.dumpsys_cache.invalidate()
 
         timeout_start = time.time()
         # b/111791239: Newer versions of android sometimes return early after
@@ -1276,6 +1356,7 @@ class AndroidDevice:
         # to correctly detect when the framework has fully come up.
         self.adb.shell("setprop sys.boot_completed 0")
         self.adb.shell("start")
+        self.dumpsys_cache.invalidate()
         self.wait_for_boot_completion()
         self.root_adb()
 
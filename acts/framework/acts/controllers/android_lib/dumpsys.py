@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import re
+import shlex
+import threading
+import time
+
+# The default number of seconds a dumpsys snapshot is reused for.
+DEFAULT_DUMPSYS_CACHE_TTL = 2
+
+
+class DumpsysSnapshot(object):
+    """The output of a dumpsys service at one point in time.
+
+    Attributes:
+        service: The dumpsys service, such as 'telephony.registry'.
+        output: The output of dumpsys.
+        timestamp: The time.time() the output was fetched at.
+    """
+
+    def __init__(self, service, output, timestamp):
+        self.service = service
+        self.output = output
+        self.timestamp = timestamp
+        self._lines = None
+
+    @property
+    def lines(self):
+        """The lines of the output."""
+        if self._lines is None:
+            self._lines = self.output.splitlines()
+        return self._lines
+
+    def grep(self, text, ignore_case=False):
+        """Returns the lines containing text, like `dumpsys <service> | grep`.
+
+        Args:
+            text: The text to find. Matched literally, like grep -F.
+            ignore_case: Whether to match regardless of case, like grep -i.
+
+        Returns:
+            The matching lines, joined by newlines.
+        """
+        if ignore_case:
+            text = text.lower()
+            return '\n'.join(line for line in self.lines
+                             if text in line.lower())
+        return '\n'.join(line for line in self.lines if text in line)
+
+    def findall(self, pattern, flags=0):
+        """Returns re.findall of a pattern over the output."""
+        return re.findall(pattern, self.output, flags)
+
+
+class DumpsysCache(object):
+    """Caches the output of dumpsys services of a device.
+
+    The output of each service is fetched once, and reused for up to ttl
+    seconds, so helpers reading several fields of the same service back to
+    back cost a single adb command. invalidate() must be called after
+    anything that changes the state of the device, such as a reboot or
+    toggling airplane mode.
+
+    Attributes:
+        ttl: The number of seconds a snapshot is reused for. Caching is
+            disabled if 0.
+    """
+
+    def __init__(self, adb, ttl=DEFAULT_DUMPSYS_CACHE_TTL):
+        """
+        Args:
+            adb: The AdbProxy of the device.
+            ttl: The number of seconds a snapshot is reused for.
+        """
+        self._adb = adb
+        self.ttl = ttl
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._service_locks = {}
+        # Incremented by invalidate(), so that a snapshot fetched while the
+        # state changed is not cached.
+        self._generation = 0
+
+    def _get_fresh_snapshot(self, service):
+        """Returns the cached snapshot of a service, or None if it expired."""
+        with self._lock:
+            snapshot = self._snapshots.get(service)
+        if snapshot and time.time() - snapshot.timestamp < self.ttl:
+            return snapshot
+        return None
+
+    def grep(self, service, text, ignore_case=False):
+        """Returns the lines of a service containing text.
+
+        The cached snapshot is searched if it is still fresh. Otherwise the
+        output is filtered on the device, and not cached, so that reading a
+        single field of a large service such as carrier_config does not pull
+        its full output.
+
+        Args:
+            service: The dumpsys service, such as 'carrier_config'.
+            text: The text to find. Matched literally, like grep -F.
+            ignore_case: Whether to match regardless of case, like grep -i.
+
+        Returns:
+            The matching lines, joined by newlines.
+        """
+        snapshot = self._get_fresh_snapshot(service)
+        if snapshot:
+            return snapshot.grep(text, ignore_case=ignore_case)
+        flags = '-Fi' if ignore_case else '-F'
+        output = self._adb.shell('dumpsys %s | grep %s -e %s' %
+                                 (service, flags, shlex.quote(text)))
+        return '\n'.join(output.splitlines())
+
+    def get(self, service):
+        """Returns a DumpsysSnapshot of a service.
+
+        A snapshot fetched within the last ttl seconds is reused. Concurrent
+        calls for the same service share a single fetch.
+
+        Args:
+            service: The dumpsys service, such as 'telephony.registry'.
+        """
+        with self._lock:
+            service_lock = self._service_locks.setdefault(
+                service, threading.Lock())
+        with service_lock:
+            with self._lock:
+                generation = self._generation
+            snapshot = self._get_fresh_snapshot(service)
+            if snapshot:
+                return snapshot
+            timestamp = time.time()
+            output = self._adb.shell('dumpsys %s' % service)
+            snapshot = DumpsysSnapshot(service, output, timestamp)
+            with self._lock:
+                if generation == self._generation:
+                    self._snapshots[service] = snapshot
+            return snapshot
+
+    def invalidate(self, service=None):
+        """Discards the cached snapshots.
+
+        Args:
+            service: The service to discard the snapshot of. All snapshots
+                are discarded if None.
+        """
+        with self._lock:
+            self._generation += 1
+            if service is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(service, None)
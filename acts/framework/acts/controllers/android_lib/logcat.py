@@ -14,15 +14,369 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import bisect
+import collections
+import datetime
 import logging
+import os
+import queue
 import re
+import threading
 
+from acts import context
+from acts.context import ContextLevel
+from acts.event import event_bus
 from acts.libs.proc.process import Process
 from acts.libs.logging import log_stream
 from acts.libs.logging.log_stream import LogStyles
 
 TIMESTAMP_REGEX = r'((?:\d+-)?\d+-\d+ \d+:\d+:\d+.\d+)'
 
+# The 'YYYY-MM-DD HH:MM:SS.mmm' timestamp that starts each line written with
+# '-v year'. Since it is fixed-width, these timestamps sort as strings.
+LINE_TIMESTAMP_LEN = 23
+_LINE_TIMESTAMP_REGEX = re.compile(
+    rb'\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d\d\d')
+
+# The maximal number of bytes of logcat output read at once when writing
+# logcat directly to files.
+LOGCAT_READ_SIZE = 256 * 1024
+
+_logcat_writers = {}
+_logcat_publishers = {}
+_logcat_publishers_lock = threading.Lock()
+
+# Matches backreferences, which refer to the wrong groups once the pattern is
+# combined with others.
+_BACKREFERENCE_REGEX = re.compile(r'\\[1-9]|\(\?P=')
+
+LogcatMatch = collections.namedtuple('LogcatMatch',
+                                     ['pattern', 'line', 'match'])
+LogcatMatch.__doc__ = """A logcat line matching a subscribed pattern.
+
+Attributes:
+    pattern: The subscribed pattern, as given to subscribe().
+    line: The logcat line, without its trailing newline.
+    match: The re.Match of the pattern on the line.
+"""
+
+
+def epoch_to_line_timestamp(epoch_time):
+    """Converts an epoch time in ms to the timestamp format of logcat lines.
+
+    Unlike acts.logger.epoch_to_log_line_timestamp, the milliseconds are
+    zero-padded, so the result can be compared against line timestamps as a
+    string.
+    """
+    s, ms = divmod(epoch_time, 1000)
+    date = datetime.datetime.fromtimestamp(s)
+    return '%s.%03d' % (date.strftime('%Y-%m-%d %H:%M:%S'), ms)
+
+
+class LogcatIndex(object):
+    """A sparse index from timestamps to byte offsets of a logcat file.
+
+    The file is split into blocks of at least BLOCK_SIZE bytes that start on a
+    line boundary. For each block, the index holds its offset, the latest
+    timestamp of any line before it, and the earliest timestamp of any line
+    within it or after it. Lines from different logcat buffers can be slightly
+    out of order, but both of these timestamps are sorted, so the blocks
+    holding a time window can be found by bisection.
+
+    The index is updated incrementally from the file itself, so each byte of
+    the file is only parsed once. If the file is replaced or truncated, the
+    index is rebuilt.
+
+    Attributes:
+        path: The path of the logcat file.
+    """
+    BLOCK_SIZE = 64 * 1024
+    READ_SIZE = 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self._reset(None)
+
+    def _reset(self, file_id):
+        self._file_id = file_id
+        self._indexed_size = 0
+        self._max_timestamp = ''
+        self._offsets = []
+        self._prior_max_timestamps = []
+        self._min_timestamps = []
+        self._suffix_min_timestamps = []
+
+    def update(self):
+        """Indexes the complete lines appended since the last update."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset(None)
+            return
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._indexed_size:
+            self._reset(file_id)
+        if stat.st_size == self._indexed_size:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._indexed_size)
+            offset = self._indexed_size
+            remainder = b''
+            while True:
+                data = f.read(self.READ_SIZE)
+                if not data:
+                    break
+                lines = (remainder + data).split(b'\n')
+                remainder = lines.pop()
+                for line in lines:
+                    self._index_line(line, offset)
+                    offset += len(line) + 1
+        self._indexed_size = offset
+        self._update_suffix_min_timestamps()
+
+    def _index_line(self, line, offset):
+        if not _LINE_TIMESTAMP_REGEX.match(line):
+            return
+        timestamp = line[:LINE_TIMESTAMP_LEN].decode('ascii')
+        if (not self._offsets
+                or offset - self._offsets[-1] >= self.BLOCK_SIZE):
+            self._offsets.append(offset)
+            self._prior_max_timestamps.append(self._max_timestamp)
+            self._min_timestamps.append(timestamp)
+        elif timestamp < self._min_timestamps[-1]:
+            self._min_timestamps[-1] = timestamp
+        if timestamp > self._max_timestamp:
+            self._max_timestamp = timestamp
+
+    def _update_suffix_min_timestamps(self):
+        """Propagates the earliest timestamps of new lines to prior blocks."""
+        suffix_mins = self._suffix_min_timestamps
+        # The last block indexed before may have gained lines since.
+        changed = max(len(suffix_mins) - 1, 0)
+        suffix_mins.extend(self._min_timestamps[len(suffix_mins):])
+        following = None
+        for block in reversed(range(len(suffix_mins))):
+            value = self._min_timestamps[block]
+            if following is not None and following < value:
+                value = following
+            if block < changed and value == suffix_mins[block]:
+                break
+            suffix_mins[block] = value
+            following = value
+
+    def get_byte_range(self, begin_timestamp, end_timestamp=None):
+        """Returns the byte range holding every line within the time window.
+
+        The range may also hold lines outside of the window, so they must
+        still be filtered by their timestamps.
+
+        Args:
+            begin_timestamp: The earliest line timestamp of the window.
+            end_timestamp: The latest line timestamp of the window. If None,
+                the window continues to the end of the file.
+
+        Returns:
+            A tuple of (start offset, end offset). The end offset is None if
+            the range continues to the end of the file.
+        """
+        self.update()
+        if not self._offsets:
+            return 0, None
+        block = max(bisect.bisect_left(self._prior_max_timestamps,
+                                       begin_timestamp) - 1, 0)
+        if end_timestamp is not None:
+            next_block = bisect.bisect_right(self._suffix_min_timestamps,
+                                             end_timestamp)
+            if next_block < len(self._offsets):
+                return (self._offsets[block],
+                        self._offsets[max(next_block, block)])
+        return self._offsets[block], None
+
+    def read_lines(self, begin_timestamp, end_timestamp=None):
+        """Yields the lines of the byte range holding the time window.
+
+        See get_byte_range for the arguments. The lines are not filtered by
+        their timestamps.
+        """
+        start, end = self.get_byte_range(begin_timestamp, end_timestamp)
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if end is not None and offset >= end:
+                    break
+                offset += len(line)
+                yield line.decode('utf-8', errors='replace')
+
+
+class LogcatSubscription(object):
+    """A subscription to the logcat lines matching some patterns.
+
+    Matches are passed to the callback, or put in the queue, from the thread
+    reading the logcat, so callbacks must return quickly. Can be used as a
+    context manager, which unsubscribes on exit.
+
+    Attributes:
+        patterns: The subscribed patterns.
+        queue: The queue.Queue the LogcatMatches are put in, or None if a
+            callback was given.
+    """
+
+    def __init__(self, publisher, patterns, callback=None, match_queue=None):
+        self.patterns = patterns
+        self.queue = match_queue
+        if callback is None and match_queue is None:
+            self.queue = queue.Queue()
+        self._publisher = publisher
+        self._callback = callback
+
+    def deliver(self, logcat_match):
+        """Passes a LogcatMatch on to the callback or the queue."""
+        if self._callback is not None:
+            try:
+                self._callback(logcat_match)
+            except Exception:
+                logging.exception('Logcat subscription callback failed.')
+        else:
+            self.queue.put(logcat_match)
+
+    def get(self, timeout=None):
+        """Returns the next LogcatMatch from the queue.
+
+        Args:
+            timeout: The maximal wait time, in seconds. None to wait forever.
+
+        Raises:
+            queue.Empty if no line matched within the timeout.
+        """
+        return self.queue.get(timeout=timeout)
+
+    def unsubscribe(self):
+        """Stops receiving the matching lines."""
+        self._publisher.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.unsubscribe()
+
+
+class _LogcatMatcher(object):
+    """Matches lines against the patterns of every subscription at once.
+
+    The patterns that can be combined are joined into a single alternation,
+    which is searched once per line. Only the lines it matches are searched
+    for each of these patterns individually.
+    """
+
+    def __init__(self, subscriptions):
+        self._combined_entries = []
+        self._separate_entries = []
+        for subscription in subscriptions:
+            for pattern in subscription.patterns:
+                regex = re.compile(pattern)
+                entry = (regex, pattern, subscription)
+                if (regex.flags & ~re.UNICODE or regex.groupindex
+                        or _BACKREFERENCE_REGEX.search(regex.pattern)):
+                    self._separate_entries.append(entry)
+                else:
+                    self._combined_entries.append(entry)
+        self._combined_regex = None
+        if self._combined_entries:
+            self._combined_regex = re.compile('|'.join(
+                '(?:%s)' % regex.pattern
+                for regex, _, _ in self._combined_entries))
+
+    def match(self, line):
+        """Returns the (subscription, LogcatMatch) pairs of a line."""
+        entries = self._separate_entries
+        if self._combined_regex and self._combined_regex.search(line):
+            entries = self._combined_entries + entries
+        matches = []
+        for regex, pattern, subscription in entries:
+            match = regex.search(line)
+            if match:
+                matches.append((subscription, LogcatMatch(pattern, line,
+                                                          match)))
+        return matches
+
+
+class LogcatPublisher(object):
+    """Publishes the lines of the logcat of a device to subscriptions.
+
+    The logcat keepalive process of the device publishes each line as it is
+    read, so subscribers get the matching lines as they stream, without
+    reading the logcat file.
+
+    Attributes:
+        serial: The serial of the device.
+    """
+
+    def __init__(self, serial):
+        self.serial = serial
+        self._lock = threading.Lock()
+        self._subscriptions = []
+        self._matcher = None
+
+    @property
+    def has_subscriptions(self):
+        """Whether any subscription is active."""
+        return self._matcher is not None
+
+    def subscribe(self, patterns, callback=None, match_queue=None):
+        """Subscribes to the logcat lines matching any of the patterns.
+
+        Args:
+            patterns: A regex string or compiled regex, or a list of them.
+                Each is searched for in each line.
+            callback: A function called with a LogcatMatch for each match.
+            match_queue: A queue.Queue to put a LogcatMatch in for each match.
+                If neither callback nor match_queue is given, a new queue is
+                used.
+
+        Returns:
+            The LogcatSubscription.
+        """
+        if isinstance(patterns, str) or hasattr(patterns, 'search'):
+            patterns = [patterns]
+        subscription = LogcatSubscription(self, list(patterns), callback,
+                                          match_queue)
+        with self._lock:
+            self._subscriptions.append(subscription)
+            self._matcher = _LogcatMatcher(self._subscriptions)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Removes a LogcatSubscription."""
+        with self._lock:
+            if subscription not in self._subscriptions:
+                return
+            self._subscriptions.remove(subscription)
+            self._matcher = None
+            if self._subscriptions:
+                self._matcher = _LogcatMatcher(self._subscriptions)
+
+    def publish(self, line):
+        """Delivers a line to the subscriptions it matches.
+
+        Args:
+            line: The logcat line, without its trailing newline.
+        """
+        matcher = self._matcher
+        if matcher is None:
+            return
+        for subscription, logcat_match in matcher.match(line):
+            subscription.deliver(logcat_match)
+
+
+def get_logcat_publisher(serial):
+    """Returns the LogcatPublisher of a device."""
+    with _logcat_publishers_lock:
+        if serial not in _logcat_publishers:
+            _logcat_publishers[serial] = LogcatPublisher(serial)
+        return _logcat_publishers[serial]
+
 
 class TimestampTracker(object):
     """Stores the last timestamp outputted by the Logcat process."""
@@ -41,6 +395,122 @@ class TimestampTracker(object):
             self._last_timestamp = all_timestamps[0]
 
 
+class LogcatFileWriter(object):
+    """Writes logcat output directly to the log files of a device.
+
+    The output is written as is, in large buffered writes, to the same
+    '<name>_debug.txt' file a LogStyles.LOG_DEBUG | LogStyles.TESTCASE_LOG log
+    stream would write it to, without going through the logging module. Like
+    such a log stream, the file is moved to the output directory of each new
+    test class and test case.
+
+    Only complete lines are written, so that no line is split across files.
+    The timestamp of the last line written is kept for retries.
+
+    Attributes:
+        name: The name of the log. Used as the file name prefix.
+        log_name: The name the output paths of the log are registered under
+            in the test context.
+        last_timestamp: The timestamp of the last line written, or None.
+    """
+    WRITE_BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, name, log_name, subcontext='', base_path='',
+                 publisher=None):
+        """Creates a LogcatFileWriter, and opens its file.
+
+        Args:
+            name: The name of the log. Used as the file name prefix.
+            log_name: The name to register the output paths of the log under
+                in the test context.
+            subcontext: Location of the log relative to the test context path.
+            base_path: The base path of the log. Use logging.log_path as
+                default.
+            publisher: The LogcatPublisher to publish the lines to, if any.
+        """
+        self.name = name
+        self.log_name = log_name
+        self.last_timestamp = None
+        self._publisher = publisher
+        context.TestContext.add_base_output_path(
+            log_name, base_path or getattr(logging, 'log_path',
+                                           '/tmp/acts_logs'))
+        context.TestContext.add_subcontext(log_name, subcontext)
+        self._lock = threading.Lock()
+        self._remainder = b''
+        self._file = self._open()
+        self._registration_id = event_bus.register(context.NewContextEvent,
+                                                   self._on_new_context)
+
+    def _open(self):
+        directory = context.get_current_context(
+            ContextLevel.TESTCASE).get_full_output_path(self.log_name)
+        return open(os.path.join(directory, '%s_debug.txt' % self.name), 'ab',
+                    buffering=self.WRITE_BUFFER_SIZE)
+
+    def _on_new_context(self, event):
+        if not isinstance(event, (context.NewTestClassContextEvent,
+                                  context.NewTestCaseContextEvent)):
+            return
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = self._open()
+
+    def write(self, data):
+        """Writes the complete lines of a chunk of logcat output.
+
+        The trailing incomplete line, if any, is written along with the next
+        chunk.
+
+        Args:
+            data: The bytes of output.
+        """
+        with self._lock:
+            end = data.rfind(b'\n')
+            if end == -1:
+                self._remainder += data
+                return
+            # Only the last complete line is parsed for its timestamp.
+            start = data.rfind(b'\n', 0, end) + 1
+            last_line = data[start:end]
+            if start == 0:
+                last_line = self._remainder + last_line
+            if _LINE_TIMESTAMP_REGEX.match(last_line):
+                self.last_timestamp = last_line[:LINE_TIMESTAMP_LEN].decode(
+                    'ascii')
+            if self._file is not None:
+                if self._remainder:
+                    self._file.write(self._remainder)
+                self._file.write(memoryview(data)[:end + 1])
+            if self._publisher and self._publisher.has_subscriptions:
+                lines = (self._remainder + data[:end]).decode(
+                    'utf-8', errors='replace')
+                for line in lines.split('\n'):
+                    self._publisher.publish(line)
+            self._remainder = data[end + 1:]
+
+    def flush(self):
+        """Flushes the written lines to the file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """Writes the remaining output and closes the file."""
+        if self._registration_id is not None:
+            event_bus.unregister(self._registration_id)
+            self._registration_id = None
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(self._remainder)
+            self._remainder = b''
+            self._file.close()
+            self._file = None
+
+
 def _get_log_level(message):
     """Returns the log level for the given message."""
     if message.startswith('-') or len(message) < 37:
@@ -58,16 +528,33 @@ def _get_log_level(message):
     return logging.NOTSET
 
 
-def _log_line_func(log, timestamp_tracker):
-    """Returns a lambda that logs a message to the given logger."""
+def _log_line_func(log, timestamp_tracker, publisher=None):
+    """Returns a lambda that logs a message to the given logger, and
+    publishes it to the given LogcatPublisher, if any.
+    """
 
     def log_line(message):
         timestamp_tracker.read_output(message)
         log.log(_get_log_level(message), message)
+        if publisher:
+            publisher.publish(message)
 
     return log_line
 
 
+def _write_output_func(writer):
+    """Returns a function that writes chunks of output to the given writer."""
+
+    def write_output(data):
+        writer.write(data)
+        # A short read means the output is drained for now, so the file is
+        # brought up to date. Under heavy output, writes stay buffered.
+        if len(data) < LOGCAT_READ_SIZE:
+            writer.flush()
+
+    return write_output
+
+
 def _on_retry(serial, extra_params, timestamp_tracker):
     def on_retry(_):
         begin_at = '"%s"' % (timestamp_tracker.last_timestamp or 1)
@@ -79,24 +566,59 @@ def _on_retry(serial, extra_params, timestamp_tracker):
     return on_retry
 
 
-def create_logcat_keepalive_process(serial, logcat_dir, extra_params=''):
+def close_logcat_writer(serial):
+    """Closes the LogcatFileWriter of the logcat process of a device, if any.
+
+    Called once the process is stopped, so that its last incomplete line is
+    written, and its file is no longer moved to new test contexts.
+
+    Args:
+        serial: The serial of the device.
+    """
+    writer = _logcat_writers.pop('adblog_%s' % serial, None)
+    if writer:
+        writer.close()
+
+
+def create_logcat_keepalive_process(serial, logcat_dir, extra_params='',
+                                    direct_write=False):
     """Creates a Logcat Process that automatically attempts to reconnect.
 
+    Each line read is published to the LogcatPublisher of the device.
+
     Args:
         serial: The serial of the device to read the logcat of.
         logcat_dir: The directory used for logcat file output.
         extra_params: Any additional params to be added to the logcat cmdline.
+        direct_write: If True, the output is read in large chunks and written
+            directly to the log files by a LogcatFileWriter, instead of being
+            logged line by line. Meant for devices with heavy logcat output.
 
     Returns:
         A acts.libs.proc.process.Process object.
     """
-    logger = log_stream.create_logger(
-        'adblog_%s' % serial, log_name=serial, subcontext=logcat_dir,
-        log_styles=(LogStyles.LOG_DEBUG | LogStyles.TESTCASE_LOG))
+    name = 'adblog_%s' % serial
+    publisher = get_logcat_publisher(serial)
     process = Process('adb -s %s logcat -T 1 -v year %s' %
                       (serial, extra_params))
+    if direct_write:
+        if name in _logcat_writers:
+            _logcat_writers[name].close()
+        writer = LogcatFileWriter(name, serial, subcontext=logcat_dir,
+                                  publisher=publisher)
+        _logcat_writers[name] = writer
+        process.set_on_output_callback(_write_output_func(writer),
+                                       binary=True,
+                                       chunk_size=LOGCAT_READ_SIZE)
+        process.set_on_terminate_callback(
+            _on_retry(serial, extra_params, writer))
+        return process
+    logger = log_stream.create_logger(
+        name, log_name=serial, subcontext=logcat_dir,
+        log_styles=(LogStyles.LOG_DEBUG | LogStyles.TESTCASE_LOG))
     timestamp_tracker = TimestampTracker()
-    process.set_on_output_callback(_log_line_func(logger, timestamp_tracker))
+    process.set_on_output_callback(
+        _log_line_func(logger, timestamp_tracker, publisher))
     process.set_on_terminate_callback(
         _on_retry(serial, extra_params, timestamp_tracker))
     return process
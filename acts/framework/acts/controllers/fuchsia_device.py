@@ -15,7 +15,6 @@
 #   limitations under the License.
 
 import backoff
-import json
 import logging
 import platform
 import os
@@ -34,6 +33,8 @@ from acts import signals
 from acts.controllers import pdu
 
 from acts.controllers.fuchsia_lib.backlight_lib import FuchsiaBacklightLib
+from acts.controllers.fuchsia_lib.base_lib import close_transport
+from acts.controllers.fuchsia_lib.base_lib import get_transport
 from acts.controllers.fuchsia_lib.bt.avdtp_lib import FuchsiaAvdtpLib
 from acts.controllers.fuchsia_lib.light_lib import FuchsiaLightLib
 
@@ -55,7 +56,7 @@ from acts.controllers.fuchsia_lib.syslog_lib import FuchsiaSyslogError
 from acts.controllers.fuchsia_lib.syslog_lib import start_syslog
 from acts.controllers.fuchsia_lib.sysinfo_lib import FuchsiaSysInfoLib
 from acts.controllers.fuchsia_lib.utils_lib import create_ssh_connection
-from acts.controllers.fuchsia_lib.utils_lib import SshResults
+from acts.controllers.fuchsia_lib.utils_lib import SshConnectionPool
 from acts.controllers.fuchsia_lib.wlan_deprecated_configuration_lib import FuchsiaWlanDeprecatedConfigurationLib
 from acts.controllers.fuchsia_lib.wlan_lib import FuchsiaWlanLib
 from acts.controllers.fuchsia_lib.wlan_ap_policy_lib import FuchsiaWlanApPolicyLib
@@ -180,6 +181,11 @@ class FuchsiaDevice:
                     ssh_config: Location of the ssh_config file to connect to
                         the fuchsia device
                         (Default: None)
+                    sl4f_health_probe_interval: Seconds between background
+                        pings of the device. While the last ping failed, SL4F
+                        calls fail immediately. If unset, the device is only
+                        pinged after an SL4F call fails.
+                        (Default: None)
         """
         self.conf_data = fd_conf_data
         if "ip" not in fd_conf_data:
@@ -192,7 +198,12 @@ class FuchsiaDevice:
         self.hard_reboot_on_fail = fd_conf_data.get("hard_reboot_on_fail",
                                                     False)
         self.device_pdu_config = fd_conf_data.get("PduDevice", None)
+        self.sl4f_health_probe_interval = fd_conf_data.get(
+            "sl4f_health_probe_interval", None)
         self._persistent_ssh_conn = None
+        # Connections reused by send_command_ssh.
+        self.ssh_pool = SshConnectionPool(self.ip, self.ssh_username,
+                                          self.ssh_config)
 
         self.log = acts_logger.create_tagged_trace_logger(
             "FuchsiaDevice | %s" % self.ip)
@@ -323,17 +334,33 @@ class FuchsiaDevice:
     def init_server_connection(self):
         """Initializes HTTP connection with SL4F server."""
         self.log.debug("Initialziing server connection")
-        init_data = json.dumps({
+        init_data = {
             "jsonrpc": "2.0",
             "id": self.build_id(self.test_counter),
             "method": "sl4f.sl4f_init",
             "params": {
                 "client_id": self.client_id
             }
-        })
+        }
 
-        requests.get(url=self.init_address, data=init_data)
+        # SL4F may have restarted, so connections from before are stale.
+        self.sl4f_transport.reset()
+        self.sl4f_transport.send(init_data,
+                                 response_timeout=None,
+                                 url=self.init_address)
         self.test_counter += 1
+        if self.sl4f_health_probe_interval:
+            self.sl4f_transport.start_health_probe(
+                self.sl4f_health_probe_interval)
+
+    @property
+    def sl4f_transport(self):
+        """The Sl4fTransport shared by all SL4F libs of the device.
+
+        It is looked up on each use, as clean_up() closes it, and a new one is
+        created if the device is initialized again, e.g. after a reboot.
+        """
+        return get_transport(self.address)
 
     def build_id(self, test_id):
         """Concatenates client_id and test_id to form a command_id
@@ -426,6 +453,7 @@ class FuchsiaDevice:
                         'dm reboot',
                         timeout=FUCHSIA_RECONNECT_AFTER_REBOOT_TIME,
                         skip_status_code_check=True)
+                    self.ssh_pool.close()
             else:
                 self.log.info('Initializing reboot of FuchsiaDevice (%s)'
                               ' with SL4F.' % self.ip)
@@ -438,6 +466,7 @@ class FuchsiaDevice:
                     if self._persistent_ssh_conn:
                         self._persistent_ssh_conn.close()
                         self._persistent_ssh_conn = None
+                    self.ssh_pool.close()
         elif reboot_type == FUCHSIA_REBOOT_TYPE_HARD:
             self.log.info('Power cycling FuchsiaDevice (%s)' % self.ip)
             device_pdu, device_pdu_port = pdu.get_pdu_port_for_device(
@@ -448,6 +477,7 @@ class FuchsiaDevice:
                 if self._persistent_ssh_conn:
                     self._persistent_ssh_conn.close()
                     self._persistent_ssh_conn = None
+                self.ssh_pool.close()
             self.log.info('Killing power to FuchsiaDevice (%s)...' % self.ip)
             device_pdu.off(str(device_pdu_port))
 
@@ -519,30 +549,21 @@ class FuchsiaDevice:
             A SshResults object containing the results of the ssh command.
         """
         command_result = False
-        ssh_conn = None
         if not self.ssh_config:
             self.log.warning(FUCHSIA_SSH_CONFIG_NOT_DEFINED)
         else:
             try:
-                ssh_conn = create_ssh_connection(
-                    self.ip,
-                    self.ssh_username,
-                    self.ssh_config,
-                    connect_timeout=connect_timeout)
-                cmd_result_stdin, cmd_result_stdout, cmd_result_stderr = (
-                    ssh_conn.exec_command(test_cmd, timeout=timeout))
+                results = self.ssh_pool.run(
+                    test_cmd,
+                    timeout=timeout,
+                    connect_timeout=connect_timeout,
+                    skip_status_code_check=skip_status_code_check)
                 if not skip_status_code_check:
-                    command_result = SshResults(cmd_result_stdin,
-                                                cmd_result_stdout,
-                                                cmd_result_stderr,
-                                                cmd_result_stdout.channel)
+                    command_result = results
             except Exception as e:
                 self.log.warning("Problem running ssh command: %s"
                                  "\n Exception: %s" % (test_cmd, e))
                 return e
-            finally:
-                if ssh_conn is not None:
-                    ssh_conn.close()
         return command_result
 
     def ping(self, dest_ip, count=3, interval=1000, timeout=1000, size=25):
@@ -601,14 +622,16 @@ class FuchsiaDevice:
         print_id = self.build_id(self.test_counter)
         print_args = {}
         print_method = "sl4f.sl4f_print_clients"
-        data = json.dumps({
+        data = {
             "jsonrpc": "2.0",
             "id": print_id,
             "method": print_method,
             "params": print_args
-        })
+        }
 
-        r = requests.get(url=self.print_address, data=data).json()
+        r = self.sl4f_transport.send(data,
+                                     response_timeout=None,
+                                     url=self.print_address)
         self.test_counter += 1
 
         return r
@@ -620,21 +643,25 @@ class FuchsiaDevice:
         cleanup_id = self.build_id(self.test_counter)
         cleanup_args = {}
         cleanup_method = "sl4f.sl4f_cleanup"
-        data = json.dumps({
+        data = {
             "jsonrpc": "2.0",
             "id": cleanup_id,
             "method": cleanup_method,
             "params": cleanup_args
-        })
+        }
 
         try:
-            response = requests.get(url=self.cleanup_address, data=data).json()
+            response = self.sl4f_transport.send(data,
+                                                response_timeout=None,
+                                                url=self.cleanup_address)
             self.log.debug(response)
         except Exception as err:
             self.log.exception("Cleanup request failed with %s:" % err)
         finally:
             self.test_counter += 1
             self.stop_services()
+            close_transport(self.address)
+            self.ssh_pool.close()
 
     def check_process_state(self, process_name):
         """Checks the state of a process on the Fuchsia device
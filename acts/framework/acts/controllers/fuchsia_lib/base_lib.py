@@ -23,6 +23,7 @@ import random
 import re
 import requests
 import socket
+import threading
 import time
 
 from urllib.parse import urlparse
@@ -30,10 +31,171 @@ from urllib.parse import urlparse
 from acts import utils
 
 
+# The default number of seconds between health probes of an Sl4fTransport.
+DEFAULT_HEALTH_PROBE_INTERVAL = 5
+
+
 class DeviceOffline(Exception):
     """Exception if the device is no longer reachable via the network."""
 
 
+class Sl4fTransport(object):
+    """Sends JSON-RPC requests to an SL4F server over a keep-alive session.
+
+    Requests share a pooled HTTP connection instead of opening one per call.
+    The device is only pinged once a request fails, to tell an offline device
+    from a slow call, or periodically by an optional health probe.
+
+    Attributes:
+        address: The address of the SL4F server.
+        hostname: The hostname of the device.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.hostname = urlparse(address).hostname
+        self._session = requests.Session()
+        self._supports_batch = True
+        self._is_reachable = True
+        self._probe_thread = None
+        self._probe_stop = threading.Event()
+
+    def _raise_if_offline(self):
+        """Pings the device after a failed request.
+
+        Raises:
+            DeviceOffline if the device is not reachable.
+        """
+        if not utils.is_pingable(self.hostname):
+            raise DeviceOffline("FuchsiaDevice %s is not reachable via the "
+                                "network." % self.hostname)
+        logging.debug('FuchsiaDevice %s is online but SL4f call failed.' %
+                      self.hostname)
+
+    def send(self, payload, response_timeout=30, url=None):
+        """Sends a JSON-RPC request or batch of requests.
+
+        Args:
+            payload: dict or list of dicts, the JSON-RPC request(s) to send.
+            response_timeout: int, seconds to wait for a response before
+                throwing an exception.
+            url: string, the url to send the request to. Defaults to address.
+
+        Returns:
+            The decoded JSON response.
+
+        Raises:
+            DeviceOffline if the device is not reachable.
+        """
+        if not self._is_reachable:
+            raise DeviceOffline("FuchsiaDevice %s is not reachable via the "
+                                "network." % self.hostname)
+        try:
+            return self._session.get(url=url or self.address,
+                                     data=json.dumps(payload),
+                                     timeout=response_timeout).json()
+        except (requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError) as e:
+            self._raise_if_offline()
+            raise e
+
+    def send_batch(self, payloads, response_timeout=30):
+        """Sends JSON-RPC requests in a single batch.
+
+        If the server does not support batches, the requests are sent one at
+        a time instead.
+
+        Args:
+            payloads: list of dicts, the JSON-RPC requests to send. Each must
+                have a unique id.
+            response_timeout: int, seconds to wait for a response before
+                throwing an exception.
+
+        Returns:
+            A list of the responses, in the order of payloads. A response the
+            server left out of the batch is None.
+        """
+        if not payloads:
+            return []
+        if self._supports_batch:
+            responses = self.send(list(payloads), response_timeout)
+            if isinstance(responses, list):
+                responses_by_id = {
+                    response.get('id'): response
+                    for response in responses if isinstance(response, dict)
+                }
+                return [
+                    responses_by_id.get(payload['id'])
+                    for payload in payloads
+                ]
+            logging.debug('SL4F server at %s does not support batches: %s' %
+                          (self.hostname, responses))
+            self._supports_batch = False
+        return [
+            self.send(payload, response_timeout) for payload in payloads
+        ]
+
+    def _run_health_probe(self, interval):
+        while not self._probe_stop.wait(interval):
+            self._is_reachable = utils.is_pingable(self.hostname)
+
+    def start_health_probe(self, interval=DEFAULT_HEALTH_PROBE_INTERVAL):
+        """Pings the device in the background every interval seconds.
+
+        While the last ping failed, requests raise DeviceOffline without
+        waiting for a response.
+        """
+        if self._probe_thread:
+            return
+        self._probe_stop.clear()
+        self._probe_thread = threading.Thread(target=self._run_health_probe,
+                                              args=(interval, ),
+                                              daemon=True)
+        self._probe_thread.start()
+
+    def stop_health_probe(self):
+        """Stops the health probe, if it is running."""
+        if not self._probe_thread:
+            return
+        self._probe_stop.set()
+        self._probe_thread.join()
+        self._probe_thread = None
+        self._is_reachable = True
+
+    def reset(self):
+        """Drops the pooled connections, e.g. after the server restarts."""
+        self._is_reachable = True
+        self._session.close()
+        self._session = requests.Session()
+
+    def close(self):
+        """Stops the health probe and closes the session."""
+        self.stop_health_probe()
+        self._session.close()
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(address):
+    """Returns the Sl4fTransport shared by all libs of the SL4F address."""
+    with _transports_lock:
+        transport = _transports.get(address)
+        if transport is None:
+            transport = Sl4fTransport(address)
+            _transports[address] = transport
+        return transport
+
+
+def close_transport(address):
+    """Closes the Sl4fTransport of the SL4F address, if there is one."""
+    with _transports_lock:
+        transport = _transports.pop(address, None)
+    if transport:
+        transport.close()
+
+
 class BaseLib():
     def __init__(self, addr, tc, client_id):
         self.address = addr
@@ -61,26 +223,35 @@ class BaseLib():
         Returns:
             Dictionary, Result of sl4f command executed.
         """
-        if not utils.is_pingable(urlparse(self.address).hostname):
-            raise DeviceOffline("FuchsiaDevice %s is not reachable via the "
-                                "network." % urlparse(self.address).hostname)
-        test_data = json.dumps({
-            "jsonrpc": "2.0",
-            "id": test_id,
-            "method": test_cmd,
-            "params": test_args
-        })
-        try:
-            return requests.get(url=self.address,
-                                data=test_data,
-                                timeout=response_timeout).json()
-        except requests.exceptions.Timeout as e:
-            if not utils.is_pingable(urlparse(self.address).hostname):
-                raise DeviceOffline(
-                    "FuchsiaDevice %s is not reachable via the "
-                    "network." % urlparse(self.address).hostname)
-            else:
-                logging.debug(
-                    'FuchsiaDevice %s is online but SL4f call timed out.' %
-                    urlparse(self.address).hostname)
-                raise e
+        return get_transport(self.address).send(
+            {
+                "jsonrpc": "2.0",
+                "id": test_id,
+                "method": test_cmd,
+                "params": test_args
+            }, response_timeout)
+
+    def send_batch(self, commands, response_timeout=30):
+        """Builds and sends JSON commands to SL4F server in a single request.
+
+        Args:
+            commands: list of (test_cmd, test_args) tuples, the sl4f method
+                names and arguments of the commands to execute.
+            response_timeout: int, seconds to wait for a response before
+                throwing an exception.
+
+        Returns:
+            List of dictionaries, Results of the sl4f commands executed, in
+            the order of commands.
+        """
+        payloads = []
+        for test_cmd, test_args in commands:
+            payloads.append({
+                "jsonrpc": "2.0",
+                "id": self.build_id(self.test_counter),
+                "method": test_cmd,
+                "params": test_args
+            })
+            self.test_counter += 1
+        return get_transport(self.address).send_batch(payloads,
+                                                      response_timeout)
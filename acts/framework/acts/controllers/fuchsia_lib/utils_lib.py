@@ -19,6 +19,7 @@ import os
 import logging
 import paramiko
 import socket
+import threading
 import time
 
 from acts import utils
@@ -31,6 +32,10 @@ logging.getLogger("paramiko").setLevel(logging.WARNING)
 # Therefore, in order to reduce confusion in the logs the log level is set to
 # WARNING.
 
+# The default maximum number of channels open at once on a pooled connection,
+# which matches the default MaxSessions of sshd.
+DEFAULT_MAX_CHANNELS_PER_CONNECTION = 10
+
 
 def get_private_key(ip_address, ssh_config):
     """Tries to load various ssh key types.
@@ -73,7 +78,8 @@ def create_ssh_connection(ip_address,
                           ssh_config,
                           connect_timeout=10,
                           auth_timeout=10,
-                          banner_timeout=10):
+                          banner_timeout=10,
+                          port=22):
     """Creates and ssh connection to a Fuchsia device
 
     Args:
@@ -83,6 +89,7 @@ def create_ssh_connection(ip_address,
         connect_timeout: Timeout value for connecting to ssh_server.
         auth_timeout: Timeout value to wait for authentication.
         banner_timeout: Timeout to wait for ssh banner.
+        port: Port of the ssh server.
 
     Returns:
         A paramiko ssh object
@@ -94,6 +101,7 @@ def create_ssh_connection(ip_address,
     ssh_client = paramiko.SSHClient()
     ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     ssh_client.connect(hostname=ip_address,
+                       port=port,
                        username=ssh_username,
                        allow_agent=False,
                        pkey=ssh_key,
@@ -169,3 +177,138 @@ class SshResults:
     @property
     def exit_status(self):
         return self._exit_status
+
+
+class SshConnectionPool:
+    """A pool of ssh connections to a Fuchsia device, shared by commands.
+
+    Each command runs on its own channel of a pooled connection, so commands
+    skip the key exchange and authentication of a new connection, and
+    concurrent commands share a connection up to max_channels_per_connection.
+    Connections that were closed, for instance by a reboot, are replaced on
+    the next command.
+
+    Attributes:
+        ip_address: IP address of the ssh server.
+        ssh_username: Username for the ssh server.
+        ssh_config: ssh_config location for the ssh server.
+        port: Port of the ssh server.
+        max_channels_per_connection: The maximum number of commands to run at
+            once on a connection.
+    """
+    def __init__(self,
+                 ip_address,
+                 ssh_username,
+                 ssh_config,
+                 port=22,
+                 max_channels_per_connection=(
+                     DEFAULT_MAX_CHANNELS_PER_CONNECTION)):
+        self.ip_address = ip_address
+        self.ssh_username = ssh_username
+        self.ssh_config = ssh_config
+        self.port = port
+        self.max_channels_per_connection = max_channels_per_connection
+        # Maps each pooled ssh client to its number of open channels.
+        self._channel_counts = {}
+        self._lock = threading.Lock()
+        self._connections_opened = 0
+        self._commands_run = 0
+
+    def _acquire_connection(self, connect_timeout):
+        """Returns a tuple of (a connection with a free channel, is new)."""
+        with self._lock:
+            for ssh_client, count in list(self._channel_counts.items()):
+                if not ssh_is_connected(ssh_client):
+                    if not count:
+                        del self._channel_counts[ssh_client]
+                        ssh_client.close()
+                elif count < self.max_channels_per_connection:
+                    self._channel_counts[ssh_client] = count + 1
+                    return ssh_client, False
+        ssh_client = create_ssh_connection(self.ip_address,
+                                           self.ssh_username,
+                                           self.ssh_config,
+                                           connect_timeout=connect_timeout,
+                                           port=self.port)
+        with self._lock:
+            self._connections_opened += 1
+            self._channel_counts[ssh_client] = 1
+        return ssh_client, True
+
+    def _release_connection(self, ssh_client):
+        with self._lock:
+            if ssh_client not in self._channel_counts:
+                # The pool was closed while the command ran.
+                ssh_client.close()
+            else:
+                self._channel_counts[ssh_client] -= 1
+
+    def run(self,
+            command,
+            timeout=3600,
+            connect_timeout=10,
+            skip_status_code_check=False):
+        """Runs a command on a channel of a pooled connection.
+
+        Args:
+            command: string, command to send to the Fuchsia device.
+            timeout: Timeout to wait for the command to complete.
+            connect_timeout: Timeout to wait for connecting, if there is no
+                connection to reuse.
+            skip_status_code_check: Whether to return without waiting for
+                the command's results.
+
+        Returns:
+            A SshResults object containing the results of the command, or
+            None if skip_status_code_check is set.
+        """
+        while True:
+            ssh_client, is_new = self._acquire_connection(connect_timeout)
+            try:
+                try:
+                    _, stdout, stderr = ssh_client.exec_command(
+                        command, timeout=timeout)
+                except (paramiko.ssh_exception.SSHException, EOFError,
+                        OSError):
+                    if not is_new and not ssh_is_connected(ssh_client):
+                        # The connection was closed while idle. Retry on a
+                        # new one.
+                        continue
+                    raise
+                with self._lock:
+                    self._commands_run += 1
+                if skip_status_code_check:
+                    stdout.channel.close()
+                    return None
+                try:
+                    return SshResults(None, stdout, stderr, stdout.channel)
+                finally:
+                    stdout.channel.close()
+            finally:
+                self._release_connection(ssh_client)
+
+    def stats(self):
+        """Returns a dict of statistics about the pool.
+
+        The dict holds the number of connections opened so far
+        (connections_opened), of connections in the pool (connections), of
+        commands running (active_channels), and of commands run so far
+        (commands_run).
+        """
+        with self._lock:
+            return {
+                'connections_opened': self._connections_opened,
+                'connections': len(self._channel_counts),
+                'active_channels': sum(self._channel_counts.values()),
+                'commands_run': self._commands_run,
+            }
+
+    def close(self):
+        """Closes the idle connections, and the others once their commands
+        finish."""
+        with self._lock:
+            channel_counts = self._channel_counts
+            self._channel_counts = {}
+        for ssh_client, count in channel_counts.items():
+            if not count:
+                ssh_client.close()
@@ -154,3 +154,17 @@ class FuchsiaWlanLib(BaseLib):
         self.test_counter += 1
 
         return self.send_command(test_id, test_cmd, test_args)
+
+    def wlanQueryInterfaces(self, iface_ids):
+        """ Retrieves interface info for several wlan iface ids at once.
+
+        Args:
+            iface_ids: list of unsigned 16-bit ints, the wlan interface ids.
+
+        Returns:
+            List of dictionaries, in the order of iface_ids, each as returned
+            by wlanQueryInterface.
+        """
+        return self.send_batch([(COMMAND_QUERY_IFACE, {
+            'iface_id': iface_id
+        }) for iface_id in iface_ids])
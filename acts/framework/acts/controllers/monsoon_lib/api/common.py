@@ -14,6 +14,12 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import os
+
+import numpy as np
+
+from acts.controllers.monsoon_lib.sampling import capture_file
+from acts.controllers.monsoon_lib.sampling import pyramid
 from acts.signals import ControllerError
 
 
@@ -47,10 +53,11 @@ class MonsoonDataRecord(object):
 
         Args:
             time: the string '{time}s', where time is measured in seconds since
-                the beginning of the data collection.
-            current: The current in Amperes as a string.
+                the beginning of the data collection. May also be given as a
+                number of seconds.
+            current: The current in Amperes as a string or number.
         """
-        self._time = float(time[:-1])
+        self._time = float(time[:-1]) if isinstance(time, str) else float(time)
         self._current = float(current)
 
     @property
@@ -78,12 +85,19 @@ class MonsoonResult(object):
         _sum_currents: The total sum of all current values gathered, in amperes.
         _hz: The frequency sampling is being done at.
         _voltage: The voltage output during sampling.
+        _statistics: The CurrentStatistics gathered during sampling, if any.
     """
 
     # The number of decimal places to round a value to.
     ROUND_TO = 6
 
-    def __init__(self, num_samples, sum_currents, hz, voltage, datafile_path):
+    def __init__(self,
+                 num_samples,
+                 sum_currents,
+                 hz,
+                 voltage,
+                 datafile_path,
+                 statistics=None):
         """Creates a new MonsoonResult.
 
         Args:
@@ -92,20 +106,32 @@ class MonsoonResult(object):
             hz: the number of samples per second.
             voltage: the voltage used during the test.
             datafile_path: the path to the monsoon data file.
+            statistics: the CurrentStatistics gathered while sampling.
         """
         self._num_samples = num_samples
         self._sum_currents = sum_currents
         self._hz = hz
         self._voltage = voltage
+        self._statistics = statistics
         self.tag = datafile_path
 
     def get_data_points(self):
-        """Returns an iterator of MonsoonDataRecords."""
+        """Returns an iterator of MonsoonDataRecords.
+
+        Note that for large captures, get_data_arrays() is much faster.
+        """
         class MonsoonDataIterator:
             def __init__(self, file):
                 self.file = file
 
             def __iter__(self):
+                if capture_file.is_capture_file(self.file):
+                    capture = capture_file.CaptureFile(self.file)
+                    for record in capture.records:
+                        yield MonsoonDataRecord(record['sample_time'],
+                                                record['main_current'])
+                    return
+
                 with open(self.file, 'r') as f:
                     for line in f:
                         # Remove the newline character.
@@ -114,6 +140,72 @@ class MonsoonResult(object):
 
         return MonsoonDataIterator(self.tag)
 
+    def get_capture_file(self):
+        """Returns the memory-mapped CaptureFile of the data file.
+
+        Raises:
+            MonsoonError if the data file is not a binary capture file.
+        """
+        if not capture_file.is_capture_file(self.tag):
+            raise MonsoonError('%s is not a binary capture file.' % self.tag)
+        return capture_file.CaptureFile(self.tag)
+
+    def get_pyramid(self):
+        """Returns the min/max/mean Pyramid written next to the data file.
+
+        Raises:
+            MonsoonError if no pyramid was written for the data file.
+        """
+        pyramid_path = pyramid.get_pyramid_path(self.tag)
+        if not os.path.isdir(pyramid_path):
+            raise MonsoonError('No pyramid was written for %s.' % self.tag)
+        return pyramid.Pyramid(pyramid_path)
+
+    def get_data_arrays(self, start_time=None, end_time=None):
+        """Returns the sample times and currents as NumPy arrays.
+
+        For binary capture files, the arrays are views of the memory-mapped
+        file, and only the requested time range is read from disk. Text files
+        are parsed in full.
+
+        Args:
+            start_time: The first sample time to include, in seconds. If None,
+                starts from the first sample.
+            end_time: The sample time to stop before, in seconds. If None,
+                ends at the last sample.
+
+        Returns:
+            A tuple of (times, currents), in seconds and Amperes respectively.
+        """
+        if capture_file.is_capture_file(self.tag):
+            records = self.get_capture_file().get_time_range(
+                start_time, end_time)
+            return records['sample_time'], records['main_current']
+
+        data_points = list(self.get_data_points())
+        times = np.array([data_point.time for data_point in data_points])
+        currents = np.array(
+            [data_point.current for data_point in data_points])
+        in_range = np.ones(len(times), dtype=bool)
+        if start_time is not None:
+            in_range &= times >= start_time
+        if end_time is not None:
+            in_range &= times < end_time
+        return times[in_range], currents[in_range]
+
+    def convert_to_text(self, text_path):
+        """Writes the binary capture file's data in the legacy text format.
+
+        Args:
+            text_path: The path of the text file to write.
+
+        Raises:
+            MonsoonError if the data file is not a binary capture file.
+        """
+        if not capture_file.is_capture_file(self.tag):
+            raise MonsoonError('%s is not a binary capture file.' % self.tag)
+        capture_file.convert_to_text(self.tag, text_path)
+
     @property
     def num_samples(self):
         """The number of samples recorded during the test."""
@@ -143,6 +235,37 @@ class MonsoonResult(object):
         """The voltage during the measurement (in Volts)."""
         return self._voltage
 
+    @property
+    def statistics(self):
+        """The CurrentStatistics gathered while sampling, in Amperes.
+
+        Holds the min/max/stdev, approximate percentiles, current histogram and
+        per-window means of the measurement, without rereading the data file.
+        None if no statistics were gathered.
+        """
+        return self._statistics
+
+    @property
+    def max_current(self):
+        """Maximum current in mA, or None if statistics were not gathered."""
+        if not self._statistics or not self._statistics.num_samples:
+            return None
+        return round(self._statistics.max_current * 1000, self.ROUND_TO)
+
+    def get_percentile_current(self, percentile):
+        """Returns the approximate current in mA at the given percentile.
+
+        Args:
+            percentile: The percentile, within [0, 100].
+
+        Returns:
+            The current in mA, or None if statistics were not gathered.
+        """
+        if not self._statistics or not self._statistics.num_samples:
+            return None
+        return round(self._statistics.get_percentile(percentile) * 1000,
+                     self.ROUND_TO)
+
     def __str__(self):
         return ('avg current: %s\n'
                 'total charge: %s\n'
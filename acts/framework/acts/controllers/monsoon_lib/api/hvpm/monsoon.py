@@ -22,10 +22,15 @@ from Monsoon import Operations as op
 
 from acts.controllers.monsoon_lib.api.common import MonsoonResult
 from acts.controllers.monsoon_lib.api.monsoon import BaseMonsoon
+from acts.controllers.monsoon_lib.sampling.capture_file import is_capture_path
+from acts.controllers.monsoon_lib.sampling.pyramid import get_pyramid_path
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import AssemblyLineBuilder
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ThreadAssemblyLine
+from acts.controllers.monsoon_lib.sampling.engine.transformers import BinaryTee
 from acts.controllers.monsoon_lib.sampling.engine.transformers import DownSampler
+from acts.controllers.monsoon_lib.sampling.engine.transformers import PyramidBuilder
 from acts.controllers.monsoon_lib.sampling.engine.transformers import SampleAggregator
+from acts.controllers.monsoon_lib.sampling.engine.transformers import StatisticsAggregator
 from acts.controllers.monsoon_lib.sampling.engine.transformers import Tee
 from acts.controllers.monsoon_lib.sampling.hvpm.transformers import HvpmTransformer
 
@@ -50,6 +55,9 @@ class Monsoon(BaseMonsoon):
         self._mon = HVPM.Monsoon()
         self._mon.setup_usb(serial)
         self._allocated = True
+        # If True, measure_power() decodes samples into columnar chunks of
+        # readings, which is considerably cheaper on the host CPU.
+        self.columnar_decode = False
         if self._mon.Protocol.DEVICE is None:
             raise ValueError('HVPM Monsoon %s could not be found.' % serial)
 
@@ -114,22 +122,36 @@ class Monsoon(BaseMonsoon):
                       measure_after_seconds=0,
                       hz=5000,
                       output_path=None,
-                      transformers=None):
+                      transformers=None,
+                      raw_recording_path=None):
         """See parent docstring for details."""
         voltage = self._get_main_voltage()
 
         aggregator = SampleAggregator(measure_after_seconds)
+        statistics_aggregator = StatisticsAggregator(measure_after_seconds)
         manager = multiprocessing.Manager()
 
         assembly_line_builder = AssemblyLineBuilder(manager.Queue,
                                                     ThreadAssemblyLine)
         assembly_line_builder.source(
-            HvpmTransformer(self.serial, duration + measure_after_seconds))
+            HvpmTransformer(self.serial,
+                            duration + measure_after_seconds,
+                            columnar=self.columnar_decode,
+                            raw_recording_path=raw_recording_path))
         if hz != 5000:
             assembly_line_builder.into(DownSampler(int(5000 / hz)))
         if output_path:
-            assembly_line_builder.into(Tee(output_path, measure_after_seconds))
+            if is_capture_path(output_path):
+                assembly_line_builder.into(
+                    BinaryTee(output_path, hz, voltage, measure_after_seconds))
+                assembly_line_builder.into(
+                    PyramidBuilder(get_pyramid_path(output_path), hz, voltage,
+                                   measure_after_seconds))
+            else:
+                assembly_line_builder.into(
+                    Tee(output_path, measure_after_seconds))
         assembly_line_builder.into(aggregator)
+        assembly_line_builder.into(statistics_aggregator)
         if transformers:
             for transformer in transformers:
                 assembly_line_builder.into(transformer)
@@ -142,7 +164,8 @@ class Monsoon(BaseMonsoon):
         self._allocated = True
         monsoon_data = MonsoonResult(aggregator.num_samples,
                                      aggregator.sum_currents, hz, voltage,
-                                     output_path)
+                                     output_path,
+                                     statistics_aggregator.statistics)
         self._log.info('Measurement summary:\n%s', str(monsoon_data))
         return monsoon_data
 
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Reads the Length-Value-Checksum frames sent by an LVPM stock Monsoon.
+
+Each frame begins with a length byte, followed by that many bytes: the value,
+then a checksum byte. The checksum is the sum of the length byte and all value
+bytes, modulo 256.
+"""
+import collections
+import logging
+
+import numpy as np
+
+# The number of frames below which checksums are summed one frame at a time,
+# as numpy's overhead outweighs its gains.
+MIN_VECTORIZED_FRAMES = 16
+
+FrameReaderStats = collections.namedtuple(
+    'FrameReaderStats',
+    ['frames', 'corrupt_frames', 'dropped_frames', 'dropped_bytes'])
+
+
+class FrameReader(object):
+    """Parses frames out of large serial reads.
+
+    Every read takes all of the bytes waiting on the port, and all of the
+    complete frames within them are parsed at once, with their checksums
+    summed together by numpy. Incomplete frames are kept until the next read.
+    If a checksum does not match, the stream is resynchronized one byte at a
+    time until a valid frame is found.
+
+    Attributes:
+        frames: The number of valid frames parsed.
+        corrupt_frames: The number of times a frame failed its checksum or
+            had a length of zero, losing synchronization with the stream.
+        dropped_frames: The number of valid frames discarded before being
+            returned.
+        dropped_bytes: The number of bytes discarded while resynchronizing or
+            by discard().
+    """
+
+    def __init__(self, ser):
+        """
+        Args:
+            ser: The serial.Serial to read from.
+        """
+        self._ser = ser
+        self._buffer = bytearray()
+        self._frames = collections.deque()
+        self._in_sync = True
+        self.frames = 0
+        self.corrupt_frames = 0
+        self.dropped_frames = 0
+        self.dropped_bytes = 0
+
+    def get_stats(self):
+        """Returns the FrameReaderStats of this reader."""
+        return FrameReaderStats(self.frames, self.corrupt_frames,
+                                self.dropped_frames, self.dropped_bytes)
+
+    def read_frame(self):
+        """Returns the value of the next frame, or None if the read timed out.
+        """
+        while not self._frames:
+            if not self._fill():
+                return None
+        return self._frames.popleft()
+
+    def read_frames(self):
+        """Returns the values of every frame parsed from the waiting bytes.
+
+        The port is only read if no frames are left over from earlier reads,
+        until at least one frame is parsed.
+
+        Returns:
+            A list of frame values. Empty if the read timed out.
+        """
+        while not self._frames:
+            if not self._fill():
+                return []
+        frames = list(self._frames)
+        self._frames.clear()
+        return frames
+
+    def discard(self):
+        """Discards all parsed frames and buffered bytes."""
+        self.dropped_frames += len(self._frames)
+        self.dropped_bytes += len(self._buffer)
+        self._frames.clear()
+        self._buffer.clear()
+        self._in_sync = True
+
+    def _fill(self):
+        """Reads the waiting bytes from the port, and parses them.
+
+        Returns:
+            False if the read timed out. True otherwise.
+        """
+        data = self._ser.read(max(1, self._ser.in_waiting))
+        if not data:
+            return False
+        self._buffer += data
+        self._frames.extend(self._parse())
+        return True
+
+    def _parse(self):
+        """Parses and removes all complete frames from the buffer.
+
+        Returns:
+            A list of the values of the valid frames.
+        """
+        buffer = self._buffer
+        size = len(buffer)
+        frames = []
+        position = 0
+        while position < size:
+            starts, stop = self._find_frames(position)
+            num_valid = self._count_valid_frames(starts)
+            frames.extend(
+                bytes(buffer[start + 1:start + buffer[start]])
+                for start in starts[:num_valid])
+            if num_valid:
+                self.frames += num_valid
+                self._in_sync = True
+            if num_valid < len(starts):
+                position = starts[num_valid]
+            else:
+                position = stop
+                if position == size or buffer[position]:
+                    # The rest of the buffer is an incomplete frame.
+                    break
+            self._skip_corrupt_byte(buffer[position])
+            position += 1
+        del buffer[:position]
+        return frames
+
+    def _find_frames(self, position):
+        """Finds the complete frames at and after position, by their lengths.
+
+        Returns:
+            A tuple of (the start of each frame, the position after the last
+            frame). Finding stops at the first incomplete frame, or the first
+            length byte of zero.
+        """
+        buffer = self._buffer
+        size = len(buffer)
+        starts = []
+        while position < size:
+            length = buffer[position]
+            if not length or position + length >= size:
+                break
+            starts.append(position)
+            position += length + 1
+        return starts, position
+
+    def _count_valid_frames(self, starts):
+        """Returns the number of frames before the first bad checksum."""
+        if len(starts) < MIN_VECTORIZED_FRAMES:
+            buffer = self._buffer
+            for index, start in enumerate(starts):
+                checksum_position = start + buffer[start]
+                if (sum(buffer[start:checksum_position]) & 0xFF !=
+                        buffer[checksum_position]):
+                    return index
+            return len(starts)
+        data = np.frombuffer(self._buffer, dtype=np.uint8)
+        starts = np.array(starts)
+        checksum_positions = starts + data[starts]
+        # Each frame's length and value bytes are summed by alternating
+        # between the start of the frame and the position of its checksum.
+        bounds = np.empty(len(starts) * 2, dtype=np.intp)
+        bounds[0::2] = starts
+        bounds[1::2] = checksum_positions
+        sums = np.add.reduceat(data, bounds, dtype=np.uint32)[0::2]
+        bad_frames = np.flatnonzero(
+            (sums & 0xFF) != data[checksum_positions])
+        if bad_frames.size:
+            return int(bad_frames[0])
+        return len(starts)
+
+    def _skip_corrupt_byte(self, byte):
+        """Records a byte skipped while resynchronizing with the stream."""
+        if self._in_sync:
+            self._in_sync = False
+            self.corrupt_frames += 1
+            logging.warning(
+                'Invalid frame from serial port (length %d). Resynchronizing.',
+                byte)
+        self.dropped_bytes += 1
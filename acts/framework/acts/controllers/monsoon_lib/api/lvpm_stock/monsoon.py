@@ -19,10 +19,15 @@ import time
 from acts.controllers.monsoon_lib.api.common import MonsoonResult
 from acts.controllers.monsoon_lib.api.lvpm_stock.monsoon_proxy import MonsoonProxy
 from acts.controllers.monsoon_lib.api.monsoon import BaseMonsoon
+from acts.controllers.monsoon_lib.sampling.capture_file import is_capture_path
+from acts.controllers.monsoon_lib.sampling.pyramid import get_pyramid_path
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import AssemblyLineBuilder
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ThreadAssemblyLine
+from acts.controllers.monsoon_lib.sampling.engine.transformers import BinaryTee
 from acts.controllers.monsoon_lib.sampling.engine.transformers import DownSampler
+from acts.controllers.monsoon_lib.sampling.engine.transformers import PyramidBuilder
 from acts.controllers.monsoon_lib.sampling.engine.transformers import SampleAggregator
+from acts.controllers.monsoon_lib.sampling.engine.transformers import StatisticsAggregator
 from acts.controllers.monsoon_lib.sampling.engine.transformers import Tee
 from acts.controllers.monsoon_lib.sampling.lvpm_stock.stock_transformers import StockLvpmSampler
 
@@ -96,22 +101,35 @@ class Monsoon(BaseMonsoon):
                       measure_after_seconds=0,
                       hz=5000,
                       output_path=None,
-                      transformers=None):
+                      transformers=None,
+                      raw_recording_path=None):
         """See parent docstring for details."""
         voltage = self._mon.get_voltage()
 
         aggregator = SampleAggregator(measure_after_seconds)
+        statistics_aggregator = StatisticsAggregator(measure_after_seconds)
         manager = multiprocessing.Manager()
 
         assembly_line_builder = AssemblyLineBuilder(manager.Queue,
                                                     ThreadAssemblyLine)
         assembly_line_builder.source(
-            StockLvpmSampler(self.serial, duration + measure_after_seconds))
+            StockLvpmSampler(self.serial,
+                             duration + measure_after_seconds,
+                             raw_recording_path=raw_recording_path))
         if hz != 5000:
             assembly_line_builder.into(DownSampler(int(round(5000 / hz))))
         if output_path is not None:
-            assembly_line_builder.into(Tee(output_path, measure_after_seconds))
+            if is_capture_path(output_path):
+                assembly_line_builder.into(
+                    BinaryTee(output_path, hz, voltage, measure_after_seconds))
+                assembly_line_builder.into(
+                    PyramidBuilder(get_pyramid_path(output_path), hz, voltage,
+                                   measure_after_seconds))
+            else:
+                assembly_line_builder.into(
+                    Tee(output_path, measure_after_seconds))
         assembly_line_builder.into(aggregator)
+        assembly_line_builder.into(statistics_aggregator)
         if transformers:
             for transformer in transformers:
                 assembly_line_builder.into(transformer)
@@ -122,7 +140,8 @@ class Monsoon(BaseMonsoon):
 
         monsoon_data = MonsoonResult(aggregator.num_samples,
                                      aggregator.sum_currents, hz, voltage,
-                                     output_path)
+                                     output_path,
+                                     statistics_aggregator.statistics)
         self._log.info('Measurement summary:\n%s', str(monsoon_data))
         return monsoon_data
 
@@ -33,6 +33,7 @@ import errno
 import serial
 
 from acts.controllers.monsoon_lib.api.common import MonsoonError
+from acts.controllers.monsoon_lib.api.lvpm_stock.frame_reader import FrameReader
 
 
 class LvpmStatusPacket(object):
@@ -161,6 +162,7 @@ class MonsoonProxy(object):
 
         if device:
             self.ser = serial.Serial(device, timeout=1)
+            self.frame_reader = FrameReader(self.ser)
             return
         # Try all devices connected through USB virtual serial ports until we
         # find one we can use.
@@ -210,6 +212,7 @@ class MonsoonProxy(object):
 
                 try:  # try to open the device
                     self.ser = serial.Serial('/dev/%s' % dev, timeout=1)
+                    self.frame_reader = FrameReader(self.ser)
                     self.stop_data_collection()  # just in case
                     self._flush_input()  # discard stale input
                     status = self.get_status()
@@ -364,38 +367,27 @@ class MonsoonProxy(object):
         self.ser.write(out)
 
     def _read_packet(self):
-        """Returns a single packet as a string (without length or checksum)."""
-        len_char = self.ser.read(1)
-        if not len_char:
-            raise MonsoonError('Reading from serial port timed out')
+        """Returns a single packet as bytes (without length or checksum).
 
-        data_len = ord(len_char)
-        if not data_len:
-            return ''
-        result = self.ser.read(int(data_len))
-        result = bytearray(result)
-        if len(result) != data_len:
-            raise MonsoonError(
-                'Length mismatch, expected %d bytes, got %d bytes.', data_len,
-                len(result))
-        body = result[:-1]
-        checksum = (sum(struct.unpack('B' * len(body), body)) + data_len) % 256
-        if result[-1] != checksum:
-            raise MonsoonError(
-                'Invalid checksum from serial port! Expected %s, got %s',
-                hex(checksum), hex(result[-1]))
-        return result[:-1]
+        Corrupt packets are skipped, and counted by the frame_reader.
+        """
+        packet = self.frame_reader.read_frame()
+        if packet is None:
+            raise MonsoonError('Reading from serial port timed out')
+        return packet
 
     def _flush_input(self):
         """Flushes all read data until the input is empty."""
         self.ser.reset_input_buffer()
+        self.frame_reader.discard()
         while True:
             ready_r, ready_w, ready_x = select.select([self.ser], [],
                                                       [self.ser], 0)
             if len(ready_x) > 0:
                 raise MonsoonError('Exception from serial port.')
             elif len(ready_r) > 0:
-                self.ser.read(1)  # This may cause underlying buffering.
+                # This may cause underlying buffering.
+                self.ser.read(max(1, self.ser.in_waiting))
                 # Flush the underlying buffer too.
                 self.ser.reset_input_buffer()
             else:
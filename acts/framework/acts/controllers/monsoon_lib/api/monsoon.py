@@ -200,7 +200,8 @@ class BaseMonsoon(object):
                       measure_after_seconds=0,
                       hz=5000,
                       output_path=None,
-                      transformers=None):
+                      transformers=None,
+                      raw_recording_path=None):
         """Measure power consumption of the attached device.
 
         This function is a default implementation of measuring power consumption
@@ -214,9 +215,17 @@ class BaseMonsoon(object):
                 reading measurement.
             hz: The number of samples to collect per second. Must be a factor
                 of 5000.
-            output_path: The location to write the gathered data to.
+            output_path: The location to write the gathered data to. If the
+                path ends with sampling.capture_file.CAPTURE_FILE_EXTENSION,
+                the data is written as a binary capture file, along with a
+                min/max/mean pyramid of it (see sampling.pyramid). Otherwise,
+                it is written as text.
             transformers: A list of Transformer objects that receive passed-in
                           samples. Runs in order sent.
+            raw_recording_path: If set, the raw packets received from the
+                Monsoon are also written to this path, so the capture can be
+                processed again offline by an HvpmReplayer or a
+                StockLvpmReplayer (see sampling.raw_recording).
 
         Returns:
             A MonsoonData object with the measured power data.
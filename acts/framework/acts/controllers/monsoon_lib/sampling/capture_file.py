@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Reads and writes binary Monsoon capture files.
+
+A capture file is a small header followed by fixed-width records. Every record
+holds one little-endian float64 per column, the first column always being the
+sample_time in seconds.
+
+Header layout:
+
+Offset │ Format   │ Field       │ Description
+───────┼──────────┼─────────────┼──────────────────────────────────────────
+   0   │ char[8]  │ magic       │ CAPTURE_FILE_MAGIC
+   8   │ uint16   │ version     │ The version of the capture file format
+  10   │ uint16   │ num_columns │ The number of float64 columns per record
+  12   │ byte[4]  │ padding     │
+  16   │ float64  │ hz          │ The number of samples per second
+  24   │ float64  │ voltage     │ The voltage used during the capture
+  32   │ char[16] │ columns[0]  │ NUL-padded name of the first column
+  48   │ char[16] │ columns[1]  │ ...and so on, for each column
+
+All values are stored in little-endian format.
+"""
+
+import os
+import struct
+
+import numpy as np
+
+# The file extension used for capture files.
+CAPTURE_FILE_EXTENSION = '.capture'
+
+CAPTURE_FILE_MAGIC = b'MONSOON\x00'
+CAPTURE_FILE_VERSION = 1
+
+_HEADER_FORMAT = '<8sHH4xdd'
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+_COLUMN_NAME_SIZE = 16
+
+# The values written as text by the legacy Tee transformer.
+_TEXT_FORMAT = '%.9fs %.12f'
+
+
+def is_capture_path(path):
+    """Returns True iff the path names a capture file by its extension."""
+    return path.endswith(CAPTURE_FILE_EXTENSION)
+
+
+def is_capture_file(path):
+    """Returns True iff the file at the given path is a capture file."""
+    with open(path, 'rb') as f:
+        return f.read(len(CAPTURE_FILE_MAGIC)) == CAPTURE_FILE_MAGIC
+
+
+def get_record_dtype(columns):
+    """Returns the record dtype for the given data column names."""
+    return np.dtype([('sample_time', '<f8')] +
+                    [(column, '<f8') for column in columns])
+
+
+class CaptureFileWriter(object):
+    """Writes samples to a capture file.
+
+    Attributes:
+        path: The path of the capture file.
+        hz: The number of samples per second.
+        voltage: The voltage used during the capture.
+        columns: The names of the data columns. These are written after the
+            sample_time of each record.
+    """
+
+    def __init__(self, path, hz, voltage, columns=('main_current', )):
+        self.path = path
+        self.hz = hz
+        self.voltage = voltage
+        self.columns = tuple(columns)
+        self.dtype = get_record_dtype(self.columns)
+        self._fd = None
+
+    def open(self):
+        """Opens the capture file and writes its header."""
+        self._fd = open(self.path, 'wb')
+        names = self.dtype.names
+        self._fd.write(
+            struct.pack(_HEADER_FORMAT, CAPTURE_FILE_MAGIC,
+                        CAPTURE_FILE_VERSION, len(names), self.hz,
+                        self.voltage))
+        for name in names:
+            encoded_name = name.encode('ascii')
+            if len(encoded_name) > _COLUMN_NAME_SIZE:
+                raise ValueError('Column name "%s" is longer than %s bytes.' %
+                                 (name, _COLUMN_NAME_SIZE))
+            self._fd.write(encoded_name.ljust(_COLUMN_NAME_SIZE, b'\x00'))
+
+    def write(self, sample_times, *column_values):
+        """Appends the given samples to the capture file.
+
+        Args:
+            sample_times: An array of sample times.
+            *column_values: An array of values for each data column, in the
+                order given by self.columns.
+        """
+        records = np.empty(len(sample_times), dtype=self.dtype)
+        records['sample_time'] = sample_times
+        for column, values in zip(self.columns, column_values):
+            records[column] = values
+        self._fd.write(records.tobytes())
+
+    def flush(self):
+        self._fd.flush()
+
+    def close(self):
+        self._fd.close()
+
+
+class CaptureFile(object):
+    """A read-only, memory-mapped view of a capture file.
+
+    Records are not read into memory until they are accessed, so slicing a time
+    range of a large capture only reads the pages of that range.
+
+    Attributes:
+        path: The path of the capture file.
+        hz: The number of samples per second.
+        voltage: The voltage used during the capture.
+        columns: The names of every column, starting with 'sample_time'.
+        records: The structured array of records, backed by a memory map.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER_SIZE)
+            if len(header) < _HEADER_SIZE:
+                raise ValueError('%s is not a capture file.' % path)
+            magic, version, num_columns, self.hz, self.voltage = (
+                struct.unpack(_HEADER_FORMAT, header))
+            if magic != CAPTURE_FILE_MAGIC:
+                raise ValueError('%s is not a capture file.' % path)
+            if version != CAPTURE_FILE_VERSION:
+                raise ValueError('%s has unsupported capture file version %s.'
+                                 % (path, version))
+            self.columns = tuple(
+                f.read(_COLUMN_NAME_SIZE).rstrip(b'\x00').decode('ascii')
+                for _ in range(num_columns))
+
+        dtype = np.dtype([(column, '<f8') for column in self.columns])
+        data_offset = _HEADER_SIZE + num_columns * _COLUMN_NAME_SIZE
+        # A partially written record (e.g. from an interrupted capture) is
+        # ignored.
+        num_records = (os.path.getsize(path) - data_offset) // dtype.itemsize
+        if num_records > 0:
+            self.records = np.memmap(path,
+                                     dtype=dtype,
+                                     mode='r',
+                                     offset=data_offset,
+                                     shape=(num_records, ))
+        else:
+            # Zero-length files cannot be memory mapped.
+            self.records = np.empty(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def sample_times(self):
+        """The view of the sample_time column."""
+        return self.records['sample_time']
+
+    def get_column(self, name):
+        """Returns a view of the column with the given name."""
+        return self.records[name]
+
+    def get_time_range(self, start_time=None, end_time=None):
+        """Returns a view of the records within [start_time, end_time).
+
+        Sample times are written in increasing order, so the range is found by
+        bisection without reading the rest of the file.
+
+        Args:
+            start_time: The first sample time to include. If None, starts from
+                the first record.
+            end_time: The sample time to stop before. If None, ends at the last
+                record.
+        """
+        start = 0
+        end = len(self.records)
+        if start_time is not None:
+            start = np.searchsorted(self.sample_times, start_time, 'left')
+        if end_time is not None:
+            end = np.searchsorted(self.sample_times, end_time, 'left')
+        return self.records[start:end]
+
+
+def convert_to_text(capture_path, text_path, column='main_current',
+                    chunk_size=2**16):
+    """Converts a capture file into the text format written by Tee.
+
+    Args:
+        capture_path: The path of the capture file to read.
+        text_path: The path of the text file to write.
+        column: The data column to write next to each sample_time.
+        chunk_size: The number of records to convert at a time.
+    """
+    capture = CaptureFile(capture_path)
+    with open(text_path, 'w') as f:
+        for start in range(0, len(capture), chunk_size):
+            records = capture.records[start:start + chunk_size]
+            np.savetxt(f,
+                       np.column_stack((records['sample_time'],
+                                        records[column])),
+                       fmt=_TEXT_FORMAT)
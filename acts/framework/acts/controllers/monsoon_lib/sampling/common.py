@@ -14,6 +14,8 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import numpy as np
+
 
 class UncalibratedSampleChunk(object):
     """An uncalibrated sample collection stored with its calibration data.
@@ -22,10 +24,37 @@ class UncalibratedSampleChunk(object):
     the CalibrationApplier Transformer.
 
     Attributes:
-        samples: the uncalibrated samples list
+        samples: the uncalibrated samples list. When decoding columnar data,
+            this is a structured array of samples instead.
         calibration_data: the data used to calibrate the samples.
     """
 
     def __init__(self, samples, calibration_data):
         self.samples = samples
         self.calibration_data = calibration_data
+
+
+# The record layout of a columnar chunk of calibrated readings.
+#
+# Columnar chunks are np.recarrays of this dtype. Whole columns can be read at
+# once (e.g. chunk.main_current), while iterating over the chunk still yields
+# records with the same attributes as an HvpmReading.
+READING_DTYPE = np.dtype([
+    ('sample_time', '<f8'),
+    ('main_current', '<f8'),
+    ('usb_current', '<f8'),
+    ('aux_current', '<f8'),
+    ('main_voltage', '<f8'),
+    ('usb_voltage', '<f8'),
+])  # yapf: disable
+
+
+def create_reading_columns(num_readings):
+    """Returns a new, zeroed columnar chunk holding num_readings readings."""
+    return np.zeros(num_readings, dtype=READING_DTYPE).view(np.recarray)
+
+
+def is_reading_columns(buffer):
+    """Returns True iff the buffer is a columnar chunk of readings."""
+    return (isinstance(buffer, np.ndarray)
+            and buffer.dtype.names == READING_DTYPE.names)
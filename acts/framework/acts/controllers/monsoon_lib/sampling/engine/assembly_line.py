@@ -14,10 +14,13 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import collections
 import queue
 from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
 
+import numpy as np
+
 
 class AssemblyLine(object):
     """A class for passing data through a chain of threads or processes,
@@ -71,6 +74,11 @@ class AssemblyLine(object):
         """Runs the AssemblyLine, passing the data between each work node."""
         raise NotImplementedError()
 
+    def _close_streams(self):
+        """Releases the streams created between each node."""
+        for node in self.nodes[1:]:
+            node.input_stream.close()
+
 
 class ProcessAssemblyLine(AssemblyLine):
     """An AssemblyLine that uses processes to schedule work on nodes."""
@@ -88,6 +96,7 @@ class ProcessAssemblyLine(AssemblyLine):
                                      [node.input_stream])
         process_pool.close()
         process_pool.join()
+        self._close_streams()
 
 
 class ThreadAssemblyLine(AssemblyLine):
@@ -99,6 +108,7 @@ class ThreadAssemblyLine(AssemblyLine):
             for node in self.nodes:
                 thread_pool.submit(node.transformer.transform,
                                    node.input_stream)
+        self._close_streams()
 
 
 class AssemblyLineBuilder(object):
@@ -121,7 +131,7 @@ class AssemblyLineBuilder(object):
                 None.
 
             Returns:
-                A Queue object.
+                A Queue object, or a BufferStream to be used as-is.
     """
 
     def __init__(self, queue_generator, assembly_line_generator):
@@ -188,7 +198,9 @@ class AssemblyLineBuilder(object):
         if self.built:
             raise ValueError('Cannot add additional nodes after the '
                              'AssemblyLine has been built.')
-        stream = BufferStream(self.__generate_queue())
+        stream = self.__generate_queue()
+        if not isinstance(stream, BufferStream):
+            stream = BufferStream(stream)
         self.nodes[-1].transformer.set_output_stream(stream)
         self.nodes.append(AssemblyLine.Node(transformer, stream))
         return self
@@ -225,9 +237,32 @@ class ProcessAssemblyLineBuilder(AssemblyLineBuilder):
             with one another over multiple processes.
     """
 
-    def __init__(self):
+    def __init__(self, shared_memory_dtype=None,
+                 shared_memory_capacity=2**20):
+        """Creates a ProcessAssemblyLineBuilder.
+
+        Args:
+            shared_memory_dtype: If set, the record dtype buffers are expected
+                to be in. Buffers of this dtype are passed between nodes
+                through SharedMemoryBufferStreams instead of being pickled.
+            shared_memory_capacity: The number of records each shared memory
+                ring buffer can hold.
+        """
         self.manager = multiprocessing.Manager()
-        super().__init__(self.manager.Queue, ProcessAssemblyLine)
+        self._shared_memory_dtype = shared_memory_dtype
+        self._shared_memory_capacity = shared_memory_capacity
+        if shared_memory_dtype is None:
+            queue_generator = self.manager.Queue
+        else:
+            queue_generator = self._generate_shared_memory_stream
+        super().__init__(queue_generator, ProcessAssemblyLine)
+
+    def _generate_shared_memory_stream(self):
+        """Returns a new SharedMemoryBufferStream for passing buffers."""
+        return SharedMemoryBufferStream(self.manager.Queue(),
+                                        self._shared_memory_dtype,
+                                        self._shared_memory_capacity,
+                                        space_queue=self.manager.Queue())
 
 
 class IndexedBuffer(object):
@@ -307,6 +342,199 @@ class BufferStream(object):
         """
         return self._buffer_queue.get()
 
+    def close(self):
+        """Releases any resources held by the stream.
+
+        Must only be called once all transformers using the stream are done.
+        """
+        pass
+
+
+# The message sent over a SharedMemoryBufferStream's queue in place of an
+# IndexedBuffer whose records were written into the ring buffer.
+_SharedMemorySlice = collections.namedtuple(
+    '_SharedMemorySlice',
+    ['index', 'offset', 'length', 'skipped', 'is_recarray'])
+
+
+class SharedMemoryBufferStream(BufferStream):
+    """A BufferStream that passes numeric records through shared memory.
+
+    Buffers that are numpy arrays of the stream's dtype are copied into a
+    ring buffer held in multiprocessing.shared_memory, and only the offset and
+    length of the records are sent over the queue. Any other buffer is sent
+    over the queue as-is, as with a BufferStream.
+
+    The ring buffer supports a single writer and a single reader. The reader
+    copies the records out of the ring buffer when it removes them, and
+    publishes how many records it has consumed in a header at the start of the
+    shared memory. When the ring buffer is full, the writer flags that it is
+    waiting in the header, and blocks on the space queue until the reader
+    signals that it has consumed more records.
+
+    multiprocessing.shared_memory requires Python 3.8, so it is only imported
+    once a SharedMemoryBufferStream is created.
+
+    Attributes:
+        dtype: The numpy dtype of the records held in shared memory.
+        capacity: The number of records the ring buffer can hold.
+    """
+
+    # The number of bytes reserved at the start of the shared memory for the
+    # header: the count of consumed records, and whether the writer is waiting
+    # for free space.
+    HEADER_SIZE = 64
+
+    # The indexes of the header values.
+    _CONSUMED = 0
+    _WRITER_WAITING = 1
+
+    def __init__(self, buffer_queue, dtype, capacity=2**20, space_queue=None):
+        """Creates a new SharedMemoryBufferStream.
+
+        Args:
+            buffer_queue: A Queue object used to pass the location of buffers
+                along the stream. Must be picklable if the stream is used
+                across processes, e.g. a multiprocessing.Manager().Queue().
+            dtype: The numpy dtype of the records passed through the stream.
+            capacity: The number of records the ring buffer can hold.
+            space_queue: A Queue object the reader uses to wake a writer
+                waiting for free space. Must be picklable if the stream is
+                used across processes. Defaults to a queue.Queue.
+        """
+        from multiprocessing import shared_memory
+
+        super().__init__(buffer_queue)
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self._space_queue = space_queue or queue.Queue()
+        self._shared_memory = shared_memory.SharedMemory(
+            create=True,
+            size=self.HEADER_SIZE + self.dtype.itemsize * capacity)
+        self._is_owner = True
+        self._header = None
+        self._records = None
+        self._write_total = 0
+        self._attach()
+        self._header[:] = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_shared_memory'] = self._shared_memory.name
+        state['_is_owner'] = False
+        state['_header'] = None
+        state['_records'] = None
+        return state
+
+    def __setstate__(self, state):
+        from multiprocessing import shared_memory
+
+        self.__dict__.update(state)
+        self._shared_memory = shared_memory.SharedMemory(
+            name=state['_shared_memory'])
+
+    def _attach(self):
+        """Maps the header and records onto the shared memory."""
+        if self._records is not None:
+            return
+        self._header = np.ndarray((2,),
+                                  dtype=np.int64,
+                                  buffer=self._shared_memory.buf)
+        self._records = np.ndarray((self.capacity * self.dtype.itemsize,),
+                                   dtype=np.uint8,
+                                   buffer=self._shared_memory.buf,
+                                   offset=self.HEADER_SIZE)
+
+    def initialize(self):
+        """Initializes the stream within the process using it."""
+        super().initialize()
+        self._attach()
+
+    def add_indexed_buffer(self, buffer):
+        """Adds the given buffer to the buffer stream.
+
+        Blocks while the ring buffer does not have room for the records.
+        """
+        records = buffer.buffer
+        if (not isinstance(records, np.ndarray) or records.dtype != self.dtype
+                or not 0 < len(records) <= self.capacity):
+            super().add_indexed_buffer(buffer)
+            return
+        self._attach()
+
+        length = len(records)
+        offset = self._write_total % self.capacity
+        # Records are always contiguous, so if they do not fit before the end
+        # of the ring buffer, the remaining slots are skipped.
+        skipped = 0
+        if offset + length > self.capacity:
+            skipped = self.capacity - offset
+            offset = 0
+        self._wait_for_space(skipped + length)
+
+        # Copying the raw bytes is much faster than assigning field by field.
+        itemsize = self.dtype.itemsize
+        self._records[offset * itemsize:(offset + length) * itemsize] = (
+            np.ascontiguousarray(records).view(np.uint8))
+        self._write_total += skipped + length
+        self._buffer_queue.put(
+            _SharedMemorySlice(buffer.index, offset, length, skipped,
+                               isinstance(records, np.recarray)),
+            block=False)
+
+    def _has_space(self, num_records):
+        """Returns whether num_records more records fit in the ring buffer."""
+        return (self._write_total + num_records -
+                self._header[self._CONSUMED] <= self.capacity)
+
+    def _wait_for_space(self, num_records):
+        """Blocks until num_records more records fit in the ring buffer."""
+        while not self._has_space(num_records):
+            self._header[self._WRITER_WAITING] = 1
+            # The reader may have consumed records before seeing the flag.
+            if self._has_space(num_records):
+                break
+            # A wake-up may be left over from an earlier wait, so the space
+            # is checked again after every wake-up.
+            self._space_queue.get()
+        self._header[self._WRITER_WAITING] = 0
+
+    def remove_indexed_buffer(self):
+        """Removes an indexed buffer from the stream.
+
+        This operation blocks until data is received.
+
+        Returns:
+            an IndexedBuffer.
+        """
+        message = self._buffer_queue.get()
+        if not isinstance(message, _SharedMemorySlice):
+            return message
+        self._attach()
+
+        itemsize = self.dtype.itemsize
+        start = message.offset * itemsize
+        end = start + message.length * itemsize
+        records = self._records[start:end].copy().view(self.dtype)
+        self._header[self._CONSUMED] += message.skipped + message.length
+        if self._header[self._WRITER_WAITING]:
+            self._header[self._WRITER_WAITING] = 0
+            self._space_queue.put(None)
+        if message.is_recarray:
+            records = records.view(np.recarray)
+        return IndexedBuffer(message.index, records)
+
+    def close(self):
+        """Unmaps the shared memory, and frees it if this stream created it."""
+        if self._shared_memory is None:
+            return
+        self._header = None
+        self._records = None
+        self._shared_memory.close()
+        if self._is_owner:
+            self._shared_memory.unlink()
+        self._shared_memory = None
+
 
 class DevNullBufferStream(BufferStream):
     """A BufferStream that is always empty."""
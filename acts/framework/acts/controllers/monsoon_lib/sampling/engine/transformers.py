@@ -14,11 +14,23 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import itertools
+
 import numpy as np
 
+from acts.controllers.monsoon_lib.sampling.capture_file import CaptureFileWriter
+from acts.controllers.monsoon_lib.sampling.common import READING_DTYPE
+from acts.controllers.monsoon_lib.sampling.common import create_reading_columns
+from acts.controllers.monsoon_lib.sampling.common import is_reading_columns
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import BufferList
 from acts.controllers.monsoon_lib.sampling.engine.transformer import ParallelTransformer
 from acts.controllers.monsoon_lib.sampling.engine.transformer import SequentialTransformer
+from acts.controllers.monsoon_lib.sampling.engine.transformer import SourceTransformer
+from acts.controllers.monsoon_lib.sampling.pyramid import DEFAULT_LEVELS
+from acts.controllers.monsoon_lib.sampling.pyramid import PyramidWriter
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecording
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecordingWriter
+from acts.controllers.monsoon_lib.sampling.statistics import CurrentStatistics
 
 
 class Tee(SequentialTransformer):
@@ -52,8 +64,12 @@ class Tee(SequentialTransformer):
         """Writes the reading values to a file.
 
         Args:
-            buffer: A list of HvpmReadings.
+            buffer: A list of HvpmReadings, or a columnar chunk of readings.
         """
+        if is_reading_columns(buffer):
+            self._write_columns(buffer)
+            return BufferList([buffer])
+
         for sample in buffer:
             if sample.sample_time < self.measure_after_seconds:
                 continue
@@ -63,6 +79,211 @@ class Tee(SequentialTransformer):
         self._fd.flush()
         return BufferList([buffer])
 
+    def _write_columns(self, columns):
+        """Writes the values of a columnar chunk of readings to the file."""
+        columns = columns[columns.sample_time >= self.measure_after_seconds]
+        np.savetxt(self._fd,
+                   np.column_stack((columns.sample_time -
+                                    self.measure_after_seconds,
+                                    columns.main_current)),
+                   fmt='%.9fs %.12f')
+        self._fd.flush()
+
+
+class BinaryTee(SequentialTransformer):
+    """Outputs reading values to a binary capture file.
+
+    See sampling.capture_file for details on the file format.
+
+    Attributes:
+        _writer: the CaptureFileWriter used to write the capture file.
+    """
+
+    def __init__(self,
+                 filename,
+                 hz,
+                 voltage,
+                 measure_after_seconds=0,
+                 columns=('main_current', )):
+        """Creates a BinaryTee.
+
+        Args:
+            filename: the path to the file to write the collected data to.
+            hz: the number of samples per second received by this transformer.
+            voltage: the voltage used during the capture.
+            measure_after_seconds: the number of seconds to skip before
+                logging data as part of the measurement.
+            columns: the reading attributes to write for each sample.
+        """
+        super().__init__()
+        self._writer = CaptureFileWriter(filename, hz, voltage, columns)
+        self.measure_after_seconds = measure_after_seconds
+
+    def on_begin(self):
+        self._writer.open()
+
+    def on_end(self):
+        self._writer.close()
+
+    def _transform_buffer(self, buffer):
+        """Writes the reading values to the capture file.
+
+        Args:
+            buffer: A list of H/LvpmReadings, or a columnar chunk of readings.
+        """
+        columns = self._writer.columns
+        if is_reading_columns(buffer):
+            readings = buffer[buffer.sample_time >= self.measure_after_seconds]
+            sample_times = readings.sample_time
+            column_values = [readings[column] for column in columns]
+        else:
+            readings = [
+                sample for sample in buffer
+                if sample.sample_time >= self.measure_after_seconds
+            ]
+            sample_times = [reading.sample_time for reading in readings]
+            column_values = [[getattr(reading, column) for reading in readings]
+                             for column in columns]
+
+        self._writer.write(
+            np.subtract(sample_times, self.measure_after_seconds,
+                        dtype=float), *column_values)
+        self._writer.flush()
+        return BufferList([buffer])
+
+
+class PyramidBuilder(SequentialTransformer):
+    """Builds a min/max/mean pyramid of the main_current values.
+
+    See sampling.pyramid for details on the pyramid levels.
+
+    Attributes:
+        _writer: the PyramidWriter used to write the pyramid.
+    """
+
+    def __init__(self,
+                 path,
+                 hz,
+                 voltage,
+                 measure_after_seconds=0,
+                 levels=DEFAULT_LEVELS):
+        """Creates a PyramidBuilder.
+
+        Args:
+            path: the path of the pyramid directory to write.
+            hz: the number of samples per second received by this transformer.
+            voltage: the voltage used during the capture.
+            measure_after_seconds: the number of seconds to skip before
+                adding data to the pyramid.
+            levels: the power-of-two exponents of the levels to build.
+        """
+        super().__init__()
+        self._writer = PyramidWriter(path, hz, voltage, levels)
+        self.measure_after_seconds = measure_after_seconds
+
+    def on_begin(self):
+        self._writer.open()
+
+    def on_end(self):
+        self._writer.close()
+
+    def _transform_buffer(self, buffer):
+        """Adds the readings to the pyramid.
+
+        Args:
+            buffer: A list of H/LvpmReadings, or a columnar chunk of readings.
+        """
+        if is_reading_columns(buffer):
+            readings = buffer[buffer.sample_time >= self.measure_after_seconds]
+            sample_times = readings.sample_time
+            currents = readings.main_current
+        else:
+            readings = [
+                sample for sample in buffer
+                if sample.sample_time >= self.measure_after_seconds
+            ]
+            sample_times = [reading.sample_time for reading in readings]
+            currents = [reading.main_current for reading in readings]
+
+        self._writer.write(
+            np.subtract(sample_times, self.measure_after_seconds,
+                        dtype=float), currents)
+        return BufferList([buffer])
+
+
+class RawPacketRecorder(SequentialTransformer):
+    """Writes the raw packets of a PacketCollector to a raw recording.
+
+    See sampling.raw_recording for details on the file format. The raw packets
+    are passed on unchanged, so this transformer belongs between a
+    PacketCollector and the transformer that decodes its packets.
+
+    Attributes:
+        _writer: the RawRecordingWriter used to write the raw recording.
+    """
+
+    def __init__(self, path, metadata=None):
+        """Creates a RawPacketRecorder.
+
+        Args:
+            path: the path of the raw recording to write.
+            metadata: a JSON-serializable dict describing the Monsoon. Must
+                hold whatever is needed to decode the packets again.
+        """
+        super().__init__()
+        self._writer = RawRecordingWriter(path, metadata)
+
+    def on_begin(self):
+        self._writer.open()
+
+    def on_end(self):
+        self._writer.close()
+
+    def _transform_buffer(self, buffer):
+        """Writes the raw packets to the raw recording.
+
+        Args:
+            buffer: A list of raw packets, as sent by a PacketCollector.
+        """
+        self._writer.write(buffer)
+        return BufferList([buffer])
+
+
+class RawPacketReplayer(SourceTransformer):
+    """Replays the raw packets of a raw recording.
+
+    Packets are sent as fast as they can be read, with the timing recorded by
+    the PacketCollector, so a capture can be processed again without a
+    Monsoon attached.
+    """
+
+    def __init__(self, path):
+        """Creates a RawPacketReplayer.
+
+        Args:
+            path: the path of the raw recording to replay.
+        """
+        super().__init__()
+        self._path = path
+        self._raw_packets = None
+
+    def on_begin(self):
+        self._raw_packets = RawRecording(self._path).read_raw_packets()
+
+    def on_end(self):
+        if self._raw_packets is not None:
+            self._raw_packets.close()
+
+    def _transform_buffer(self, buffer):
+        """Fills the buffer with the next raw packets of the recording.
+
+        Returns:
+            A list of up to len(buffer) raw packets. None once every packet
+            has been sent.
+        """
+        raw_packets = list(itertools.islice(self._raw_packets, len(buffer)))
+        return raw_packets or None
+
 
 class SampleAggregator(ParallelTransformer):
     """Aggregates the main current value and the number of samples gathered."""
@@ -84,8 +305,16 @@ class SampleAggregator(ParallelTransformer):
         """Aggregates the sample data.
 
         Args:
-            buffer: A buffer of H/LvpmReadings.
+            buffer: A buffer of H/LvpmReadings, or a columnar chunk of
+                readings.
         """
+        if is_reading_columns(buffer):
+            currents = buffer.main_current[
+                buffer.sample_time >= self.start_after_seconds]
+            self._num_samples += len(currents)
+            self._sum_currents += float(np.sum(currents))
+            return buffer
+
         for sample in buffer:
             if sample.sample_time < self.start_after_seconds:
                 continue
@@ -104,6 +333,52 @@ class SampleAggregator(ParallelTransformer):
         return self._sum_currents
 
 
+class StatisticsAggregator(ParallelTransformer):
+    """Gathers streaming statistics of the main current values.
+
+    Unlike SampleAggregator, this gathers the min, max, variance, approximate
+    percentiles, a histogram and per-window means of the currents, all within
+    constant memory.
+
+    Attributes:
+        statistics: The CurrentStatistics gathered so far.
+    """
+
+    def __init__(self, start_after_seconds=0, **statistics_kwargs):
+        """Creates a new StatisticsAggregator.
+
+        Args:
+            start_after_seconds: The number of seconds to wait before gathering
+                data. Window times are relative to this value.
+            **statistics_kwargs: The keyword arguments to pass to
+                CurrentStatistics.
+        """
+        super().__init__()
+        self.start_after_seconds = start_after_seconds
+        self.statistics = CurrentStatistics(**statistics_kwargs)
+
+    def _transform_buffer(self, buffer):
+        """Adds the sample data to the statistics.
+
+        Args:
+            buffer: A buffer of H/LvpmReadings, or a columnar chunk of
+                readings.
+        """
+        if is_reading_columns(buffer):
+            sample_times = buffer.sample_time
+            currents = buffer.main_current
+        else:
+            sample_times = np.array([sample.sample_time for sample in buffer],
+                                    dtype=float)
+            currents = np.array([sample.main_current for sample in buffer],
+                                dtype=float)
+
+        measured = sample_times >= self.start_after_seconds
+        self.statistics.add(sample_times[measured] - self.start_after_seconds,
+                            currents[measured])
+        return buffer
+
+
 class DownSampler(SequentialTransformer):
     """Takes in sample outputs and returns a downsampled version of that data.
 
@@ -158,7 +433,13 @@ class DownSampler(SequentialTransformer):
                   ║ ╚╝ ╚╝ ╚╝ ╚╝ ╚╝ ║           ║ ╚╝ ╚╝ ╚╝ ╚╝ ╚╝ ║
                   ╚════════════════╝           ╚════════════════╝
                    output buffer n             output buffer n + 1
+
+        Columnar chunks of readings are downsampled column by column, and
+        return a columnar chunk of the averaged readings.
         """
+        if is_reading_columns(buffer):
+            return self._transform_columns(buffer)
+
         tail_length = int(
             (len(buffer) + len(self._leftovers)) % self._mean_width)
 
@@ -175,3 +456,26 @@ class DownSampler(SequentialTransformer):
         self._leftovers = buffer[len(buffer) - tail_length:]
 
         return downsampled_values
+
+    def _transform_columns(self, columns):
+        """Returns the columnar chunk downsampled by an integer factor.
+
+        See _transform_buffer for details. The tail is stored in
+        self._leftovers as a columnar chunk.
+        """
+        if len(self._leftovers):
+            columns = np.concatenate(
+                (self._leftovers, columns)).view(np.recarray)
+        tailless_length = len(columns) - len(columns) % self._mean_width
+
+        downsampled = create_reading_columns(tailless_length //
+                                             self._mean_width)
+        for name in READING_DTYPE.names:
+            downsampled[name] = np.mean(
+                np.reshape(columns[name][:tailless_length],
+                           (-1, self._mean_width)),
+                axis=1)
+
+        self._leftovers = columns[tailless_length:]
+
+        return downsampled
@@ -17,6 +17,9 @@
 import itertools
 from collections import deque
 
+import numpy as np
+
+from acts.controllers.monsoon_lib.sampling.engine.calibration import CalibrationCollection
 from acts.controllers.monsoon_lib.sampling.engine.calibration import CalibrationScalars
 from acts.controllers.monsoon_lib.sampling.engine.calibration import CalibrationWindows
 from acts.controllers.monsoon_lib.sampling.enums import Channel
@@ -54,7 +57,15 @@ class HvpmCalibrationData(CalibrationWindows):
             [8]: 0x10 == Origin.ZERO
                  0x30 == Origin.REFERENCE
         """
-        sample_type = sample.get_sample_type()
+        self.add_calibration_values(sample.get_sample_type(), sample.values)
+
+    def add_calibration_values(self, sample_type, values):
+        """Adds calibration values from the raw values of a calibration sample.
+
+        Args:
+            sample_type: The SampleType of the calibration sample.
+            values: The sample's values, ordered as HvpmMeasurement.values.
+        """
         if sample_type == SampleType.ZERO_CAL:
             origin = Origin.ZERO
         elif sample_type == SampleType.REF_CAL:
@@ -68,8 +79,72 @@ class HvpmCalibrationData(CalibrationWindows):
             granularity = i & 0x01
             # Divides by 2 to get the Channel value.
             channel = i >> 1
-            self.add(channel, origin, granularity,
-                     sample[channel, granularity])
+            self.add(channel, origin, granularity, int(values[i]))
+
+    def add_calibration_array(self, origin, values):
+        """Adds an array of calibration values for the given origin.
+
+        Args:
+            origin: The Origin of the calibration samples.
+            values: A 2D array with a row of values for each calibration sample
+                in the order received. Each row holds the first 6 values of
+                HvpmMeasurement.values.
+
+        Returns:
+            A 2D float array with len(values) + 1 rows. Row i holds the window
+            averages (ordered as the input columns) after the first i
+            calibration samples have been added. A row is NaN if the windows
+            were not yet full at that point.
+        """
+        keys = [(i >> 1, origin, i & 0x01) for i in range(6)]
+        history = np.array([list(self._calibrations[key]) for key in keys],
+                           dtype=np.int64).T.reshape(-1, 6)
+        all_values = np.concatenate((history, values.astype(np.int64)))
+
+        window_size = self._calibration_window_size
+        sums = np.zeros((len(all_values) + 1, 6), dtype=np.int64)
+        np.cumsum(all_values, axis=0, out=sums[1:])
+
+        averages = np.full((len(values) + 1, 6), np.nan)
+        counts = np.arange(len(history), len(all_values) + 1)
+        full = counts >= window_size
+        averages[full] = ((sums[counts[full]] -
+                           sums[counts[full] - window_size]) / window_size)
+
+        for row in values[-window_size:]:
+            for i, key in enumerate(keys):
+                self.add(*key, int(row[i]))
+
+        return averages
+
+
+class HvpmCalibrationColumns(CalibrationCollection):
+    """The dynamic calibration values of every sample within a sample array.
+
+    Unlike other CalibrationCollections, get() returns an array holding the
+    calibration value for each sample instead of a single value.
+    """
+
+    def __init__(self, zero, reference):
+        """Creates an HvpmCalibrationColumns.
+
+        Args:
+            zero: A 2D array of the Origin.ZERO calibration values, with a row
+                for each sample ordered as HvpmMeasurement.values[:6].
+            reference: The same as zero, but for Origin.REFERENCE.
+        """
+        self._calibrations = {Origin.ZERO: zero, Origin.REFERENCE: reference}
+
+    def add(self, channel, origin, granularity, value):
+        raise NotImplementedError('HvpmCalibrationColumns are read-only.')
+
+    def get_keys(self):
+        return itertools.product(Channel.values,
+                                 (Origin.ZERO, Origin.REFERENCE),
+                                 Granularity.values)
+
+    def get(self, channel, origin, granularity):
+        return self._calibrations[origin][:, channel * 2 + granularity]
 
 
 class HvpmCalibrationConstants(CalibrationScalars):
@@ -145,3 +220,24 @@ def build_status_packet_attribute_name(channel, origin, granularity):
         raise ValueError('Invalid origin "%s"' % origin)
 
     return '%s%s%s' % (channel, granularity, origin)
+
+
+def get_status_packet_calibrations(monsoon_status_packet):
+    """Returns the calibration constants of a Monsoon status packet.
+
+    Args:
+        monsoon_status_packet: the HVPM Monsoon status packet.
+
+    Returns:
+        A dict of the status packet attribute names used by
+        HvpmCalibrationConstants to their values. It can stand in for the
+        status packet as a types.SimpleNamespace(**calibrations).
+    """
+    calibrations = {}
+    for key in itertools.product(Channel.values, (Origin.SCALE, Origin.ZERO),
+                                 Granularity.values):
+        if key[0] == Channel.AUX and key[1] == Origin.ZERO:
+            continue
+        name = build_status_packet_attribute_name(*key)
+        calibrations[name] = getattr(monsoon_status_packet, name)
+    return calibrations
@@ -15,6 +15,8 @@
 #   limitations under the License.
 import struct
 
+import numpy as np
+
 from acts.controllers.monsoon_lib.sampling.enums import Reading
 
 
@@ -210,3 +212,84 @@ class Packet(object):
 
     def __len__(self):
         return self.num_measurements
+
+
+# The layout of a single HvpmMeasurement, as read directly from the packet.
+# See HvpmMeasurement.__doc__ for details on each value.
+MEASUREMENT_DTYPE = np.dtype([('values', '>u2', (8, )), ('gains', 'u1', (2, ))])
+
+# The layout of a decoded measurement, with its sample time attached.
+SAMPLE_DTYPE = np.dtype([('sample_time', '<f8'), ('values', '<u2', (8, )),
+                         ('gains', 'u1', (2, ))])
+
+# The size of the time data and packet header placed before the measurements.
+# This is the size of the '<2dhBx' prefix used by Packet.
+PACKET_HEADER_SIZE = 20
+
+
+def packet_dtype(num_measurements):
+    """Returns the structured dtype of a packet with the given measurements.
+
+    The layout mirrors the struct string used by Packet, which allows a buffer
+    of equally sized packets to be read with a single np.frombuffer call.
+
+    Args:
+        num_measurements: The number of measurements within each packet.
+    """
+    return np.dtype([
+        ('time_since_start', '<f8'),
+        ('time_since_last_sample', '<f8'),
+        ('dropped_count', '<i2'),
+        ('flags', 'u1'),
+        ('padding', 'u1'),
+        ('measurements', MEASUREMENT_DTYPE, (num_measurements, )),
+    ])  # yapf: disable
+
+
+def get_num_measurements(packet_size):
+    """Returns the number of measurements in a packet of the given size.
+
+    Returns:
+        The number of measurements, or None if the size does not correspond to
+        a well-formed packet.
+    """
+    num_data_bytes = packet_size - PACKET_HEADER_SIZE
+    if num_data_bytes <= 0 or num_data_bytes % HvpmMeasurement.SIZE:
+        return None
+    return num_data_bytes // HvpmMeasurement.SIZE
+
+
+def unpack_packets(raw_packets, num_measurements):
+    """Reads equally sized raw packets into a structured packet array.
+
+    Args:
+        raw_packets: A list of raw packets (time data included), each holding
+            exactly num_measurements measurements.
+        num_measurements: The number of measurements within each packet.
+
+    Returns:
+        A tuple of (packets, samples), where packets is an array of
+        packet_dtype(num_measurements) and samples is an array of SAMPLE_DTYPE
+        holding every measurement in the order it was received.
+    """
+    packets = np.frombuffer(b''.join(raw_packets),
+                            dtype=packet_dtype(num_measurements))
+
+    # Matches Packet._get_sample_time(): samples within a packet are assumed
+    # to be uniformly distributed over the time it took to read the packet.
+    time_per_sample = packets['time_since_last_sample'] / num_measurements
+    sample_times = (packets['time_since_start'][:, np.newaxis] +
+                    time_per_sample[:, np.newaxis] *
+                    np.arange(1, num_measurements + 1))
+
+    measurements = packets['measurements'].reshape(-1)
+    samples = np.empty(len(measurements), dtype=SAMPLE_DTYPE)
+    samples['sample_time'] = sample_times.reshape(-1)
+    samples['values'] = measurements['values']
+    samples['gains'] = measurements['gains']
+    return packets, samples
+
+
+def get_sample_types(samples):
+    """Returns the SampleType of each sample in a SAMPLE_DTYPE array."""
+    return samples['gains'][:, 1] & 0x30
@@ -15,14 +15,17 @@
 #   limitations under the License.
 
 import array
+import itertools
 import logging
 import struct
 import time
+import types
 
 import numpy as np
 from Monsoon import HVPM
 
 from acts.controllers.monsoon_lib.sampling.common import UncalibratedSampleChunk
+from acts.controllers.monsoon_lib.sampling.common import create_reading_columns
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import BufferList
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ProcessAssemblyLineBuilder
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ThreadAssemblyLineBuilder
@@ -32,24 +35,51 @@ from acts.controllers.monsoon_lib.sampling.engine.transformer import ParallelTra
 from acts.controllers.monsoon_lib.sampling.engine.transformer import SequentialTransformer
 from acts.controllers.monsoon_lib.sampling.engine.transformer import SourceTransformer
 from acts.controllers.monsoon_lib.sampling.engine.transformer import Transformer
+from acts.controllers.monsoon_lib.sampling.engine.transformers import RawPacketRecorder
+from acts.controllers.monsoon_lib.sampling.engine.transformers import RawPacketReplayer
 from acts.controllers.monsoon_lib.sampling.enums import Channel
 from acts.controllers.monsoon_lib.sampling.enums import Granularity
 from acts.controllers.monsoon_lib.sampling.enums import Origin
 from acts.controllers.monsoon_lib.sampling.enums import Reading
+from acts.controllers.monsoon_lib.sampling.hvpm.calibrations import HvpmCalibrationColumns
 from acts.controllers.monsoon_lib.sampling.hvpm.calibrations import HvpmCalibrationConstants
 from acts.controllers.monsoon_lib.sampling.hvpm.calibrations import HvpmCalibrationData
+from acts.controllers.monsoon_lib.sampling.hvpm.calibrations import get_status_packet_calibrations
 from acts.controllers.monsoon_lib.sampling.hvpm.packet import HvpmMeasurement
 from acts.controllers.monsoon_lib.sampling.hvpm.packet import Packet
+from acts.controllers.monsoon_lib.sampling.hvpm.packet import SAMPLE_DTYPE
 from acts.controllers.monsoon_lib.sampling.hvpm.packet import SampleType
+from acts.controllers.monsoon_lib.sampling.hvpm.packet import get_num_measurements
+from acts.controllers.monsoon_lib.sampling.hvpm.packet import get_sample_types
+from acts.controllers.monsoon_lib.sampling.hvpm.packet import unpack_packets
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecording
+
+# The value of the 'monsoon' metadata of HVPM raw recordings.
+RAW_RECORDING_MONSOON = 'hvpm'
 
 
 class HvpmTransformer(Transformer):
     """Gathers samples from the Monsoon and brings them back to the caller."""
 
-    def __init__(self, monsoon_serial, duration):
+    def __init__(self, monsoon_serial, duration, columnar=False,
+                 raw_recording_path=None):
+        """Creates an HvpmTransformer.
+
+        Args:
+            monsoon_serial: The serial number of the Monsoon to sample from.
+            duration: The number of seconds to sample for.
+            columnar: If True, samples are decoded with NumPy and sent to the
+                output stream as columnar chunks (see
+                sampling.common.READING_DTYPE) instead of lists of HvpmReadings.
+            raw_recording_path: If set, the raw packets are also written to
+                this path as a raw recording, which can be processed again
+                with an HvpmReplayer.
+        """
         super().__init__()
         self.monsoon_serial = monsoon_serial
         self.duration = duration
+        self.columnar = columnar
+        self.raw_recording_path = raw_recording_path
 
     def _transform(self, input_stream):
         # We need to gather the status packet before sampling so we can use the
@@ -60,10 +90,58 @@ class HvpmTransformer(Transformer):
         monsoon_status_packet = monsoon.statusPacket()
         monsoon.closeDevice()
 
+        assembly_line_builder = ProcessAssemblyLineBuilder().source(
+            PacketCollector(self.monsoon_serial, self.duration))
+        if self.raw_recording_path:
+            metadata = {
+                'monsoon': RAW_RECORDING_MONSOON,
+                'serial': self.monsoon_serial,
+                'status_packet':
+                get_status_packet_calibrations(monsoon_status_packet),
+            }
+            assembly_line_builder.into(
+                RawPacketRecorder(self.raw_recording_path, metadata))
+        # yapf: disable. Yapf doesn't handle fluent interfaces well.
+        (assembly_line_builder
+         .into(SampleNormalizer(monsoon_status_packet=monsoon_status_packet,
+                                columnar=self.columnar))
+         .build(output_stream=self.output_stream).run())
+        # yapf: enable
+
+
+class HvpmReplayer(Transformer):
+    """Replays the raw recording of an HvpmTransformer as if sampling again.
+
+    The readings are sent to the output stream exactly as an HvpmTransformer
+    would, so any downsampling, offset or output can be applied to an old
+    capture without a Monsoon attached.
+    """
+
+    def __init__(self, raw_recording_path, columnar=False):
+        """Creates an HvpmReplayer.
+
+        Args:
+            raw_recording_path: The path of the raw recording to replay.
+            columnar: If True, samples are decoded into columnar chunks. See
+                HvpmTransformer.
+        """
+        super().__init__()
+        self.raw_recording_path = raw_recording_path
+        self.columnar = columnar
+
+    def _transform(self, input_stream):
+        metadata = RawRecording(self.raw_recording_path).metadata
+        if metadata.get('monsoon') != RAW_RECORDING_MONSOON:
+            raise ValueError('%s is not a raw recording of an HVPM Monsoon.' %
+                             self.raw_recording_path)
+        monsoon_status_packet = types.SimpleNamespace(
+            **metadata['status_packet'])
+
         # yapf: disable. Yapf doesn't handle fluent interfaces well.
         (ProcessAssemblyLineBuilder()
-         .source(PacketCollector(self.monsoon_serial, self.duration))
-         .into(SampleNormalizer(monsoon_status_packet=monsoon_status_packet))
+         .source(RawPacketReplayer(self.raw_recording_path))
+         .into(SampleNormalizer(monsoon_status_packet=monsoon_status_packet,
+                                columnar=self.columnar))
          .build(output_stream=self.output_stream).run())
         # yapf: enable
 
@@ -154,22 +232,37 @@ class PacketCollector(SourceTransformer):
 class SampleNormalizer(Transformer):
     """A Transformer that applies calibration to the input's packets."""
 
-    def __init__(self, monsoon_status_packet):
+    def __init__(self, monsoon_status_packet, columnar=False):
         """Creates a SampleNormalizer.
 
         Args:
             monsoon_status_packet: The status of the monsoon. Used for gathering
                 the constant calibration data from the device.
+            columnar: If True, uses the columnar transformers to decode the
+                packets into columnar chunks of readings.
         """
         super().__init__()
         self.monsoon_status_packet = monsoon_status_packet
+        self.columnar = columnar
 
     def _transform(self, input_stream):
+        if self.columnar:
+            transformers = [
+                ColumnarPacketReader(),
+                ColumnarSampleChunker(),
+                ColumnarCalibrationApplier(self.monsoon_status_packet)
+            ]
+        else:
+            transformers = [
+                PacketReader(),
+                SampleChunker(),
+                CalibrationApplier(self.monsoon_status_packet)
+            ]
         # yapf: disable. Yapf doesn't handle fluent interfaces well.
         (ThreadAssemblyLineBuilder()
-         .source(PacketReader(), input_stream=input_stream)
-         .into(SampleChunker())
-         .into(CalibrationApplier(self.monsoon_status_packet))
+         .source(transformers[0], input_stream=input_stream)
+         .into(transformers[1])
+         .into(transformers[2])
          .build(output_stream=self.output_stream).run())
         # yapf: enable
 
@@ -207,16 +300,26 @@ class PacketReader(ParallelTransformer):
 
     def _process_dropped_count(self, packet):
         """Processes the dropped count value, updating the internal counters."""
-        if packet.dropped_count == self.previous_dropped_count:
+        self._update_dropped_count(packet.dropped_count,
+                                   packet.time_since_start)
+
+    def _update_dropped_count(self, dropped_count, time_since_start):
+        """Updates the internal counters with a packet's dropped count.
+
+        Args:
+            dropped_count: The dropped count reported by the packet.
+            time_since_start: The time the packet was collected at.
+        """
+        if dropped_count == self.previous_dropped_count:
             return
 
-        if packet.dropped_count < self.previous_dropped_count:
+        if dropped_count < self.previous_dropped_count:
             self.rollover_count += 1
 
-        self.previous_dropped_count = packet.dropped_count
+        self.previous_dropped_count = dropped_count
         log_function = logging.info if __debug__ else logging.warning
         log_function('At %9f, total dropped count: %s' %
-                     (packet.time_since_start, self.total_dropped_count))
+                     (time_since_start, self.total_dropped_count))
 
     @property
     def total_dropped_count(self):
@@ -242,6 +345,49 @@ class PacketReader(ParallelTransformer):
                     'dropped.' % self.total_dropped_count)
 
 
+class ColumnarPacketReader(PacketReader):
+    """Reads raw HVPM Monsoon data directly into a structured sample array.
+
+    Unlike PacketReader, no Packet or HvpmMeasurement objects are created.
+    Consecutive packets of equal size are decoded together with NumPy, and the
+    output buffer is a single array of hvpm.packet.SAMPLE_DTYPE.
+    """
+
+    def _transform_buffer(self, buffer):
+        """Reads raw sample data and converts it into a sample array."""
+        sample_arrays = []
+        # PacketCollector leaves a None in the buffer when a USB read fails.
+        raw_packets = [raw_packet for raw_packet in buffer if raw_packet]
+        for packet_size, packet_group in itertools.groupby(raw_packets, len):
+            num_measurements = get_num_measurements(packet_size)
+            packet_group = list(packet_group)
+            if num_measurements is None:
+                logging.warning('Received %d malformed packets of size %d.',
+                                len(packet_group), packet_size)
+                continue
+
+            packets, samples = unpack_packets(packet_group, num_measurements)
+            self._process_dropped_counts(packets)
+            sample_arrays.append(samples)
+
+        if not sample_arrays:
+            return np.empty(0, dtype=SAMPLE_DTYPE)
+        return np.concatenate(sample_arrays)
+
+    def _process_dropped_counts(self, packets):
+        """Processes the dropped counts of an array of packets."""
+        packets = packets[packets['time_since_start'] >
+                          PacketReader.DROP_COUNT_TIMER_THRESHOLD]
+        dropped_counts = packets['dropped_count']
+        # Only packets whose dropped count differs from the previous packet
+        # can change the internal counters.
+        changed = np.flatnonzero(
+            np.diff(dropped_counts, prepend=self.previous_dropped_count))
+        for index in changed:
+            self._update_dropped_count(int(dropped_counts[index]),
+                                       packets['time_since_start'][index])
+
+
 class SampleChunker(SequentialTransformer):
     """Chunks input packets into lists of samples with identical calibration.
 
@@ -307,6 +453,69 @@ class SampleChunker(SequentialTransformer):
         return new_chunk
 
 
+class ColumnarSampleChunker(SequentialTransformer):
+    """Attaches the dynamic calibration to each sample of a sample array.
+
+    Designed to come after a ColumnarPacketReader. Rather than splitting the
+    samples into a chunk for every calibration window (see SampleChunker), the
+    calibration windows are computed for every sample with array operations,
+    and each buffer is sent along as a single chunk.
+
+    Attributes:
+        calibration_data: The calibration window information.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.calibration_data = HvpmCalibrationData()
+
+    def _transform_buffer(self, buffer):
+        """Takes in a sample array and attaches the calibration to it.
+
+        Measurement samples taken before the Monsoon has finished calibrating
+        are dropped.
+
+        Args:
+            buffer: An array of hvpm.packet.SAMPLE_DTYPE.
+
+        Returns:
+            An UncalibratedSampleChunk, whose samples are the measurement
+            samples within the buffer, and whose calibration_data is an
+            HvpmCalibrationColumns.
+        """
+        sample_types = get_sample_types(buffer)
+        measurement_indices = np.flatnonzero(
+            sample_types == SampleType.MEASUREMENT)
+
+        calibrations = {}
+        calibrated = np.ones(len(measurement_indices), dtype=bool)
+        for origin, sample_type in ((Origin.ZERO, SampleType.ZERO_CAL),
+                                    (Origin.REFERENCE, SampleType.REF_CAL)):
+            calibration_indices = np.flatnonzero(sample_types == sample_type)
+            averages = self.calibration_data.add_calibration_array(
+                origin, buffer['values'][calibration_indices, :6])
+            # Each measurement uses the calibration windows as they were after
+            # the last calibration sample received before it.
+            calibrations[origin] = averages[np.searchsorted(
+                calibration_indices, measurement_indices)]
+            calibrated &= ~np.isnan(calibrations[origin][:, 0])
+
+        for index in np.flatnonzero(
+                (sample_types != SampleType.MEASUREMENT)
+                & (sample_types != SampleType.ZERO_CAL)
+                & (sample_types != SampleType.REF_CAL)):
+            # There's no information on what this sample means within the
+            # documentation or code Monsoon Inc. provides.
+            logging.warning('Received unidentifiable sample with SampleType '
+                            '%s: %s' % (sample_types[index], buffer[index]))
+
+        calibration_columns = HvpmCalibrationColumns(
+            calibrations[Origin.ZERO][calibrated],
+            calibrations[Origin.REFERENCE][calibrated])
+        return UncalibratedSampleChunk(
+            buffer[measurement_indices[calibrated]], calibration_columns)
+
+
 class HvpmReading(object):
     """The result of fully calibrating a sample. Contains all Monsoon readings.
 
@@ -420,10 +629,30 @@ class CalibrationApplier(ParallelTransformer):
             buffer.samples.clear()
             return buffer.samples
 
-        readings = np.zeros((len(buffer.samples), 5))
-
         measurements = np.array([sample.values for sample in buffer.samples])
-        calibrated_value = np.zeros((len(buffer.samples), 2))
+        readings = self._calibrate(measurements, calibration_data)
+
+        for i in range(len(buffer.samples)):
+            buffer.samples[i] = HvpmReading(
+                list(readings[i]), buffer.samples[i].get_sample_time())
+
+        return buffer.samples
+
+    def _calibrate(self, measurements, calibration_data):
+        """Applies the calibration formula to the raw measurement values.
+
+        Args:
+            measurements: A 2D array of raw values, one row per sample, ordered
+                as HvpmMeasurement.values.
+            calibration_data: The calibration data to apply. Its values may
+                either be scalars, or arrays holding a value for each sample.
+
+        Returns:
+            A 2D array of readings, one row per sample, ordered as the
+            HvpmReading reading_list.
+        """
+        readings = np.zeros((len(measurements), 5))
+        calibrated_value = np.zeros((len(measurements), 2))
 
         for channel in Channel.values:
             for granularity in Granularity.values:
@@ -436,10 +665,10 @@ class CalibrationApplier(ParallelTransformer):
                 cal_zero = calibration_data.get(channel, Origin.ZERO,
                                                 granularity)
                 zero_offset += cal_zero
-                if cal_ref - zero_offset != 0:
-                    slope = scale / (cal_ref - zero_offset)
-                else:
-                    slope = 0
+                denominator = np.asarray(cal_ref - zero_offset, dtype=float)
+                slope = np.divide(scale, denominator,
+                                  out=np.zeros(denominator.shape),
+                                  where=denominator != 0)
                 if granularity == Granularity.FINE:
                     slope /= 1000
 
@@ -462,9 +691,35 @@ class CalibrationApplier(ParallelTransformer):
                           * self._main_voltage_scale)
         readings[:, 4] = (measurements[:, usb_voltage_index] * self._adc_ratio
                           * self._usb_voltage_scale)
+        return readings
 
-        for i in range(len(buffer.samples)):
-            buffer.samples[i] = HvpmReading(
-                list(readings[i]), buffer.samples[i].get_sample_time())
 
-        return buffer.samples
+class ColumnarCalibrationApplier(CalibrationApplier):
+    """Applies the calibration formula to sample arrays.
+
+    Designed to come after a ColumnarSampleChunker. Outputs columnar chunks of
+    readings (see sampling.common.READING_DTYPE) instead of HvpmReadings.
+    """
+
+    def _transform_buffer(self, buffer):
+        """Transforms the buffer's sample array into a columnar chunk.
+
+        Args:
+            buffer: An UncalibratedSampleChunk holding a sample array and its
+                HvpmCalibrationColumns.
+
+        Returns:
+            A columnar chunk of readings.
+        """
+        samples = buffer.samples
+        readings = self._calibrate(samples['values'].astype(np.int64),
+                                   buffer.calibration_data)
+
+        columns = create_reading_columns(len(samples))
+        columns.sample_time = samples['sample_time']
+        columns.main_current = readings[:, 0]
+        columns.usb_current = readings[:, 1]
+        columns.aux_current = readings[:, 2]
+        columns.main_voltage = readings[:, 3]
+        columns.usb_voltage = readings[:, 4]
+        return columns
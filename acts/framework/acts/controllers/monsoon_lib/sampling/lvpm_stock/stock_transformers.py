@@ -14,6 +14,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import collections
 import logging
 import struct
 import time
@@ -30,6 +31,8 @@ from acts.controllers.monsoon_lib.sampling.engine.transformer import ParallelTra
 from acts.controllers.monsoon_lib.sampling.engine.transformer import SequentialTransformer
 from acts.controllers.monsoon_lib.sampling.engine.transformer import SourceTransformer
 from acts.controllers.monsoon_lib.sampling.engine.transformer import Transformer
+from acts.controllers.monsoon_lib.sampling.engine.transformers import RawPacketRecorder
+from acts.controllers.monsoon_lib.sampling.engine.transformers import RawPacketReplayer
 from acts.controllers.monsoon_lib.sampling.enums import Channel
 from acts.controllers.monsoon_lib.sampling.enums import Granularity
 from acts.controllers.monsoon_lib.sampling.enums import Origin
@@ -37,20 +40,75 @@ from acts.controllers.monsoon_lib.sampling.lvpm_stock.calibrations import LvpmCa
 from acts.controllers.monsoon_lib.sampling.lvpm_stock.calibrations import LvpmCalibrationSnapshot
 from acts.controllers.monsoon_lib.sampling.lvpm_stock.packet import Packet
 from acts.controllers.monsoon_lib.sampling.lvpm_stock.packet import SampleType
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecording
+
+# The value of the 'monsoon' metadata of LVPM stock raw recordings.
+RAW_RECORDING_MONSOON = 'lvpm_stock'
 
 
 class StockLvpmSampler(Transformer):
     """Gathers samples from the Monsoon and brings them back to the caller."""
 
-    def __init__(self, monsoon_serial, duration):
+    def __init__(self, monsoon_serial, duration, raw_recording_path=None):
+        """Creates a StockLvpmSampler.
+
+        Args:
+            monsoon_serial: The serial number of the Monsoon to sample from.
+            duration: The number of seconds to sample for.
+            raw_recording_path: If set, the raw packets are also written to
+                this path as a raw recording, which can be processed again
+                with a StockLvpmReplayer.
+        """
         super().__init__()
         self.monsoon_serial = monsoon_serial
         self.duration = duration
+        self.raw_recording_path = raw_recording_path
+
+    def _transform(self, input_stream):
+        assembly_line_builder = ProcessAssemblyLineBuilder().source(
+            PacketCollector(self.monsoon_serial, self.duration))
+        if self.raw_recording_path:
+            metadata = {
+                'monsoon': RAW_RECORDING_MONSOON,
+                'serial': self.monsoon_serial,
+            }
+            assembly_line_builder.into(
+                RawPacketRecorder(self.raw_recording_path, metadata))
+        # yapf: disable. Yapf doesn't handle fluent interfaces well.
+        (assembly_line_builder
+         .into(SampleNormalizer())
+         .build(output_stream=self.output_stream)
+         .run())
+        # yapf: enable
+
+
+class StockLvpmReplayer(Transformer):
+    """Replays the raw recording of a StockLvpmSampler as if sampling again.
+
+    The readings are sent to the output stream exactly as a StockLvpmSampler
+    would, so any downsampling, offset or output can be applied to an old
+    capture without a Monsoon attached.
+    """
+
+    def __init__(self, raw_recording_path):
+        """Creates a StockLvpmReplayer.
+
+        Args:
+            raw_recording_path: The path of the raw recording to replay.
+        """
+        super().__init__()
+        self.raw_recording_path = raw_recording_path
 
     def _transform(self, input_stream):
+        metadata = RawRecording(self.raw_recording_path).metadata
+        if metadata.get('monsoon') != RAW_RECORDING_MONSOON:
+            raise ValueError(
+                '%s is not a raw recording of an LVPM stock Monsoon.' %
+                self.raw_recording_path)
+
         # yapf: disable. Yapf doesn't handle fluent interfaces well.
         (ProcessAssemblyLineBuilder()
-         .source(PacketCollector(self.monsoon_serial, self.duration))
+         .source(RawPacketReplayer(self.raw_recording_path))
          .into(SampleNormalizer())
          .build(output_stream=self.output_stream)
          .run())
@@ -58,12 +116,17 @@ class StockLvpmSampler(Transformer):
 
 
 class PacketCollector(SourceTransformer):
-    """Collects Monsoon packets into a buffer to be sent to another process."""
+    """Collects Monsoon packets into a buffer to be sent to another process.
+
+    Packets are read in bulk by the MonsoonProxy's FrameReader. Packets read
+    beyond the end of a buffer are held until the next buffer.
+    """
 
     def __init__(self, serial=None, sampling_duration=None):
         super().__init__()
         self._monsoon_serial = serial
         self._monsoon_proxy = None
+        self._pending_packets = collections.deque()
         self.start_time = 0
         self.sampling_duration = sampling_duration
 
@@ -81,6 +144,13 @@ class PacketCollector(SourceTransformer):
         """Stops data collection."""
         self._monsoon_proxy.stop_data_collection()
         self._monsoon_proxy.ser.close()
+        stats = self._monsoon_proxy.frame_reader.get_stats()
+        logging.info(
+            'Read %d packets from the Monsoon. %d were corrupt, and %d were '
+            'dropped (%d bytes discarded).', stats.frames,
+            stats.corrupt_frames,
+            stats.dropped_frames + len(self._pending_packets),
+            stats.dropped_bytes)
 
     def _transform_buffer(self, buffer):
         """Fills the given buffer with raw monsoon data at each entry."""
@@ -88,54 +158,38 @@ class PacketCollector(SourceTransformer):
                 and self.sampling_duration < time.time() - self.start_time):
             return None
 
-        for index in range(len(buffer)):
-            time_before_read = time.time()
-            data = self._read_packet()
-            if data is None:
-                continue
-            time_after_read = time.time()
-            time_data = struct.pack('dd', time_after_read - self.start_time,
-                                    time_after_read - time_before_read)
-            buffer[index] = time_data + data
+        index = 0
+        while index < len(buffer):
+            if not self._pending_packets and not self._read_packets():
+                logging.warning('Reading from serial timed out.')
+                break
+            buffer[index] = self._pending_packets.popleft()
+            index += 1
 
         return buffer
 
-    def _read_packet(self):
-        """Reads a single packet from the serial port.
+    def _read_packets(self):
+        """Reads all available packets from the serial port.
 
-        Packets are sent as Length-Value-Checksum, where the first byte is the
-        length, the following bytes are the value and checksum. The checksum is
-        the stored in the final byte, and is calculated as the 16 least-
-        significant-bits of the sum of all value bytes.
+        Each packet is prefixed with the time since sampling began and the
+        time the read took, and held until it is placed within a buffer. The
+        time of the read is spread evenly across the packets it returned, as
+        if each were read one at a time.
 
         Returns:
-            None if the read failed. Otherwise, the packet data received.
+            False if the read timed out. True otherwise.
         """
-        len_char = self._monsoon_proxy.ser.read(1)
-        if not len_char:
-            logging.warning('Reading from serial timed out.')
-            return None
-
-        data_len = ord(len_char)
-        if not data_len:
-            logging.warning('Unable to read packet length.')
-            return None
-
-        result = self._monsoon_proxy.ser.read(int(data_len))
-        result = bytearray(result)
-        if len(result) != data_len:
-            logging.warning(
-                'Length mismatch, expected %d bytes, got %d bytes.', data_len,
-                len(result))
-            return None
-        body = result[:-1]
-        checksum = sum(body, data_len) & 0xFF
-        if result[-1] != checksum:
-            logging.warning(
-                'Invalid checksum from serial port! Expected %s, '
-                'got %s', hex(checksum), hex(result[-1]))
-            return None
-        return body
+        time_before_read = time.time()
+        packets = self._monsoon_proxy.frame_reader.read_frames()
+        time_after_read = time.time()
+        if not packets:
+            return False
+        read_time = (time_after_read - time_before_read) / len(packets)
+        start_of_read = time_before_read - self.start_time
+        self._pending_packets.extend(
+            struct.pack('dd', start_of_read + (i + 1) * read_time, read_time) +
+            packet for i, packet in enumerate(packets))
+        return True
 
 
 class SampleNormalizer(Transformer):
@@ -167,6 +221,9 @@ class PacketReader(ParallelTransformer):
                 Packet objects.
         """
         for i, packet in enumerate(buffer):
+            # PacketCollector leaves a None in the buffer when a read fails.
+            if packet is None:
+                continue
             time_bytes_size = struct.calcsize('dd')
             # Unpacks the two time.time() values sent by PacketCollector.
             time_since_start, time_of_read = struct.unpack(
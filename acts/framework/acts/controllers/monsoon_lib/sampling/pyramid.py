@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Builds and reads multi-resolution min/max/mean pyramids of power traces.
+
+A pyramid is a directory holding one capture file per level. Level N holds one
+record per 2**N consecutive samples of the original trace, with the
+sample_time of the first sample and the min, max and mean current of the
+samples within it. Plotting code can read the coarsest level that still has
+enough points for its viewport instead of the full trace.
+
+Each level is built from the buckets of the level before it, so the cost of
+building every level is only a fraction more than building the finest one.
+"""
+
+import glob
+import os
+import re
+
+import numpy as np
+
+from acts.controllers.monsoon_lib.sampling.capture_file import CAPTURE_FILE_EXTENSION
+from acts.controllers.monsoon_lib.sampling.capture_file import CaptureFile
+from acts.controllers.monsoon_lib.sampling.capture_file import CaptureFileWriter
+
+# The suffix appended to a capture file's path to get its pyramid's path.
+PYRAMID_PATH_SUFFIX = '.pyramid'
+
+# The default power-of-two exponents of the levels to build. At 5000hz, these
+# range from 0.8ms to 13 seconds per point.
+DEFAULT_LEVELS = (2, 4, 6, 8, 10, 12, 14, 16)
+
+PYRAMID_COLUMNS = ('min_current', 'max_current', 'mean_current')
+
+_LEVEL_FILE_FORMAT = 'level_%02d' + CAPTURE_FILE_EXTENSION
+_LEVEL_FILE_PATTERN = re.compile(r'level_(\d+)%s$' %
+                                 re.escape(CAPTURE_FILE_EXTENSION))
+
+# The buckets passed between levels. Sums and counts are kept instead of means
+# so partial buckets at the end of a trace are weighted correctly.
+_BUCKET_DTYPE = np.dtype([('sample_time', '<f8'), ('min', '<f8'),
+                          ('max', '<f8'), ('sum', '<f8'), ('count', '<i8')])
+
+
+def get_pyramid_path(capture_path):
+    """Returns the path of the pyramid stored next to the given capture."""
+    return capture_path + PYRAMID_PATH_SUFFIX
+
+
+def _reduce_buckets(buckets, ratio):
+    """Reduces each group of ratio consecutive buckets into a single bucket.
+
+    Returns:
+        A tuple of (reduced buckets, the buckets that did not fill a group).
+    """
+    num_groups = len(buckets) // ratio
+    groups = buckets[:num_groups * ratio]
+    reduced = np.empty(num_groups, dtype=_BUCKET_DTYPE)
+    reduced['sample_time'] = groups['sample_time'][::ratio]
+    reduced['min'] = groups['min'].reshape(num_groups, ratio).min(axis=1)
+    reduced['max'] = groups['max'].reshape(num_groups, ratio).max(axis=1)
+    reduced['sum'] = groups['sum'].reshape(num_groups, ratio).sum(axis=1)
+    reduced['count'] = groups['count'].reshape(num_groups, ratio).sum(axis=1)
+    return reduced, buckets[num_groups * ratio:]
+
+
+class _LevelBuilder(object):
+    """Builds a single level of the pyramid from the buckets of the last one.
+
+    Attributes:
+        ratio: The number of buckets from the previous level in each bucket of
+            this level.
+        writer: The CaptureFileWriter the level is written to.
+        _pending: The buckets of the previous level that have not yet filled a
+            bucket of this level.
+    """
+
+    def __init__(self, ratio, writer):
+        self.ratio = ratio
+        self.writer = writer
+        self._pending = np.empty(0, dtype=_BUCKET_DTYPE)
+
+    def add(self, buckets):
+        """Adds the buckets of the previous level.
+
+        Returns:
+            The completed buckets of this level.
+        """
+        if len(self._pending):
+            buckets = np.concatenate((self._pending, buckets))
+        reduced, self._pending = _reduce_buckets(buckets, self.ratio)
+        self._write(reduced)
+        return reduced
+
+    def flush(self):
+        """Writes the pending buckets as a final partial bucket.
+
+        Returns:
+            The partial bucket, or no buckets if none were pending.
+        """
+        reduced, _ = _reduce_buckets(self._pending, len(self._pending) or 1)
+        self._pending = self._pending[:0]
+        self._write(reduced)
+        return reduced
+
+    def _write(self, buckets):
+        if len(buckets):
+            means = buckets['sum'] / buckets['count']
+            self.writer.write(buckets['sample_time'], buckets['min'],
+                              buckets['max'], means)
+
+
+class PyramidWriter(object):
+    """Writes the pyramid of a power trace as its samples are received.
+
+    Attributes:
+        path: The path of the pyramid directory.
+        hz: The number of samples per second of the trace.
+        voltage: The voltage used during the capture.
+        levels: The sorted power-of-two exponents of the levels to build.
+    """
+
+    def __init__(self, path, hz, voltage, levels=DEFAULT_LEVELS):
+        self.path = path
+        self.hz = hz
+        self.voltage = voltage
+        self.levels = tuple(sorted(levels))
+        if not self.levels or self.levels[0] < 1:
+            raise ValueError('Pyramid levels must be positive exponents.')
+        self._builders = []
+
+    def open(self):
+        """Creates the pyramid directory and opens a file for each level."""
+        os.makedirs(self.path, exist_ok=True)
+        last_level = 0
+        for level in self.levels:
+            writer = CaptureFileWriter(
+                os.path.join(self.path, _LEVEL_FILE_FORMAT % level),
+                self.hz / 2**level, self.voltage, PYRAMID_COLUMNS)
+            writer.open()
+            self._builders.append(
+                _LevelBuilder(2**(level - last_level), writer))
+            last_level = level
+
+    def write(self, sample_times, currents):
+        """Adds the given samples to every level of the pyramid.
+
+        Args:
+            sample_times: An array of sample times.
+            currents: An array of the current of each sample.
+        """
+        buckets = np.empty(len(sample_times), dtype=_BUCKET_DTYPE)
+        buckets['sample_time'] = sample_times
+        buckets['min'] = currents
+        buckets['max'] = currents
+        buckets['sum'] = currents
+        buckets['count'] = 1
+        for builder in self._builders:
+            buckets = builder.add(buckets)
+
+    def flush(self):
+        for builder in self._builders:
+            builder.writer.flush()
+
+    def close(self):
+        """Writes the remaining partial buckets and closes every level."""
+        buckets = np.empty(0, dtype=_BUCKET_DTYPE)
+        for builder in self._builders:
+            buckets = np.concatenate((builder.add(buckets), builder.flush()))
+            builder.writer.close()
+        self._builders = []
+
+
+class Pyramid(object):
+    """A read-only view of the levels of a pyramid.
+
+    Attributes:
+        path: The path of the pyramid directory.
+        levels: A dict of the power-of-two exponent of each level to the
+            memory-mapped CaptureFile holding it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.levels = {}
+        for level_path in glob.glob(os.path.join(path, '*')):
+            match = _LEVEL_FILE_PATTERN.search(os.path.basename(level_path))
+            if match:
+                self.levels[int(match.group(1))] = CaptureFile(level_path)
+        if not self.levels:
+            raise ValueError('%s does not contain any pyramid levels.' % path)
+
+    def get_level(self, level):
+        """Returns the CaptureFile of the given level."""
+        return self.levels[level]
+
+    def select_level(self, start_time=None, end_time=None, max_points=2000):
+        """Returns the finest level with at most max_points within the range.
+
+        If no level is coarse enough, the coarsest level is returned.
+
+        Args:
+            start_time: The first sample time of the range. If None, starts
+                from the beginning of the trace.
+            end_time: The sample time to stop before. If None, ends at the end
+                of the trace.
+            max_points: The maximum number of points to return.
+        """
+        for level in sorted(self.levels):
+            records = self.levels[level].get_time_range(start_time, end_time)
+            if len(records) <= max_points:
+                return level
+        return max(self.levels)
+
+    def get_time_range(self, start_time=None, end_time=None, max_points=2000):
+        """Returns the records of the level that best fits the time range.
+
+        Args:
+            start_time: The first sample time of the range. If None, starts
+                from the beginning of the trace.
+            end_time: The sample time to stop before. If None, ends at the end
+                of the trace.
+            max_points: The maximum number of points to return, if possible.
+
+        Returns:
+            A tuple of (level, records), where records is a memory-mapped
+            structured array with the sample_time, min_current, max_current
+            and mean_current of each point.
+        """
+        level = self.select_level(start_time, end_time, max_points)
+        return level, self.levels[level].get_time_range(start_time, end_time)
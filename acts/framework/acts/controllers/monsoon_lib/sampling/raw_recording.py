@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Reads and writes raw Monsoon packet recordings.
+
+A raw recording holds the exact raw packets sent by a PacketCollector, before
+any decoding or calibration, so that a capture can be processed again offline.
+Each raw packet starts with the two float64 timing values added by the
+PacketCollector, followed by the bytes read from the Monsoon.
+
+Header layout:
+
+Offset │ Format   │ Field         │ Description
+───────┼──────────┼───────────────┼────────────────────────────────────────
+   0   │ char[8]  │ magic         │ RAW_RECORDING_MAGIC
+   8   │ uint16   │ version       │ The version of the raw recording format
+  10   │ byte[2]  │ padding       │
+  12   │ uint32   │ metadata_size │ The size of the metadata in bytes
+  16   │ char[]   │ metadata      │ A UTF-8 JSON object describing the
+       │          │               │ Monsoon, e.g. its calibration constants
+
+The header is followed by one record per raw packet:
+
+Offset │ Format   │ Field         │ Description
+───────┼──────────┼───────────────┼────────────────────────────────────────
+   0   │ uint16   │ size          │ The size of the raw packet in bytes
+   2   │ byte[]   │ raw_packet    │ The raw packet
+
+All values are stored in little-endian format.
+"""
+
+import json
+import mmap
+import struct
+
+# The file extension used for raw recordings.
+RAW_RECORDING_EXTENSION = '.monsoon_raw'
+
+RAW_RECORDING_MAGIC = b'MONSRAW\x00'
+RAW_RECORDING_VERSION = 1
+
+_HEADER_FORMAT = '<8sH2xI'
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+_RECORD_SIZE_FORMAT = '<H'
+_RECORD_SIZE_SIZE = struct.calcsize(_RECORD_SIZE_FORMAT)
+
+
+def is_raw_recording(path):
+    """Returns True iff the file at the given path is a raw recording."""
+    with open(path, 'rb') as f:
+        return f.read(len(RAW_RECORDING_MAGIC)) == RAW_RECORDING_MAGIC
+
+
+class RawRecordingWriter(object):
+    """Writes raw packets to a raw recording.
+
+    Attributes:
+        path: The path of the raw recording.
+        metadata: A JSON-serializable dict describing the Monsoon.
+    """
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.metadata = metadata or {}
+        self._fd = None
+
+    def open(self):
+        """Opens the raw recording and writes its header."""
+        self._fd = open(self.path, 'wb')
+        metadata = json.dumps(self.metadata).encode('utf-8')
+        self._fd.write(
+            struct.pack(_HEADER_FORMAT, RAW_RECORDING_MAGIC,
+                        RAW_RECORDING_VERSION, len(metadata)))
+        self._fd.write(metadata)
+
+    def write(self, raw_packets):
+        """Appends the given raw packets to the raw recording.
+
+        Args:
+            raw_packets: An iterable of raw packets. None values, left by
+                PacketCollectors when a read fails, are skipped.
+        """
+        self._fd.write(b''.join(
+            struct.pack(_RECORD_SIZE_FORMAT, len(raw_packet)) + raw_packet
+            for raw_packet in raw_packets if raw_packet is not None))
+
+    def flush(self):
+        self._fd.flush()
+
+    def close(self):
+        self._fd.close()
+
+
+class RawRecording(object):
+    """A read-only raw recording.
+
+    Attributes:
+        path: The path of the raw recording.
+        metadata: The dict describing the Monsoon the packets came from.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER_SIZE)
+            if len(header) < _HEADER_SIZE:
+                raise ValueError('%s is not a raw recording.' % path)
+            magic, version, metadata_size = struct.unpack(
+                _HEADER_FORMAT, header)
+            if magic != RAW_RECORDING_MAGIC:
+                raise ValueError('%s is not a raw recording.' % path)
+            if version != RAW_RECORDING_VERSION:
+                raise ValueError('%s has unsupported raw recording version %s.'
+                                 % (path, version))
+            self.metadata = json.loads(f.read(metadata_size).decode('utf-8'))
+        self._data_offset = _HEADER_SIZE + metadata_size
+
+    def read_raw_packets(self):
+        """Yields the raw packets of the recording, in the order received.
+
+        A partially written record (e.g. from an interrupted capture) is
+        ignored.
+        """
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                size = len(data)
+                position = self._data_offset
+                while position + _RECORD_SIZE_SIZE <= size:
+                    packet_size, = struct.unpack_from(_RECORD_SIZE_FORMAT,
+                                                      data, position)
+                    position += _RECORD_SIZE_SIZE
+                    if position + packet_size > size:
+                        return
+                    yield data[position:position + packet_size]
+                    position += packet_size
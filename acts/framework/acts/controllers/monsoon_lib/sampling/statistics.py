@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Streaming statistics over chunks of Monsoon current samples.
+
+Every class here is updated one chunk of samples at a time with NumPy, and
+holds memory independent of the number of samples seen (WindowedMeans grows
+with the capture duration, not with the sample count).
+"""
+
+import math
+
+import numpy as np
+
+
+class RunningMoments(object):
+    """Tracks the count, min, max, mean and variance of a stream of values.
+
+    Chunks are merged with the parallel variance algorithm by Chan et al.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, values):
+        """Adds an array of values to the running moments."""
+        count = len(values)
+        if not count:
+            return
+        mean = float(np.mean(values))
+        m2 = float(np.sum(np.square(values - mean)))
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+
+    @property
+    def variance(self):
+        """The population variance of the values seen."""
+        if not self.count:
+            return 0.0
+        return self._m2 / self.count
+
+    @property
+    def stdev(self):
+        """The population standard deviation of the values seen."""
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch(object):
+    """Approximates quantiles with a bounded relative error.
+
+    Values are counted within logarithmically sized buckets (see the DDSketch
+    paper, Masson et al. 2019). Any quantile returned is within
+    relative_accuracy of the true value, as long as the true value's magnitude
+    lies within [min_value, max_value]. Smaller magnitudes are treated as 0,
+    and larger magnitudes are clamped to max_value.
+    """
+
+    def __init__(self, relative_accuracy=.01, min_value=1e-9, max_value=1e3):
+        """Creates a QuantileSketch.
+
+        Args:
+            relative_accuracy: The maximum relative error of the quantiles.
+            min_value: The smallest magnitude distinguishable from 0.
+            max_value: The largest magnitude that is not clamped.
+        """
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._min_value = min_value
+        self._offset = math.floor(math.log(min_value) / self._log_gamma)
+        num_buckets = (math.ceil(math.log(max_value) / self._log_gamma) -
+                       self._offset + 1)
+        self._positive_counts = np.zeros(num_buckets, dtype=np.int64)
+        self._negative_counts = np.zeros(num_buckets, dtype=np.int64)
+        self._zero_count = 0
+
+    @property
+    def count(self):
+        """The number of values added to the sketch."""
+        return (int(self._positive_counts.sum()) +
+                int(self._negative_counts.sum()) + self._zero_count)
+
+    def _get_bucket_indices(self, magnitudes):
+        indices = (np.ceil(np.log(magnitudes) / self._log_gamma) -
+                   self._offset).astype(np.int64)
+        return np.clip(indices, 0, len(self._positive_counts) - 1)
+
+    def _get_bucket_value(self, index):
+        """Returns the value that best represents the given bucket."""
+        return (2 * self._gamma**(index + self._offset) / (self._gamma + 1))
+
+    def add(self, values):
+        """Adds an array of values to the sketch."""
+        values = np.asarray(values, dtype=float)
+        magnitudes = np.abs(values)
+        is_zero = magnitudes < self._min_value
+        self._zero_count += int(np.count_nonzero(is_zero))
+        for counts, selection in ((self._positive_counts, values > 0),
+                                  (self._negative_counts, values < 0)):
+            selection &= ~is_zero
+            counts += np.bincount(
+                self._get_bucket_indices(magnitudes[selection]),
+                minlength=len(counts))
+
+    def get_quantile(self, quantile):
+        """Returns the approximate value at the given quantile.
+
+        Args:
+            quantile: A value within [0, 1].
+
+        Returns:
+            The approximate value, or None if no values have been added.
+        """
+        if not 0 <= quantile <= 1:
+            raise ValueError('Quantile %s is not within [0, 1].' % quantile)
+        count = self.count
+        if not count:
+            return None
+        rank = quantile * (count - 1)
+
+        # Walk the buckets in increasing order of value: negative values with
+        # the largest magnitude first, then zeros, then positive values.
+        negative_cumsum = np.cumsum(self._negative_counts[::-1])
+        if rank < negative_cumsum[-1]:
+            index = np.searchsorted(negative_cumsum, rank, 'right')
+            return -self._get_bucket_value(len(negative_cumsum) - 1 - index)
+        rank -= negative_cumsum[-1]
+        if rank < self._zero_count:
+            return 0.0
+        rank -= self._zero_count
+        positive_cumsum = np.cumsum(self._positive_counts)
+        index = np.searchsorted(positive_cumsum, rank, 'right')
+        return self._get_bucket_value(min(index, len(positive_cumsum) - 1))
+
+
+class FixedBinHistogram(object):
+    """A histogram of values within evenly sized, fixed bins.
+
+    Attributes:
+        bin_edges: The edges of the bins, as returned by np.histogram.
+        counts: The number of values within each bin.
+        underflow_count: The number of values below the first bin edge.
+        overflow_count: The number of values above the last bin edge.
+    """
+
+    def __init__(self, min_value, max_value, num_bins):
+        self.bin_edges = np.linspace(min_value, max_value, num_bins + 1)
+        self.counts = np.zeros(num_bins, dtype=np.int64)
+        self.underflow_count = 0
+        self.overflow_count = 0
+
+    def add(self, values):
+        """Adds an array of values to the histogram."""
+        counts, _ = np.histogram(values, bins=self.bin_edges)
+        self.counts += counts
+        self.underflow_count += int(np.count_nonzero(
+            values < self.bin_edges[0]))
+        self.overflow_count += int(np.count_nonzero(
+            values > self.bin_edges[-1]))
+
+
+class WindowedMeans(object):
+    """Tracks the mean of values within consecutive fixed-length time windows.
+
+    Attributes:
+        window_seconds: The length of each window.
+    """
+
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self._sums = np.zeros(0)
+        self._counts = np.zeros(0, dtype=np.int64)
+
+    def add(self, sample_times, values):
+        """Adds values to the windows their sample times fall within.
+
+        Args:
+            sample_times: An array of non-negative sample times, in seconds.
+            values: An array of values, one for each sample time.
+        """
+        if not len(values):
+            return
+        windows = (np.asarray(sample_times) // self.window_seconds).astype(
+            np.int64)
+        num_windows = max(len(self._counts), int(windows.max()) + 1)
+        if num_windows > len(self._counts):
+            self._sums.resize(num_windows, refcheck=False)
+            self._counts.resize(num_windows, refcheck=False)
+        self._sums += np.bincount(windows, weights=values,
+                                  minlength=num_windows)
+        self._counts += np.bincount(windows, minlength=num_windows)
+
+    @property
+    def means(self):
+        """The mean of each window. Windows without values are NaN."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._sums / self._counts
+
+    @property
+    def counts(self):
+        """The number of values within each window."""
+        return self._counts.copy()
+
+
+class CurrentStatistics(object):
+    """Streaming statistics of the current samples gathered during a capture.
+
+    All values are in Amperes, and all sample times are in seconds.
+
+    Attributes:
+        moments: The RunningMoments of the currents.
+        sketch: The QuantileSketch of the currents.
+        histogram: The FixedBinHistogram of the currents.
+        windows: The WindowedMeans of the currents.
+    """
+
+    def __init__(self,
+                 window_seconds=1,
+                 histogram_range=(0, 5),
+                 histogram_bins=5000,
+                 relative_accuracy=.01):
+        """Creates a CurrentStatistics.
+
+        Args:
+            window_seconds: The length of each window for the window means.
+            histogram_range: The (min, max) currents covered by the histogram.
+            histogram_bins: The number of bins within the histogram. The
+                default gives 1mA bins.
+            relative_accuracy: The relative accuracy of the quantiles.
+        """
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.histogram = FixedBinHistogram(histogram_range[0],
+                                           histogram_range[1], histogram_bins)
+        self.windows = WindowedMeans(window_seconds)
+
+    def add(self, sample_times, currents):
+        """Adds a chunk of samples to the statistics.
+
+        Args:
+            sample_times: An array of sample times.
+            currents: An array of currents, one for each sample time.
+        """
+        currents = np.asarray(currents, dtype=float)
+        self.moments.add(currents)
+        self.sketch.add(currents)
+        self.histogram.add(currents)
+        self.windows.add(sample_times, currents)
+
+    @property
+    def num_samples(self):
+        return self.moments.count
+
+    @property
+    def min_current(self):
+        return self.moments.min
+
+    @property
+    def max_current(self):
+        return self.moments.max
+
+    @property
+    def mean_current(self):
+        return self.moments.mean
+
+    @property
+    def stdev_current(self):
+        return self.moments.stdev
+
+    def get_percentile(self, percentile):
+        """Returns the approximate current at the given percentile [0, 100]."""
+        return self.sketch.get_quantile(percentile / 100)
+
+    def get_window_means(self):
+        """Returns the mean current of each window_seconds long window."""
+        return self.windows.means
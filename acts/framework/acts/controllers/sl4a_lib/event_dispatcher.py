@@ -49,11 +49,23 @@ class EventDispatcher:
         _event_dict: A dictionary of str eventName = Queue<Event> eventQueue
         _handlers: A dictionary of str eventName => (lambda, args) handler
         _lock: A lock that prevents multiple reads/writes to the event queues.
+        _compiled_patterns: A dictionary of str regex => the compiled regex,
+                            for each pattern waited on by pop_events.
+        _pattern_names: A dictionary of str regex => the set of event names
+                        in _event_dict that match the regex.
+        _pattern_conditions: A dictionary of str regex => the Condition
+                             notified when an event matching the regex is
+                             queued.
+        _listeners: A dictionary of str eventName => list of listeners called
+                    with each event of that name.
         log: The EventDispatcher's logger.
     """
 
     DEFAULT_TIMEOUT = 60
 
+    # The maximum number of pending events fetched by a single eventPoll RPC.
+    MAX_EVENTS_PER_POLL = 100
+
     def __init__(self, serial, rpc_client):
         self._serial = serial
         self._rpc_client = rpc_client
@@ -62,6 +74,10 @@ class EventDispatcher:
         self._event_dict = {}
         self._handlers = {}
         self._lock = threading.RLock()
+        self._compiled_patterns = {}
+        self._pattern_names = {}
+        self._pattern_conditions = {}
+        self._listeners = {}
 
         def _log_formatter(message):
             """Defines the formatting used in the logger."""
@@ -77,11 +93,26 @@ class EventDispatcher:
         If there are registered handlers, the handlers will be called with
         corresponding event immediately upon event discovery, and the event
         won't be stored. If exceptions occur, stop the dispatcher and return
+
+        Once an event arrives, all other pending events are drained with
+        eventPoll, so a burst of events only costs a couple of RPCs.
         """
         while self._started:
             try:
                 # 60000 in ms, timeout in second
                 event_obj = self._rpc_client.eventWait(60000, timeout=120)
+                if not event_obj:
+                    continue
+                if not self._dispatch_event(event_obj):
+                    return
+                while True:
+                    events = self._rpc_client.eventPoll(
+                        self.MAX_EVENTS_PER_POLL)
+                    for event_obj in events:
+                        if not self._dispatch_event(event_obj):
+                            return
+                    if len(events) < self.MAX_EVENTS_PER_POLL:
+                        break
             except rpc_client.Sl4aConnectionError as e:
                 if self._rpc_client.is_alive:
                     self.log.warning('Closing due to closed session.')
@@ -90,34 +121,75 @@ class EventDispatcher:
                     self.log.warning('Closing due to error: %s.' % e)
                     self.close()
                     raise e
-            if not event_obj:
-                continue
-            elif 'name' not in event_obj:
-                self.log.error('Received Malformed event {}'.format(event_obj))
-                continue
-            else:
-                event_name = event_obj['name']
-            # if handler registered, process event
-            if event_name == 'EventDispatcherShutdown':
-                self.log.debug('Received shutdown signal.')
-                # closeSl4aSession has been called, which closes the event
-                # dispatcher. Stop execution on this polling thread.
-                return
-            if event_name in self._handlers:
-                self.log.debug(
-                    'Using handler %s for event: %r' %
-                    (self._handlers[event_name].__name__, event_obj))
-                self.handle_subscribed_event(event_obj, event_name)
-            else:
-                self.log.debug('Queuing event: %r' % event_obj)
-                self._lock.acquire()
-                if event_name in self._event_dict:  # otherwise, cache event
-                    self._event_dict[event_name].put(event_obj)
-                else:
-                    q = queue.Queue()
-                    q.put(event_obj)
-                    self._event_dict[event_name] = q
-                self._lock.release()
+
+    def _dispatch_event(self, event_obj):
+        """Passes an event to its handler, or queues it if it has none.
+
+        Returns:
+            False if the event signals the dispatcher to shut down, True
+            otherwise.
+        """
+        if 'name' not in event_obj:
+            self.log.error('Received Malformed event {}'.format(event_obj))
+            return True
+        event_name = event_obj['name']
+        # if handler registered, process event
+        if event_name == 'EventDispatcherShutdown':
+            self.log.debug('Received shutdown signal.')
+            # closeSl4aSession has been called, which closes the event
+            # dispatcher. Stop execution on this polling thread.
+            return False
+        if event_name in self._handlers:
+            self.log.debug('Using handler %s for event: %r' %
+                           (self._handlers[event_name].__name__, event_obj))
+            self.handle_subscribed_event(event_obj, event_name)
+        else:
+            self.log.debug('Queuing event: %r' % event_obj)
+            with self._lock:
+                self.get_event_q(event_name).put(event_obj)
+                for pattern, condition in self._pattern_conditions.items():
+                    if event_name in self._pattern_names[pattern]:
+                        condition.notify_all()
+        self._notify_listeners(event_obj, event_name)
+        return True
+
+    def _notify_listeners(self, event_obj, event_name):
+        """Calls the listeners of an event."""
+        with self._lock:
+            listeners = list(self._listeners.get(event_name, ()))
+        for listener in listeners:
+            try:
+                listener(event_obj)
+            except Exception as e:
+                self.log.warning('Listener %s failed on event %r: %s' %
+                                 (listener, event_obj, e))
+
+    def add_listener(self, event_name, listener):
+        """Adds a listener to be called with each event of a name.
+
+        Unlike handlers, listeners can be added while the dispatcher is
+        running, and do not consume events: each event is still queued or
+        handled as usual. Listeners are called on the polling thread, so they
+        must return quickly.
+
+        Args:
+            event_name: Name of the event to listen to.
+            listener: A function that takes the event json object.
+        """
+        with self._lock:
+            self._listeners.setdefault(event_name, []).append(listener)
+
+    def remove_listener(self, event_name, listener):
+        """Removes a listener added by add_listener.
+
+        Args:
+            event_name: Name of the event the listener was added for.
+            listener: The listener to remove.
+        """
+        with self._lock:
+            listeners = self._listeners.get(event_name, [])
+            if listener in listeners:
+                listeners.remove(listener)
 
     def register_handler(self, handler, event_name, args):
         """Registers an event handler.
@@ -254,7 +326,8 @@ class EventDispatcher:
         while True:
             event = None
             try:
-                event = self.pop_event(event_name, 1)
+                event = self.pop_event(event_name,
+                                       max(deadline - time.time(), 0))
                 if consume_events:
                     self.log.debug('Consuming event: %r' % event)
                 else:
@@ -291,6 +364,8 @@ class EventDispatcher:
                 should match in order to be popped.
             timeout: Number of seconds to wait for events in case no event
                 matching the condition exits when the function is called.
+            freq: Unused. Waiters are woken as soon as a matching event is
+                queued.
 
         Returns:
             results: Pop events whose names match a regex pattern.
@@ -305,12 +380,18 @@ class EventDispatcher:
             raise IllegalStateError(
                 "Dispatcher needs to be started before popping.")
         deadline = time.time() + timeout
-        while True:
-            # TODO: fix the sleep loop
-            results = self._match_and_pop(regex_pattern)
-            if len(results) != 0 or time.time() > deadline:
-                break
-            time.sleep(freq)
+        with self._lock:
+            condition = self._pattern_conditions.get(regex_pattern)
+            if condition is None:
+                self._get_matching_names(regex_pattern)
+                condition = threading.Condition(self._lock)
+                self._pattern_conditions[regex_pattern] = condition
+            while True:
+                results = self._match_and_pop(regex_pattern)
+                remaining = deadline - time.time()
+                if len(results) != 0 or remaining <= 0:
+                    break
+                condition.wait(remaining)
         if len(results) == 0:
             raise queue.Empty('Timeout after {}s waiting for event: {}'.format(
                 timeout, regex_pattern))
@@ -322,18 +403,32 @@ class EventDispatcher:
         match (in a sense of regular expression) regex_pattern.
         """
         results = []
-        self._lock.acquire()
-        for name in self._event_dict.keys():
-            if re.match(regex_pattern, name):
-                q = self._event_dict[name]
-                if q:
-                    try:
-                        results.append(q.get(False))
-                    except queue.Empty:
-                        pass
-        self._lock.release()
+        with self._lock:
+            for name in self._get_matching_names(regex_pattern):
+                try:
+                    results.append(self._event_dict[name].get(False))
+                except queue.Empty:
+                    pass
         return results
 
+    def _get_matching_names(self, regex_pattern):
+        """Returns the set of queued event names matching regex_pattern.
+
+        The regex is compiled and matched against each event name only once.
+        The set is kept up to date as new event names are queued.
+        """
+        with self._lock:
+            names = self._pattern_names.get(regex_pattern)
+            if names is None:
+                pattern = re.compile(regex_pattern)
+                names = {
+                    name
+                    for name in self._event_dict if pattern.match(name)
+                }
+                self._compiled_patterns[regex_pattern] = pattern
+                self._pattern_names[regex_pattern] = names
+            return names
+
     def get_event_q(self, event_name):
         """Obtain the queue storing events of the specified name.
 
@@ -345,6 +440,9 @@ class EventDispatcher:
         if (event_name not in self._event_dict
                 or self._event_dict[event_name] is None):
             self._event_dict[event_name] = queue.Queue()
+            for regex_pattern, pattern in self._compiled_patterns.items():
+                if pattern.match(event_name):
+                    self._pattern_names[regex_pattern].add(event_name)
         self._lock.release()
 
         event_queue = self._event_dict[event_name]
@@ -457,4 +555,6 @@ class EventDispatcher:
         """Clear all event queues and their cached events."""
         self._lock.acquire()
         self._event_dict.clear()
+        for names in self._pattern_names.values():
+            names.clear()
         self._lock.release()
@@ -13,10 +13,10 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
+import collections
 import json
 import socket
 import threading
-import time
 from concurrent import futures
 
 from acts import error
@@ -93,10 +93,20 @@ class RpcClient(object):
     Attributes:
         _free_connections: A list of all idle RpcConnections.
         _working_connections: A list of all working RpcConnections.
+        _request_counts: A Counter of the number of RPCs in flight on each
+            working RpcConnection.
+        _connection_timeouts: The timeout set on each working RpcConnection
+            by the RPCs in flight on it, or None for the default timeout.
         _lock: A lock used for accessing critical memory.
+        _connection_available: A condition notified whenever a working
+            connection is released or removed.
         max_connections: The maximum number of RpcConnections at a time.
             Increasing or decreasing the number of max connections does NOT
             modify the thread pool size being used for self.future RPC calls.
+        max_pipelined_requests: The maximum number of RPCs that may be in
+            flight on a single connection. When greater than 1, RPCs made while
+            all max_connections connections are working are pipelined onto the
+            least busy connection instead of waiting for one to be released.
         _log: The logger for this RpcClient.
     """
     """The default value for the maximum amount of connections for a client."""
@@ -134,7 +144,8 @@ class RpcClient(object):
                  serial,
                  on_error_callback,
                  _create_connection_func,
-                 max_connections=None):
+                 max_connections=None,
+                 max_pipelined_requests=1):
         """Creates a new RpcClient object.
 
         Args:
@@ -145,6 +156,8 @@ class RpcClient(object):
                 new session.
             max_connections: The maximum number of connections the RpcClient
                 can have.
+            max_pipelined_requests: The maximum number of RPCs that may be in
+                flight on a single connection.
         """
         self._serial = serial
         self.on_error = on_error_callback
@@ -153,6 +166,9 @@ class RpcClient(object):
 
         self.uid = self._free_connections[0].uid
         self._lock = threading.Lock()
+        self._connection_available = threading.Condition(self._lock)
+        self._request_counts = collections.Counter()
+        self._connection_timeouts = {}
 
         def _log_formatter(message):
             """Formats the message to be logged."""
@@ -165,6 +181,7 @@ class RpcClient(object):
             self.max_connections = RpcClient.DEFAULT_MAX_CONNECTION
         else:
             self.max_connections = max_connections
+        self.max_pipelined_requests = max_pipelined_requests
 
         self._async_client = RpcClient.AsyncClient(self)
         self.is_alive = True
@@ -183,50 +200,107 @@ class RpcClient(object):
             connection.close()
         self._free_connections = []
         self._working_connections = []
+        self._request_counts.clear()
+        self._connection_timeouts.clear()
         self.is_alive = False
 
-    def _get_free_connection(self):
+    def _get_free_connection(self, timeout=None):
         """Returns a free connection to be used for an RPC call.
 
         This function also adds the client to the working set to prevent
-        multiple users from obtaining the same client.
+        multiple users from obtaining the same client. If every connection is
+        working, an RPC is pipelined onto the least busy working connection
+        with the same timeout when pipelining is enabled. Otherwise, this
+        function waits until a connection is released.
+
+        Args:
+            timeout: The socket timeout the RPC needs, or None for the
+                default timeout. Set on the connection until it is freed.
         """
-        while True:
-            if len(self._free_connections) > 0:
-                with self._lock:
-                    # Check if another thread grabbed the remaining connection.
-                    # while we were waiting for the lock.
-                    if len(self._free_connections) == 0:
-                        continue
+        with self._lock:
+            while True:
+                if len(self._free_connections) > 0:
                     client = self._free_connections.pop()
                     self._working_connections.append(client)
-                    return client
-
-            client_count = (len(self._free_connections) +
-                            len(self._working_connections))
-            if client_count < self.max_connections:
-                with self._lock:
-                    client_count = (len(self._free_connections) +
-                                    len(self._working_connections))
-                    if client_count < self.max_connections:
-                        client = self._create_connection_func(self.uid)
-                        self._working_connections.append(client)
-                        return client
-            time.sleep(.01)
+                    break
+
+                client_count = (len(self._free_connections) +
+                                len(self._working_connections))
+                if client_count < self.max_connections:
+                    client = self._create_connection_func(self.uid)
+                    self._working_connections.append(client)
+                    break
+
+                client = self._get_pipelinable_connection(timeout)
+                if client is not None:
+                    break
+                self._connection_available.wait()
+            if not self._request_counts[client]:
+                self._connection_timeouts[client] = timeout
+                if timeout:
+                    client.set_timeout(timeout)
+            self._request_counts[client] += 1
+            return client
+
+    def _get_pipelinable_connection(self, timeout=None):
+        """Returns the least busy working connection that can take another RPC.
+
+        Only connections whose in-flight RPCs use the same timeout are
+        considered, as the timeout is set on the connection's socket.
+
+        Returns None if pipelining is disabled or every connection is full.
+        Must be called while holding self._lock.
+        """
+        if self.max_pipelined_requests <= 1:
+            return None
+        connections = [
+            connection for connection in self._working_connections
+            if self._request_counts[connection] < self.max_pipelined_requests
+            and self._connection_timeouts.get(connection) == timeout
+        ]
+        if not connections:
+            return None
+        return min(connections, key=lambda c: self._request_counts[c])
 
     def _release_working_connection(self, connection):
         """Marks a working client as free.
 
+        If other RPCs are still pipelined on the client, it stays working.
+        Otherwise, its socket timeout is restored to the default. Clients
+        already removed, e.g. after another pipelined RPC timed out, are
+        ignored.
+
         Args:
             connection: The client to mark as free.
-        Raises:
-            A ValueError if the client is not a known working connection.
         """
         # We need to keep this code atomic because the client count is based on
         # the length of the free and working connection list lengths.
         with self._lock:
-            self._working_connections.remove(connection)
-            self._free_connections.append(connection)
+            if connection not in self._working_connections:
+                return
+            self._request_counts[connection] -= 1
+            if self._request_counts[connection] <= 0:
+                del self._request_counts[connection]
+                if self._connection_timeouts.pop(connection, None):
+                    connection.set_timeout(SOCKET_TIMEOUT)
+                self._working_connections.remove(connection)
+                self._free_connections.append(connection)
+            self._connection_available.notify()
+
+    def _remove_working_connection(self, connection):
+        """Removes a working client that can no longer be used."""
+        with self._lock:
+            if connection in self._working_connections:
+                self._working_connections.remove(connection)
+            self._request_counts.pop(connection, None)
+            self._connection_timeouts.pop(connection, None)
+            self._connection_available.notify()
+
+    def _get_response(self, connection, ticket):
+        """Returns the response to the request with the given ticket."""
+        if self.max_pipelined_requests > 1:
+            return connection.get_response_for(ticket)
+        return connection.get_response()
 
     def rpc(self, method, *args, timeout=None, retries=3):
         """Sends an rpc to sl4a.
@@ -246,11 +320,9 @@ class RpcClient(object):
             Sl4aProtocolError: Something went wrong with the sl4a protocol.
             Sl4aApiError: The rpc went through, however executed with errors.
         """
-        connection = self._get_free_connection()
+        connection = self._get_free_connection(timeout)
         ticket = connection.get_new_ticket()
         timed_out = False
-        if timeout:
-            connection.set_timeout(timeout)
         data = {'id': ticket, 'method': method, 'params': args}
         request = json.dumps(data)
         response = ''
@@ -258,7 +330,7 @@ class RpcClient(object):
             for i in range(1, retries + 1):
                 connection.send_request(request)
 
-                response = connection.get_response()
+                response = self._get_response(connection, ticket)
                 if not response:
                     if i < retries:
                         self._log.warning(
@@ -290,17 +362,101 @@ class RpcClient(object):
             timed_out = True
             self._log.warning('RPC "%s" (id: %s) timed out after %s seconds.',
                               method, ticket, timeout or SOCKET_TIMEOUT)
-            self._log.debug(
-                'Closing timed out connection over %s' % connection.ports)
-            connection.close()
-            self._working_connections.remove(connection)
+            self._close_timed_out_connection(connection)
             # Re-raise the error as an SL4A Error so end users can process it.
             raise Sl4aRpcTimeoutError(err)
         finally:
             if not timed_out:
-                if timeout:
-                    connection.set_timeout(SOCKET_TIMEOUT)
                 self._release_working_connection(connection)
+        return self._get_result(method, ticket, response)
+
+    def batch(self, calls, timeout=None):
+        """Sends several rpcs to sl4a at once, and returns their results.
+
+        All requests are written to a single connection before any response is
+        read, so the batch only pays for one round trip to the device.
+        Responses are matched to their requests by id.
+
+        >>> scan_results, connection_info = droid.batch([
+        ...     'wifiGetScanResults', ('wifiGetConnectionInfo', )])
+
+        Args:
+            calls: A list of RPCs to send. Each RPC is either a method name, or
+                a tuple of a method name followed by its args.
+            timeout: The amount of time to wait for each response.
+
+        Returns:
+            A list of the results of each rpc, in the order given.
+
+        Raises:
+            Sl4aProtocolError: Something went wrong with the sl4a protocol.
+            Sl4aApiError: An rpc went through, however executed with errors.
+                Raised for the first failing rpc, after every response has
+                been received.
+        """
+        if not calls:
+            return []
+        connection = self._get_free_connection(timeout)
+        rpcs = []
+        for call in calls:
+            if isinstance(call, str):
+                call = (call, )
+            rpcs.append((call[0], connection.get_new_ticket(), call[1:]))
+        timed_out = False
+        responses = []
+        try:
+            connection.send_requests([
+                json.dumps({'id': ticket, 'method': method, 'params': args})
+                for method, ticket, args in rpcs
+            ])
+            for method, ticket, _ in rpcs:
+                response = connection.get_response_for(ticket)
+                if not response:
+                    self._log.error('No response for RPC method %s in batch.',
+                                    method)
+                    self.on_error(connection)
+                    raise Sl4aProtocolError(
+                        Sl4aProtocolError.NO_RESPONSE_FROM_SERVER)
+                responses.append(response)
+        except BrokenPipeError as e:
+            if self.is_alive:
+                self._log.exception(
+                    'The device disconnected during a batch of %s RPC calls. '
+                    'Please check the logcat for a crash or disconnect.',
+                    len(rpcs))
+                self.on_error(connection)
+            raise Sl4aConnectionError(e)
+        except socket.timeout as err:
+            timed_out = True
+            self._log.warning('A batch of %s RPCs timed out after %s seconds.',
+                              len(rpcs), timeout or SOCKET_TIMEOUT)
+            self._close_timed_out_connection(connection)
+            raise Sl4aRpcTimeoutError(err)
+        finally:
+            if not timed_out:
+                self._release_working_connection(connection)
+        return [
+            self._get_result(method, ticket, response)
+            for (method, ticket, _), response in zip(rpcs, responses)
+        ]
+
+    def _close_timed_out_connection(self, connection):
+        """Closes a timed out connection and removes it from the pool.
+
+        If a socket connection has timed out, the socket can no longer be used.
+        """
+        self._log.debug(
+            'Closing timed out connection over %s' % connection.ports)
+        connection.close()
+        self._remove_working_connection(connection)
+
+    def _get_result(self, method, ticket, response):
+        """Returns the result of an rpc from its response.
+
+        Raises:
+            Sl4aProtocolError: The response is for a different rpc.
+            Sl4aApiError: The rpc went through, however executed with errors.
+        """
         result = json.loads(str(response, encoding='utf8'))
 
         if result['error']:
@@ -42,6 +42,14 @@ class RpcConnection(object):
         _socket_file: The file created over the _client_socket.
         _ticket_counter: The counter storing the current ticket number.
         _ticket_lock: A lock on the ticket counter to prevent ticket collisions.
+        _write_lock: A lock that keeps requests sent by multiple threads from
+            interleaving.
+        _response_condition: A condition guarding the responses read on behalf
+            of other pipelined requests.
+        _responses: A dict of ticket to the responses that were read while
+            reading the response of another pipelined request.
+        _is_reading: Whether a thread is currently reading from the socket on
+            behalf of all pipelined requests.
         adb: A reference to the AdbProxy of the AndroidDevice. Used for logging.
         log: The logger for this RPC Client.
         ports: The Sl4aPorts object that stores the ports this connection uses.
@@ -53,6 +61,10 @@ class RpcConnection(object):
         self._socket_file = socket_fd
         self._ticket_counter = 0
         self._ticket_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._response_condition = threading.Condition()
+        self._responses = {}
+        self._is_reading = False
         self.adb = adb
         self.uid = uid
 
@@ -123,9 +135,16 @@ class RpcConnection(object):
 
     def send_request(self, request):
         """Sends a request over the connection."""
-        self._socket_file.write(request.encode('utf8') + b'\n')
-        self._socket_file.flush()
-        self.log.debug('Sent: ' + request)
+        self.send_requests([request])
+
+    def send_requests(self, requests):
+        """Sends several requests over the connection in a single write."""
+        data = b''.join(request.encode('utf8') + b'\n' for request in requests)
+        with self._write_lock:
+            self._socket_file.write(data)
+            self._socket_file.flush()
+        for request in requests:
+            self.log.debug('Sent: ' + request)
 
     def get_response(self):
         """Returns the first response sent back to the client."""
@@ -133,6 +152,53 @@ class RpcConnection(object):
         self.log.debug('Received: ' + data.decode('utf8', errors='replace'))
         return data
 
+    def get_response_for(self, ticket):
+        """Returns the response to the request with the given ticket.
+
+        Used when several requests are pipelined on this connection. Only one
+        thread reads from the socket at a time. Responses it reads for other
+        tickets are stored for the threads waiting on them.
+
+        Args:
+            ticket: The id of the request to get the response of.
+
+        Returns:
+            The response line, or an empty response if the server closed the
+            connection.
+        """
+        with self._response_condition:
+            while ticket not in self._responses:
+                if not self._is_reading:
+                    self._is_reading = True
+                    break
+                self._response_condition.wait()
+            else:
+                return self._responses.pop(ticket)
+
+        try:
+            while True:
+                data = self.get_response()
+                if not data:
+                    return data
+                response_id = self._get_response_id(data)
+                if response_id == ticket:
+                    return data
+                with self._response_condition:
+                    self._responses[response_id] = data
+                    self._response_condition.notify_all()
+        finally:
+            with self._response_condition:
+                self._is_reading = False
+                self._response_condition.notify_all()
+
+    def _get_response_id(self, data):
+        """Returns the id of the given response, or None if it has none."""
+        try:
+            return json.loads(str(data, encoding='utf8')).get('id')
+        except (ValueError, AttributeError):
+            self.log.warning('Received a response without an id: %s', data)
+            return None
+
     def close(self):
         """Closes the connection gracefully."""
         self._client_socket.close()
@@ -244,7 +244,8 @@ class Sl4aManager(object):
     def create_session(self,
                        max_connections=None,
                        client_port=0,
-                       server_port=None):
+                       server_port=None,
+                       max_pipelined_requests=1):
         """Creates an SL4A server with the given ports if possible.
 
         The ports are not guaranteed to be available for use. If the port
@@ -256,6 +257,8 @@ class Sl4aManager(object):
             server_port: The port on the Android device.
             max_connections: The max number of client connections for the
                 session.
+            max_pipelined_requests: The max number of RPCs that may be in
+                flight on a single client connection.
 
         Returns:
             A new Sl4aServer instance.
@@ -275,7 +278,8 @@ class Sl4aManager(object):
             server_port,
             self.obtain_sl4a_server,
             self.diagnose_failure,
-            max_connections=max_connections)
+            max_connections=max_connections,
+            max_pipelined_requests=max_pipelined_requests)
         self.sessions[session.uid] = session
         return session
 
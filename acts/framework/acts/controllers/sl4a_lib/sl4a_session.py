@@ -55,7 +55,8 @@ class Sl4aSession(object):
                  device_port,
                  get_server_port_func,
                  on_error_callback,
-                 max_connections=None):
+                 max_connections=None,
+                 max_pipelined_requests=1):
         """Creates an SL4A Session.
 
         Args:
@@ -67,6 +68,9 @@ class Sl4aSession(object):
                 server for its first connection.
             device_port: The SL4A server port to be used as a hint for which
                 SL4A server to connect to.
+            max_connections: The max number of client connections.
+            max_pipelined_requests: The max number of RPCs that may be in
+                flight on a single client connection.
         """
         self._event_dispatcher = None
         self._terminate_lock = threading.Lock()
@@ -90,7 +94,8 @@ class Sl4aSession(object):
             self.adb.serial,
             self.diagnose_failure,
             connection_creator,
-            max_connections=max_connections)
+            max_connections=max_connections,
+            max_pipelined_requests=max_pipelined_requests)
 
     def _rpc_connection_creator(self, host_port):
         def create_client(uid):
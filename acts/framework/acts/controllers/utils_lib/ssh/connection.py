@@ -15,7 +15,10 @@
 import collections
 import os
 import re
+import shlex
 import shutil
+import subprocess
+import tarfile
 import tempfile
 import threading
 import time
@@ -24,6 +27,7 @@ import uuid
 from acts import logger
 from acts.controllers.utils_lib import host_utils
 from acts.controllers.utils_lib.ssh import formatter
+from acts.controllers.utils_lib.ssh import shell_session
 from acts.libs.proc import job
 
 
@@ -79,6 +83,8 @@ class SshConnection(object):
         self._master_ssh_proc = None
         self._master_ssh_tempdir = None
         self._tunnels = list()
+        self._shell_session = None
+        self._shell_session_lock = threading.Lock()
 
         def log_line(msg):
             return '[SshConnection | %s] %s' % (self._settings.hostname, msg)
@@ -186,15 +192,7 @@ class SshConnection(object):
         if env is None:
             env = {}
 
-        try:
-            self.setup_master_ssh(self._settings.connect_timeout)
-        except Error:
-            self.log.warning('Failed to create master ssh connection, using '
-                             'normal ssh connection.')
-
-        extra_options = {'BatchMode': True}
-        if self._master_ssh_proc:
-            extra_options['ControlPath'] = self.socket_path
+        extra_options = self._get_extra_options()
 
         identifier = str(uuid.uuid4())
         full_command = 'echo "CONNECTED: %s"; %s' % (identifier, command)
@@ -277,6 +275,111 @@ class SshConnection(object):
                      attempts - 1)
         raise Error('The job failed for unknown reasons.', result)
 
+    def _get_extra_options(self):
+        """Returns the ssh options for commands sharing the master ssh."""
+        try:
+            self.setup_master_ssh(self._settings.connect_timeout)
+        except Error:
+            self.log.warning('Failed to create master ssh connection, using '
+                             'normal ssh connection.')
+
+        extra_options = {'BatchMode': True}
+        if self._master_ssh_proc:
+            extra_options['ControlPath'] = self.socket_path
+        return extra_options
+
+    def _get_shell_session(self):
+        """Returns the persistent shell session, starting it if needed.
+
+        Returns:
+            The open shell_session.ShellSession, or None if the shell failed
+            to start.
+        """
+        if self._shell_session and self._shell_session.is_open:
+            return self._shell_session
+        session_command = self._formatter.format_command(
+            'sh',
+            None,
+            self._settings,
+            extra_options=self._get_extra_options())
+        session = shell_session.ShellSession(session_command)
+        try:
+            session.run(['true'], timeout=self._settings.connect_timeout)
+        except (job.TimeoutError, shell_session.SessionClosedError):
+            self.log.warning('Failed to start a remote shell session.')
+            return None
+        self._shell_session = session
+        return session
+
+    def run_batch(self,
+                  commands,
+                  timeout=60,
+                  ignore_status=False,
+                  env=None,
+                  io_encoding='utf-8'):
+        """Runs remote commands over a persistent shell session.
+
+        The commands are pipelined through a single remote shell, so the batch
+        takes about one round trip instead of one ssh process per command.
+        Each command runs in its own subshell. Unless ignore_status is set,
+        the commands after the first failing one do not run, as when calling
+        run() for each command. If the remote shell cannot be started, the commands are run
+        one at a time with run(). If the shell exits before any output is
+        read, e.g. because the remote host rebooted since it was started, the
+        batch is retried once on a new shell.
+
+        Args:
+            commands: A list of the commands to execute over ssh.
+            timeout: number seconds to wait for each command to finish.
+            ignore_status: bool True to ignore the exit codes of the remote
+                           commands.
+            env: dict environment variables to setup on the remote host.
+            io_encoding: str unicode encoding of command output.
+
+        Returns:
+            A list of the job.Result of each command.
+
+        Raises:
+            job.TimeoutError: When a remote command took to long to execute.
+                              The commands after it do not run.
+            Error: When the remote shell exited mid-batch.
+            job.Error: When a command failed and ignore_status is False. The
+                       commands after it do not run.
+        """
+        if not commands:
+            return []
+        remote_commands = [
+            self._formatter.format_remote_command(command, env)
+            for command in commands
+        ]
+        with self._shell_session_lock:
+            for attempt in range(2):
+                session = self._get_shell_session()
+                if session is None:
+                    return [
+                        self.run(command,
+                                 timeout=timeout,
+                                 ignore_status=ignore_status,
+                                 env=env,
+                                 io_encoding=io_encoding)
+                        for command in commands
+                    ]
+                try:
+                    results = session.run(
+                        remote_commands, timeout, io_encoding,
+                        stop_on_failure=not ignore_status)
+                    break
+                except shell_session.SessionClosedError as e:
+                    if e.output_received or attempt:
+                        raise Error('The remote shell session closed.', e)
+                    self.log.debug('The remote shell session closed before '
+                                   'running the batch. Retrying on a new '
+                                   'session.')
+        for result in results:
+            if result.exit_status and not ignore_status:
+                raise job.Error(result)
+        return results
+
     def run_async(self, command, env=None):
         """Starts up a background command over ssh.
 
@@ -304,6 +407,9 @@ class SshConnection(object):
 
     def close(self):
         """Clean up open connections to remote host."""
+        if self._shell_session:
+            self._shell_session.close()
+            self._shell_session = None
         self._cleanup_master_ssh()
         while self._tunnels:
             self.close_ssh_tunnel(self._tunnels[0].local_port)
@@ -417,6 +523,113 @@ class SshConnection(object):
         job.run('scp %s:%s %s' % (user_host, remote_path, local_path),
                 ignore_status=ignore_status)
 
+    def _start_remote_command(self, command, stdin=None, stdout=None):
+        """Starts a remote command, with stderr written to a temp file."""
+        ssh_command = self._formatter.format_command(
+            command, None, self._settings,
+            extra_options=self._get_extra_options())
+        stderr = tempfile.TemporaryFile()
+        return subprocess.Popen(ssh_command,
+                                stdin=stdin,
+                                stdout=stdout,
+                                stderr=stderr), stderr
+
+    def _finish_remote_command(self, proc, stderr, command, start_time,
+                               ignore_status):
+        """Waits for a remote command, raising job.Error if it failed."""
+        proc.wait()
+        stderr.seek(0)
+        result = job.Result(command=command,
+                            stderr=stderr.read(),
+                            exit_status=proc.returncode,
+                            duration=time.time() - start_time)
+        stderr.close()
+        if result.exit_status and not ignore_status:
+            raise job.Error(result)
+        return result
+
+    def send_files(self, local_paths, remote_dir, ignore_status=False):
+        """Send files from the local host to a directory on the remote host.
+
+        The files are sent as a single tar stream, rather than with one scp
+        per file. Directories are sent with their contents.
+
+        Args:
+            local_paths: list of string paths of files to send on local host.
+            remote_dir: string path of the directory to copy the files to on
+                        remote host. It is created if it does not exist.
+            ignore_status: Whether or not to ignore the command's exit_status.
+
+        Returns:
+            A job.Result of the remote tar command.
+        """
+        start_time = time.time()
+        command = 'mkdir -p %s && tar -xf - -C %s' % (shlex.quote(remote_dir),
+                                                     shlex.quote(remote_dir))
+        proc, stderr = self._start_remote_command(command,
+                                                  stdin=subprocess.PIPE)
+        try:
+            with tarfile.open(fileobj=proc.stdin, mode='w|') as tar:
+                for local_path in local_paths:
+                    tar.add(local_path,
+                            arcname=os.path.basename(
+                                os.path.normpath(local_path)))
+        except BrokenPipeError:
+            # The remote tar failed, which its exit status reports.
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        return self._finish_remote_command(proc, stderr, command, start_time,
+                                           ignore_status)
+
+    def pull_files(self, remote_paths, local_dir, ignore_status=False):
+        """Pull files from the remote host to a directory on the local host.
+
+        The files are received as a single tar stream, rather than with one
+        scp per file. Directories are pulled with their contents.
+
+        Args:
+            remote_paths: list of string paths of files to copy on remote host.
+            local_dir: string path of the directory to copy the files to on
+                       local host. It is created if it does not exist.
+            ignore_status: Whether or not to ignore the command's exit_status.
+
+        Returns:
+            A job.Result of the remote tar command.
+        """
+        start_time = time.time()
+        # Maps the name of each remote path in the archive to the name it is
+        # extracted as.
+        arcnames = {}
+        for remote_path in remote_paths:
+            remote_path = os.path.normpath(remote_path)
+            arcnames[remote_path.lstrip('/')] = os.path.basename(remote_path)
+        command = 'tar -cf - %s' % ' '.join(
+            shlex.quote(remote_path) for remote_path in remote_paths)
+        proc, stderr = self._start_remote_command(command,
+                                                  stdout=subprocess.PIPE)
+        os.makedirs(local_dir, exist_ok=True)
+        try:
+            with tarfile.open(fileobj=proc.stdout, mode='r|') as tar:
+                for member in tar:
+                    name = _get_local_arcname(member.name, arcnames)
+                    if name is None:
+                        self.log.warning('Skipping unexpected file %s.',
+                                         member.name)
+                        continue
+                    member.name = name
+                    tar.extract(member, local_dir)
+        except tarfile.ReadError:
+            # The remote tar failed, which its exit status reports.
+            pass
+        finally:
+            proc.stdout.close()
+        return self._finish_remote_command(proc, stderr, command, start_time,
+                                           ignore_status)
+
     def find_free_port(self, interface_name='localhost'):
         """Find a unused port on the remote host.
 
@@ -439,3 +652,27 @@ class SshConnection(object):
         # Yield to the os to ensure the port gets cleaned up.
         time.sleep(0.001)
         return port
+
+
+def _get_local_arcname(name, arcnames):
+    """Returns the local name of a pulled archive member.
+
+    Args:
+        name: The name of the member in the archive.
+        arcnames: A dict of the names of the pulled paths in the archive to
+                  their local names.
+
+    Returns:
+        The name to extract the member as, or None if it is outside of the
+        pulled paths.
+    """
+    name = name.lstrip('/')
+    for arcname, local_name in arcnames.items():
+        if name == arcname:
+            return local_name
+        if name.startswith(arcname + '/'):
+            relative_name = name[len(arcname) + 1:]
+            if os.pardir in relative_name.split('/'):
+                return None
+            return os.path.join(local_name, relative_name)
+    return None
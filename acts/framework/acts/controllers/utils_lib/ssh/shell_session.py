@@ -0,0 +1,199 @@
+# Copyright 2020 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import selectors
+import subprocess
+import time
+
+from acts.libs.proc import job
+from acts.libs.proc import marked_command
+
+_READ_SIZE = 65536
+
+
+class SessionClosedError(Exception):
+    """Raised when the shell exits before a command finishes.
+
+    Attributes:
+        output_received: Whether any output of the commands was read before
+            the shell exited.
+    """
+    output_received = False
+
+
+class ShellSession(object):
+    """A long-lived shell that runs the commands written to its stdin.
+
+    Commands are pipelined: all commands of a batch are written at once, and
+    their results are read back in order, so a batch costs a single round trip
+    to the remote host rather than one per command.
+
+    Attributes:
+        is_open: Whether the shell can run more commands.
+    """
+    def __init__(self, command):
+        """
+        Args:
+            command: The local command that starts the shell, as a list.
+        """
+        self._proc = subprocess.Popen(command,
+                                      stdin=subprocess.PIPE,
+                                      stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE,
+                                      preexec_fn=os.setpgrp)
+        self._stdin_fd = self._proc.stdin.fileno()
+        self._stdout_fd = self._proc.stdout.fileno()
+        self._stderr_fd = self._proc.stderr.fileno()
+        os.set_blocking(self._stdin_fd, False)
+        self._buffers = {self._stdout_fd: bytearray(),
+                         self._stderr_fd: bytearray()}
+        self._pending_input = bytearray()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._stdout_fd, selectors.EVENT_READ)
+        self._selector.register(self._stderr_fd, selectors.EVENT_READ)
+        self.is_open = True
+
+    def _poll(self, deadline):
+        """Writes pending input and reads available output.
+
+        Returns:
+            False if the deadline passed first, True otherwise.
+        """
+        if self._pending_input:
+            if self._stdin_fd not in self._selector.get_map():
+                self._selector.register(self._stdin_fd, selectors.EVENT_WRITE)
+        elif self._stdin_fd in self._selector.get_map():
+            self._selector.unregister(self._stdin_fd)
+        timeout = None if deadline is None else deadline - time.time()
+        if timeout is not None and timeout <= 0:
+            return False
+        events = self._selector.select(timeout)
+        if not events:
+            return False
+        for key, _ in events:
+            if key.fd == self._stdin_fd:
+                try:
+                    written = os.write(self._stdin_fd, self._pending_input)
+                except BlockingIOError:
+                    continue
+                except BrokenPipeError:
+                    raise SessionClosedError('The shell exited.')
+                del self._pending_input[:written]
+                continue
+            data = os.read(key.fd, _READ_SIZE)
+            if not data:
+                raise SessionClosedError('The shell exited.')
+            self._buffers[key.fd] += data
+        return True
+
+    def _read_until(self, fd, delimiter, deadline):
+        """Reads the output of fd up to the delimiter, consuming both.
+
+        Returns:
+            The output before the delimiter, or None if the deadline passed
+            first.
+        """
+        buffer = self._buffers[fd]
+        start = 0
+        while True:
+            index = buffer.find(delimiter, start)
+            if index >= 0:
+                data = bytes(buffer[:index])
+                del buffer[:index + len(delimiter)]
+                return data
+            start = max(len(buffer) - len(delimiter) + 1, 0)
+            if not self._poll(deadline):
+                return None
+
+    def run(self, commands, timeout=60, io_encoding='utf-8',
+            stop_on_failure=False):
+        """Runs the commands in order.
+
+        Args:
+            commands: A list of the shell commands to run.
+            timeout: The number of seconds to wait for each command to finish.
+            io_encoding: str unicode encoding of command output.
+            stop_on_failure: Whether to skip the commands after the first one
+                that exits with a non-zero status.
+
+        Returns:
+            A list of the job.Result of each command that ran.
+
+        Raises:
+            job.TimeoutError: When a command took too long to finish. The shell
+                is closed, and the commands after it do not run.
+            SessionClosedError: When the shell exited.
+        """
+        marked_commands = [
+            marked_command.MarkedCommand(
+                command, skip_after_failure=stop_on_failure and i > 0)
+            for i, command in enumerate(commands)
+        ]
+        for marked in marked_commands:
+            self._pending_input += marked.script.encode('utf-8')
+
+        results = []
+        try:
+            for marked in marked_commands:
+                start_time = time.time()
+                deadline = None if timeout is None else start_time + timeout
+                stdout = self._read_until(self._stdout_fd, marked.stdout_end,
+                                          deadline)
+                exit_status = None
+                if stdout is not None:
+                    exit_status = self._read_until(self._stdout_fd, b'\n',
+                                                   deadline)
+                stderr = None
+                if exit_status is not None:
+                    stderr = self._read_until(self._stderr_fd,
+                                              marked.stderr_end, deadline)
+                result = job.Result(
+                    command=marked.command,
+                    stdout=stdout or b'',
+                    stderr=stderr or b'',
+                    exit_status=(
+                        None if exit_status is None else
+                        marked_command.parse_exit_status(exit_status)),
+                    duration=time.time() - start_time,
+                    did_timeout=stderr is None,
+                    encoding=io_encoding)
+                if result.did_timeout:
+                    raise job.TimeoutError(result)
+                if not (stop_on_failure and results and
+                        results[-1].exit_status):
+                    results.append(result)
+        except SessionClosedError as e:
+            e.output_received = bool(results or any(self._buffers.values()))
+            self.close()
+            raise
+        except job.TimeoutError:
+            self.close()
+            raise
+        return results
+
+    def close(self):
+        """Stops the shell."""
+        if not self.is_open:
+            return
+        self.is_open = False
+        self._selector.close()
+        self._proc.kill()
+        self._proc.wait()
+        for stream in (self._proc.stdin, self._proc.stdout,
+                       self._proc.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
@@ -18,7 +18,8 @@ from acts.event.subscription_handle import StaticSubscriptionHandle
 from acts.event import subscription_bundle
 
 
-def subscribe_static(event_type, event_filter=None, order=0):
+def subscribe_static(event_type, event_filter=None, order=0,
+                     asynchronous=False):
     """A decorator that subscribes a static or module-level function.
 
     This function must be registered manually.
@@ -27,18 +28,20 @@ def subscribe_static(event_type, event_filter=None, order=0):
         def __init__(self, func):
             super().__init__(event_type, func,
                              event_filter=event_filter,
-                             order=order)
+                             order=order,
+                             asynchronous=asynchronous)
 
     return InnerSubscriptionHandle
 
 
-def subscribe(event_type, event_filter=None, order=0):
+def subscribe(event_type, event_filter=None, order=0, asynchronous=False):
     """A decorator that subscribes an instance method."""
     class InnerSubscriptionHandle(InstanceSubscriptionHandle):
         def __init__(self, func):
             super().__init__(event_type, func,
                              event_filter=event_filter,
-                             order=order)
+                             order=order,
+                             asynchronous=asynchronous)
 
     return InnerSubscriptionHandle
 
@@ -13,15 +13,92 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
-import bisect
+import collections
 import logging
 import inspect
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition
+from threading import Lock
 from threading import RLock
 
 from acts.event.event_subscription import EventSubscription
 from acts.event.subscription_handle import SubscriptionHandle
 
 
+# The default number of threads delivering events to asynchronous
+# subscriptions.
+DEFAULT_ASYNC_WORKERS = 4
+
+
+class _AsyncDeliverer(object):
+    """Delivers events to asynchronous subscriptions on a pool of threads.
+
+    Each subscription has its own queue of pending events, which only one
+    thread drains at a time. Events therefore reach each subscriber in the
+    order they were posted, while slow subscribers do not block the poster or
+    each other.
+
+    Attributes:
+        max_workers: The maximum number of delivery threads.
+        _executor: The ThreadPoolExecutor running the threads. Created on the
+                   first asynchronous delivery.
+        _pending: A dictionary of {EventSubscription: deque<Event>} holding the
+                  events not yet delivered to each subscription.
+        _lock: The lock guarding the pending events.
+        _idle: A condition notified whenever a subscription's queue empties.
+    """
+
+    def __init__(self, max_workers=DEFAULT_ASYNC_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending = {}
+        self._lock = Lock()
+        self._idle = Condition(self._lock)
+
+    def deliver(self, subscription, event):
+        """Queues the event for delivery to the subscription."""
+        with self._lock:
+            queue = self._pending.get(subscription)
+            if queue is not None:
+                queue.append(event)
+                return
+            self._pending[subscription] = collections.deque([event])
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='EventBus')
+            self._executor.submit(self._drain, subscription)
+
+    def _drain(self, subscription):
+        """Delivers the subscription's pending events until none are left."""
+        while True:
+            with self._lock:
+                queue = self._pending[subscription]
+                if not queue:
+                    del self._pending[subscription]
+                    self._idle.notify_all()
+                    return
+                event = queue.popleft()
+            try:
+                subscription.deliver(event)
+            except Exception:
+                logging.exception('An exception occurred while handling '
+                                  'an event asynchronously.')
+
+    def flush(self, timeout=None):
+        """Waits for all queued events to be delivered.
+
+        Args:
+            timeout: The maximum number of seconds to wait. If None, waits
+                     indefinitely.
+
+        Returns:
+            True if all events were delivered, False on timeout.
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+
 class _EventBus(object):
     """
     Attributes:
@@ -30,14 +107,25 @@ class _EventBus(object):
                              {RegistrationID: EventSubscription}
         _subscription_lock: The lock to prevent concurrent removal or addition
                             to events.
+        _async_subscriptions: The set of registered subscriptions that are
+                              delivered asynchronously.
+        _dispatch_cache: A dictionary of {EventType: tuple} holding the
+                         (EventSubscription, is asynchronous) pairs to deliver
+                         an event of that exact type to, in delivery order.
+                         Cleared whenever a subscription is added or removed.
+        _async_deliverer: The _AsyncDeliverer for asynchronous subscriptions.
     """
 
     def __init__(self):
         self._subscriptions = {}
         self._registration_id_map = {}
         self._subscription_lock = RLock()
+        self._async_subscriptions = set()
+        self._dispatch_cache = {}
+        self._async_deliverer = _AsyncDeliverer()
 
-    def register(self, event_type, func, filter_fn=None, order=0):
+    def register(self, event_type, func, filter_fn=None, order=0,
+                 asynchronous=False):
         """Subscribes the given function to the event type given.
 
         Args:
@@ -54,13 +142,18 @@ class _EventBus(object):
                    subscription that is more specific goes first (i.e.
                    BaseEventType will execute after ChildEventType if they share
                    the same order).
+            asynchronous: If True, the event is delivered on a separate
+                          thread, so the function does not block the poster.
+                          Events are still delivered in the order they were
+                          posted.
 
         Returns:
             A registration ID.
         """
         subscription = EventSubscription(event_type, func,
                                          event_filter=filter_fn,
-                                         order=order)
+                                         order=order,
+                                         asynchronous=asynchronous)
         return self.register_subscription(subscription)
 
     def register_subscriptions(self, subscriptions):
@@ -88,20 +181,50 @@ class _EventBus(object):
             A registration ID.
         """
         with self._subscription_lock:
-            if subscription.event_type in self._subscriptions.keys():
-                subscription_list = self._subscriptions[subscription.event_type]
-                subscription_list.append(subscription)
-                subscription_list.sort(key=lambda x: x.order)
-            else:
-                subscription_list = list()
-                bisect.insort(subscription_list, subscription)
-                self._subscriptions[subscription.event_type] = subscription_list
+            subscription_list = self._subscriptions.setdefault(
+                subscription.event_type, [])
+            # Insert after every subscription of a lower or equal order. This
+            # is usually the end of the list, so search from there.
+            index = len(subscription_list)
+            while (index > 0 and
+                   subscription_list[index - 1].order > subscription.order):
+                index -= 1
+            subscription_list.insert(index, subscription)
+            if subscription.asynchronous:
+                self._async_subscriptions.add(subscription)
+            self._dispatch_cache.clear()
 
             registration_id = id(subscription)
             self._registration_id_map[registration_id] = subscription
 
         return registration_id
 
+    def _get_dispatch_list(self, event_type):
+        """Returns the subscriptions to deliver an event of the given type to.
+
+        Returns:
+            A tuple of (EventSubscription, is asynchronous) pairs, in the order
+            the subscriptions should be delivered to.
+        """
+        dispatch_list = self._dispatch_cache.get(event_type)
+        if dispatch_list is not None:
+            return dispatch_list
+        with self._subscription_lock:
+            listening_subscriptions = []
+            for current_type in inspect.getmro(event_type):
+                if current_type in self._subscriptions:
+                    listening_subscriptions.extend(
+                        self._subscriptions[current_type])
+
+            # The subscriptions will be collected in sorted runs of sorted
+            # order. Running timsort here is the optimal way to sort this list.
+            listening_subscriptions.sort(key=lambda x: x.order)
+            dispatch_list = tuple(
+                (subscription, subscription in self._async_subscriptions)
+                for subscription in listening_subscriptions)
+            self._dispatch_cache[event_type] = dispatch_list
+        return dispatch_list
+
     def post(self, event, ignore_errors=False):
         """Posts an event to its subscribers.
 
@@ -109,17 +232,10 @@ class _EventBus(object):
             event: The event object to send to the subscribers.
             ignore_errors: Deliver to all subscribers, ignoring any errors.
         """
-        listening_subscriptions = []
-        for current_type in inspect.getmro(type(event)):
-            if current_type not in self._subscriptions.keys():
+        for subscription, asynchronous in self._get_dispatch_list(type(event)):
+            if asynchronous:
+                self._async_deliverer.deliver(subscription, event)
                 continue
-            for subscription in self._subscriptions[current_type]:
-                listening_subscriptions.append(subscription)
-
-        # The subscriptions will be collected in sorted runs of sorted order.
-        # Running timsort here is the optimal way to sort this list.
-        listening_subscriptions.sort(key=lambda x: x.order)
-        for subscription in listening_subscriptions:
             try:
                 subscription.deliver(event)
             except Exception:
@@ -161,6 +277,8 @@ class _EventBus(object):
             if (event_type in self._subscriptions and
                     subscription in self._subscriptions[event_type]):
                 self._subscriptions[event_type].remove(subscription)
+            self._async_subscriptions.discard(subscription)
+            self._dispatch_cache.clear()
         return True
 
     def unregister_all(self, from_list=None, from_event=None):
@@ -177,11 +295,23 @@ class _EventBus(object):
             if from_event is None or subscription.event_type == from_event:
                 self.unregister(subscription)
 
+    def flush(self, timeout=None):
+        """Waits for all posted events to reach asynchronous subscriptions.
+
+        Args:
+            timeout: The maximum number of seconds to wait. If None, waits
+                     indefinitely.
+
+        Returns:
+            True if all events were delivered, False on timeout.
+        """
+        return self._async_deliverer.flush(timeout)
+
 
 _event_bus = _EventBus()
 
 
-def register(event_type, func, filter_fn=None, order=0):
+def register(event_type, func, filter_fn=None, order=0, asynchronous=False):
     """Subscribes the given function to the event type given.
 
     Args:
@@ -197,12 +327,15 @@ def register(event_type, func, filter_fn=None, order=0):
                between two subscribers of a different type, the type of the
                subscription that is more specific goes first (i.e. BaseEventType
                will execute after ChildEventType if they share the same order).
+        asynchronous: If True, the event is delivered on a separate thread, so
+                      the function does not block the poster. Events are still
+                      delivered in the order they were posted.
 
     Returns:
         A registration ID.
     """
     return _event_bus.register(event_type, func, filter_fn=filter_fn,
-                               order=order)
+                               order=order, asynchronous=asynchronous)
 
 
 def register_subscriptions(subscriptions):
@@ -258,6 +391,29 @@ def unregister_all(from_list=None, from_event=None):
     return _event_bus.unregister_all(from_list=from_list, from_event=from_event)
 
 
+def flush(timeout=None):
+    """Waits for all posted events to reach asynchronous subscriptions.
+
+    Args:
+        timeout: The maximum number of seconds to wait. If None, waits
+                 indefinitely.
+
+    Returns:
+        True if all events were delivered, False on timeout.
+    """
+    return _event_bus.flush(timeout)
+
+
+def reset():
+    """Replaces the event bus with one that has no subscriptions.
+
+    Used by forked processes, which would otherwise deliver their events to
+    the subscriptions inherited from their parent.
+    """
+    global _event_bus
+    _event_bus = _EventBus()
+
+
 class listen_for(object):
     """A context-manager class (with statement) for listening to an event within
     a given section of code.
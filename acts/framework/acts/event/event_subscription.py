@@ -24,12 +24,16 @@ class EventSubscription(object):
         _event_filter: A lambda that returns True if an event should be passed
                        to the subscribed function.
         order: The order value in which this subscription should be called.
+        asynchronous: Whether the event bus delivers events to this
+                      subscription on a separate thread.
     """
-    def __init__(self, event_type, func, event_filter=None, order=0):
+    def __init__(self, event_type, func, event_filter=None, order=0,
+                 asynchronous=False):
         self._event_type = event_type
         self._func = func
         self._event_filter = event_filter
         self.order = order
+        self.asynchronous = asynchronous
 
     @property
     def event_type(self):
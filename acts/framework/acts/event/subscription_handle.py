@@ -19,11 +19,13 @@ from acts.event.event_subscription import EventSubscription
 class SubscriptionHandle(object):
     """The object created by a method decorated with an event decorator."""
 
-    def __init__(self, event_type, func, event_filter=None, order=0):
+    def __init__(self, event_type, func, event_filter=None, order=0,
+                 asynchronous=False):
         self._event_type = event_type
         self._func = func
         self._event_filter = event_filter
         self._order = order
+        self._asynchronous = asynchronous
         self._subscription = None
         self._owner = None
 
@@ -33,7 +35,8 @@ class SubscriptionHandle(object):
             return self._subscription
         self._subscription = EventSubscription(self._event_type, self._func,
                                                event_filter=self._event_filter,
-                                               order=self._order)
+                                               order=self._order,
+                                               asynchronous=self._asynchronous)
         return self._subscription
 
     def __get__(self, instance, owner):
@@ -45,7 +48,8 @@ class SubscriptionHandle(object):
         # Otherwise, we create a new SubscriptionHandle that will only be used
         # for the instance that owns this SubscriptionHandle.
         ret = SubscriptionHandle(self._event_type, self._func,
-                                 self._event_filter, self._order)
+                                 self._event_filter, self._order,
+                                 self._asynchronous)
         ret._owner = instance
         ret._func = ret._wrap_call(ret._func)
         for attr, value in owner.__dict__.items():
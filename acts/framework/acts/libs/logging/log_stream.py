@@ -13,9 +13,15 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
+import collections
+import copy
+import functools
 import logging
 import os
+import queue
 import sys
+import threading
+import traceback
 from logging import FileHandler
 from logging import Handler
 from logging import StreamHandler
@@ -91,6 +97,13 @@ class LogStyles:
 _log_streams = dict()
 _null_handler = logging.NullHandler()
 
+# The default number of records an asynchronous LogStream queues up before
+# dropping records below WARNING.
+DEFAULT_MAX_QUEUE_SIZE = 10000
+
+LogQueueStats = collections.namedtuple(
+    'LogQueueStats', ['queue_depth', 'max_queue_size', 'dropped_records'])
+
 
 @subscribe_static(context.NewContextEvent)
 def _update_handlers(event):
@@ -103,7 +116,8 @@ event_bus.register_subscription(_update_handlers.subscription)
 
 def create_logger(name, log_name=None, base_path='', subcontext='',
                   log_styles=LogStyles.NONE, stream_format=None,
-                  file_format=None):
+                  file_format=None, asynchronous=False,
+                  max_queue_size=DEFAULT_MAX_QUEUE_SIZE):
     """Creates a Python Logger object with the given attributes.
 
     Creation through this method will automatically manage the logger in the
@@ -127,11 +141,16 @@ def create_logger(name, log_name=None, base_path='', subcontext='',
             >>>  LogStyles.LOG_ERROR + LogStyles.TO_ACTS_LOG]
         stream_format: Format used for log output to stream
         file_format: Format used for log output to files
+        asynchronous: If True, log records are queued up and written by a
+            background thread, instead of by the thread logging them.
+        max_queue_size: The number of records an asynchronous LogStream
+            queues up before dropping records below WARNING.
     """
     if name in _log_streams:
         _log_streams[name].cleanup()
     log_stream = _LogStream(name, log_name, base_path, subcontext, log_styles,
-                            stream_format, file_format)
+                            stream_format, file_format, asynchronous,
+                            max_queue_size)
     _set_logger(log_stream)
     return log_stream.logger
 
@@ -141,6 +160,19 @@ def _set_logger(log_stream):
     return log_stream
 
 
+def get_queue_stats(name):
+    """Returns the LogQueueStats of a LogStream.
+
+    Args:
+        name: The name of the LogStream.
+
+    Returns:
+        The LogQueueStats of the LogStream, or None if it is not
+        asynchronous.
+    """
+    return _log_streams[name].get_queue_stats()
+
+
 class AlsoToLogHandler(Handler):
     """Logs a message at a given level also to another logger.
 
@@ -159,7 +191,23 @@ class AlsoToLogHandler(Handler):
 class MovableFileHandler(FileHandler):
     """FileHandler implementation that allows the output file to be changed
     during operation.
+
+    Attributes:
+        defer_flush: If True, the output is only flushed by flush(force=True).
+            Set by asynchronous LogStreams, which flush once per batch of
+            records rather than once per record.
     """
+    defer_flush = False
+
+    def flush(self, force=False):
+        """Flushes the output, unless flushes are deferred.
+
+        Args:
+            force: Whether to flush even if flushes are deferred.
+        """
+        if force or not self.defer_flush:
+            StreamHandler.flush(self)
+
     def set_file(self, file_name):
         """Set the target output file to file_name.
 
@@ -179,13 +227,147 @@ class MovableRotatingFileHandler(RotatingFileHandler):
     changed during operation. Rotated files will automatically adopt the newest
     output path.
     """
+    defer_flush = False
+    flush = MovableFileHandler.flush
     set_file = MovableFileHandler.set_file
 
 
+_MOVABLE_FILE_HANDLERS = (MovableFileHandler, MovableRotatingFileHandler)
+
+
 class InvalidStyleSetError(Exception):
     """Raised when the given LogStyles are an invalid set."""
 
 
+class _AsyncLogWriter(object):
+    """Writes the log records of a LogStream from a background thread.
+
+    Log records and handler updates are queued up, and processed in order by
+    a single writer thread. The handlers are flushed whenever the queue runs
+    empty, so that bursts of records are written in batches.
+
+    Attributes:
+        handlers: The handlers the records are written to.
+        max_queue_size: The number of records queued up before records below
+            WARNING are dropped.
+        dropped_records: The number of records dropped so far.
+    """
+    _STOP = object()
+
+    def __init__(self, name, max_queue_size=DEFAULT_MAX_QUEUE_SIZE):
+        self.handlers = []
+        self.max_queue_size = max_queue_size
+        self.dropped_records = 0
+        self._dropped_records_lock = threading.Lock()
+        self._queue = queue.Queue(max_queue_size)
+        self._thread = threading.Thread(target=self._run,
+                                        name='log_writer_%s' % name,
+                                        daemon=True)
+
+    @property
+    def queue_depth(self):
+        """The number of items waiting to be processed."""
+        return self._queue.qsize()
+
+    def add_handler(self, handler):
+        """Adds a handler to write the records to."""
+        if isinstance(handler, _MOVABLE_FILE_HANDLERS):
+            handler.defer_flush = True
+        self.handlers.append(handler)
+
+    def start(self):
+        """Starts the writer thread."""
+        self._thread.start()
+
+    def put_record(self, record):
+        """Queues up a record.
+
+        Records at WARNING or above wait for room in the queue. Other records
+        are dropped if the queue is full.
+        """
+        if record.levelno >= logging.WARNING:
+            self._queue.put(record)
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_records_lock:
+                self.dropped_records += 1
+
+    def submit(self, func, *args):
+        """Queues up a call, to run on the writer thread after the records
+        already queued up.
+        """
+        self._queue.put(functools.partial(func, *args))
+
+    def wait(self):
+        """Waits until every item queued up so far is processed."""
+        if not self._thread.is_alive():
+            return
+        processed = threading.Event()
+        self.submit(processed.set)
+        processed.wait()
+
+    def stop(self):
+        """Processes the remaining items and stops the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _flush(self):
+        for handler in self.handlers:
+            if isinstance(handler, _MOVABLE_FILE_HANDLERS):
+                handler.flush(force=True)
+            else:
+                handler.flush()
+
+    def _process(self, item):
+        if isinstance(item, logging.LogRecord):
+            for handler in self.handlers:
+                if item.levelno >= handler.level:
+                    handler.handle(item)
+            return
+        # Calls may move the files, so the records written so far must reach
+        # the current files first.
+        self._flush()
+        try:
+            item()
+        except Exception:
+            traceback.print_exc()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            while item is not self._STOP:
+                self._process(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._flush()
+            if item is self._STOP:
+                return
+
+
+class _QueueHandler(Handler):
+    """Passes the log records of a LogStream on to its _AsyncLogWriter."""
+
+    def __init__(self, writer):
+        super().__init__()
+        self._writer = writer
+
+    def emit(self, record):
+        try:
+            # The message is formatted now, as its arguments may change
+            # before the record is written.
+            record = copy.copy(record)
+            record.msg = record.getMessage()
+            record.args = None
+            self._writer.put_record(record)
+        except Exception:
+            self.handleError(record)
+
+
 class _LogStream(object):
     """A class that sets up a logging.Logger object.
 
@@ -205,7 +387,8 @@ class _LogStream(object):
 
     def __init__(self, name, log_name=None, base_path='', subcontext='',
                  log_styles=LogStyles.NONE, stream_format=None,
-                 file_format=None):
+                 file_format=None, asynchronous=False,
+                 max_queue_size=DEFAULT_MAX_QUEUE_SIZE):
         """Creates a LogStream.
 
         Args:
@@ -226,6 +409,10 @@ class _LogStream(object):
                 >>>  LogStyles.LOG_ERROR + LogStyles.TO_ACTS_LOG]
             stream_format: Format used for log output to stream
             file_format: Format used for log output to files
+            asynchronous: If True, log records are queued up and written by
+                a background thread, instead of by the thread logging them.
+            max_queue_size: The number of records an asynchronous LogStream
+                queues up before dropping records below WARNING.
         """
         self.name = name
         if log_name is not None:
@@ -244,11 +431,17 @@ class _LogStream(object):
         self.file_format = file_format
         self._testclass_handlers = []
         self._testcase_handlers = []
+        self._writer = None
+        if asynchronous:
+            self._writer = _AsyncLogWriter(name, max_queue_size)
         if not isinstance(log_styles, list):
             log_styles = [log_styles]
         self.__validate_styles(log_styles)
         for log_style in log_styles:
             self.__handle_style(log_style)
+        if self._writer:
+            self.logger.addHandler(_QueueHandler(self._writer))
+            self._writer.start()
 
     @staticmethod
     def __validate_styles(_log_styles_list):
@@ -387,7 +580,7 @@ class _LogStream(object):
                     handler.setFormatter(self.stream_format)
 
             handler.setLevel(LogStyles.LEVEL_TO_NO[lowest_log_level])
-            self.logger.addHandler(handler)
+            self.__add_handler(handler)
 
         # Handle streaming logs to log-level files
         for log_level in LogStyles.LOG_LEVELS:
@@ -397,13 +590,20 @@ class _LogStream(object):
 
             handler = self.__create_handler(
                 handler_creator, log_level, log_location)
-            self.logger.addHandler(handler)
+            self.__add_handler(handler)
 
             if log_style & LogStyles.TESTCLASS_LOG:
                 self._testclass_handlers.append(handler)
             if log_style & LogStyles.TESTCASE_LOG:
                 self._testcase_handlers.append(handler)
 
+    def __add_handler(self, handler):
+        """Adds a handler to the logger, or to the writer if asynchronous."""
+        if self._writer:
+            self._writer.add_handler(handler)
+        else:
+            self.logger.addHandler(handler)
+
     def __remove_handler(self, handler):
         """Removes a handler from the logger, unless it's a NullHandler."""
         if handler is not _null_handler:
@@ -426,11 +626,41 @@ class _LogStream(object):
         if not handlers:
             return
         new_dir = self.__get_current_output_dir()
+        if self._writer:
+            # Moved in order with the records, so that the records logged
+            # before the context changed still go to the previous files.
+            self._writer.submit(self.__move_handlers, handlers, new_dir)
+        else:
+            self.__move_handlers(handlers, new_dir)
+
+    @staticmethod
+    def __move_handlers(handlers, new_dir):
+        """Moves the output files of the handlers to new_dir."""
         for handler in handlers:
             filename = os.path.basename(handler.baseFilename)
             handler.set_file(os.path.join(new_dir, filename))
 
+    def flush(self):
+        """Waits until the records logged so far are written."""
+        if self._writer:
+            self._writer.wait()
+
+    def get_queue_stats(self):
+        """Returns the LogQueueStats of the LogStream, or None if it is not
+        asynchronous.
+        """
+        if not self._writer:
+            return None
+        return LogQueueStats(self._writer.queue_depth,
+                             self._writer.max_queue_size,
+                             self._writer.dropped_records)
+
     def cleanup(self):
         """Removes all LogHandlers from the logger."""
+        if self._writer:
+            self._writer.stop()
+            for handler in self._writer.handlers:
+                handler.close()
+            self._writer.handlers = []
         for handler in self.logger.handlers:
             self.__remove_handler(handler)
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Scans pcap and pcapng captures for the link layer headers of frames.
+
+The capture is memory-mapped and read in place with struct, and only the
+802.11 or Ethernet header of each frame is decoded, so scanning a capture
+costs little more than reading it. Address predicates compare the raw address
+bytes, without decoding the frames that do not match.
+"""
+
+import collections
+import mmap
+import struct
+
+LINKTYPE_ETHERNET = 1
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_PRISM_HEADER = 119
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+LINKTYPE_IEEE802_11_AVS = 163
+LINKTYPE_PPI = 192
+
+FRAME_TYPE_MANAGEMENT = 'management'
+FRAME_TYPE_CONTROL = 'control'
+FRAME_TYPE_DATA = 'data'
+FRAME_TYPE_EXTENSION = 'extension'
+FRAME_TYPE_ETHERNET = 'ethernet'
+
+_DOT11_FRAME_TYPES = (FRAME_TYPE_MANAGEMENT, FRAME_TYPE_CONTROL,
+                      FRAME_TYPE_DATA, FRAME_TYPE_EXTENSION)
+# The control frames that only have a receiver address: control wrapper, CTS
+# and ACK.
+_DOT11_CONTROL_SUBTYPES_WITHOUT_ADDR2 = (7, 12, 13)
+
+_PCAP_MAGIC_USEC = 0xa1b2c3d4
+_PCAP_MAGIC_NSEC = 0xa1b23c4d
+_PCAPNG_SECTION_HEADER_BLOCK = 0x0a0d0d0a
+_PCAPNG_BYTE_ORDER_MAGIC = 0x1a2b3c4d
+_PCAPNG_INTERFACE_DESCRIPTION_BLOCK = 1
+_PCAPNG_PACKET_BLOCK = 2
+_PCAPNG_SIMPLE_PACKET_BLOCK = 3
+_PCAPNG_ENHANCED_PACKET_BLOCK = 6
+_PCAPNG_OPTION_IF_TSRESOL = 9
+
+_HEX_BYTES = ['%02x' % i for i in range(256)]
+
+PcapFrame = collections.namedtuple('PcapFrame', [
+    'offset', 'timestamp', 'frame_type', 'subtype', 'addr1', 'addr2', 'addr3',
+    'addr4'
+])
+PcapFrame.__doc__ = """The link layer header of a captured frame.
+
+Attributes:
+    offset: The byte offset of the record of the frame in the capture.
+    timestamp: The capture time, in seconds since the epoch.
+    frame_type: One of the FRAME_TYPE_* values.
+    subtype: The 802.11 frame subtype, or the EtherType of Ethernet frames.
+    addr1: The 802.11 receiver address, or the Ethernet destination.
+    addr2: The 802.11 transmitter address, or the Ethernet source. None if
+        the frame has none.
+    addr3: The third 802.11 address, or None.
+    addr4: The fourth 802.11 address, or None.
+
+Addresses are lower case strings, such as '02:00:00:00:00:01'.
+"""
+
+# A captured record: (offset, timestamp, linktype, data offset, data length).
+_Record = collections.namedtuple(
+    '_Record', ['offset', 'timestamp', 'linktype', 'start', 'length'])
+
+
+class PcapFormatError(Exception):
+    """Raised when a capture is not a pcap or pcapng file."""
+
+
+def mac_to_bytes(mac):
+    """Converts a MAC address such as '02:00:00:00:00:01' to 6 bytes."""
+    return bytes.fromhex(mac.replace(':', '').replace('-', ''))
+
+
+def bytes_to_mac(raw):
+    """Converts 6 bytes to a MAC address such as '02:00:00:00:00:01'."""
+    if raw is None:
+        return None
+    return ':'.join([_HEX_BYTES[b] for b in raw])
+
+
+class PcapScanner(object):
+    """Reads the frames of a pcap or pcapng capture in place.
+
+    Usage:
+        with PcapScanner(pcap_path) as scanner:
+            if scanner.has_frame(addr2='02:00:00:00:00:01'):
+                ...
+
+    Attributes:
+        path: The path of the capture.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._data = b''
+        self._index = None
+        try:
+            if self._file.seek(0, 2):
+                self._data = mmap.mmap(self._file.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    def close(self):
+        """Unmaps and closes the capture."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _records(self):
+        """Yields the _Records of the capture, in order."""
+        data = self._data
+        if len(data) < 4:
+            return
+        magic_le, = struct.unpack_from('<I', data, 0)
+        if magic_le == _PCAPNG_SECTION_HEADER_BLOCK:
+            yield from self._pcapng_records()
+        elif magic_le in (_PCAP_MAGIC_USEC, _PCAP_MAGIC_NSEC):
+            yield from self._pcap_records('<', magic_le)
+        else:
+            magic_be, = struct.unpack_from('>I', data, 0)
+            if magic_be not in (_PCAP_MAGIC_USEC, _PCAP_MAGIC_NSEC):
+                raise PcapFormatError('%s is not a pcap or pcapng file.' %
+                                      self.path)
+            yield from self._pcap_records('>', magic_be)
+
+    def _pcap_records(self, endian, magic):
+        data = self._data
+        size = len(data)
+        if size < 24:
+            return
+        linktype, = struct.unpack_from(endian + 'I', data, 20)
+        linktype &= 0xffff
+        fraction = 1e-9 if magic == _PCAP_MAGIC_NSEC else 1e-6
+        record_header = struct.Struct(endian + 'IIII')
+        offset = 24
+        while offset + 16 <= size:
+            seconds, fractions, length, _ = record_header.unpack_from(
+                data, offset)
+            start = offset + 16
+            if start + length > size:
+                return
+            yield _Record(offset, seconds + fractions * fraction, linktype,
+                          start, length)
+            offset = start + length
+
+    def _pcapng_records(self):
+        data = self._data
+        size = len(data)
+        endian = '<'
+        interfaces = []
+        offset = 0
+        while offset + 12 <= size:
+            block_type, = struct.unpack_from(endian + 'I', data, offset)
+            if block_type == _PCAPNG_SECTION_HEADER_BLOCK:
+                magic, = struct.unpack_from('<I', data, offset + 8)
+                endian = '<' if magic == _PCAPNG_BYTE_ORDER_MAGIC else '>'
+                interfaces = []
+            block_length, = struct.unpack_from(endian + 'I', data, offset + 4)
+            if block_length < 12 or offset + block_length > size:
+                return
+            body = offset + 8
+            body_end = offset + block_length - 4
+            if block_type == _PCAPNG_INTERFACE_DESCRIPTION_BLOCK:
+                interfaces.append(
+                    self._read_interface(endian, body, body_end))
+            elif block_type in (_PCAPNG_ENHANCED_PACKET_BLOCK,
+                                _PCAPNG_PACKET_BLOCK):
+                if block_type == _PCAPNG_ENHANCED_PACKET_BLOCK:
+                    interface_id, high, low, length, _ = struct.unpack_from(
+                        endian + 'IIIII', data, body)
+                else:
+                    interface_id, _, high, low, length, _ = (
+                        struct.unpack_from(endian + 'HHIIII', data, body))
+                if interface_id < len(interfaces):
+                    linktype, resolution = interfaces[interface_id]
+                    yield _Record(offset, ((high << 32) | low) * resolution,
+                                  linktype, body + 20, length)
+            elif block_type == _PCAPNG_SIMPLE_PACKET_BLOCK and interfaces:
+                length, = struct.unpack_from(endian + 'I', data, body)
+                yield _Record(offset, None, interfaces[0][0], body + 4,
+                              min(length, body_end - body - 4))
+            offset += block_length
+
+    def _read_interface(self, endian, body, body_end):
+        """Returns the (linktype, timestamp resolution) of an interface."""
+        data = self._data
+        linktype, = struct.unpack_from(endian + 'H', data, body)
+        resolution = 1e-6
+        offset = body + 8
+        while offset + 4 <= body_end:
+            code, length = struct.unpack_from(endian + 'HH', data, offset)
+            if code == 0:
+                break
+            if code == _PCAPNG_OPTION_IF_TSRESOL and length >= 1:
+                value = data[offset + 4]
+                if value & 0x80:
+                    resolution = 2.0**-(value & 0x7f)
+                else:
+                    resolution = 10.0**-value
+            offset += 4 + (length + 3) // 4 * 4
+        return linktype, resolution
+
+    def _get_link_header(self, record):
+        """Returns the (start, end) of the 802.11 or Ethernet header of a
+        record, and whether it is 802.11, or None if it cannot be found.
+        """
+        data = self._data
+        start = record.start
+        end = start + record.length
+        linktype = record.linktype
+        if linktype == LINKTYPE_ETHERNET:
+            return start, end, False
+        if linktype == LINKTYPE_IEEE802_11:
+            return start, end, True
+        if linktype == LINKTYPE_IEEE802_11_RADIOTAP:
+            if record.length < 4:
+                return None
+            header_length, = struct.unpack_from('<H', data, start + 2)
+        elif linktype == LINKTYPE_PPI:
+            if record.length < 4:
+                return None
+            header_length, = struct.unpack_from('<H', data, start + 2)
+        elif linktype == LINKTYPE_PRISM_HEADER:
+            if record.length < 8:
+                return None
+            header_length, = struct.unpack_from('<I', data, start + 4)
+        elif linktype == LINKTYPE_IEEE802_11_AVS:
+            if record.length < 8:
+                return None
+            header_length, = struct.unpack_from('>I', data, start + 4)
+        else:
+            return None
+        return start + header_length, end, True
+
+    def _get_address_offsets(self, record):
+        """Returns the frame type, subtype and the offsets of the addresses of
+        a record, or None if it has no link header.
+
+        The offset of each address missing from the frame is None.
+        """
+        header = self._get_link_header(record)
+        if header is None:
+            return None
+        start, end, is_dot11 = header
+        data = self._data
+        if not is_dot11:
+            if end - start < 14:
+                return None
+            ethertype, = struct.unpack_from('>H', data, start + 12)
+            return (FRAME_TYPE_ETHERNET, ethertype, start, start + 6, None,
+                    None)
+        if end - start < 10:
+            return None
+        frame_control = data[start]
+        flags = data[start + 1]
+        frame_type = (frame_control >> 2) & 0x3
+        subtype = frame_control >> 4
+        length = end - start
+        addr2 = addr3 = addr4 = None
+        if frame_type == 1:
+            if (subtype not in _DOT11_CONTROL_SUBTYPES_WITHOUT_ADDR2
+                    and length >= 16):
+                addr2 = start + 10
+        elif frame_type != 3 and length >= 22:
+            addr2 = start + 10
+            addr3 = start + 16
+            if frame_type == 2 and flags & 0x3 == 0x3 and length >= 30:
+                addr4 = start + 24
+        return (_DOT11_FRAME_TYPES[frame_type], subtype, start + 4, addr2,
+                addr3, addr4)
+
+    def _decode(self, record, address_offsets):
+        data = self._data
+        frame_type, subtype = address_offsets[:2]
+        addresses = [
+            None if offset is None else bytes_to_mac(data[offset:offset + 6])
+            for offset in address_offsets[2:]
+        ]
+        return PcapFrame(record.offset, record.timestamp, frame_type, subtype,
+                         *addresses)
+
+    def frames(self):
+        """Yields the PcapFrame of each frame with a supported link layer."""
+        for record in self._records():
+            address_offsets = self._get_address_offsets(record)
+            if address_offsets is not None:
+                yield self._decode(record, address_offsets)
+
+    def build_index(self):
+        """Indexes the frames of the capture by address.
+
+        Once indexed, find_frames and has_frame only read the frames holding
+        the addresses they look for. Worth it when the capture is queried for
+        several addresses.
+        """
+        data = self._data
+        index = collections.defaultdict(list)
+        for record in self._records():
+            address_offsets = self._get_address_offsets(record)
+            if address_offsets is None:
+                continue
+            addresses = set(data[offset:offset + 6]
+                            for offset in address_offsets[2:]
+                            if offset is not None)
+            for address in addresses:
+                index[address].append(record)
+        self._index = dict(index)
+
+    def find_frames(self,
+                    addr=None,
+                    addr1=None,
+                    addr2=None,
+                    addr3=None,
+                    addr4=None,
+                    frame_type=None):
+        """Yields the PcapFrames matching every given criterion.
+
+        Args:
+            addr: An address found in any address field.
+            addr1: The 802.11 receiver address, or the Ethernet destination.
+            addr2: The 802.11 transmitter address, or the Ethernet source.
+            addr3: The third 802.11 address.
+            addr4: The fourth 802.11 address.
+            frame_type: One of the FRAME_TYPE_* values.
+        """
+        data = self._data
+        any_address = mac_to_bytes(addr) if addr else None
+        fields = [(i, mac_to_bytes(mac))
+                  for i, mac in enumerate((addr1, addr2, addr3, addr4), 2)
+                  if mac]
+        records = None
+        if self._index is not None:
+            if any_address is not None:
+                records = self._index.get(any_address, [])
+            elif fields:
+                records = self._index.get(fields[0][1], [])
+        if records is None:
+            records = self._records()
+        for record in records:
+            address_offsets = self._get_address_offsets(record)
+            if address_offsets is None:
+                continue
+            if frame_type is not None and address_offsets[0] != frame_type:
+                continue
+            if any(address_offsets[i] is None
+                   or data[address_offsets[i]:address_offsets[i] + 6] != mac
+                   for i, mac in fields):
+                continue
+            if any_address is not None and not any(
+                    offset is not None
+                    and data[offset:offset + 6] == any_address
+                    for offset in address_offsets[2:]):
+                continue
+            yield self._decode(record, address_offsets)
+
+    def find_frame(self, **criteria):
+        """Returns the first PcapFrame matching the criteria of find_frames,
+        or None.
+        """
+        return next(self.find_frames(**criteria), None)
+
+    def has_frame(self, **criteria):
+        """Returns whether any frame matches the criteria of find_frames."""
+        return self.find_frame(**criteria) is not None
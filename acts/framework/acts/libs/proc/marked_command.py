@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Runs commands on a long-lived shell, one after the other.
+
+Each command is written to the stdin of the shell wrapped in a script that
+runs it in a subshell with no stdin, so it cannot change the state of the
+shell or consume the commands that follow it. Markers are then written to
+stdout and stderr, the one on stdout followed by the exit status of the
+command, so the output of each command can be told apart from the next one's.
+
+A command may also be skipped when the command before it failed, so that a
+sequence of commands written at once still stops at the first failure.
+"""
+
+import shlex
+import uuid
+
+_RUN_SCRIPT = '(eval %s) </dev/null; __acts_status=$?; '
+_MARKER_SCRIPT = ('printf \'\\n%s\\n\' >&2; '
+                  'printf \'\\n%s %%d\\n\' "$__acts_status"\n')
+
+
+class MarkedCommand(object):
+    """A command wrapped with the markers that end its output.
+
+    Attributes:
+        command: The shell command to run.
+        script: The script to write to the shell to run the command.
+        stdout_end: The bytes that end the stdout of the command. They are
+            followed by the exit status and a newline.
+        stderr_end: The bytes that end the stderr of the command.
+    """
+
+    def __init__(self, command, skip_after_failure=False):
+        """
+        Args:
+            command: The shell command to run.
+            skip_after_failure: Whether to skip the command if the command
+                run before it on the same shell failed. A skipped command has
+                no output, and reports the exit status of the failed one.
+        """
+        marker = uuid.uuid4().hex
+        self.command = command
+        run_script = _RUN_SCRIPT % shlex.quote(command)
+        if skip_after_failure:
+            run_script = ('if [ "$__acts_status" = 0 ]; then %sfi; ' %
+                          run_script)
+        self.script = run_script + _MARKER_SCRIPT % (marker, marker)
+        self.stdout_end = ('\n%s ' % marker).encode()
+        self.stderr_end = ('\n%s\n' % marker).encode()
+
+
+def parse_exit_status(status_line):
+    """Returns the exit status written after the stdout marker.
+
+    Args:
+        status_line: The bytes between stdout_end and the newline that
+            follows it, with or without the newline.
+
+    Raises:
+        ValueError if the line does not hold an exit status.
+    """
+    status = status_line.rstrip(b'\n')
+    if not status.isdigit():
+        raise ValueError('Invalid exit status line: %r' % status_line)
+    return int(status)
@@ -69,12 +69,14 @@ class Process(object):
         self._redirection_thread = None
         self._on_output_callback = lambda *args, **kw: None
         self._binary_output = False
+        self._chunk_size = 1024
         self._on_terminate_callback = lambda *args, **kw: ''
 
         self._started = False
         self._stopped = False
 
-    def set_on_output_callback(self, on_output_callback, binary=False):
+    def set_on_output_callback(self, on_output_callback, binary=False,
+                               chunk_size=1024):
         """Sets the on_output_callback function.
 
         Args:
@@ -85,11 +87,15 @@ class Process(object):
                 >>>     return None
 
             binary: If True, read the process output as raw binary.
+            chunk_size: The maximal number of bytes passed to each call if
+                binary. Each call receives whatever output is available, up to
+                chunk_size bytes.
         Returns:
             self
         """
         self._on_output_callback = on_output_callback
         self._binary_output = binary
+        self._chunk_size = chunk_size
         return self
 
     def set_on_terminate_callback(self, on_terminate_callback):
@@ -201,7 +207,7 @@ class Process(object):
         """Redirects the output from the command into the on_output_callback."""
         if self._binary_output:
             while True:
-                data = self._process.stdout.read(1024)
+                data = self._process.stdout.read1(self._chunk_size)
 
                 if not data:
                     return
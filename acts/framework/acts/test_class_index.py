@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""A persistent index of the test classes found in each test module.
+
+Finding the module of a test class used to require importing every test
+module, along with all of its dependencies. The index instead finds the names
+of the classes a module may export by parsing its source, and caches them by
+the module's path, modification time and size, so only modified modules are
+parsed again.
+"""
+
+import ast
+import json
+import logging
+import os
+import tempfile
+
+# The default location of the index file.
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'acts',
+                                  'test_class_index.json')
+
+# Changing the way class names are found requires a new version, so that
+# entries from older versions are discarded.
+INDEX_VERSION = 1
+
+
+def _is_test_class_name(name):
+    """Returns whether TestRunner treats the module member as a test class."""
+    return not name.startswith('__') and name.endswith('Test')
+
+
+def find_test_class_names(source):
+    """Finds the names of the test classes a module may define.
+
+    This includes the classes and other names bound at the top level of the
+    module, such as imported classes, since these are also module members.
+    Plain imports are skipped, since they only bind modules.
+
+    Args:
+        source: The source code of the module.
+
+    Returns:
+        A sorted list of the test class names.
+
+    Raises:
+        SyntaxError if the source cannot be parsed.
+    """
+    names = set()
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.ClassDef):
+            names.add(node.name)
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                names.add(alias.asname or alias.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names.add(target.id)
+    return sorted(name for name in names if _is_test_class_name(name))
+
+
+class TestClassIndex(object):
+    """A persistent index of the test class names defined by test modules.
+
+    Attributes:
+        path: The path of the index file.
+        _entries: A dictionary of {module path: entry}, where each entry is a
+                  dictionary holding the mtime_ns and size of the module when
+                  it was indexed, and its sorted test class names. The names
+                  are None if the module could not be parsed.
+        _modified: Whether the entries have changed since they were loaded.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._entries = {}
+        self._modified = False
+
+    def load(self):
+        """Loads the entries from the index file, if it exists and is valid."""
+        self._entries = {}
+        self._modified = False
+        try:
+            with open(self.path, 'r') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.debug('Ignoring unreadable test class index %s: %s',
+                          self.path, e)
+            return
+        if (isinstance(index, dict)
+                and index.get('version') == INDEX_VERSION
+                and isinstance(index.get('modules'), dict)):
+            self._entries = index['modules']
+
+    def save(self):
+        """Writes the entries to the index file if they have changed.
+
+        The file is replaced atomically, so concurrent test runs never read a
+        partially written index. Failing to write the index is not an error,
+        since it only slows down the next run.
+        """
+        if not self._modified:
+            return
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': INDEX_VERSION,
+                           'modules': self._entries}, f)
+            os.replace(tmp_path, self.path)
+            self._modified = False
+        except OSError as e:
+            logging.debug('Unable to write test class index %s: %s',
+                          self.path, e)
+
+    def clear(self):
+        """Removes all entries and deletes the index file."""
+        self._entries = {}
+        self._modified = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def get_test_class_names(self, module_path):
+        """Returns the test class names of the module at the given path.
+
+        The module is only parsed if it is not indexed, or if it has changed
+        since it was indexed.
+
+        Args:
+            module_path: The path of the module's source file.
+
+        Returns:
+            A sorted list of the test class names, or None if the module
+            could not be read or parsed.
+        """
+        module_path = os.path.abspath(module_path)
+        try:
+            stat = os.stat(module_path)
+        except OSError:
+            return None
+        entry = self._entries.get(module_path)
+        if (entry is not None and entry.get('mtime_ns') == stat.st_mtime_ns
+                and entry.get('size') == stat.st_size):
+            return entry.get('classes')
+
+        try:
+            with open(module_path, 'rb') as f:
+                class_names = find_test_class_names(f.read())
+        except (OSError, SyntaxError, ValueError) as e:
+            logging.debug('Unable to parse %s: %s', module_path, e)
+            class_names = None
+        self._entries[module_path] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'classes': class_names,
+        }
+        self._modified = True
+        return class_names
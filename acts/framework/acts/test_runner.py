@@ -34,11 +34,17 @@ from acts import keys
 from acts import logger
 from acts import records
 from acts import signals
+from acts import test_class_index
 from acts import utils
 from acts import error
+from acts.event import event_bus
 
 from mobly.records import ExceptionRecord
 
+# The maximum number of seconds to wait for asynchronous event subscribers to
+# finish handling a test run's events.
+EVENT_BUS_FLUSH_TIMEOUT = 60
+
 
 def _find_test_class():
     """Finds the test class in a test script.
@@ -107,6 +113,8 @@ class TestRunner(object):
         results: The test result object used to record the results of this test
             run.
         running: A boolean signifies whether this test run is ongoing or not.
+        test_class_index_path: The path of the TestClassIndex used to find the
+            modules of the test classes on the run list.
     """
     def __init__(self, test_configs, run_list):
         self.test_run_config = test_configs
@@ -125,6 +133,7 @@ class TestRunner(object):
         self.results = records.TestResult()
         self.running = False
         self.usage_publisher = UsageMetadataPublisher()
+        self.test_class_index_path = test_class_index.DEFAULT_INDEX_PATH
 
     @property
     def log_path(self):
@@ -140,9 +149,13 @@ class TestRunner(object):
         """Imports test classes from test scripts.
 
         1. Locate all .py files under test paths.
-        2. Import the .py files as modules.
-        3. Find the module members that are test classes.
-        4. Categorize the test classes by name.
+        2. Find the test class names of each file in the test class index.
+        3. Import the .py files that may define test classes on the run list
+           as modules. If the index finds no match for a run list entry, for
+           instance because the class is created dynamically, every file is
+           imported instead.
+        4. Find the module members that are test classes.
+        5. Categorize the test classes by name.
 
         Args:
             test_paths: A list of directory paths where the test files reside.
@@ -158,8 +171,34 @@ class TestRunner(object):
             return False
 
         file_list = utils.find_files(test_paths, is_testfile_name)
+        index = test_class_index.TestClassIndex(self.test_class_index_path)
+        index.load()
+        patterns = [test_cls_name for test_cls_name, _ in self.run_list]
+        unmatched_patterns = set(patterns)
+        selected_files = []
+        for path, name, ext in file_list:
+            class_names = index.get_test_class_names(
+                os.path.join(path, name + ext))
+            if class_names is None:
+                # Let the import surface the error, as it would without the
+                # index.
+                selected_files.append((path, name, ext))
+                continue
+            matched = {pattern for pattern in patterns
+                       if fnmatch.filter(class_names, pattern)}
+            if matched:
+                unmatched_patterns -= matched
+                selected_files.append((path, name, ext))
+        index.save()
+        if unmatched_patterns:
+            self.log.debug('No indexed test classes match %s. Importing all '
+                           'test files.', sorted(unmatched_patterns))
+            selected_files = file_list
+        self.log.debug('Importing %d of %d test files.', len(selected_files),
+                       len(file_list))
+
         test_classes = {}
-        for path, name, _ in file_list:
+        for path, name, _ in selected_files:
             sys.path.append(path)
             try:
                 with utils.SuppressLogOutput(
@@ -304,6 +343,12 @@ class TestRunner(object):
         This function concludes a test run and writes out a test report.
         """
         if self.running:
+            # Let asynchronous subscribers finish handling the run's events.
+            if not event_bus.flush(timeout=EVENT_BUS_FLUSH_TIMEOUT):
+                self.log.warning(
+                    'Asynchronous event subscribers did not finish within '
+                    '%s seconds. Their remaining events may be lost.',
+                    EVENT_BUS_FLUSH_TIMEOUT)
             msg = '\nSummary for test run %s: %s\n' % (
                 self.id, self.results.summary_str())
             self._write_results_to_file()
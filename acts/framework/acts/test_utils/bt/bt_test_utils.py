@@ -14,6 +14,7 @@
 # License for the specific language governing permissions and limitations under
 # the License.
 
+import contextlib
 import logging
 import os
 import random
@@ -740,6 +741,7 @@ def get_bt_metric(ad_list, duration=1, tag="bt_metric", processed=True):
         "rssi": "RSSI:\s[-](\d+)"
     }
     metrics_dict = {"rssi": {}, "pwlv": {}, "vsp_txpl": {}}
+    bqr_tag = "Handle:"
 
     # Converting a single android device object to list
     if not isinstance(ad_list, list):
@@ -750,23 +752,37 @@ def get_bt_metric(ad_list, duration=1, tag="bt_metric", processed=True):
         ad.droid.setTime(int(round(time.time() * 1000)))
         time.sleep(0.5)
 
-    begin_time = utils.get_current_epoch_time()
-    time.sleep(duration)
-    end_time = utils.get_current_epoch_time()
+    # Collect the bqr lines as logcat streams them, if it is running
+    bqr_lines = {}
+    with contextlib.ExitStack() as subscriptions:
+        for ad in ad_list:
+            if ad.is_adb_logcat_on:
+                lines = bqr_lines[ad.serial] = []
+                subscriptions.enter_context(
+                    ad.logcat.subscribe(
+                        re.escape(bqr_tag),
+                        callback=lambda match, lines=lines: lines.append(
+                            match.line)))
+
+        begin_time = utils.get_current_epoch_time()
+        time.sleep(duration)
+        end_time = utils.get_current_epoch_time()
 
     for ad in ad_list:
-        bt_rssi_log = ad.cat_adb_log(tag, begin_time, end_time)
-        bqr_tag = "Handle:"
+        if ad.serial not in bqr_lines:
+            bt_rssi_log = ad.cat_adb_log(tag, begin_time, end_time)
+            with open(bt_rssi_log, "r") as file_bt_log:
+                bqr_lines[ad.serial] = [
+                    line for line in file_bt_log if bqr_tag in line
+                ]
 
         # Extracting supporting bqr quantities
         for metric, regex in regex_dict.items():
             bqr_metric = []
-            file_bt_log = open(bt_rssi_log, "r")
-            for line in file_bt_log:
-                if bqr_tag in line:
-                    if re.findall(regex, line):
-                        m = re.findall(regex, line)[0].strip(",")
-                        bqr_metric.append(m)
+            for line in bqr_lines[ad.serial]:
+                if re.findall(regex, line):
+                    m = re.findall(regex, line)[0].strip(",")
+                    bqr_metric.append(m)
             metrics_dict[metric][ad.serial] = bqr_metric
 
         # Ensures back-compatibility for vsp_txpl enabled DUTs
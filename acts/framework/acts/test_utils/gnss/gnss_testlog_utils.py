@@ -16,8 +16,12 @@
 '''Python Module for GNSS test log utilities.'''
 
 import re as regex
-import datetime
 import functools as fts
+import hashlib
+import io
+import multiprocessing
+import os
+import pickle
 import numpy as npy
 import pandas as pds
 from acts import logger
@@ -124,8 +128,221 @@ CONFIG_GPSTTFFLOG = {
 
 LOGPARSE_UTIL_LOGGER = logger.create_logger()
 
+# Number of bytes of a log parsed by each worker process
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
 
-def parse_log_to_df(filename, configs, index_rownum=True):
+# Regex characters which end the literal prefix of a pattern
+REGEX_SPECIAL_CHARS = '.^$*+?{}[]|()'
+# Regex quantifiers which make the preceding character optional
+REGEX_OPTIONAL_QUANTIFIERS = '*?{'
+
+
+def get_literal_prefix(regex_string):
+    r"""Get the literal text every match of a regex starts with.
+
+    Args:
+      regex_string: regex of the config pattern.
+        Type Raw String.
+
+    Returns:
+      prefix: the literal prefix, empty if the regex has none.
+        Type String.
+      is_line_start: whether the regex only matches at the line start.
+        Type Boolean.
+
+    Examples:
+      get_literal_prefix(r'^Speed:\s+(?P<Speed>\d+.\d+)')
+      returns ('Speed:', True)
+    """
+    is_line_start = regex_string.startswith('^')
+    prefix = []
+    idx_char = 1 if is_line_start else 0
+    in_prefix = True
+    while idx_char < len(regex_string):
+        char = regex_string[idx_char]
+        if char == '\\':
+            escaped = regex_string[idx_char + 1:idx_char + 2]
+            # \d, \s, \w and the like are character classes, not literals.
+            if escaped.isalnum() or not escaped:
+                in_prefix = False
+            elif in_prefix:
+                prefix.append(escaped)
+            idx_char += 2
+            continue
+        if char == '|':
+            # A top level alternative may start with anything.
+            return '', is_line_start
+        if in_prefix:
+            if char in REGEX_OPTIONAL_QUANTIFIERS and prefix:
+                prefix.pop()
+            if char in REGEX_SPECIAL_CHARS:
+                in_prefix = False
+            else:
+                prefix.append(char)
+        idx_char += 1
+    return ''.join(prefix), is_line_start
+
+
+class LogLineDispatcher(object):
+    """Dispatch each log line to the config patterns it may match.
+
+    Rather than searching every line with every pattern, lines are prefiltered
+    by the literal prefix of each pattern, so only the patterns a line may
+    match are searched.
+
+    Attributes:
+      cregexes: compiled regex of each config pattern.
+        Type dictionary.
+    """
+    def __init__(self, configs):
+        """
+        Args:
+          configs: configs dictionary of parsed Pandas dataframes.
+            Type dictionary, see parse_log_to_df.
+        """
+        self.cregexes = {}
+        line_start_prefixes = {}
+        self._substring_keys = []
+        self._fallback_keys = []
+        for key, regex_string in configs.items():
+            self.cregexes[key] = regex.compile(regex_string)
+            prefix, is_line_start = get_literal_prefix(regex_string)
+            if prefix and is_line_start:
+                line_start_prefixes[key] = prefix
+            elif prefix:
+                self._substring_keys.append((prefix, key))
+            else:
+                self._fallback_keys.append(key)
+
+        # The prefilter matches the longest prefix a line starts with, whose
+        # candidates include the patterns of every shorter prefix of it.
+        prefixes = sorted(set(line_start_prefixes.values()),
+                          key=len,
+                          reverse=True)
+        self._prefix_candidates = {
+            prefix: [
+                key for key in configs
+                if key in line_start_prefixes
+                and prefix.startswith(line_start_prefixes[key])
+            ]
+            for prefix in prefixes
+        }
+        self._prefix_cregex = None
+        if prefixes:
+            self._prefix_cregex = regex.compile('|'.join(
+                regex.escape(prefix) for prefix in prefixes))
+
+    def get_candidates(self, line):
+        """Get the config patterns a log line may match.
+
+        Args:
+          line: log line.
+            Type String.
+
+        Returns:
+          keys: config keys of the candidate patterns.
+            Type List.
+        """
+        candidates = []
+        if self._prefix_cregex:
+            matched_prefix = self._prefix_cregex.match(line)
+            if matched_prefix:
+                candidates = self._prefix_candidates[matched_prefix.group()]
+        if self._substring_keys:
+            candidates = candidates + [
+                key for prefix, key in self._substring_keys if prefix in line
+            ]
+        if self._fallback_keys:
+            candidates = candidates + self._fallback_keys
+        return candidates
+
+    def parse_lines(self, lines, first_rownumber=1):
+        """Parse log lines to lists of matched data.
+
+        Args:
+          lines: log lines.
+            Type iterable of String.
+          first_rownumber: row number of the first line.
+            Type Integer.
+
+        Returns:
+          datalists: dictionary of parsed data.
+            Type dictionary.
+            dict key, the parsed pattern name, such as 'Speed',
+            dict value, list of the matched data dictionary of each row.
+        """
+        datalists = {key: [] for key in self.cregexes}
+        for idx_line, current_line in enumerate(lines, first_rownumber):
+            for key in self.get_candidates(current_line):
+                matched_log_object = self.cregexes[key].search(current_line)
+
+                if matched_log_object:
+                    matched_data = matched_log_object.groupdict()
+                    matched_data['rownumber'] = idx_line
+                    datalists[key].append(matched_data)
+        return datalists
+
+
+def get_log_chunks(filename, chunk_size):
+    """Split a log file to byte ranges ending at line boundaries.
+
+    Args:
+      filename: log file name.
+        Type String.
+      chunk_size: approximate number of bytes of each chunk.
+        Type Integer.
+
+    Returns:
+      chunks: list of (start, end) byte offsets.
+        Type List.
+    """
+    file_size = os.path.getsize(filename)
+    chunks = []
+    start = 0
+    with open(filename, 'rb') as fid:
+        while start < file_size:
+            fid.seek(start + chunk_size)
+            fid.readline()
+            end = min(fid.tell(), file_size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def parse_log_chunk(filename, configs, start, end):
+    """Parse a byte range of a log file, for a worker process.
+
+    Returns:
+      datalists: dictionary of parsed data, with row numbers counted from
+        the start of the chunk.
+        Type dictionary, see LogLineDispatcher.parse_lines.
+      line_count: number of lines in the chunk.
+        Type Integer.
+    """
+    with open(filename, 'rb') as fid:
+        fid.seek(start)
+        data = fid.read(end - start)
+    # Decode as open(filename, 'r') does.
+    lines = io.TextIOWrapper(io.BytesIO(data)).readlines()
+    return LogLineDispatcher(configs).parse_lines(lines), len(lines)
+
+
+def get_log_cache_key(filename, configs, index_rownum):
+    """Get the cache key of a parsed log, from the hash of its content."""
+    log_hash = hashlib.sha256()
+    log_hash.update(repr((sorted(configs.items()), index_rownum)).encode())
+    with open(filename, 'rb') as fid:
+        for data in iter(lambda: fid.read(1024 * 1024), b''):
+            log_hash.update(data)
+    return log_hash.hexdigest()
+
+
+def parse_log_to_df(filename,
+                    configs,
+                    index_rownum=True,
+                    cache_dir=None,
+                    processes=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
     r"""Parse log to a dictionary of Pandas dataframes.
 
     Args:
@@ -139,6 +356,17 @@ def parse_log_to_df(filename, configs, index_rownum=True):
       index_rownum: index row number from raw data.
         Type Boolean.
         Default, True.
+      cache_dir: directory to cache parsed data in, keyed by the hash of the
+        log content. The log is parsed again once it changes.
+        Type String.
+        Default, None, not to cache parsed data.
+      processes: maximum number of worker processes.
+        Type Integer.
+        Default, None, the number of CPUs.
+      chunk_size: number of bytes parsed by each worker process. Logs no
+        larger than this are parsed in the current process.
+        Type Integer.
+        Default, DEFAULT_CHUNK_SIZE.
 
     Returns:
       parsed_data: dictionary of parsed data.
@@ -154,49 +382,96 @@ def parse_log_to_df(filename, configs, index_rownum=True):
           'Speed': r'Speed:\s+(?P<Speed>\d+.\d+)',
       }
     """
-    # Init a local config dictionary to hold compiled regex and match dict.
-    configs_local = {}
+    cache_file = None
+    if cache_dir:
+        cache_file = os.path.join(
+            cache_dir,
+            get_log_cache_key(filename, configs, index_rownum) + '.pkl')
+        try:
+            with open(cache_file, 'rb') as fid:
+                LOGPARSE_UTIL_LOGGER.debug('Loading parsed "%s" from "%s".',
+                                           filename, cache_file)
+                return pickle.load(fid)
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, pickle.UnpicklingError) as err:
+            LOGPARSE_UTIL_LOGGER.warning('Ignoring cache file "%s": %s',
+                                         cache_file, err)
+
+    chunks = get_log_chunks(filename, chunk_size)
+    if processes is None:
+        processes = os.cpu_count()
+    processes = min(processes, len(chunks))
+
+    if processes > 1:
+        # Parse each chunk in a worker process, then offset the row numbers
+        # of each chunk by the lines before it.
+        with multiprocessing.Pool(processes) as pool:
+            chunk_results = pool.starmap(
+                parse_log_chunk,
+                [(filename, configs, start, end) for start, end in chunks])
+        datalists = {key: [] for key in configs}
+        line_offset = 0
+        for chunk_datalists, line_count in chunk_results:
+            for key, datalist in chunk_datalists.items():
+                for matched_data in datalist:
+                    matched_data['rownumber'] += line_offset
+                datalists[key].extend(datalist)
+            line_offset += line_count
+    else:
+        # Open the file, loop and parse
+        with open(filename, 'r') as fid:
+            datalists = LogLineDispatcher(configs).parse_lines(fid)
+
     # Construct parsed data dictionary
     parsed_data = {}
-
-    # Loop the config dictionary to compile regex and init data list
-    for key, regex_string in configs.items():
-        configs_local[key] = {
-            'cregex': regex.compile(regex_string),
-            'datalist': [],
-        }
-
-    # Open the file, loop and parse
-    with open(filename, 'r') as fid:
-
-        for idx_line, current_line in enumerate(fid):
-            for _, config in configs_local.items():
-                matched_log_object = config['cregex'].search(current_line)
-
-                if matched_log_object:
-                    matched_data = matched_log_object.groupdict()
-                    matched_data['rownumber'] = idx_line + 1
-                    config['datalist'].append(matched_data)
-
-    # Loop to generate parsed data from configs list
-    for key, config in configs_local.items():
-        parsed_data[key] = pds.DataFrame(config['datalist'])
+    for key, datalist in datalists.items():
+        parsed_data[key] = pds.DataFrame(datalist)
         if index_rownum and not parsed_data[key].empty:
             parsed_data[key].set_index('rownumber', inplace=True)
         elif parsed_data[key].empty:
             LOGPARSE_UTIL_LOGGER.debug(
                 'The parsed dataframe of "%s" is empty.', key)
 
+    if cache_file:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first, so that concurrent parses of the
+        # same log never read a partially written cache file.
+        temp_file = '%s.%d.tmp' % (cache_file, os.getpid())
+        with open(temp_file, 'wb') as fid:
+            pickle.dump(parsed_data, fid, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+
     # Return parsed data list
     return parsed_data
 
 
-def parse_gpstool_ttfflog_to_df(filename):
+def to_datetime(date_series, time_series):
+    """Convert date and time columns of a log to datetimes.
+
+    Args:
+      date_series: dates, such as '2020/01/01'.
+        Type, Pandas Series.
+      time_series: times, such as '12:00:00'.
+        Type, Pandas Series.
+
+    Returns:
+      datetime_series: the corresponding datetimes.
+        Type, Pandas Series.
+    """
+    return pds.to_datetime(date_series + '-' + time_series,
+                           format='%Y/%m/%d-%H:%M:%S')
+
+
+def parse_gpstool_ttfflog_to_df(filename, cache_dir=None):
     """Parse GPSTool ttff log to Pandas dataframes.
 
     Args:
       filename: full log file name.
         Type, String.
+      cache_dir: directory to cache parsed data in.
+        Type, String.
+        Default, None, not to cache parsed data.
 
     Returns:
       ttff_df: TTFF Data Frame.
@@ -206,6 +481,7 @@ def parse_gpstool_ttfflog_to_df(filename):
     parsed_data = parse_log_to_df(
         filename=filename,
         configs=CONFIG_GPSTTFFLOG,
+        cache_dir=cache_dir,
     )
     ttff_df = parsed_data['ttff_info']
 
@@ -222,12 +498,15 @@ def parse_gpstool_ttfflog_to_df(filename):
     return ttff_df
 
 
-def parse_gpsapilog_to_df(filename):
+def parse_gpsapilog_to_df(filename, cache_dir=None):
     """Parse GPS API log to Pandas dataframes.
 
     Args:
       filename: full log file name.
         Type, String.
+      cache_dir: directory to cache parsed data in.
+        Type, String.
+        Default, None, not to cache parsed data.
 
     Returns:
       timestamp_df: Timestamp Data Frame.
@@ -240,41 +519,29 @@ def parse_gpsapilog_to_df(filename):
         Type, Pandas DataFrame.
         include Provider, Latitude, Longitude, Altitude, GNSSTime, Speed, Bearing
     """
-    def get_phone_time(target_df_row, timestamp_df):
-        """subfunction to get the phone_time."""
-
-        try:
-            row_num = timestamp_df[
-                timestamp_df.index < target_df_row.name].iloc[-1].name
-            phone_time = timestamp_df.loc[row_num]['phone_time']
-        except IndexError:
-            row_num = npy.NaN
-            phone_time = npy.NaN
-
-        return phone_time, row_num
-
     # Get parsed dataframe list
     parsed_data = parse_log_to_df(
         filename=filename,
         configs=CONFIG_GPSAPILOG,
+        cache_dir=cache_dir,
     )
 
     # get DUT Timestamp
     timestamp_df = parsed_data['phone_time']
-    timestamp_df['phone_time'] = timestamp_df.apply(
-        lambda row: datetime.datetime.strptime(row.date + '-' + row.time,
-                                               '%Y/%m/%d-%H:%M:%S'),
-        axis=1)
+    timestamp_df['phone_time'] = to_datetime(timestamp_df['date'],
+                                             timestamp_df['time'])
 
-    # Add phone_time from timestamp_df dataframe by row number
+    # Add phone_time and its row number from the last timestamp before each
+    # row, by a sorted as-of merge on the row numbers
+    phone_time_df = timestamp_df[['phone_time']].assign(
+        time_row_num=timestamp_df.index)
     for key in parsed_data:
-        if key != 'phone_time':
-            current_df = parsed_data[key]
-            time_n_row_num = current_df.apply(get_phone_time,
-                                              axis=1,
-                                              timestamp_df=timestamp_df)
-            current_df[['phone_time', 'time_row_num'
-                        ]] = pds.DataFrame(time_n_row_num.apply(pds.Series))
+        if (key != 'phone_time') and (not parsed_data[key].empty):
+            parsed_data[key] = pds.merge_asof(parsed_data[key],
+                                              phone_time_df,
+                                              left_index=True,
+                                              right_index=True,
+                                              allow_exact_matches=False)
 
     # Get space vehicle info dataframe
     sv_info_df = parsed_data['SpaceVehicle']
@@ -305,20 +572,21 @@ def parse_gpsapilog_to_df(filename):
                             parsed_data[LIST_LOCINFO[0]],
                             on='time_row_num')
     # Convert GNSS Time
-    loc_info_df['gnsstime'] = loc_info_df.apply(
-        lambda row: datetime.datetime.strptime(row.Date + '-' + row.Time,
-                                               '%Y/%m/%d-%H:%M:%S'),
-        axis=1)
+    loc_info_df['gnsstime'] = to_datetime(loc_info_df['Date'],
+                                          loc_info_df['Time'])
 
     return timestamp_df, sv_info_df, sv_stat_df, loc_info_df
 
 
-def parse_gpsapilog_to_df_v2(filename):
+def parse_gpsapilog_to_df_v2(filename, cache_dir=None):
     """Parse GPS API log to Pandas dataframes, by using merge_asof.
 
     Args:
       filename: full log file name.
         Type, String.
+      cache_dir: directory to cache parsed data in.
+        Type, String.
+        Default, None, not to cache parsed data.
 
     Returns:
       timestamp_df: Timestamp Data Frame.
@@ -335,14 +603,13 @@ def parse_gpsapilog_to_df_v2(filename):
     parsed_data = parse_log_to_df(
         filename=filename,
         configs=CONFIG_GPSAPILOG,
+        cache_dir=cache_dir,
     )
 
     # get DUT Timestamp
     timestamp_df = parsed_data['phone_time']
-    timestamp_df['phone_time'] = timestamp_df.apply(
-        lambda row: datetime.datetime.strptime(row.date + '-' + row.time,
-                                               '%Y/%m/%d-%H:%M:%S'),
-        axis=1)
+    timestamp_df['phone_time'] = to_datetime(timestamp_df['date'],
+                                             timestamp_df['time'])
     # drop logsize, date, time
     parsed_data['phone_time'] = timestamp_df.drop(['logsize', 'date', 'time'],
                                                   axis=1)
@@ -397,10 +664,8 @@ def parse_gpsapilog_to_df_v2(filename):
                             parsed_data[LIST_LOCINFO[0]],
                             on='phone_time')
     # Convert GNSS Time
-    loc_info_df['gnsstime'] = loc_info_df.apply(
-        lambda row: datetime.datetime.strptime(row.Date + '-' + row.Time,
-                                               '%Y/%m/%d-%H:%M:%S'),
-        axis=1)
+    loc_info_df['gnsstime'] = to_datetime(loc_info_df['Date'],
+                                          loc_info_df['Time'])
 
     # Data Conversion
     timestamp_df['logsize'] = timestamp_df['logsize'].astype(int)
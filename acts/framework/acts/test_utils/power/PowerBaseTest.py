@@ -344,6 +344,10 @@ class PowerBaseTest(base_test.BaseTestClass):
         self.power_result.metric_value = (result.average_current *
                                           self.mon_voltage)
         self.avg_current = result.average_current
+        if result.max_current is not None:
+            self.log.info('Peak current: %s mA, 95th percentile: %s mA' %
+                          (result.max_current,
+                           result.get_percentile_current(95)))
 
         plot_utils.monsoon_data_plot(self.mon_info, result)
         plot_utils.monsoon_histogram_plot(self.mon_info, result)
@@ -29,6 +29,7 @@ from bokeh.models import tools as bokeh_tools
 from bokeh.models.widgets import DataTable, TableColumn
 from bokeh.plotting import figure, output_file, save
 from acts.controllers.monsoon_lib.api.common import PassthroughStates
+from acts.test_utils.power import plot_utils
 
 LOGTIME_RETRY_COUNT = 3
 RESET_BATTERY_STATS = 'dumpsys batterystats --reset'
@@ -75,17 +76,9 @@ class PowerGnssBaseTest(PBT.PowerBaseTest):
             total_samples += result.num_samples
         avg_current = total_current / total_samples
 
-        time_relative = [
-            data_point.time
-            for monsoon_result in monsoon_results
-            for data_point in monsoon_result.get_data_points()
-        ]
-
-        power_data = [
-            data_point.current * voltage
-            for monsoon_result in monsoon_results
-            for data_point in monsoon_result.get_data_points()
-        ]
+        time_relative, currents = plot_utils.get_monsoon_data_arrays(
+            monsoon_results)
+        power_data = currents * voltage
 
         total_data_points = sum(
             result.num_samples for result in monsoon_results)
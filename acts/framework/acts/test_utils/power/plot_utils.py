@@ -26,6 +26,21 @@ from bokeh.models.widgets import DataTable, TableColumn
 from bokeh.plotting import figure, output_file, save
 
 
+def get_monsoon_data_arrays(monsoon_results):
+    """Reads the samples of monsoon results, reading each data file once.
+
+    Args:
+        monsoon_results: a list of MonsoonResult objects.
+
+    Returns:
+        a tuple of NumPy arrays of the sample times in seconds and the
+        currents in Amperes of all the results, in order.
+    """
+    data_arrays = [result.get_data_arrays() for result in monsoon_results]
+    return (numpy.concatenate([times for times, _ in data_arrays]),
+            numpy.concatenate([currents for _, currents in data_arrays]))
+
+
 def monsoon_data_plot(mon_info, monsoon_results, tag=''):
     """Plot the monsoon current data using bokeh interactive plotting tool.
 
@@ -61,15 +76,8 @@ def monsoon_data_plot(mon_info, monsoon_results, tag=''):
         total_samples += result.num_samples
     avg_current = total_current / total_samples
 
-    time_relative = [
-        data_point.time for monsoon_result in monsoon_results
-        for data_point in monsoon_result.get_data_points()
-    ]
-
-    current_data = [
-        data_point.current * 1000 for monsoon_result in monsoon_results
-        for data_point in monsoon_result.get_data_points()
-    ]
+    time_relative, currents = get_monsoon_data_arrays(monsoon_results)
+    current_data = currents * 1000
 
     total_data_points = sum(result.num_samples for result in monsoon_results)
     color = ['navy'] * total_data_points
@@ -168,13 +176,24 @@ def monsoon_histogram_plot(mon_info, monsoon_result):
         a tuple of arrays containing the values of the histogram and the
         bin edges.
     """
-    current_data = [
-        data_point.current * 1000
-        for data_point in monsoon_result.get_data_points()
-    ]
-    hist, edges = numpy.histogram(current_data,
-                                  bins=math.ceil(max(current_data)),
-                                  range=(0, max(current_data)))
+    statistics = getattr(monsoon_result, 'statistics', None)
+    if (statistics and statistics.num_samples
+            and not statistics.histogram.overflow_count):
+        # Use the histogram gathered while sampling instead of rereading the
+        # data file. Its bins are converted from Amperes to mA.
+        edges = statistics.histogram.bin_edges * 1000
+        num_bins = max(1, numpy.searchsorted(edges,
+                                             statistics.max_current * 1000))
+        hist = statistics.histogram.counts[:num_bins]
+        edges = edges[:num_bins + 1]
+    else:
+        current_data = [
+            data_point.current * 1000
+            for data_point in monsoon_result.get_data_points()
+        ]
+        hist, edges = numpy.histogram(current_data,
+                                      bins=math.ceil(max(current_data)),
+                                      range=(0, max(current_data)))
 
     plot_title = (os.path.basename(os.path.splitext(monsoon_result.tag)[0]) +
                   '_histogram')
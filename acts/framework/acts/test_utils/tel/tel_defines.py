@@ -29,6 +29,10 @@ MAX_WAIT_TIME_CALL_DROP = 60
 # Wait time between state check retry
 WAIT_TIME_BETWEEN_STATE_CHECK = 5
 
+# Wait time between state check retry, when state changes are also watched
+# through telephony events
+WAIT_TIME_BETWEEN_STATE_CHECK_WITH_EVENTS = 20
+
 # Max wait time for state change
 MAX_WAIT_TIME_FOR_STATE_CHANGE = 60
 
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Waits for telephony states, woken up by SL4A telephony events.
+
+State check functions decorated with state_change_events declare the events
+that may change their result. Waits on those functions listen to the events
+through the EventDispatcher of each device, and check the state again as soon
+as one arrives. The state is still polled every
+WAIT_TIME_BETWEEN_STATE_CHECK_WITH_EVENTS seconds, in case an event was missed,
+for instance because another helper stopped tracking it. Waits on other state
+check functions poll every WAIT_TIME_BETWEEN_STATE_CHECK seconds, as before.
+
+Once the last wait tracking an event on a subscription ends, tracking is
+stopped and the queued events are cleared, so that later helpers waiting on
+the EventDispatcher do not receive stale events.
+"""
+
+import collections
+import contextlib
+import functools
+import threading
+import time
+
+from acts import utils
+from acts.test_utils.tel.tel_defines import EventCallStateChanged
+from acts.test_utils.tel.tel_defines import EventDataConnectionStateChanged
+from acts.test_utils.tel.tel_defines import EventServiceStateChanged
+from acts.test_utils.tel.tel_defines import WAIT_TIME_BETWEEN_STATE_CHECK
+from acts.test_utils.tel.tel_defines import WAIT_TIME_BETWEEN_STATE_CHECK_WITH_EVENTS
+
+CALL_STATE_EVENTS = (EventCallStateChanged, )
+NETWORK_STATE_EVENTS = (EventServiceStateChanged,
+                        EventDataConnectionStateChanged)
+
+# The SL4A RPC that starts tracking each event on a subscription.
+TRACKING_RPCS = {
+    EventCallStateChanged:
+    'telephonyStartTrackingCallStateForSubscription',
+    EventDataConnectionStateChanged:
+    'telephonyStartTrackingDataConnectionStateChangeForSubscription',
+    EventServiceStateChanged:
+    'telephonyStartTrackingServiceStateChangeForSubscription',
+}
+
+# The SL4A RPC that stops tracking each event on a subscription.
+STOP_TRACKING_RPCS = {
+    EventCallStateChanged:
+    'telephonyStopTrackingCallStateChangeForSubscription',
+    EventDataConnectionStateChanged:
+    'telephonyStopTrackingDataConnectionStateChangeForSubscription',
+    EventServiceStateChanged:
+    'telephonyStopTrackingServiceStateChangeForSubscription',
+}
+
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def state_change_events(*event_names):
+    """Declares the events that may change the result of a state check.
+
+    Args:
+        event_names: The names of the SL4A events.
+    """
+    def decorator(state_check_func):
+        state_check_func.state_change_events = event_names
+        return state_check_func
+
+    return decorator
+
+
+def get_state_change_events(state_check_func):
+    """Returns the events declared by state_change_events, if any."""
+    return getattr(state_check_func, 'state_change_events', ())
+
+
+class TelephonyStateWatcher(object):
+    """Wakes up the waiters on the telephony events of a device.
+
+    Attributes:
+        ad: The android device.
+    """
+    def __init__(self, ad):
+        self.ad = ad
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        self._listened_events = set()
+        self._waiters = {}
+        # The number of watches tracking each (event name, sub id).
+        self._tracking_counts = collections.Counter()
+
+    def _on_event(self, event):
+        with self._lock:
+            waiters = list(self._waiters.get(event['name'], ()))
+        for waiter in waiters:
+            waiter.set()
+
+    def _listen(self, event_names):
+        """Listens to the events on the current EventDispatcher of the device.
+
+        The EventDispatcher is replaced whenever SL4A restarts, in which case
+        the events are listened to again on the new one.
+        """
+        dispatcher = self.ad.ed
+        with self._lock:
+            if dispatcher is not self._dispatcher:
+                self._dispatcher = dispatcher
+                self._listened_events = set()
+            new_event_names = [
+                event_name for event_name in event_names
+                if event_name not in self._listened_events
+            ]
+            self._listened_events.update(new_event_names)
+        for event_name in new_event_names:
+            dispatcher.add_listener(event_name, self._on_event)
+
+    def _start_tracking(self, event_names, sub_id):
+        """Starts tracking the events on a subscription.
+
+        Tracking is started for every wait, as other helpers stop tracking
+        once they are done with the events.
+
+        Returns:
+            The (event name, sub id) of each event tracked, to pass to
+            _stop_tracking.
+        """
+        if sub_id is None:
+            sub_id = self.ad.droid.subscriptionGetDefaultSubId()
+        tracked = []
+        try:
+            for event_name in event_names:
+                if event_name in TRACKING_RPCS:
+                    getattr(self.ad.droid, TRACKING_RPCS[event_name])(sub_id)
+                    tracked.append((event_name, sub_id))
+                    with self._lock:
+                        self._tracking_counts[event_name, sub_id] += 1
+        except Exception:
+            self._stop_tracking(tracked)
+            raise
+        return tracked
+
+    def _stop_tracking(self, tracked):
+        """Stops tracking the events no other watch is tracking.
+
+        The queued events are cleared once they are not tracked on any
+        subscription.
+
+        Args:
+            tracked: The list returned by _start_tracking.
+        """
+        with self._lock:
+            self._tracking_counts.subtract(tracked)
+            stopped = [
+                key for key in set(tracked) if self._tracking_counts[key] <= 0
+            ]
+            for key in stopped:
+                del self._tracking_counts[key]
+            tracked_event_names = {
+                event_name for event_name, _ in self._tracking_counts
+            }
+        for event_name, sub_id in stopped:
+            try:
+                getattr(self.ad.droid,
+                        STOP_TRACKING_RPCS[event_name])(sub_id)
+                if event_name not in tracked_event_names:
+                    self.ad.ed.clear_events(event_name)
+            except Exception as e:
+                self.ad.log.debug('Unable to stop tracking %s: %s',
+                                  event_name, e)
+
+    @contextlib.contextmanager
+    def watch(self, event_names, waiter, sub_id=None):
+        """Sets a threading.Event whenever one of the events arrives.
+
+        Args:
+            event_names: The names of the events to watch.
+            waiter: The threading.Event to set.
+            sub_id: The subscription to track the events on. The default
+                subscription if None.
+
+        Yields:
+            True if the events are watched. False if they could not be, for
+            instance because SL4A is not running, in which case the waiter is
+            never set.
+        """
+        try:
+            self._listen(event_names)
+            tracked = self._start_tracking(event_names, sub_id)
+        except Exception as e:
+            self.ad.log.debug('Unable to watch %s, polling instead: %s',
+                              event_names, e)
+            yield False
+            return
+        with self._lock:
+            for event_name in event_names:
+                self._waiters.setdefault(event_name, set()).add(waiter)
+        try:
+            yield True
+        finally:
+            with self._lock:
+                for event_name in event_names:
+                    self._waiters[event_name].discard(waiter)
+            self._stop_tracking(tracked)
+
+
+def get_state_watcher(ad):
+    """Returns the TelephonyStateWatcher of a device."""
+    with _watchers_lock:
+        watcher = _watchers.get(ad.serial)
+        if watcher is None or watcher.ad is not ad:
+            watcher = TelephonyStateWatcher(ad)
+            _watchers[ad.serial] = watcher
+        return watcher
+
+
+def _check_state(ads, state_check):
+    """Checks the state of every device concurrently."""
+    if len(ads) == 1:
+        return [state_check(ads[0])]
+    return utils.run_concurrent_actions(
+        *[functools.partial(state_check, ad) for ad in ads])
+
+
+def wait_for_devices_in_state(ads,
+                              max_time,
+                              state_check,
+                              event_names=(),
+                              sub_id=None):
+    """Waits for every device to be in a state at once.
+
+    Args:
+        ads: The android devices.
+        max_time: The maximal wait time, in seconds.
+        state_check: A function that takes an android device, and returns
+            whether it is in the state.
+        event_names: The events that may change the result of state_check.
+            If empty, the state is polled every WAIT_TIME_BETWEEN_STATE_CHECK
+            seconds.
+        sub_id: The subscription to track the events on. The default
+            subscription of each device if None.
+
+    Returns:
+        True if every device was in the state within max_time, False
+        otherwise.
+    """
+    deadline = time.time() + max_time
+    state_changed = threading.Event()
+    interval = WAIT_TIME_BETWEEN_STATE_CHECK
+    with contextlib.ExitStack() as stack:
+        if event_names:
+            watched = [
+                stack.enter_context(
+                    get_state_watcher(ad).watch(event_names, state_changed,
+                                                sub_id)) for ad in ads
+            ]
+            if all(watched):
+                interval = WAIT_TIME_BETWEEN_STATE_CHECK_WITH_EVENTS
+        while True:
+            # Clear before checking, so that a change during the check is
+            # checked again.
+            state_changed.clear()
+            if all(_check_state(ads, state_check)):
+                return True
+            remaining_time = deadline - time.time()
+            if remaining_time <= 0:
+                return False
+            state_changed.wait(min(interval, remaining_time))
@@ -233,6 +233,7 @@ def set_subid_for_data(ad, sub_id, time_to_sleep=WAIT_TIME_CHANGE_DATA_SUB_ID):
     # TODO: Need to check onSubscriptionChanged event. b/27843365
     if ad.droid.subscriptionGetDefaultDataSubId() != sub_id:
         ad.droid.subscriptionSetDefaultDataSubId(sub_id)
+        ad.dumpsys_cache.invalidate()
         time.sleep(time_to_sleep)
         setattr(ad, "default_data_sub_id", sub_id)
 
@@ -248,6 +249,7 @@ def set_subid_for_message(ad, sub_id):
         None
     """
     ad.droid.subscriptionSetDefaultSmsSubId(sub_id)
+    ad.dumpsys_cache.invalidate()
     if hasattr(ad, "outgoing_message_sub_id"):
         ad.outgoing_message_sub_id = sub_id
 
@@ -263,6 +265,7 @@ def set_subid_for_outgoing_call(ad, sub_id):
         None
     """
     ad.droid.telecomSetUserSelectedOutgoingPhoneAccountBySubId(sub_id)
+    ad.dumpsys_cache.invalidate()
     if hasattr(ad, "outgoing_voice_sub_id"):
         ad.outgoing_voice_sub_id = sub_id
 
@@ -278,6 +281,7 @@ def set_incoming_voice_sub_id(ad, sub_id):
         None
     """
     ad.droid.subscriptionSetDefaultVoiceSubId(sub_id)
+    ad.dumpsys_cache.invalidate()
     if hasattr(ad, "incoming_voice_sub_id"):
         ad.incoming_voice_sub_id = sub_id
 
@@ -182,6 +182,11 @@ from acts.test_utils.tel.tel_subscription_utils import get_incoming_message_sub_
 from acts.test_utils.tel.tel_subscription_utils import set_subid_for_outgoing_call
 from acts.test_utils.tel.tel_subscription_utils import set_subid_for_message
 from acts.test_utils.tel.tel_subscription_utils import get_subid_on_same_network_of_host_ad
+from acts.test_utils.tel.tel_state_watcher import CALL_STATE_EVENTS
+from acts.test_utils.tel.tel_state_watcher import NETWORK_STATE_EVENTS
+from acts.test_utils.tel.tel_state_watcher import get_state_change_events
+from acts.test_utils.tel.tel_state_watcher import state_change_events
+from acts.test_utils.tel.tel_state_watcher import wait_for_devices_in_state
 from acts.test_utils.wifi import wifi_test_utils
 from acts.test_utils.wifi import wifi_constants
 from acts.utils import adb_shell_ping
@@ -580,6 +585,8 @@ def toggle_airplane_mode_by_adb(log, ad, new_state=None):
     except Exception as e:
         ad.log.error(e)
         return False
+    finally:
+        ad.dumpsys_cache.invalidate()
     changed_state = bool(int(ad.adb.shell("settings get global airplane_mode_on")))
     return changed_state == new_state
 
@@ -817,7 +824,7 @@ def wait_for_sims_ready_by_adb(log, ad, wait_time=90):
 
 
 def get_service_state_by_adb(log, ad):
-    output = ad.adb.shell("dumpsys telephony.registry | grep mServiceState")
+    output = ad.dumpsys_cache.get("telephony.registry").grep("mServiceState")
     if "mVoiceRegState" in output:
         result = re.search(r"mVoiceRegState=(\S+)\((\S+)\)", output)
         if result:
@@ -961,6 +968,7 @@ def toggle_airplane_mode_msim(log, ad, new_state=None, strict_checking=True):
 
     timeout_time = time.time() + MAX_WAIT_TIME_AIRPLANEMODE_EVENT
     ad.droid.connectivityToggleAirplaneMode(new_state)
+    ad.dumpsys_cache.invalidate()
 
     try:
         try:
@@ -1284,6 +1292,7 @@ def wait_and_answer_call_for_subscription(
             return False
         ad.log.info("Accept the ring call")
         ad.droid.telecomAcceptRingingCall(video_state)
+        ad.dumpsys_cache.invalidate()
 
         if wait_for_call_offhook_for_subscription(
                 log, ad, sub_id, event_tracking_started=True):
@@ -1414,6 +1423,7 @@ def hangup_call(log, ad, is_emergency=False):
             ad.droid.telecomCallDisconnect(call)
     else:
         ad.droid.telecomEndCall()
+    ad.dumpsys_cache.invalidate()
 
     try:
         ad.ed.wait_for_event(
@@ -1660,6 +1670,7 @@ def initiate_call(log,
             ad.droid.telecomCallEmergencyNumber(callee_number)
         else:
             ad.droid.telecomCallNumber(callee_number, video)
+        ad.dumpsys_cache.invalidate()
 
         # Verify OFFHOOK state
         if not wait_for_call_offhook_for_subscription(
@@ -1788,11 +1799,12 @@ def hangup_call_by_adb(ad):
     """
     ad.log.info("End call by adb")
     ad.send_keycode("ENDCALL")
+    ad.dumpsys_cache.invalidate()
 
 
 def dumpsys_all_call_info(ad):
     """ Get call information by dumpsys telecom. """
-    output = ad.adb.shell("dumpsys telecom")
+    output = ad.dumpsys_cache.get("telecom").output
     calls = re.findall("Call TC@\d+: {(.*?)}", output, re.DOTALL)
     calls_info = []
     for call in calls:
@@ -1816,7 +1828,7 @@ def dumpsys_all_call_info(ad):
 def dumpsys_last_call_info(ad):
     """ Get call information by dumpsys telecom. """
     num = dumpsys_last_call_number(ad)
-    output = ad.adb.shell("dumpsys telecom")
+    output = ad.dumpsys_cache.get("telecom").output
     result = re.search(r"Call TC@%s: {(.*?)}" % num, output, re.DOTALL)
     call_info = {"TC": num}
     if result:
@@ -1836,7 +1848,7 @@ def dumpsys_last_call_info(ad):
 
 
 def dumpsys_last_call_number(ad):
-    output = ad.adb.shell("dumpsys telecom")
+    output = ad.dumpsys_cache.get("telecom").output
     call_nums = re.findall("Call TC@(\d+):", output)
     if not call_nums:
         return 0
@@ -1857,7 +1869,7 @@ def dumpsys_new_call_info(ad, last_tc_number, retries=3, interval=5):
 
 
 def dumpsys_carrier_config(ad):
-    output = ad.adb.shell("dumpsys carrier_config").split("\n")
+    output = ad.dumpsys_cache.get("carrier_config").output.split("\n")
     output_phone_id_0 = []
     output_phone_id_1 = []
     current_output = []
@@ -5313,45 +5325,37 @@ def toggle_video_calling_for_subscription(ad, new_state=None, sub_id=None):
 
 def _wait_for_droid_in_state(log, ad, max_time, state_check_func, *args,
                              **kwargs):
-    while max_time >= 0:
-        if state_check_func(log, ad, *args, **kwargs):
-            return True
-
-        time.sleep(WAIT_TIME_BETWEEN_STATE_CHECK)
-        max_time -= WAIT_TIME_BETWEEN_STATE_CHECK
-
-    return False
+    return _wait_for_droids_in_state(log, [ad], max_time, state_check_func,
+                                     *args, **kwargs)
 
 
 def _wait_for_droid_in_state_for_subscription(
         log, ad, sub_id, max_time, state_check_func, *args, **kwargs):
-    while max_time >= 0:
-        if state_check_func(log, ad, sub_id, *args, **kwargs):
-            return True
+    """Wait for android to be in a state on a subscription.
 
-        time.sleep(WAIT_TIME_BETWEEN_STATE_CHECK)
-        max_time -= WAIT_TIME_BETWEEN_STATE_CHECK
-
-    return False
+    If state_check_func declares its state_change_events, the state is
+    checked again as soon as one of them arrives on the subscription.
+    """
+    return wait_for_devices_in_state(
+        [ad], max_time,
+        lambda ad: state_check_func(log, ad, sub_id, *args, **kwargs),
+        get_state_change_events(state_check_func), sub_id)
 
 
 def _wait_for_droids_in_state(log, ads, max_time, state_check_func, *args,
                               **kwargs):
-    while max_time > 0:
-        success = True
-        for ad in ads:
-            if not state_check_func(log, ad, *args, **kwargs):
-                success = False
-                break
-        if success:
-            return True
-
-        time.sleep(WAIT_TIME_BETWEEN_STATE_CHECK)
-        max_time -= WAIT_TIME_BETWEEN_STATE_CHECK
+    """Wait for all android devices to be in a state at once.
 
-    return False
+    The devices are checked concurrently. If state_check_func declares its
+    state_change_events, the devices are checked again as soon as one of
+    them arrives on any device.
+    """
+    return wait_for_devices_in_state(
+        ads, max_time, lambda ad: state_check_func(log, ad, *args, **kwargs),
+        get_state_change_events(state_check_func))
 
 
+@state_change_events(*CALL_STATE_EVENTS)
 def is_phone_in_call(log, ad):
     """Return True if phone in call.
 
@@ -5366,6 +5370,7 @@ def is_phone_in_call(log, ad):
             "dumpsys telephony.registry | grep mCallState")
 
 
+@state_change_events(*CALL_STATE_EVENTS)
 def is_phone_not_in_call(log, ad):
     """Return True if phone not in call.
 
@@ -5471,11 +5476,13 @@ def wait_for_droid_not_in_call(log, ad, max_time=MAX_WAIT_TIME_CALL_DROP):
     return _wait_for_droid_in_state(log, ad, max_time, is_phone_not_in_call)
 
 
+@state_change_events(*NETWORK_STATE_EVENTS)
 def _is_attached(log, ad, voice_or_data):
     return _is_attached_for_subscription(
         log, ad, ad.droid.subscriptionGetDefaultSubId(), voice_or_data)
 
 
+@state_change_events(*NETWORK_STATE_EVENTS)
 def _is_attached_for_subscription(log, ad, sub_id, voice_or_data):
     rat = get_network_rat_for_subscription(log, ad, sub_id, voice_or_data)
     ad.log.info("Sub_id %s network RAT is %s for %s", sub_id, rat,
@@ -5483,6 +5490,7 @@ def _is_attached_for_subscription(log, ad, sub_id, voice_or_data):
     return rat != RAT_UNKNOWN
 
 
+@state_change_events(*NETWORK_STATE_EVENTS)
 def is_voice_attached(log, ad):
     return _is_attached_for_subscription(
         log, ad, ad.droid.subscriptionGetDefaultSubId(), NETWORK_SERVICE_VOICE)
@@ -6680,6 +6688,7 @@ def is_droid_in_rat_family(log, ad, rat_family, voice_or_data=None):
         voice_or_data)
 
 
+@state_change_events(*NETWORK_STATE_EVENTS)
 def is_droid_in_rat_family_for_subscription(log,
                                             ad,
                                             sub_id,
@@ -6695,6 +6704,7 @@ def is_droid_in_rat_familiy_list(log, ad, rat_family_list, voice_or_data=None):
         voice_or_data)
 
 
+@state_change_events(*NETWORK_STATE_EVENTS)
 def is_droid_in_rat_family_list_for_subscription(log,
                                                  ad,
                                                  sub_id,
@@ -6731,6 +6741,7 @@ def is_droid_in_network_generation(log, ad, nw_gen, voice_or_data):
         log, ad, ad.droid.subscriptionGetDefaultSubId(), nw_gen, voice_or_data)
 
 
+@state_change_events(*NETWORK_STATE_EVENTS)
 def is_droid_in_network_generation_for_subscription(log, ad, sub_id, nw_gen,
                                                     voice_or_data):
     """Checks if a droid in expected network generation ("2g", "3g" or "4g").
@@ -8601,6 +8612,8 @@ def power_off_sim(ad, sim_slot_id=None,
     except Exception as e:
         ad.log.error(e)
         return False
+    finally:
+        ad.dumpsys_cache.invalidate()
     while timeout > 0:
         sim_state = verify_func(*verify_args)
         if sim_state in (SIM_STATE_UNKNOWN, SIM_STATE_ABSENT):
@@ -8626,6 +8639,8 @@ def power_on_sim(ad, sim_slot_id=None):
     except Exception as e:
         ad.log.error(e)
         return False
+    finally:
+        ad.dumpsys_cache.invalidate()
     if wait_for_state(verify_func, SIM_STATE_READY,
                       MAX_WAIT_TIME_FOR_STATE_CHANGE,
                       WAIT_TIME_BETWEEN_STATE_CHECK, *verify_args):
@@ -8785,7 +8800,7 @@ def get_carrier_id_version(ad):
 
 
 def get_carrier_config_version(ad):
-    out = ad.adb.shell("dumpsys carrier_config | grep version_string")
+    out = ad.dumpsys_cache.grep("carrier_config", "version_string")
     if out and "-" in out:
         version = out.split('-')[1]
     else:
@@ -9194,7 +9209,8 @@ def get_call_forwarding_by_adb(log, ad, call_forwarding_type="unconditional"):
 
     slot_index_of_default_voice_subid = get_slot_index_from_subid(log, ad,
         get_incoming_voice_sub_id(ad))
-    output = ad.adb.shell("dumpsys telephony.registry | grep mCallForwarding")
+    output = ad.dumpsys_cache.get("telephony.registry").grep(
+        "mCallForwarding")
     if "mCallForwarding" in output:
         result_list = re.findall(r"mCallForwarding=(true|false)", output)
         if result_list:
@@ -39,6 +39,10 @@ SCAN = 'wpa_cli scan'
 SCAN_RESULTS = 'wpa_cli scan_results'
 SIGNAL_POLL = 'wpa_cli signal_poll'
 WPA_CLI_STATUS = 'wpa_cli status'
+# Separates the outputs of the commands batched into a single adb shell call.
+RSSI_OUTPUT_SEPARATOR = '__RSSI_OUTPUT_SEPARATOR__'
+CONNECTED_RSSI_COMMAND = '; echo {0}; '.format(RSSI_OUTPUT_SEPARATOR).join(
+    [WPA_CLI_STATUS, SIGNAL_POLL, STATION_DUMP])
 CONST_3dB = 3.01029995664
 RSSI_ERROR_VAL = float('nan')
 RTT_REGEX = re.compile(r'^\[(?P<timestamp>\S+)\] .*? time=(?P<rtt>\S+)')
@@ -406,6 +410,52 @@ class BokehFigure():
         })
         self.fig_property['num_lines'] += 1
 
+    def add_power_trace(self,
+                        pyramid,
+                        legend,
+                        start_time=None,
+                        end_time=None,
+                        max_points=None,
+                        color=None,
+                        y_axis='default'):
+        """Function to add a power trace from a min/max/mean pyramid.
+
+        Only the pyramid level that fits the plot width is read, so traces of
+        long captures can be plotted without loading the raw samples.
+
+        Args:
+            pyramid: the monsoon_lib.sampling.pyramid.Pyramid to plot
+            legend: string containing line title
+            start_time: first sample time to plot, in seconds
+            end_time: sample time to stop plotting before, in seconds
+            max_points: maximum number of points to plot. Defaults to twice
+                the figure width.
+            color: string describing line color
+            y_axis: identifier for y-axis to plot line against
+        """
+        if max_points is None:
+            max_points = 2 * self.fig_property['width']
+        level, records = pyramid.get_time_range(start_time, end_time,
+                                                max_points)
+        x_data = records['sample_time'].tolist()
+        hover_text = [
+            'min={:.4f}, max={:.4f}, level={}'.format(low, high, level)
+            for low, high in zip(records['min_current'],
+                                 records['max_current'])
+        ]
+        self.add_line(x_data,
+                      records['mean_current'].tolist(),
+                      legend,
+                      hover_text=hover_text,
+                      color=color,
+                      width=1,
+                      shaded_region={
+                          'x_vector': list(x_data),
+                          'lower_limit': records['min_current'].tolist(),
+                          'upper_limit': records['max_current'].tolist()
+                      },
+                      y_axis=y_axis)
+
     def generate_figure(self, output_file=None, save_json=True):
         """Function to generate and save BokehFigure.
 
@@ -728,8 +778,11 @@ def get_connected_rssi(dut,
     for idx in range(num_measurements):
         measurement_start_time = time.time()
         connected_rssi['time_stamp'].append(measurement_start_time - t0)
+        # Get the status, signal poll and per chain RSSI in one adb command
+        status_output, signal_poll_output, per_chain_rssi = (
+            dut.adb.shell(CONNECTED_RSSI_COMMAND).split(
+                RSSI_OUTPUT_SEPARATOR))
         # Get signal poll RSSI
-        status_output = dut.adb.shell(WPA_CLI_STATUS)
         match = re.search('bssid=.*', status_output)
         if match:
             current_bssid = match.group(0).split('=')[1]
@@ -740,7 +793,6 @@ def get_connected_rssi(dut,
             if disconnect_warning and previous_bssid != 'disconnected':
                 logging.warning('WIFI DISCONNECT DETECTED!')
         previous_bssid = current_bssid
-        signal_poll_output = dut.adb.shell(SIGNAL_POLL)
         match = re.search('FREQUENCY=.*', signal_poll_output)
         if match:
             frequency = int(match.group(0).split('=')[1])
@@ -765,7 +817,6 @@ def get_connected_rssi(dut,
             connected_rssi['signal_poll_avg_rssi']['data'].append(
                 RSSI_ERROR_VAL)
         # Get per chain RSSI
-        per_chain_rssi = dut.adb.shell(STATION_DUMP)
         match = re.search('.*signal avg:.*', per_chain_rssi)
         if match:
             per_chain_rssi = per_chain_rssi[per_chain_rssi.find('[') +
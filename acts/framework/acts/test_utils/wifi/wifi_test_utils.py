@@ -32,6 +32,7 @@ from acts.controllers.ap_lib import hostapd_security
 from acts.controllers.ap_lib import hostapd_ap_preset
 from acts.controllers.ap_lib.hostapd_constants import BAND_2G
 from acts.controllers.ap_lib.hostapd_constants import BAND_5G
+from acts.libs.pcap.pcap_scanner import PcapScanner
 from acts.test_utils.wifi import wifi_constants
 from acts.test_utils.tel import tel_defines
 
@@ -2155,13 +2156,33 @@ def stop_pcap(pcap, procs, test_status=None):
     if test_status:
         shutil.rmtree(os.path.dirname(fname))
 
+def _get_pcap_paths(packets):
+    """Returns the list of pcap paths in packets, or None if it holds packets.
+    """
+    if isinstance(packets, str):
+        return [packets]
+    if (isinstance(packets, (list, tuple)) and packets
+            and all(isinstance(path, str) for path in packets)):
+        return list(packets)
+    return None
+
 def verify_mac_not_found_in_pcap(mac, packets):
     """Verify that a mac address is not found in the captured packets.
 
     Args:
         mac: string representation of the mac address
-        packets: packets obtained by rdpcap(pcap_fname)
-    """
+        packets: path of the pcap file, or a list of paths, which are scanned
+            without loading them, or packets obtained by rdpcap(pcap_fname)
+    """
+    pcap_paths = _get_pcap_paths(packets)
+    if pcap_paths is not None:
+        for pcap_path in pcap_paths:
+            with PcapScanner(pcap_path) as scanner:
+                frame = scanner.find_frame(addr=mac)
+            if frame:
+                asserts.fail("Caught Factory MAC: %s in packet sniffer."
+                             "Packet = %s" % (mac, frame))
+        return
     for pkt in packets:
         logging.debug("Packet Summary = %s", pkt.summary())
         if mac in pkt.summary():
@@ -2173,11 +2194,19 @@ def verify_mac_is_found_in_pcap(mac, packets):
 
     Args:
         mac: string representation of the mac address
-        packets: packets obtained by rdpcap(pcap_fname)
-    """
-    for pkt in packets:
-        if mac in pkt.summary():
-            return
+        packets: path of the pcap file, or a list of paths, which are scanned
+            without loading them, or packets obtained by rdpcap(pcap_fname)
+    """
+    pcap_paths = _get_pcap_paths(packets)
+    if pcap_paths is not None:
+        for pcap_path in pcap_paths:
+            with PcapScanner(pcap_path) as scanner:
+                if scanner.has_frame(addr=mac):
+                    return
+    else:
+        for pkt in packets:
+            if mac in pkt.summary():
+                return
     asserts.fail("Did not find MAC = %s in packet sniffer." % mac)
 
 def start_cnss_diags(ads):
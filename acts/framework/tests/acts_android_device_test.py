@@ -23,6 +23,7 @@ import unittest
 
 from acts import logger
 from acts.controllers import android_device
+from acts.controllers.android_lib import logcat
 from acts.controllers.android_lib import errors
 
 # Mock log path for a test run.
@@ -229,18 +230,45 @@ class ActsAndroidDeviceTest(unittest.TestCase):
         """
         msg = "Some error happened."
         ads = get_mock_ads(3)
-        ads[0].start_services = mock.MagicMock()
-        ads[0].clean_up = mock.MagicMock()
-        ads[1].start_services = mock.MagicMock()
-        ads[1].clean_up = mock.MagicMock()
-        ads[2].start_services = mock.MagicMock(
-            side_effect=errors.AndroidDeviceError(msg))
-        ads[2].clean_up = mock.MagicMock()
-        with self.assertRaisesRegex(errors.AndroidDeviceError, msg):
-            android_device._start_services_on_ads(ads)
-        ads[0].clean_up.assert_called_once_with()
-        ads[1].clean_up.assert_called_once_with()
-        ads[2].clean_up.assert_called_once_with()
+        ads[2].start_services.side_effect = errors.AndroidDeviceError(msg)
+        with mock.patch.object(android_device, "get_all_instances",
+                               return_value=ads):
+            with self.assertRaisesRegex(errors.AndroidDeviceError, msg):
+                android_device.create(
+                    android_device.ANDROID_DEVICE_PICK_ALL_TOKEN)
+        for ad in ads:
+            ad.start_services.assert_called_once_with()
+            ad.clean_up.assert_called_once_with()
+
+    def test_create_does_not_start_services_if_a_device_is_detached(self):
+        ads = get_mock_ads(3)
+        ads[2].is_connected.return_value = False
+        with mock.patch.object(android_device, "get_all_instances",
+                               return_value=ads):
+            with self.assertRaises(errors.AndroidDeviceError):
+                android_device.create(
+                    android_device.ANDROID_DEVICE_PICK_ALL_TOKEN)
+        for ad in ads:
+            self.assertFalse(ad.start_services.called)
+
+    def test_create_records_phase_durations(self):
+        ads = get_mock_ads(2)
+        for ad in ads:
+            ad.droid = None
+            ad.phase_durations = {}
+        with mock.patch.object(android_device, "get_all_instances",
+                               return_value=ads):
+            android_device.create(android_device.ANDROID_DEVICE_PICK_ALL_TOKEN)
+        for ad in ads:
+            self.assertEqual(sorted(ad.phase_durations),
+                             ['is_connected', 'start_services'])
+
+    def test_destroy_cleans_up_all_devices_if_one_fails(self):
+        ads = get_mock_ads(3)
+        ads[0].clean_up.side_effect = Exception('Some error happened.')
+        android_device.destroy(ads)
+        for ad in ads:
+            ad.clean_up.assert_called_once_with()
 
     # Tests for android_device.AndroidDevice class.
     # These tests mock out any interaction with the OS and real android device
@@ -377,6 +405,38 @@ class ActsAndroidDeviceTest(unittest.TestCase):
         ad.take_bug_report("test_something", MOCK_ADB_EPOCH_BEGIN_TIME)
         mock_makedirs.assert_called_with(mock_log_path(), exist_ok=True)
 
+    @mock.patch(
+        'acts.controllers.adb.AdbProxy',
+        return_value=MockAdbProxy(MOCK_SERIAL))
+    @mock.patch(
+        'acts.controllers.fastboot.FastbootProxy',
+        return_value=MockFastbootProxy(MOCK_SERIAL))
+    @mock.patch(
+        'acts.controllers.android_device.AndroidDevice.device_log_path',
+        new_callable=mock.PropertyMock)
+    def test_AndroidDevice_cat_adb_log(self, mock_log_path, *_):
+        """Verifies AndroidDevice.cat_adb_log only excerpts the lines logged
+        within the given time period.
+        """
+        ad = android_device.AndroidDevice(serial=MOCK_SERIAL)
+        ad.log_path = self.tmp_dir
+        mock_log_path.return_value = self.tmp_dir
+        logcat_path = os.path.join(self.tmp_dir,
+                                   'adblog_%s_debug.txt' % MOCK_SERIAL)
+        lines = ['%s   123   456 D Tag: %s\n' %
+                 (logcat.epoch_to_line_timestamp(MOCK_ADB_EPOCH_BEGIN_TIME +
+                                                 1000 * i), i)
+                 for i in range(-5, 5)]
+        with open(logcat_path, 'w') as f:
+            f.write(''.join(lines))
+
+        excerpt_path = ad.cat_adb_log('test_something',
+                                      MOCK_ADB_EPOCH_BEGIN_TIME,
+                                      MOCK_ADB_EPOCH_BEGIN_TIME + 2000)
+
+        with open(excerpt_path) as f:
+            self.assertEqual(f.read(), ''.join(lines[5:8]))
+
     @mock.patch(
         'acts.controllers.adb.AdbProxy',
         return_value=MockAdbProxy(MOCK_SERIAL))
@@ -398,7 +458,8 @@ class ActsAndroidDeviceTest(unittest.TestCase):
             # Verify start did the correct operations.
             self.assertTrue(ad.adb_logcat_process)
             log_dir = "AndroidDevice%s" % ad.serial
-            create_proc_mock.assert_called_with(ad.serial, log_dir, '-b all')
+            create_proc_mock.assert_called_with(ad.serial, log_dir, '-b all',
+                                                direct_write=False)
             proc_mock.start.assert_called_with()
             # Expect warning msg if start is called back to back.
             expected_msg = "Android device .* already has a running adb logcat"
@@ -426,7 +487,8 @@ class ActsAndroidDeviceTest(unittest.TestCase):
         # Verify that create_logcat_keepalive_process is called with the
         # correct command.
         log_dir = "AndroidDevice%s" % ad.serial
-        create_proc_mock.assert_called_with(ad.serial, log_dir, '-b radio')
+        create_proc_mock.assert_called_with(ad.serial, log_dir, '-b radio',
+                                            direct_write=False)
 
     @mock.patch(
         'acts.controllers.adb.AdbProxy',
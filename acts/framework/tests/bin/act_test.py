@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import argparse
+import json
+import os
+import pickle
+import queue
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import unittest
+
+from mobly.config_parser import TestRunConfig
+from mock import patch
+
+from acts import records
+from acts.bin import act
+from acts.event import event_bus
+from acts.event.event import TestCaseEndEvent
+
+
+class FakeTestClass(object):
+    def __init__(self):
+        self.results = records.TestResult()
+
+
+class FakeTestRunner(object):
+    """Runs a single test case, which passes unless the testbed name says
+    otherwise, or blocks until stopped if the testbed name is 'Blocked'."""
+
+    def __init__(self, test_configs, run_list):
+        self.testbed_name = test_configs.testbed_name
+        self.log_path = os.path.join(test_configs.log_path, self.testbed_name)
+        os.makedirs(self.log_path)
+        self.results = records.TestResult()
+        self.stopped = False
+
+    def run(self):
+        with open(os.path.join(self.log_path, 'times'), 'w') as f:
+            f.write('%f ' % time.time())
+            if self.testbed_name == 'Blocked':
+                end_time = time.time() + 10
+                while not self.stopped and time.time() < end_time:
+                    time.sleep(0.01)
+            else:
+                time.sleep(0.1)
+            f.write('%f' % time.time())
+        print('Output of %s' % self.testbed_name)
+        test_class = FakeTestClass()
+        record = records.TestResultRecord('test_case', 'FakeTest')
+        record.test_begin()
+        if self.testbed_name.startswith('Failing'):
+            record.test_fail()
+        else:
+            record.test_pass()
+        test_class.results.add_record(record)
+        self.results += test_class.results
+        event_bus.post(TestCaseEndEvent(test_class, 'test_case', None))
+
+    def stop(self):
+        self.stopped = True
+
+
+@patch('acts.test_runner.TestRunner', FakeTestRunner)
+class RunTestsParallelTest(unittest.TestCase):
+    """Tests act._run_tests_parallel."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        event_bus_patcher = patch.object(event_bus, '_event_bus',
+                                         event_bus._EventBus())
+        event_bus_patcher.start()
+        self.addCleanup(event_bus_patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def create_configs(self, testbed_names):
+        configs = []
+        for testbed_name in testbed_names:
+            config = TestRunConfig()
+            config.testbed_name = testbed_name
+            config.log_path = self.tmp_dir
+            configs.append(config)
+        return configs
+
+    def read_summary(self):
+        with open(os.path.join(self.tmp_dir,
+                               act.PARALLEL_SUMMARY_FILE)) as f:
+            return json.load(f)['Summary']
+
+    def read_times(self, testbed_name):
+        with open(os.path.join(self.tmp_dir, testbed_name, 'times')) as f:
+            return [float(t) for t in f.read().split()]
+
+    def test_merges_the_results_of_all_testbeds(self):
+        ok = act._run_tests_parallel(
+            self.create_configs(['A', 'B', 'FailingC']), [], 1)
+
+        self.assertFalse(ok)
+        summary = self.read_summary()
+        self.assertEqual(summary['Executed'], 3)
+        self.assertEqual(summary['Passed'], 2)
+        self.assertEqual(summary['Failed'], 1)
+
+    def test_writes_worker_output_to_its_log_tree(self):
+        act._run_tests_parallel(self.create_configs(['A']), [], 1)
+
+        with open(os.path.join(self.tmp_dir, 'A',
+                               act.WORKER_OUTPUT_FILE)) as f:
+            self.assertIn('Output of A', f.read())
+
+    def test_runs_up_to_max_workers_at_once(self):
+        ok = act._run_tests_parallel(self.create_configs(['A', 'B', 'C']),
+                                     [], 1, max_workers=1)
+
+        self.assertTrue(ok)
+        times = sorted(self.read_times(name) for name in ['A', 'B', 'C'])
+        for (_, end_time), (start_time, _) in zip(times, times[1:]):
+            self.assertLessEqual(end_time, start_time)
+
+    def test_raises_if_max_workers_is_not_positive(self):
+        with self.assertRaises(ValueError):
+            act._run_tests_parallel(self.create_configs(['A']), [], 1,
+                                    max_workers=-1)
+
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, 'A')))
+
+    def test_worker_does_not_deliver_events_to_parent_subscriptions(self):
+        events_path = os.path.join(self.tmp_dir, 'parent_events')
+        event_bus.register(TestCaseEndEvent,
+                           lambda _: open(events_path, 'w').close())
+
+        act._run_tests_parallel(self.create_configs(['A']), [], 1)
+
+        self.assertFalse(os.path.exists(events_path))
+
+    @patch('multiprocessing.Process')
+    @patch('multiprocessing.Queue')
+    def test_merges_results_received_after_the_worker_exits(
+            self, queue_class, process_class):
+        process_class.return_value.is_alive.return_value = False
+        results = records.TestResult()
+        # The results arrive just after the first wait for messages ends.
+        queue_class.return_value.get.side_effect = [
+            queue.Empty(), ('done', 'A', True, pickle.dumps(results))
+        ]
+
+        ok = act._run_tests_parallel(self.create_configs(['A']), [], 1)
+
+        self.assertTrue(ok)
+
+    def test_forwards_sigterm_to_the_workers(self):
+        timer = threading.Timer(0.5, os.kill, (os.getpid(), signal.SIGTERM))
+        timer.start()
+        start_time = time.time()
+
+        ok = act._run_tests_parallel(self.create_configs(['Blocked']), [], 1)
+
+        timer.join()
+        self.assertFalse(ok)
+        self.assertLess(time.time() - start_time, 10)
+
+
+class PositiveIntTest(unittest.TestCase):
+    """Tests act._positive_int."""
+
+    def test_returns_positive_ints(self):
+        self.assertEqual(act._positive_int('3'), 3)
+
+    def test_rejects_values_below_one(self):
+        for value in ['0', '-1', 'a']:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                act._positive_int(value)
+
+
+if __name__ == '__main__':
+    unittest.main()
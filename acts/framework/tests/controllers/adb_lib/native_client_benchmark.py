@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks the latency of AdbProxy.shell with and without the native client.
+
+Requires adb and an attached device.
+
+Usage:
+    python3 native_client_benchmark.py --serial <SERIAL> [--commands 100]
+        [--command 'wpa_cli status']
+"""
+
+import argparse
+import time
+
+from acts.controllers import adb
+
+
+def time_shell(proxy, command, num_commands):
+    """Runs the command num_commands times, returning the latencies."""
+    latencies = []
+    for _ in range(num_commands):
+        start_time = time.perf_counter()
+        proxy.shell(command, ignore_status=True)
+        latencies.append(time.perf_counter() - start_time)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the latency of adb shell commands.')
+    parser.add_argument('--serial', required=True,
+                        help='The serial of the device to run commands on.')
+    parser.add_argument('--commands', type=int, default=100,
+                        help='The number of commands to run per client.')
+    parser.add_argument('--command', default='echo',
+                        help='The shell command to run.')
+    args = parser.parse_args()
+
+    proxies = [
+        ('adb client', adb.AdbProxy(args.serial)),
+        ('native', adb.AdbProxy(args.serial, use_native_client=True)),
+    ]
+    print('Running %r %d times per client.' % (args.command, args.commands))
+    for name, proxy in proxies:
+        latencies = time_shell(proxy, args.command, args.commands)
+        print('%-10s median %7.2fms  p90 %7.2fms  total %7.3fs' %
+              (name, latencies[len(latencies) // 2] * 1000,
+               latencies[len(latencies) * 9 // 10] * 1000, sum(latencies)))
+
+
+if __name__ == '__main__':
+    main()
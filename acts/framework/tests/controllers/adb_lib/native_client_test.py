@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import socket
+import socketserver
+import subprocess
+import threading
+import unittest
+
+import mock
+
+from acts.controllers import adb
+from acts.controllers.adb_lib.error import AdbError
+from acts.controllers.adb_lib.native_client import _PACKET_HEADER
+from acts.controllers.adb_lib.native_client import AdbNativeClient
+from acts.controllers.adb_lib.native_client import SHELL_EXIT
+from acts.controllers.adb_lib.native_client import SHELL_STDERR
+from acts.controllers.adb_lib.native_client import SHELL_STDIN
+from acts.controllers.adb_lib.native_client import SHELL_STDOUT
+from acts.libs.proc import job
+
+SERIAL = 'FAKE_SERIAL'
+
+
+class FakeAdbServerHandler(socketserver.BaseRequestHandler):
+    """Serves a single adb server connection.
+
+    Shells are run with the host's sh in place of the device's.
+    """
+
+    def read_exactly(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise EOFError()
+            data += chunk
+        return data
+
+    def read_request(self):
+        length = int(self.read_exactly(4), 16)
+        return self.read_exactly(length).decode()
+
+    def fail(self, message):
+        data = message.encode()
+        self.request.sendall(b'FAIL%04x' % len(data) + data)
+
+    def handle(self):
+        try:
+            request = self.read_request()
+            if request != 'host:transport:%s' % SERIAL:
+                self.fail('device \'%s\' not found' % request.split(':')[-1])
+                return
+            self.request.sendall(b'OKAY')
+            if self.read_request() != 'shell,v2,raw:':
+                self.fail('unsupported')
+                return
+            self.request.sendall(b'OKAY')
+            self.server.shells_opened += 1
+            self.run_shell()
+        except (EOFError, OSError):
+            pass
+
+    def run_shell(self):
+        shell = subprocess.Popen(['sh'], stdin=subprocess.PIPE,
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE)
+        self.server.shells.append(shell)
+        send_lock = threading.Lock()
+
+        def send_packet(packet_id, data):
+            with send_lock:
+                self.request.sendall(
+                    _PACKET_HEADER.pack(packet_id, len(data)) + data)
+
+        def forward(stream, packet_id):
+            with stream:
+                try:
+                    for data in iter(lambda: stream.read1(4096), b''):
+                        send_packet(packet_id, data)
+                except OSError:
+                    pass
+
+        def wait_for_exit(forwarders):
+            # Like adbd, report the exit status and close the stream once the
+            # shell exits.
+            for forwarder in forwarders:
+                forwarder.join()
+            try:
+                send_packet(SHELL_EXIT, bytes([shell.wait() & 0xff]))
+                self.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        forwarders = [
+            threading.Thread(target=forward,
+                             args=(shell.stdout, SHELL_STDOUT)),
+            threading.Thread(target=forward,
+                             args=(shell.stderr, SHELL_STDERR)),
+        ]
+        for forwarder in forwarders:
+            forwarder.start()
+        waiter = threading.Thread(target=wait_for_exit, args=(forwarders,))
+        waiter.start()
+        try:
+            with shell.stdin:
+                while True:
+                    packet_id, length = _PACKET_HEADER.unpack(
+                        self.read_exactly(_PACKET_HEADER.size))
+                    data = self.read_exactly(length)
+                    if packet_id == SHELL_STDIN:
+                        shell.stdin.write(data)
+                        shell.stdin.flush()
+        except (EOFError, OSError):
+            pass
+        finally:
+            if shell.poll() is None:
+                shell.kill()
+            waiter.join()
+
+
+class FakeAdbServer(socketserver.ThreadingTCPServer):
+    """An adb server with a single device, listening on a free local port."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeAdbServerHandler)
+        self.shells_opened = 0
+        self.shells = []
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        args=(0.05,))
+        self._thread.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def kill_shells(self):
+        for shell in self.shells:
+            shell.kill()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.kill_shells()
+        self._thread.join()
+
+
+class MockAdbProxy(adb.AdbProxy):
+    def __init__(self, port):
+        self.serial = SERIAL
+        self.adb_str = 'adb -s %s' % SERIAL
+        self._native_client = AdbNativeClient(SERIAL, port=port)
+
+
+class AdbNativeClientTest(unittest.TestCase):
+    """Tests acts.controllers.adb_lib.native_client.AdbNativeClient."""
+
+    def setUp(self):
+        self.server = FakeAdbServer()
+        self.client = AdbNativeClient(SERIAL, port=self.server.port)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_shell_returns_output_and_exit_status(self):
+        result = self.client.shell('echo out; echo err >&2; exit 3',
+                                   timeout=10)
+
+        self.assertEqual(result.stdout, 'out')
+        self.assertEqual(result.stderr, 'err')
+        self.assertEqual(result.exit_status, 3)
+
+    def test_shell_keeps_output_without_trailing_newline(self):
+        result = self.client.shell('printf "a\\nb"', timeout=10)
+
+        self.assertEqual(result._raw_stdout, b'a\nb')
+
+    def test_shell_reuses_the_same_shell(self):
+        for i in range(5):
+            self.assertEqual(self.client.shell('echo %d' % i).stdout, str(i))
+
+        self.assertEqual(self.server.shells_opened, 1)
+
+    def test_shell_does_not_share_state_between_commands(self):
+        self.client.shell('cd /; FOO=bar; export FOO')
+
+        self.assertEqual(self.client.shell('echo "$FOO"').stdout, '')
+
+    def test_shell_does_not_pass_later_commands_to_stdin(self):
+        self.assertEqual(self.client.shell('cat').stdout, '')
+        self.assertEqual(self.client.shell('echo after').stdout, 'after')
+
+    def test_shell_opens_a_shell_per_concurrent_command(self):
+        threads = [threading.Thread(target=self.client.shell,
+                                    args=('sleep 0.2',))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.server.shells_opened, 3)
+
+    def test_shell_retries_on_a_new_shell_if_idle_shell_was_closed(self):
+        self.client.shell('true')
+        self.server.kill_shells()
+
+        self.assertEqual(self.client.shell('echo ok', timeout=10).stdout,
+                         'ok')
+        self.assertEqual(self.server.shells_opened, 2)
+
+    def test_shell_raises_timeout_error(self):
+        with self.assertRaises(job.TimeoutError):
+            self.client.shell('sleep 5', timeout=0.1)
+
+        self.assertEqual(self.client.shell('echo ok').stdout, 'ok')
+
+    def test_shell_times_out_commands_that_keep_printing(self):
+        with self.assertRaises(job.TimeoutError) as context:
+            self.client.shell('while true; do echo a; sleep 0.1; done',
+                              timeout=0.5)
+
+        self.assertLess(context.exception.result.duration, 1)
+        self.assertEqual(self.client.shell('echo ok').stdout, 'ok')
+
+    def test_shell_reports_server_failures_like_the_adb_client(self):
+        client = AdbNativeClient('OTHER_SERIAL', port=self.server.port)
+
+        result = client.shell('true')
+
+        self.assertEqual(result.exit_status, 1)
+        self.assertEqual(result.stderr,
+                         "error: device 'OTHER_SERIAL' not found")
+
+    def test_shell_raises_if_server_is_not_running(self):
+        port = self.server.port
+        self.server.stop()
+        self.server = mock.Mock()
+        client = AdbNativeClient(SERIAL, port=port)
+
+        with self.assertRaises(ConnectionRefusedError):
+            client.shell('true')
+
+
+class AdbProxyNativeClientTest(unittest.TestCase):
+    """Tests AdbProxy with the native client."""
+
+    def setUp(self):
+        self.server = FakeAdbServer()
+        self.proxy = MockAdbProxy(self.server.port)
+
+    def tearDown(self):
+        self.proxy._native_client.close()
+        self.server.stop()
+
+    def test_shell_returns_stdout(self):
+        self.assertEqual(self.proxy.shell('echo "a b"'), 'a b')
+
+    def test_shell_parses_parcel_output(self):
+        output = self.proxy.shell(
+            "echo \"Result: Parcel(0x00000000: 00000000 '....1.2.')\"")
+
+        self.assertEqual(output, '12')
+
+    def test_shell_raises_adb_error_if_device_is_not_found(self):
+        self.proxy._native_client = AdbNativeClient('OTHER_SERIAL',
+                                                    port=self.server.port)
+
+        with self.assertRaises(AdbError):
+            self.proxy.shell('true')
+
+    def test_shell_returns_stderr_when_ignoring_status(self):
+        self.assertEqual(
+            self.proxy.shell('echo err >&2; exit 1', ignore_status=True),
+            'err')
+
+    def test_shell_falls_back_to_adb_client_if_server_is_not_running(self):
+        self.proxy._native_client = AdbNativeClient(SERIAL, port=1)
+
+        with mock.patch.object(self.proxy, '_exec_cmd',
+                               return_value='out') as exec_cmd:
+            self.assertEqual(self.proxy.shell('echo out'), 'out')
+
+        self.assertEqual(exec_cmd.call_args[0][0],
+                         "adb -s %s shell 'echo out'" % SERIAL)
+
+    def test_close_closes_the_idle_shells(self):
+        self.proxy.shell('true')
+
+        self.proxy.close()
+
+        self.assertEqual(self.proxy._native_client._num_sessions, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
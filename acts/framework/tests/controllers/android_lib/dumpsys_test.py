@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import threading
+import time
+import unittest
+
+import mock
+
+from acts.controllers.android_lib import dumpsys
+from acts.controllers.android_lib.dumpsys import DumpsysCache
+
+REGISTRY_OUTPUT = '''Last Known Values for PhoneId 0:
+  mCallState=0
+  mServiceState=Voice Registration State: IN_SERVICE
+  mSignalStrength=SignalStrength: primary=CellSignalStrengthLte
+Last Known Values for PhoneId 1:
+  mCallState=2
+'''
+
+
+class DumpsysCacheTest(unittest.TestCase):
+    """Tests acts.controllers.android_lib.dumpsys."""
+
+    def setUp(self):
+        self.adb = mock.Mock()
+        self.adb.shell.return_value = REGISTRY_OUTPUT
+
+    def test_get_runs_dumpsys_of_the_service(self):
+        cache = DumpsysCache(self.adb)
+
+        snapshot = cache.get('telephony.registry')
+
+        self.adb.shell.assert_called_once_with('dumpsys telephony.registry')
+        self.assertEqual(snapshot.service, 'telephony.registry')
+        self.assertEqual(snapshot.output, REGISTRY_OUTPUT)
+
+    def test_get_reuses_the_snapshot_within_the_ttl(self):
+        cache = DumpsysCache(self.adb, ttl=10)
+
+        first = cache.get('telephony.registry')
+        second = cache.get('telephony.registry')
+
+        self.assertIs(first, second)
+        self.assertEqual(self.adb.shell.call_count, 1)
+
+    def test_grep_searches_a_fresh_snapshot(self):
+        cache = DumpsysCache(self.adb, ttl=10)
+        cache.get('telephony.registry')
+
+        output = cache.grep('telephony.registry', 'mcallstate',
+                            ignore_case=True)
+
+        self.assertEqual(output, '  mCallState=0\n  mCallState=2')
+        self.assertEqual(self.adb.shell.call_count, 1)
+
+    def test_grep_filters_on_the_device_without_a_fresh_snapshot(self):
+        cache = DumpsysCache(self.adb, ttl=10)
+        self.adb.shell.return_value = '  version_string: 1-2'
+
+        output = cache.grep('carrier_config', 'version_string')
+
+        self.assertEqual(output, '  version_string: 1-2')
+        self.adb.shell.assert_called_once_with(
+            'dumpsys carrier_config | grep -F -e version_string')
+        cache.grep('carrier_config', 'version_string')
+        self.assertEqual(self.adb.shell.call_count, 2)
+
+    def test_get_caches_each_service_separately(self):
+        cache = DumpsysCache(self.adb, ttl=10)
+
+        cache.get('telephony.registry')
+        cache.get('telecom')
+
+        self.assertEqual(self.adb.shell.call_count, 2)
+
+    @mock.patch.object(dumpsys.time, 'time')
+    def test_get_fetches_again_once_the_ttl_expired(self, time_mock):
+        cache = DumpsysCache(self.adb, ttl=2)
+        time_mock.return_value = 100
+        cache.get('telephony.registry')
+
+        time_mock.return_value = 101
+        cache.get('telephony.registry')
+        self.assertEqual(self.adb.shell.call_count, 1)
+
+        time_mock.return_value = 102
+        cache.get('telephony.registry')
+        self.assertEqual(self.adb.shell.call_count, 2)
+
+    def test_get_does_not_cache_if_the_ttl_is_zero(self):
+        cache = DumpsysCache(self.adb, ttl=0)
+
+        cache.get('telephony.registry')
+        cache.get('telephony.registry')
+
+        self.assertEqual(self.adb.shell.call_count, 2)
+
+    def test_invalidate_discards_every_snapshot(self):
+        cache = DumpsysCache(self.adb, ttl=10)
+        cache.get('telephony.registry')
+        cache.get('telecom')
+
+        cache.invalidate()
+        cache.get('telephony.registry')
+        cache.get('telecom')
+
+        self.assertEqual(self.adb.shell.call_count, 4)
+
+    def test_invalidate_discards_the_snapshot_of_a_service(self):
+        cache = DumpsysCache(self.adb, ttl=10)
+        cache.get('telephony.registry')
+        cache.get('telecom')
+
+        cache.invalidate('telecom')
+        cache.get('telephony.registry')
+        cache.get('telecom')
+
+        self.assertEqual(self.adb.shell.call_count, 3)
+
+    def test_snapshot_fetched_during_invalidate_is_not_cached(self):
+        cache = DumpsysCache(self.adb, ttl=10)
+
+        def invalidate_while_fetching(command):
+            cache.invalidate()
+            return REGISTRY_OUTPUT
+
+        self.adb.shell.side_effect = invalidate_while_fetching
+        cache.get('telephony.registry')
+        cache.get('telephony.registry')
+
+        self.assertEqual(self.adb.shell.call_count, 2)
+
+    def test_concurrent_gets_share_a_single_fetch(self):
+        cache = DumpsysCache(self.adb, ttl=10)
+
+        def fetch_slowly(command):
+            time.sleep(0.2)
+            return REGISTRY_OUTPUT
+
+        self.adb.shell.side_effect = fetch_slowly
+        threads = [
+            threading.Thread(target=cache.get, args=('telephony.registry', ))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.adb.shell.call_count, 1)
+
+    def test_grep_returns_the_matching_lines(self):
+        snapshot = DumpsysCache(self.adb).get('telephony.registry')
+
+        self.assertEqual(snapshot.grep('mCallState'),
+                         '  mCallState=0\n  mCallState=2')
+        self.assertEqual(snapshot.grep('mCallIncomingNumber'), '')
+
+    def test_grep_ignores_case(self):
+        snapshot = DumpsysCache(self.adb).get('telephony.registry')
+
+        self.assertEqual(snapshot.grep('signalstrength'), '')
+        self.assertEqual(
+            snapshot.grep('signalstrength', ignore_case=True),
+            '  mSignalStrength=SignalStrength: primary=CellSignalStrengthLte')
+
+    def test_findall(self):
+        snapshot = DumpsysCache(self.adb).get('telephony.registry')
+
+        self.assertEqual(snapshot.findall(r'mCallState=(\d)'), ['0', '2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks the lines/sec of logcat ingestion, with and without direct_write.
+
+A synthetic logcat generator is run as the logcat process, so no device is
+required.
+
+Usage:
+    python3 logcat_benchmark.py [--lines 500000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from acts.controllers.android_lib import logcat
+from acts.libs.logging import log_stream
+from acts.libs.logging.log_stream import LogStyles
+from acts.libs.proc.process import Process
+
+LEVELS = 'VVDDDIIWE'
+TAGS = ['RILJ', 'ServiceState', 'QtiImsExt', 'WifiHAL', 'ActivityManager']
+
+
+def generate_logcat(num_lines):
+    """Writes num_lines synthetic '-v year' logcat lines to stdout."""
+    rand = random.Random(0)
+    out = sys.stdout.buffer
+    lines = []
+    for i in range(num_lines):
+        ms = i // 10
+        lines.append(
+            '2020-01-01 12:%02d:%02d.%03d  %4d  %4d %s %s: [%d] radio message '
+            'with a typical payload length for verbose logging\n' %
+            (ms // 60000 % 60, ms // 1000 % 60, ms % 1000, 1000 + i % 7,
+             2000 + i % 13, rand.choice(LEVELS), rand.choice(TAGS), i))
+        if len(lines) == 1000:
+            out.write(''.join(lines).encode())
+            lines = []
+    out.write(''.join(lines).encode())
+    out.flush()
+
+
+def run_process(process):
+    """Runs the process until it ends, returning the elapsed time."""
+    start_time = time.perf_counter()
+    process.start()
+    process.wait(kill_timeout=3600)
+    return time.perf_counter() - start_time
+
+
+def time_logging(command, serial):
+    logger = log_stream.create_logger(
+        'adblog_%s' % serial, log_name=serial,
+        log_styles=(LogStyles.LOG_DEBUG | LogStyles.TESTCASE_LOG))
+    process = Process(command)
+    process.set_on_output_callback(
+        logcat._log_line_func(logger, logcat.TimestampTracker()))
+    elapsed_time = run_process(process)
+    log_stream._log_streams['adblog_%s' % serial].cleanup()
+    return elapsed_time
+
+
+def time_direct_write(command, serial):
+    writer = logcat.LogcatFileWriter('adblog_%s' % serial, serial)
+    process = Process(command)
+    process.set_on_output_callback(logcat._write_output_func(writer),
+                                   binary=True,
+                                   chunk_size=logcat.LOGCAT_READ_SIZE)
+    elapsed_time = run_process(process)
+    writer.close()
+    return elapsed_time
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the lines/sec of logcat ingestion.')
+    parser.add_argument('--lines', type=int, default=500000,
+                        help='The number of logcat lines to ingest.')
+    parser.add_argument('--generate', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.generate:
+        generate_logcat(args.lines)
+        return
+
+    command = [sys.executable, os.path.abspath(__file__), '--generate',
+               '--lines', str(args.lines)]
+    start_time = time.perf_counter()
+    subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+    generation_time = time.perf_counter() - start_time
+
+    logging.log_path = tempfile.mkdtemp()
+    try:
+        print('Ingesting %d lines (generating them alone takes %.2fs).' %
+              (args.lines, generation_time))
+        for name, time_func in [('logging', time_logging),
+                                ('direct_write', time_direct_write)]:
+            elapsed_time = time_func(command, name)
+            print('%-12s %10.0f lines/sec  total %7.2fs' %
+                  (name, args.lines / elapsed_time, elapsed_time))
+    finally:
+        shutil.rmtree(logging.log_path)
+
+
+if __name__ == '__main__':
+    main()
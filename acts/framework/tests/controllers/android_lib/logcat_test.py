@@ -14,10 +14,17 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 
 import mock
+from acts import context
 from acts.controllers.android_lib import logcat
+from acts.controllers.android_lib.logcat import LogcatFileWriter
+from acts.controllers.android_lib.logcat import LogcatIndex
+from acts.controllers.android_lib.logcat import LogcatPublisher
 from acts.controllers.android_lib.logcat import TimestampTracker
 
 BASE_TIMESTAMP = '2000-01-01 12:34:56.789   123 75348 '
@@ -170,6 +177,326 @@ class LogcatTest(unittest.TestCase):
 
         self.assertEqual(process.set_on_terminate_callback.called, True)
 
+    def test_create_logcat_keepalive_process_direct_write_uses_a_writer(self):
+        with self.patch('log_stream') as log_stream, \
+                self.patch('Process') as process, \
+                self.patch('LogcatFileWriter') as writer:
+            logcat.create_logcat_keepalive_process('S3R14L', 'dir',
+                                                   direct_write=True)
+            logcat.create_logcat_keepalive_process('S3R14L', 'dir',
+                                                   direct_write=True)
+
+        self.assertFalse(log_stream.create_logger.called)
+        writer.assert_called_with(
+            'adblog_S3R14L', 'S3R14L', subcontext='dir',
+            publisher=logcat.get_logcat_publisher('S3R14L'))
+        self.assertTrue(writer.return_value.close.called)
+        self.assertEqual(
+            process.return_value.set_on_output_callback.call_args[1], {
+                'binary': True,
+                'chunk_size': logcat.LOGCAT_READ_SIZE
+            })
+        logcat._logcat_writers.clear()
+
+    def test_close_logcat_writer_closes_the_writer_of_the_device(self):
+        with self.patch('Process'), \
+                self.patch('LogcatFileWriter') as writer:
+            logcat.create_logcat_keepalive_process('S3R14L', 'dir',
+                                                   direct_write=True)
+
+        logcat.close_logcat_writer('S3R14L')
+        logcat.close_logcat_writer('S3R14L')
+
+        writer.return_value.close.assert_called_once_with()
+        self.assertEqual(logcat._logcat_writers, {})
+
+    def test_log_line_func_publishes_the_line(self):
+        publisher = mock.Mock()
+
+        logcat._log_line_func(mock.Mock(), mock.Mock(),
+                              publisher)(BASE_TIMESTAMP + 'D message')
+
+        publisher.publish.assert_called_with(BASE_TIMESTAMP + 'D message')
+
+    # _write_output_func
+
+    def test_write_output_func_only_flushes_short_reads(self):
+        writer = mock.Mock()
+        write_output = logcat._write_output_func(writer)
+
+        write_output(b'a' * logcat.LOGCAT_READ_SIZE)
+        self.assertFalse(writer.flush.called)
+
+        write_output(b'a\n')
+        self.assertTrue(writer.flush.called)
+        writer.write.assert_called_with(b'a\n')
+
+
+def _line(second, message='message'):
+    return '2000-01-01 12:%02d:%02d.000   123   456 D Tag: %s\n' % (
+        second // 60, second % 60, message)
+
+
+def _timestamp(second):
+    return _line(second)[:logcat.LINE_TIMESTAMP_LEN]
+
+
+class LogcatIndexTest(unittest.TestCase):
+    """Tests acts.controllers.android_lib.logcat.LogcatIndex"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'adblog_S3R14L_debug.txt')
+        self.index = LogcatIndex(self.path)
+        self.index.BLOCK_SIZE = len(_line(0)) * 10
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, lines, mode='a'):
+        with open(self.path, mode) as f:
+            f.write(''.join(lines))
+
+    def test_epoch_to_line_timestamp_pads_milliseconds(self):
+        timestamp = logcat.epoch_to_line_timestamp(1000005)
+
+        self.assertEqual(len(timestamp), logcat.LINE_TIMESTAMP_LEN)
+        self.assertTrue(timestamp.endswith('.005'))
+
+    def test_read_lines_returns_nothing_for_empty_file(self):
+        self.write([])
+
+        self.assertEqual(list(self.index.read_lines(_timestamp(0))), [])
+
+    def test_read_lines_skips_blocks_before_the_window(self):
+        lines = [_line(i) for i in range(100)]
+        self.write(lines)
+
+        read = list(self.index.read_lines(_timestamp(55), _timestamp(60)))
+
+        self.assertIn(lines[55], read)
+        self.assertIn(lines[60], read)
+        self.assertNotIn(lines[0], read)
+        self.assertNotIn(lines[99], read)
+        self.assertLessEqual(len(read), 30)
+
+    def test_read_lines_includes_lines_before_their_predecessors(self):
+        lines = [_line(i) for i in range(100)]
+        lines[75] = _line(50, 'late')
+        self.write(lines)
+
+        read = list(self.index.read_lines(_timestamp(50), _timestamp(50)))
+
+        self.assertIn(lines[50], read)
+        self.assertIn(lines[75], read)
+
+    def test_read_lines_continues_to_end_of_file_without_end(self):
+        lines = [_line(i) for i in range(100)]
+        self.write(lines)
+
+        read = list(self.index.read_lines(_timestamp(95)))
+
+        self.assertEqual(read[-1], lines[-1])
+
+    def test_update_only_reads_appended_lines(self):
+        self.write([_line(i) for i in range(50)])
+        self.index.update()
+        self.write([_line(i) for i in range(50, 100)])
+
+        with mock.patch.object(self.index, '_index_line') as index_line:
+            self.index.update()
+
+        self.assertEqual(index_line.call_count, 50)
+
+    def test_update_does_not_index_partial_lines(self):
+        self.write([_line(0), _line(1)[:10]])
+        self.index.update()
+        self.write([_line(1)[10:]])
+
+        read = list(self.index.read_lines(_timestamp(1), _timestamp(1)))
+
+        self.assertEqual(read, [_line(0), _line(1)])
+
+    def test_update_rebuilds_index_when_the_file_is_truncated(self):
+        self.write([_line(i) for i in range(100)])
+        self.index.update()
+        self.write([_line(i) for i in range(10)], mode='w')
+
+        start, end = self.index.get_byte_range(_timestamp(5), _timestamp(6))
+
+        self.assertEqual((start, end), (0, None))
+
+
+class LogcatFileWriterTest(unittest.TestCase):
+    """Tests acts.controllers.android_lib.logcat.LogcatFileWriter"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_dir = self.tmp_dir
+        patcher = mock.patch.object(context, 'get_current_context')
+        get_current_context = patcher.start()
+        self.addCleanup(patcher.stop)
+        get_current_context.return_value.get_full_output_path.side_effect = (
+            lambda log_name: self.output_dir)
+        self.writer = LogcatFileWriter('adblog_S3R14L', 'S3R14L')
+        self.addCleanup(self.writer.close)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read(self, directory=None):
+        self.writer.flush()
+        with open(os.path.join(directory or self.tmp_dir,
+                               'adblog_S3R14L_debug.txt')) as f:
+            return f.read()
+
+    def test_write_writes_complete_lines(self):
+        self.writer.write((_line(0) + _line(1)).encode())
+
+        self.assertEqual(self.read(), _line(0) + _line(1))
+        self.assertEqual(self.writer.last_timestamp, _timestamp(1))
+
+    def test_write_keeps_incomplete_lines_for_the_next_chunk(self):
+        data = (_line(0) + _line(1)).encode()
+
+        self.writer.write(data[:10])
+        self.assertEqual(self.read(), '')
+        self.writer.write(data[10:len(_line(0)) + 10])
+        self.assertEqual(self.read(), _line(0))
+        self.assertEqual(self.writer.last_timestamp, _timestamp(0))
+        self.writer.write(data[len(_line(0)) + 10:])
+        self.assertEqual(self.read(), _line(0) + _line(1))
+        self.assertEqual(self.writer.last_timestamp, _timestamp(1))
+
+    def test_write_keeps_the_timestamp_of_lines_without_one(self):
+        self.writer.write(_line(0).encode())
+        self.writer.write(b'--------- beginning of main\n')
+
+        self.assertEqual(self.writer.last_timestamp, _timestamp(0))
+
+    def test_new_test_case_moves_the_file(self):
+        self.writer.write(_line(0).encode())
+        self.output_dir = os.path.join(self.tmp_dir, 'test_case')
+        os.makedirs(self.output_dir)
+
+        self.writer._on_new_context(context.NewTestCaseContextEvent())
+        self.writer.write(_line(1).encode())
+
+        self.assertEqual(self.read(), _line(0))
+        self.assertEqual(self.read(self.output_dir), _line(1))
+
+    def test_write_publishes_complete_lines(self):
+        publisher = LogcatPublisher('S3R14L')
+        self.writer._publisher = publisher
+        subscription = publisher.subscribe('message')
+        data = (_line(0) + _line(1)).encode()
+
+        self.writer.write(data[:10])
+        self.assertTrue(subscription.queue.empty())
+        self.writer.write(data[10:])
+
+        self.assertEqual(subscription.get(timeout=0).line, _line(0)[:-1])
+        self.assertEqual(subscription.get(timeout=0).line, _line(1)[:-1])
+        self.assertTrue(subscription.queue.empty())
+
+    def test_close_writes_the_incomplete_line(self):
+        self.writer.write(_line(0).encode()[:10])
+
+        self.writer.close()
+
+        with open(os.path.join(self.tmp_dir, 'adblog_S3R14L_debug.txt')) as f:
+            self.assertEqual(f.read(), _line(0)[:10])
+
+
+class LogcatPublisherTest(unittest.TestCase):
+    """Tests acts.controllers.android_lib.logcat.LogcatPublisher"""
+
+    def setUp(self):
+        self.publisher = LogcatPublisher('S3R14L')
+
+    def get_lines(self, subscription):
+        lines = []
+        while not subscription.queue.empty():
+            lines.append(subscription.get().line)
+        return lines
+
+    def test_subscription_gets_the_matching_lines(self):
+        subscription = self.publisher.subscribe([r'RSSI: (-\d+)', 'PwLv'])
+
+        for line in ['Handle: RSSI: -45', 'Handle: TxPL', 'PwLv: 0x2']:
+            self.publisher.publish(line)
+
+        match = subscription.get(timeout=0)
+        self.assertEqual(match.pattern, r'RSSI: (-\d+)')
+        self.assertEqual(match.match.group(1), '-45')
+        self.assertEqual(self.get_lines(subscription), ['PwLv: 0x2'])
+
+    def test_each_subscription_gets_its_own_matches(self):
+        first = self.publisher.subscribe('first')
+        second = self.publisher.subscribe('second')
+
+        self.publisher.publish('first line')
+        self.publisher.publish('second line')
+
+        self.assertEqual(self.get_lines(first), ['first line'])
+        self.assertEqual(self.get_lines(second), ['second line'])
+
+    def test_line_matching_several_patterns_is_delivered_for_each(self):
+        subscription = self.publisher.subscribe(['line', 'first'])
+
+        self.publisher.publish('first line')
+
+        self.assertEqual(
+            [subscription.get(timeout=0).pattern for _ in range(2)],
+            ['line', 'first'])
+
+    def test_patterns_that_cannot_be_combined_are_matched_separately(self):
+        subscription = self.publisher.subscribe(
+            ['(?P<word>first)', '(a)\\1', 'other'])
+        other = self.publisher.subscribe('(?P<word>second)')
+
+        for line in ['first', 'aa', 'ab', 'second']:
+            self.publisher.publish(line)
+
+        self.assertEqual(subscription.get(timeout=0).match.group('word'),
+                         'first')
+        self.assertEqual(self.get_lines(subscription), ['aa'])
+        self.assertEqual(self.get_lines(other), ['second'])
+
+    def test_subscription_calls_the_callback(self):
+        callback = mock.Mock()
+        subscription = self.publisher.subscribe('line', callback=callback)
+
+        self.publisher.publish('a line')
+
+        self.assertEqual(callback.call_args[0][0].line, 'a line')
+        self.assertIsNone(subscription.queue)
+
+    def test_failing_callback_does_not_stop_other_subscriptions(self):
+        self.publisher.subscribe('line', callback=mock.Mock(
+            side_effect=Exception('failed')))
+        subscription = self.publisher.subscribe('line')
+
+        with self.assertLogs(level='ERROR'):
+            self.publisher.publish('a line')
+
+        self.assertEqual(self.get_lines(subscription), ['a line'])
+
+    def test_unsubscribe_stops_the_subscription(self):
+        with self.publisher.subscribe('line') as subscription:
+            self.assertTrue(self.publisher.has_subscriptions)
+
+        self.publisher.publish('a line')
+
+        self.assertFalse(self.publisher.has_subscriptions)
+        self.assertTrue(subscription.queue.empty())
+
+    def test_get_logcat_publisher_returns_one_publisher_per_device(self):
+        self.assertIs(logcat.get_logcat_publisher('S3R14L'),
+                      logcat.get_logcat_publisher('S3R14L'))
+        self.assertIsNot(logcat.get_logcat_publisher('S3R14L'),
+                         logcat.get_logcat_publisher('OTHER'))
+
 
 if __name__ == '__main__':
     unittest.main()
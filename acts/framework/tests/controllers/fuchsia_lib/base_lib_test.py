@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import http.server
+import json
+import threading
+import time
+import unittest
+
+import mock
+import requests
+
+from acts.controllers.fuchsia_lib import base_lib
+from acts.controllers.fuchsia_lib.base_lib import BaseLib
+from acts.controllers.fuchsia_lib.base_lib import DeviceOffline
+from acts.controllers.fuchsia_lib.base_lib import Sl4fTransport
+
+
+class FakeSl4fHandler(http.server.BaseHTTPRequestHandler):
+    """Echoes the method and params of each JSON-RPC request as its result."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        request = json.loads(
+            self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.connections.add(self.client_address)
+        self.server.requests.append(request)
+        if isinstance(request, list) and self.server.supports_batch:
+            response = [self.respond(r) for r in reversed(request)]
+        elif isinstance(request, list):
+            response = {'id': None, 'result': None, 'error': 'Bad request'}
+        else:
+            response = self.respond(request)
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def respond(self, request):
+        return {
+            'id': request['id'],
+            'result': [request['method'], request['params']],
+            'error': None
+        }
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeSl4fServer(http.server.ThreadingHTTPServer):
+    """An SL4F server listening on a free local port."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeSl4fHandler)
+        self.connections = set()
+        self.requests = []
+        self.supports_batch = True
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        args=(0.05, ))
+        self._thread.start()
+
+    @property
+    def address(self):
+        return 'http://127.0.0.1:%d' % self.server_address[1]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class Sl4fTransportTest(unittest.TestCase):
+    """Tests acts.controllers.fuchsia_lib.base_lib.Sl4fTransport."""
+
+    def setUp(self):
+        self.server = FakeSl4fServer()
+        self.transport = Sl4fTransport(self.server.address)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def request(self, request_id, method='test.method', params=None):
+        return {
+            'jsonrpc': '2.0',
+            'id': request_id,
+            'method': method,
+            'params': params or {}
+        }
+
+    @mock.patch('acts.utils.is_pingable')
+    def test_send_reuses_the_connection_without_pinging(self, is_pingable):
+        for i in range(3):
+            response = self.transport.send(self.request(i))
+            self.assertEqual(response['id'], i)
+
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertFalse(is_pingable.called)
+
+    @mock.patch('acts.utils.is_pingable', return_value=False)
+    def test_send_raises_device_offline_if_unreachable(self, _):
+        self.server.stop()
+        self.server = mock.Mock()
+
+        with self.assertRaises(DeviceOffline):
+            self.transport.send(self.request(0))
+
+    @mock.patch('acts.utils.is_pingable', return_value=True)
+    def test_send_reraises_errors_if_reachable(self, _):
+        self.server.stop()
+        self.server = mock.Mock()
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.transport.send(self.request(0))
+
+    def test_send_batch_returns_responses_in_request_order(self):
+        responses = self.transport.send_batch(
+            [self.request(i, params={'i': i}) for i in range(3)])
+
+        self.assertEqual([r['result'][1] for r in responses],
+                         [{'i': 0}, {'i': 1}, {'i': 2}])
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_send_batch_falls_back_to_single_requests(self):
+        self.server.supports_batch = False
+
+        responses = self.transport.send_batch(
+            [self.request(i) for i in range(3)])
+        self.transport.send_batch([self.request(3)])
+
+        self.assertEqual([r['id'] for r in responses], [0, 1, 2])
+        self.assertEqual([isinstance(r, list) for r in self.server.requests],
+                         [True, False, False, False, False])
+
+    @mock.patch('acts.utils.is_pingable', return_value=False)
+    def test_health_probe_fails_requests_while_unreachable(self, _):
+        self.transport.start_health_probe(0.01)
+        time.sleep(0.1)
+
+        with self.assertRaises(DeviceOffline):
+            self.transport.send(self.request(0))
+        self.assertEqual(self.server.requests, [])
+
+        self.transport.stop_health_probe()
+        self.assertEqual(self.transport.send(self.request(0))['id'], 0)
+
+
+class BaseLibTest(unittest.TestCase):
+    """Tests acts.controllers.fuchsia_lib.base_lib.BaseLib."""
+
+    def setUp(self):
+        self.server = FakeSl4fServer()
+        self.lib = BaseLib(self.server.address, 0, 'client')
+
+    def tearDown(self):
+        base_lib.close_transport(self.server.address)
+        self.server.stop()
+
+    def test_libs_of_an_address_share_the_transport(self):
+        other_lib = BaseLib(self.server.address, 0, 'other')
+
+        self.lib.send_command('client.0', 'test.method', {})
+        other_lib.send_command('other.0', 'test.method', {})
+
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_send_batch_builds_ids_from_the_test_counter(self):
+        responses = self.lib.send_batch([('test.a', {'a': 1}),
+                                         ('test.b', {})])
+
+        self.assertEqual([r['id'] for r in responses],
+                         ['client.0', 'client.1'])
+        self.assertEqual([r['result'] for r in responses],
+                         [['test.a', {'a': 1}], ['test.b', {}]])
+        self.assertEqual(self.lib.test_counter, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import unittest
+
+import mock
+import paramiko
+
+from acts.controllers.fuchsia_lib.utils_lib import SshConnectionPool
+
+USERNAME = 'fuchsia'
+
+# Both ends log the resets of connections closed by the tests.
+logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+
+
+class FakeSshServerInterface(paramiko.ServerInterface):
+    """Accepts the test key, and runs exec requests with the host's sh."""
+
+    def __init__(self, server, key):
+        self._server = server
+        self._key = key
+
+    def get_allowed_auths(self, username):
+        return 'publickey'
+
+    def check_auth_publickey(self, username, key):
+        if username == USERNAME and key == self._key:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self._exec, args=(channel, command),
+                         daemon=True).start()
+        return True
+
+    def _exec(self, channel, command):
+        with self._server.lock:
+            self._server.running += 1
+            self._server.max_running = max(self._server.max_running,
+                                           self._server.running)
+        result = subprocess.run(['sh', '-c', command.decode()],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE)
+        with self._server.lock:
+            self._server.running -= 1
+        try:
+            channel.sendall(result.stdout)
+            channel.sendall_stderr(result.stderr)
+            channel.send_exit_status(result.returncode)
+            channel.close()
+        except (EOFError, OSError, paramiko.SSHException):
+            pass
+
+
+class FakeSshServer(object):
+    """An ssh server listening on a free local port."""
+
+    def __init__(self, key):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.running = 0
+        self.max_running = 0
+        self.transports = []
+        self._key = key
+        self._host_key = paramiko.RSAKey.generate(1024)
+        self._socket = socket.socket()
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(8)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self):
+        return self._socket.getsockname()[1]
+
+    def _serve(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(connection)
+            transport.add_server_key(self._host_key)
+            self.connections += 1
+            self.transports.append(transport)
+            transport.start_server(
+                server=FakeSshServerInterface(self, self._key))
+
+    def drop_connections(self):
+        for transport in self.transports:
+            transport.close()
+
+    def stop(self):
+        self._socket.shutdown(socket.SHUT_RDWR)
+        self._socket.close()
+        self._thread.join()
+        self.drop_connections()
+
+
+class SshConnectionPoolTest(unittest.TestCase):
+    """Tests acts.controllers.fuchsia_lib.utils_lib.SshConnectionPool."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.key = paramiko.RSAKey.generate(1024)
+        key_path = os.path.join(cls.tmp_dir, 'id_rsa')
+        cls.key.write_private_key_file(key_path)
+        cls.ssh_config = os.path.join(cls.tmp_dir, 'ssh_config')
+        with open(cls.ssh_config, 'w') as f:
+            f.write('Host *\n  IdentityFile %s\n' % key_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def setUp(self):
+        self.server = FakeSshServer(self.key)
+        self.pool = SshConnectionPool('127.0.0.1', USERNAME, self.ssh_config,
+                                      port=self.server.port)
+        patcher = mock.patch('acts.utils.is_pingable', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.stop()
+
+    def test_run_returns_results(self):
+        results = self.pool.run('echo out; echo err >&2; exit 3')
+
+        self.assertEqual(results.stdout, 'out\n')
+        self.assertEqual(results.stderr, 'err\n')
+        self.assertEqual(results.exit_status, 3)
+
+    def test_run_reuses_the_connection(self):
+        for i in range(3):
+            self.assertEqual(self.pool.run('echo %d' % i).stdout, '%d\n' % i)
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(
+            self.pool.stats(), {
+                'connections_opened': 1,
+                'connections': 1,
+                'active_channels': 0,
+                'commands_run': 3,
+            })
+
+    def test_run_shares_a_connection_between_concurrent_commands(self):
+        barrier = threading.Barrier(3)
+
+        def run():
+            barrier.wait()
+            self.pool.run('sleep 0.2')
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.server.max_running, 3)
+        self.assertLessEqual(self.pool.stats()['connections'], 3)
+        self.assertEqual(self.pool.stats()['active_channels'], 0)
+
+    def test_run_opens_a_connection_once_channels_are_exhausted(self):
+        self.pool.max_channels_per_connection = 1
+        thread = threading.Thread(target=self.pool.run, args=('sleep 0.2', ))
+        thread.start()
+        while not self.server.running:
+            pass
+
+        self.pool.run('true')
+        thread.join()
+
+        self.assertEqual(self.server.connections, 2)
+
+    def test_run_reconnects_after_the_connection_is_dropped(self):
+        self.pool.run('true')
+        self.server.drop_connections()
+
+        self.assertEqual(self.pool.run('echo ok').stdout, 'ok\n')
+        self.assertEqual(self.server.connections, 2)
+
+    def test_close_closes_the_connections(self):
+        self.pool.run('true')
+
+        self.pool.close()
+
+        self.assertEqual(self.pool.stats()['connections'], 0)
+        self.assertEqual(self.pool.run('true').exit_status, 0)
+        self.assertEqual(self.server.connections, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from acts.controllers.monsoon_lib.api.common import MonsoonError
+from acts.controllers.monsoon_lib.api.common import MonsoonResult
+from acts.controllers.monsoon_lib.sampling.capture_file import CaptureFileWriter
+from acts.controllers.monsoon_lib.sampling.pyramid import PyramidWriter
+from acts.controllers.monsoon_lib.sampling.pyramid import get_pyramid_path
+from acts.controllers.monsoon_lib.sampling.statistics import CurrentStatistics
+
+
+class MonsoonResultTest(unittest.TestCase):
+    """Unit tests the MonsoonResult class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.text_path = os.path.join(self.tmp_dir, 'data.txt')
+        self.capture_path = os.path.join(self.tmp_dir, 'data.capture')
+
+        with open(self.text_path, 'w') as f:
+            f.write('0.100000000s 1.000000000000\n'
+                    '0.200000000s 2.000000000000\n'
+                    '0.300000000s 3.000000000000\n')
+        writer = CaptureFileWriter(self.capture_path, 5000, 4.2)
+        writer.open()
+        writer.write([.1, .2, .3], [1, 2, 3])
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_data_points_reads_both_formats(self):
+        for path in [self.text_path, self.capture_path]:
+            data_points = list(
+                MonsoonResult(3, 6, 5000, 4.2, path).get_data_points())
+
+            self.assertEqual([point.time for point in data_points],
+                             [.1, .2, .3])
+            self.assertEqual([point.current for point in data_points],
+                             [1, 2, 3])
+
+    def test_get_data_arrays_slices_time_range_for_both_formats(self):
+        for path in [self.text_path, self.capture_path]:
+            times, currents = MonsoonResult(3, 6, 5000, 4.2,
+                                            path).get_data_arrays(.15, .3)
+
+            np.testing.assert_allclose(times, [.2])
+            np.testing.assert_allclose(currents, [2])
+
+    def test_convert_to_text_writes_legacy_format(self):
+        output_path = os.path.join(self.tmp_dir, 'converted.txt')
+
+        MonsoonResult(3, 6, 5000, 4.2,
+                      self.capture_path).convert_to_text(output_path)
+
+        with open(output_path) as converted, open(self.text_path) as text:
+            self.assertEqual(converted.read(), text.read())
+
+    def test_get_capture_file_raises_for_text_files(self):
+        with self.assertRaises(MonsoonError):
+            MonsoonResult(3, 6, 5000, 4.2, self.text_path).get_capture_file()
+
+    def test_get_pyramid_reads_pyramid_next_to_data_file(self):
+        writer = PyramidWriter(get_pyramid_path(self.capture_path), 5000, 4.2,
+                               levels=(1, ))
+        writer.open()
+        writer.write([.1, .2, .3], [1, 2, 3])
+        writer.close()
+
+        pyramid = MonsoonResult(3, 6, 5000, 4.2,
+                                self.capture_path).get_pyramid()
+
+        np.testing.assert_array_equal(
+            pyramid.get_level(1).get_column('mean_current'), [1.5, 3])
+
+    def test_get_pyramid_raises_if_no_pyramid_was_written(self):
+        with self.assertRaises(MonsoonError):
+            MonsoonResult(3, 6, 5000, 4.2, self.capture_path).get_pyramid()
+
+    def test_statistics_are_reported_in_milliamps(self):
+        statistics = CurrentStatistics()
+        statistics.add([.1, .2, .3], [1, 2, 3])
+        result = MonsoonResult(3, 6, 5000, 4.2, self.text_path,
+                               statistics=statistics)
+
+        self.assertEqual(result.max_current, 3000)
+        self.assertAlmostEqual(result.get_percentile_current(50), 2000,
+                               delta=20)
+
+    def test_statistics_are_none_when_not_gathered(self):
+        result = MonsoonResult(3, 6, 5000, 4.2, self.text_path)
+
+        self.assertIsNone(result.max_current)
+        self.assertIsNone(result.get_percentile_current(50))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks per-packet and bulk reads of the LVPM stock serial protocol.
+
+A serial dump is replayed through a stand-in serial port, which makes the
+given number of bytes available before each read, like a port that is read
+while the Monsoon is streaming. A serial dump is the raw bytes read from the
+port, frames included. If no dump is given, sample packets are synthesized.
+
+Usage:
+    python3 frame_reader_benchmark.py [--dump serial.bin] [--seconds 60]
+"""
+
+import argparse
+import logging
+import random
+import struct
+import time
+
+from acts.controllers.monsoon_lib.api.lvpm_stock.frame_reader import FrameReader
+
+# The LVPM sends samples at roughly 5000 Hz.
+SAMPLES_PER_SECOND = 5000
+
+
+class ReplaySerial(object):
+    """A serial port that replays a dump, chunk_size bytes at a time.
+
+    Attributes:
+        reads: The number of calls to read().
+    """
+
+    def __init__(self, data, chunk_size):
+        self._data = memoryview(data)
+        self._position = 0
+        self._waiting_end = 0
+        self._chunk_size = chunk_size
+        self.reads = 0
+
+    @property
+    def in_waiting(self):
+        if self._position == self._waiting_end:
+            self._waiting_end = min(self._position + self._chunk_size,
+                                    len(self._data))
+        return self._waiting_end - self._position
+
+    def read(self, size):
+        self.reads += 1
+        data = self._data[self._position:self._position + size].tobytes()
+        self._position += len(data)
+        self._waiting_end = max(self._waiting_end, self._position)
+        return data
+
+
+def synthesize_dump(seconds):
+    """Creates a serial dump holding roughly the given seconds of samples."""
+    rand = random.Random(0)
+    frames = []
+    num_samples = 0
+    sequence = 0
+    while num_samples < seconds * SAMPLES_PER_SECOND:
+        num_measurements = rand.randint(1, 3)
+        value = struct.pack('>4B', 0x20 | sequence, 0, 0, 0)
+        for _ in range(num_measurements):
+            value += struct.pack('>3hH', *(rand.randrange(-2**15, 2**15)
+                                           for _ in range(3)),
+                                 rand.randrange(2**16))
+        value += b'\x00'
+        length = len(value) + 1
+        frames.append(bytes([length]) + value +
+                      bytes([(length + sum(value)) % 256]))
+        num_samples += num_measurements
+        sequence = (sequence + 1) % 16
+    return b''.join(frames)
+
+
+def read_per_packet(ser):
+    """Reads every frame with the per-packet reads used before FrameReader.
+
+    Returns:
+        The number of frames read.
+    """
+    num_frames = 0
+    while True:
+        len_char = ser.read(1)
+        if not len_char:
+            return num_frames
+        data_len = ord(len_char)
+        result = bytearray(ser.read(data_len))
+        body = result[:-1]
+        checksum = (sum(struct.unpack('B' * len(body), body)) + data_len) % 256
+        if result[-1] == checksum:
+            num_frames += 1
+
+
+def read_in_bulk(ser):
+    """Reads every frame with a FrameReader.
+
+    Returns:
+        The number of frames read.
+    """
+    reader = FrameReader(ser)
+    while reader.read_frames():
+        pass
+    return reader.frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmarks LVPM serial reads with a serial dump.')
+    parser.add_argument('--dump', help='The serial dump to replay.')
+    parser.add_argument(
+        '--seconds',
+        type=float,
+        default=60,
+        help='The seconds of samples to synthesize if no dump is given.')
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=512,
+        help='The number of bytes waiting on the port before each read.')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.dump:
+        with open(args.dump, 'rb') as f:
+            data = f.read()
+    else:
+        data = synthesize_dump(args.seconds)
+
+    print('Replaying %d bytes.' % len(data))
+    for name, read_func in [('per-packet', read_per_packet),
+                            ('bulk', read_in_bulk)]:
+        ser = ReplaySerial(data, args.chunk_size)
+        start_time = time.perf_counter()
+        num_frames = read_func(ser)
+        elapsed = time.perf_counter() - start_time
+        print('%-10s %8.3fs %10d frames %10d reads %12.0f frames/s' %
+              (name, elapsed, num_frames, ser.reads, num_frames / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import unittest
+
+import mock
+
+from acts.controllers.monsoon_lib.api.common import MonsoonError
+from acts.controllers.monsoon_lib.api.lvpm_stock.frame_reader import FrameReader
+from acts.controllers.monsoon_lib.api.lvpm_stock.frame_reader import FrameReaderStats
+from acts.controllers.monsoon_lib.api.lvpm_stock.monsoon_proxy import MonsoonProxy
+
+
+def frame(value):
+    """Returns the value framed as Length-Value-Checksum."""
+    length = len(value) + 1
+    return bytes([length]) + value + bytes([(length + sum(value)) % 256])
+
+
+class FakeSerial(object):
+    """A serial port that returns one chunk of bytes per read."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.reads = []
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, size):
+        self.reads.append(size)
+        if not self.chunks:
+            return b''
+        data = self.chunks[0][:size]
+        self.chunks[0] = self.chunks[0][size:]
+        if not self.chunks[0]:
+            self.chunks.pop(0)
+        return data
+
+
+class FrameReaderTest(unittest.TestCase):
+    """Tests acts.controllers.monsoon_lib.api.lvpm_stock.frame_reader."""
+
+    def test_read_frames_parses_every_frame_of_a_single_read(self):
+        data = frame(b'\x10abc') + frame(b'\x20') + frame(b'\xff' * 254)
+        ser = FakeSerial([data])
+        reader = FrameReader(ser)
+
+        self.assertEqual(reader.read_frames(),
+                         [b'\x10abc', b'\x20', b'\xff' * 254])
+        self.assertEqual(ser.reads, [len(data)])
+
+    def test_read_frames_keeps_incomplete_frames_for_the_next_read(self):
+        data = frame(b'first') + frame(b'second')
+        reader = FrameReader(FakeSerial([data[:10], data[10:]]))
+
+        self.assertEqual(reader.read_frames(), [b'first'])
+        self.assertEqual(reader.read_frames(), [b'second'])
+
+    def test_read_frames_reads_until_a_frame_is_complete(self):
+        data = frame(b'value')
+        reader = FrameReader(FakeSerial([data[:1], data[1:4], data[4:]]))
+
+        self.assertEqual(reader.read_frames(), [b'value'])
+
+    def test_read_frames_returns_nothing_on_timeout(self):
+        reader = FrameReader(FakeSerial([frame(b'value')[:3]]))
+
+        self.assertEqual(reader.read_frames(), [])
+
+    def test_read_frame_returns_frames_one_at_a_time(self):
+        reader = FrameReader(FakeSerial([frame(b'a') + frame(b'b')]))
+
+        self.assertEqual(reader.read_frame(), b'a')
+        self.assertEqual(reader.read_frame(), b'b')
+        self.assertIsNone(reader.read_frame())
+
+    def test_corrupt_frames_are_skipped_and_counted(self):
+        # The checksum should be 0x04. The zeros are skipped while
+        # resynchronizing, as they are not valid lengths.
+        corrupt = b'\x04\x00\x00\x00\x00'
+        reader = FrameReader(
+            FakeSerial([frame(b'a') + corrupt + frame(b'b') + b'\x00' +
+                        frame(b'c')]))
+
+        self.assertEqual(reader.read_frames(), [b'a', b'b', b'c'])
+        self.assertEqual(reader.get_stats(),
+                         FrameReaderStats(frames=3, corrupt_frames=2,
+                                          dropped_frames=0,
+                                          dropped_bytes=len(corrupt) + 1))
+
+    def test_discard_drops_the_parsed_frames_and_buffered_bytes(self):
+        data = frame(b'a') + frame(b'b') + frame(b'incomplete')[:-1]
+        reader = FrameReader(FakeSerial([data]))
+        self.assertEqual(reader.read_frame(), b'a')
+
+        reader.discard()
+
+        self.assertIsNone(reader.read_frame())
+        self.assertEqual(reader.get_stats(),
+                         FrameReaderStats(frames=2, corrupt_frames=0,
+                                          dropped_frames=1,
+                                          dropped_bytes=11))
+
+
+class MonsoonProxyTest(unittest.TestCase):
+    """Tests the reads of MonsoonProxy through its FrameReader."""
+
+    def create_proxy(self, chunks):
+        with mock.patch('serial.Serial', return_value=FakeSerial(chunks)):
+            return MonsoonProxy(device='/dev/ttyACM0')
+
+    def test_read_packet_returns_the_value_of_the_next_frame(self):
+        proxy = self.create_proxy([frame(b'\x10status') + frame(b'next')])
+
+        self.assertEqual(proxy._read_packet(), b'\x10status')
+        self.assertEqual(proxy._read_packet(), b'next')
+
+    def test_read_packet_raises_on_timeout(self):
+        proxy = self.create_proxy([])
+
+        with self.assertRaises(MonsoonError):
+            proxy._read_packet()
+
+
+if __name__ == '__main__':
+    unittest.main()
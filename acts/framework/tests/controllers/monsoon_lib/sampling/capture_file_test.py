@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from acts.controllers.monsoon_lib.sampling import capture_file
+from acts.controllers.monsoon_lib.sampling.capture_file import CaptureFile
+from acts.controllers.monsoon_lib.sampling.capture_file import CaptureFileWriter
+
+
+class CaptureFileTest(unittest.TestCase):
+    """Unit tests the capture_file module."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'data.capture')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_capture(self, sample_times, *column_values, columns=None):
+        writer = CaptureFileWriter(self.path, 5000, 4.2,
+                                   columns or ['main_current'])
+        writer.open()
+        writer.write(sample_times, *column_values)
+        writer.close()
+
+    def test_reader_returns_header_values(self):
+        self.write_capture([], [], columns=['main_current', 'usb_current'])
+
+        capture = CaptureFile(self.path)
+
+        self.assertEqual(capture.hz, 5000)
+        self.assertEqual(capture.voltage, 4.2)
+        self.assertEqual(capture.columns,
+                         ('sample_time', 'main_current', 'usb_current'))
+        self.assertEqual(len(capture), 0)
+
+    def test_reader_returns_written_records(self):
+        self.write_capture([.0002, .0004], [1.5, 2.5])
+
+        capture = CaptureFile(self.path)
+
+        np.testing.assert_array_equal(capture.sample_times, [.0002, .0004])
+        np.testing.assert_array_equal(capture.get_column('main_current'),
+                                      [1.5, 2.5])
+
+    def test_reader_ignores_partially_written_record(self):
+        self.write_capture([.0002, .0004], [1.5, 2.5])
+        with open(self.path, 'ab') as f:
+            f.write(b'\x00' * 3)
+
+        self.assertEqual(len(CaptureFile(self.path)), 2)
+
+    def test_reader_raises_on_text_file(self):
+        with open(self.path, 'w') as f:
+            f.write('0.000200000s 1.500000000000\n')
+
+        with self.assertRaises(ValueError):
+            CaptureFile(self.path)
+        self.assertFalse(capture_file.is_capture_file(self.path))
+
+    def test_get_time_range_returns_records_within_range(self):
+        times = np.arange(10) / 10
+        self.write_capture(times, times * 2)
+
+        records = CaptureFile(self.path).get_time_range(.25, .5)
+
+        np.testing.assert_allclose(records['sample_time'], [.3, .4])
+        np.testing.assert_allclose(records['main_current'], [.6, .8])
+
+    def test_get_time_range_without_bounds_returns_all_records(self):
+        self.write_capture([.1, .2, .3], [1, 2, 3])
+
+        self.assertEqual(len(CaptureFile(self.path).get_time_range()), 3)
+
+    def test_convert_to_text_matches_tee_format(self):
+        self.write_capture([0.01, 0.02], [1.41421356237, 2.71828182846])
+        text_path = os.path.join(self.tmp_dir, 'data.txt')
+
+        capture_file.convert_to_text(self.path, text_path, chunk_size=1)
+
+        with open(text_path) as f:
+            self.assertEqual(
+                f.read(), '0.010000000s 1.414213562370\n'
+                '0.020000000s 2.718281828460\n')
+
+    def test_is_capture_path_checks_extension(self):
+        self.assertTrue(capture_file.is_capture_path('foo.capture'))
+        self.assertFalse(capture_file.is_capture_path('foo.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks the throughput of the AssemblyLine implementations.
+
+Columnar reading buffers are passed through a chain of pass-through
+transformers, so the measured time is dominated by moving buffers between the
+nodes of the AssemblyLine.
+
+Usage:
+    python3 assembly_line_benchmark.py [--buffers 2000] [--buffer-length 1024]
+        [--stages 4]
+"""
+
+import argparse
+import time
+
+from acts.controllers.monsoon_lib.sampling.common import READING_DTYPE
+from acts.controllers.monsoon_lib.sampling.common import create_reading_columns
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import BufferStream
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ProcessAssemblyLineBuilder
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ThreadAssemblyLineBuilder
+from acts.controllers.monsoon_lib.sampling.engine.transformer import ParallelTransformer
+from acts.controllers.monsoon_lib.sampling.engine.transformer import SourceTransformer
+
+
+class ReadingSource(SourceTransformer):
+    """Sends the same buffer of readings a fixed number of times."""
+
+    def __init__(self, num_buffers, buffer_length):
+        super().__init__()
+        self.num_buffers = num_buffers
+        self.buffer_length = buffer_length
+
+    def on_begin(self):
+        self._buffer = create_reading_columns(self.buffer_length)
+        self._buffer.fill(0)
+        self._sent = 0
+
+    def _transform_buffer(self, _):
+        if self._sent == self.num_buffers:
+            return BufferStream.END
+        self._sent += 1
+        return self._buffer
+
+
+class PassThrough(ParallelTransformer):
+    """Sends each buffer along unchanged."""
+
+    def _transform_buffer(self, buffer):
+        return buffer
+
+
+def run_assembly_line(builder, num_buffers, buffer_length, num_stages):
+    """Runs an AssemblyLine of num_stages stages, returning seconds elapsed."""
+    builder.source(ReadingSource(num_buffers, buffer_length))
+    for _ in range(num_stages):
+        builder.into(PassThrough())
+    assembly_line = builder.build()
+
+    start_time = time.perf_counter()
+    assembly_line.run()
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the AssemblyLine buffer streams.')
+    parser.add_argument('--buffers', type=int, default=2000,
+                        help='The number of buffers to send.')
+    parser.add_argument('--buffer-length', type=int, default=1024,
+                        help='The number of readings within each buffer.')
+    parser.add_argument('--stages', type=int, default=4,
+                        help='The number of transformers after the source.')
+    args = parser.parse_args()
+
+    builders = [
+        ('thread', ThreadAssemblyLineBuilder),
+        ('process', ProcessAssemblyLineBuilder),
+        ('shared_memory', lambda: ProcessAssemblyLineBuilder(
+            shared_memory_dtype=READING_DTYPE,
+            shared_memory_capacity=args.buffer_length * 64)),
+    ]
+    total_readings = args.buffers * args.buffer_length
+    print('Sending %d readings through %d stages.' %
+          (total_readings, args.stages))
+    for name, builder_generator in builders:
+        builder = builder_generator()
+        elapsed = run_assembly_line(builder, args.buffers, args.buffer_length,
+                                    args.stages)
+        if hasattr(builder, 'manager'):
+            builder.manager.shutdown()
+        print('%-14s %8.3fs %14.0f readings/s' %
+              (name, elapsed, total_readings / elapsed))
+
+
+if __name__ == '__main__':
+    main()
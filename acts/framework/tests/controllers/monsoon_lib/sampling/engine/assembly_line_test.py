@@ -14,24 +14,69 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import pickle
+import queue
+import threading
 import unittest
 
 import mock
+import numpy as np
 
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import AssemblyLineBuilder
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import BufferStream
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import DevNullBufferStream
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import IndexedBuffer
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ProcessAssemblyLine
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ProcessAssemblyLineBuilder
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import SharedMemoryBufferStream
 from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ThreadAssemblyLine
+from acts.controllers.monsoon_lib.sampling.engine.transformer import ParallelTransformer
+from acts.controllers.monsoon_lib.sampling.engine.transformer import SourceTransformer
 
 ASSEMBLY_LINE_MODULE = (
     'acts.controllers.monsoon_lib.sampling.engine.assembly_line')
 
 
+RECORD_DTYPE = np.dtype([('sample_time', '<f8'), ('main_current', '<f8')])
+
+
 def mock_import(full_module_name, import_name):
     return mock.patch('%s.%s' % (full_module_name, import_name))
 
 
+def create_records(start, length):
+    records = np.recarray(length, dtype=RECORD_DTYPE)
+    records.sample_time = np.arange(start, start + length)
+    records.main_current = records.sample_time * 2
+    return records
+
+
+class RecordSource(SourceTransformer):
+    """Generates a fixed number of record buffers."""
+
+    def __init__(self, num_buffers, buffer_length):
+        super().__init__()
+        self.num_buffers = num_buffers
+        self.buffer_length = buffer_length
+        self.sent = 0
+
+    def _transform_buffer(self, buffer):
+        if self.sent == self.num_buffers:
+            return BufferStream.END
+        records = create_records(self.sent * self.buffer_length,
+                                 self.buffer_length)
+        self.sent += 1
+        return records
+
+
+class CurrentDoubler(ParallelTransformer):
+    """Doubles the main_current of each record."""
+
+    def _transform_buffer(self, buffer):
+        buffer.main_current *= 2
+        return buffer
+
+
 class ProcessAssemblyLineTest(unittest.TestCase):
     """Tests the basic functionality of ProcessAssemblyLine."""
 
@@ -177,6 +222,16 @@ class AssemblyLineBuilderTest(unittest.TestCase):
         self.assertEqual(queue_generator(),
                          builder.nodes[-1].input_stream._buffer_queue)
 
+    def test_into_uses_buffer_streams_from_queue_generator_as_is(self):
+        """Tests into() does not wrap generated BufferStreams."""
+        stream = BufferStream(queue.Queue())
+        builder = AssemblyLineBuilder(lambda: stream, mock.Mock())
+        builder.source(mock.Mock())
+
+        builder.into(mock.Mock())
+
+        self.assertIs(builder.nodes[-1].input_stream, stream)
+
     def test_into_returns_self(self):
         """Tests into() returns the builder."""
         builder = AssemblyLineBuilder(mock.Mock(), mock.Mock())
@@ -244,5 +299,126 @@ class IndexedBufferTest(unittest.TestCase):
         self.assertEqual(len(IndexedBuffer(0, buffer_len).buffer), buffer_len)
 
 
+class SharedMemoryBufferStreamTest(unittest.TestCase):
+    """Tests the SharedMemoryBufferStream class."""
+
+    def setUp(self):
+        self.stream = SharedMemoryBufferStream(queue.Queue(), RECORD_DTYPE,
+                                               capacity=10)
+        self.stream.initialize()
+
+    def tearDown(self):
+        self.stream.close()
+
+    def test_remove_indexed_buffer_returns_copy_of_records(self):
+        records = create_records(0, 4)
+        self.stream.add_indexed_buffer(IndexedBuffer(3, records))
+
+        buffer = self.stream.remove_indexed_buffer()
+
+        self.assertEqual(buffer.index, 3)
+        self.assertIsInstance(buffer.buffer, np.recarray)
+        np.testing.assert_array_equal(buffer.buffer, records)
+        self.assertFalse(
+            np.shares_memory(buffer.buffer, self.stream._records))
+
+    def test_records_that_do_not_fit_at_the_end_wrap_around(self):
+        for start in range(0, 24, 6):
+            self.stream.add_indexed_buffer(
+                IndexedBuffer(start, create_records(start, 6)))
+            buffer = self.stream.remove_indexed_buffer()
+            np.testing.assert_array_equal(buffer.buffer.sample_time,
+                                          np.arange(start, start + 6))
+
+    def test_other_buffers_are_sent_through_the_queue(self):
+        for buffer in [[1, 2, 3], np.arange(3), create_records(0, 11)]:
+            self.stream.add_indexed_buffer(IndexedBuffer(0, buffer))
+
+            self.assertIs(self.stream.remove_indexed_buffer().buffer, buffer)
+
+    def test_end_stream_is_received(self):
+        self.stream.end_stream()
+
+        self.assertIs(self.stream.remove_indexed_buffer(), BufferStream.END)
+
+    def test_add_indexed_buffer_waits_for_records_to_be_consumed(self):
+        self.stream.add_indexed_buffer(IndexedBuffer(0, create_records(0, 8)))
+        writer = threading.Thread(
+            target=self.stream.add_indexed_buffer,
+            args=[IndexedBuffer(1, create_records(8, 4))])
+        writer.start()
+        writer.join(.05)
+        self.assertTrue(writer.is_alive())
+
+        self.stream.remove_indexed_buffer()
+        writer.join(5)
+
+        self.assertFalse(writer.is_alive())
+        np.testing.assert_array_equal(
+            self.stream.remove_indexed_buffer().buffer.sample_time,
+            np.arange(8, 12))
+
+    def test_waiting_writer_blocks_on_the_space_queue(self):
+        self.stream._space_queue = mock.Mock(wraps=self.stream._space_queue)
+        self.stream.add_indexed_buffer(IndexedBuffer(0, create_records(0, 8)))
+        writer = threading.Thread(
+            target=self.stream.add_indexed_buffer,
+            args=[IndexedBuffer(1, create_records(8, 4))])
+        writer.start()
+        writer.join(.05)
+
+        self.stream.remove_indexed_buffer()
+        writer.join(5)
+
+        self.stream._space_queue.get.assert_called_once_with()
+        self.stream._space_queue.put.assert_called_once_with(None)
+        self.assertEqual(self.stream._header[1], 0)
+
+    def test_pickled_stream_reads_from_the_same_memory(self):
+        self.stream.add_indexed_buffer(IndexedBuffer(0, create_records(0, 5)))
+        buffer_queue = self.stream._buffer_queue
+        space_queue = self.stream._space_queue
+        self.stream._buffer_queue = None
+        self.stream._space_queue = None
+
+        reader = pickle.loads(pickle.dumps(self.stream))
+        reader._buffer_queue = buffer_queue
+        reader._space_queue = space_queue
+        reader.initialize()
+        buffer = reader.remove_indexed_buffer()
+        reader.close()
+
+        np.testing.assert_array_equal(buffer.buffer.sample_time, range(5))
+        self.assertEqual(self.stream._header[0], 5)
+
+
+class SharedMemoryProcessAssemblyLineTest(unittest.TestCase):
+    """Tests ProcessAssemblyLines that pass buffers through shared memory."""
+
+    def test_buffers_pass_through_each_node(self):
+        builder = ProcessAssemblyLineBuilder(shared_memory_dtype=RECORD_DTYPE,
+                                             shared_memory_capacity=64)
+        output_stream = BufferStream(builder.manager.Queue())
+
+        (builder
+         .source(RecordSource(num_buffers=20, buffer_length=16))
+         .into(CurrentDoubler())
+         .into(CurrentDoubler())
+         .build(output_stream=output_stream).run())
+
+        buffers = []
+        while True:
+            buffer = output_stream.remove_indexed_buffer()
+            if buffer is BufferStream.END:
+                break
+            buffers.append(buffer)
+        builder.manager.shutdown()
+
+        self.assertEqual([buffer.index for buffer in buffers], list(range(20)))
+        records = np.concatenate([buffer.buffer for buffer in buffers])
+        np.testing.assert_array_equal(records['main_current'],
+                                      np.arange(20 * 16) * 8)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -13,14 +13,31 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
+import io
+import os
+import shutil
 import statistics
+import tempfile
 import unittest
 
 import mock
+import numpy as np
 
+from acts.controllers.monsoon_lib.sampling.capture_file import CaptureFile
+from acts.controllers.monsoon_lib.sampling.common import create_reading_columns
+from acts.controllers.monsoon_lib.sampling.common import is_reading_columns
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ThreadAssemblyLineBuilder
+from acts.controllers.monsoon_lib.sampling.engine.transformers import BinaryTee
 from acts.controllers.monsoon_lib.sampling.engine.transformers import DownSampler
+from acts.controllers.monsoon_lib.sampling.engine.transformers import PyramidBuilder
+from acts.controllers.monsoon_lib.sampling.engine.transformers import RawPacketRecorder
+from acts.controllers.monsoon_lib.sampling.engine.transformers import RawPacketReplayer
 from acts.controllers.monsoon_lib.sampling.engine.transformers import SampleAggregator
+from acts.controllers.monsoon_lib.sampling.engine.transformers import StatisticsAggregator
 from acts.controllers.monsoon_lib.sampling.engine.transformers import Tee
+from acts.controllers.monsoon_lib.sampling.pyramid import Pyramid
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecording
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecordingWriter
 
 ARGS = 0
 KWARGS = 1
@@ -41,6 +58,14 @@ class HvpmReading(object):
                            self.sample_time / other)
 
 
+def create_columns(main_currents, sample_times):
+    """Creates a columnar chunk of readings with the given values."""
+    columns = create_reading_columns(len(main_currents))
+    columns.main_current = main_currents
+    columns.sample_time = sample_times
+    return columns
+
+
 class TeeTest(unittest.TestCase):
     """Unit tests the transformers.Tee class."""
 
@@ -81,6 +106,146 @@ class TeeTest(unittest.TestCase):
                              expected_output):
             self.assertEqual(call[ARGS][0], out)
 
+    @mock.patch('builtins.open')
+    def test_transform_buffer_outputs_same_format_for_columns(self,
+                                                             open_mock):
+        open_mock.return_value = io.StringIO()
+        output = open_mock.return_value
+        output.close = mock.Mock()
+        tee = Tee('foo', measure_after_seconds=.01)
+        tee.on_begin()
+
+        tee._transform_buffer(
+            create_columns([1.41421356237, 2.71828182846, 3.14159265359],
+                           [0.005, 0.02, 0.03]))
+
+        self.assertEqual(
+            output.getvalue(), '0.010000000s 2.718281828460\n'
+            '0.020000000s 3.141592653590\n')
+
+
+class BinaryTeeTest(unittest.TestCase):
+    """Unit tests the transformers.BinaryTee class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'data.capture')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_transform_buffer_writes_readings(self):
+        tee = BinaryTee(self.path, 5000, 4.2, measure_after_seconds=.01)
+        tee.on_begin()
+
+        tee._transform_buffer([
+            HvpmReading([1.41421356237, 0, 0, 0, 0], 0.005),
+            HvpmReading([2.71828182846, 0, 0, 0, 0], 0.02),
+        ])
+        tee._transform_buffer(
+            create_columns([3.14159265359, 1.73205080757], [0.0, 0.03]))
+        tee.on_end()
+
+        capture = CaptureFile(self.path)
+        self.assertEqual(capture.hz, 5000)
+        self.assertEqual(capture.voltage, 4.2)
+        np.testing.assert_allclose(capture.sample_times, [.01, .02])
+        np.testing.assert_allclose(capture.get_column('main_current'),
+                                   [2.71828182846, 1.73205080757])
+
+
+class PyramidBuilderTest(unittest.TestCase):
+    """Unit tests the transformers.PyramidBuilder class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'data.capture.pyramid')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_transform_buffer_adds_readings_after_measure_after_seconds(self):
+        builder = PyramidBuilder(self.path, 5000, 4.2,
+                                 measure_after_seconds=.01, levels=(1, ))
+        builder.on_begin()
+
+        builder._transform_buffer([
+            HvpmReading([9, 0, 0, 0, 0], 0.005),
+            HvpmReading([1, 0, 0, 0, 0], 0.01),
+            HvpmReading([3, 0, 0, 0, 0], 0.02),
+        ])
+        builder._transform_buffer(create_columns([4, 6], [0.03, 0.04]))
+        builder.on_end()
+
+        records = Pyramid(self.path).get_level(1).records
+        np.testing.assert_allclose(records['sample_time'], [0, .02])
+        np.testing.assert_array_equal(records['min_current'], [1, 4])
+        np.testing.assert_array_equal(records['max_current'], [3, 6])
+        np.testing.assert_array_equal(records['mean_current'], [2, 5])
+
+
+class RawPacketRecorderTest(unittest.TestCase):
+    """Unit tests the transformers.RawPacketRecorder class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'packets.monsoon_raw')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_transform_buffer_writes_and_passes_on_raw_packets(self):
+        recorder = RawPacketRecorder(self.path, {'monsoon': 'hvpm'})
+        recorder.on_begin()
+
+        output = recorder._transform_buffer([b'packet 1', None, b'packet 2'])
+        recorder.on_end()
+
+        self.assertEqual(output, [[b'packet 1', None, b'packet 2']])
+        recording = RawRecording(self.path)
+        self.assertEqual(recording.metadata, {'monsoon': 'hvpm'})
+        self.assertEqual(list(recording.read_raw_packets()),
+                         [b'packet 1', b'packet 2'])
+
+
+class RawPacketReplayerTest(unittest.TestCase):
+    """Unit tests the transformers.RawPacketReplayer class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'packets.monsoon_raw')
+        self.raw_packets = [b'packet %d' % i for i in range(150)]
+        writer = RawRecordingWriter(self.path, {'monsoon': 'lvpm_stock'})
+        writer.open()
+        writer.write(self.raw_packets)
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_transform_buffer_fills_buffers_until_the_end(self):
+        replayer = RawPacketReplayer(self.path)
+        replayer.on_begin()
+
+        buffers = [replayer._transform_buffer([None] * 100) for _ in range(3)]
+        replayer.on_end()
+
+        self.assertEqual(buffers, [self.raw_packets[:100],
+                                   self.raw_packets[100:], None])
+
+    def test_replays_through_an_assembly_line(self):
+        copy_path = os.path.join(self.tmp_dir, 'copy.monsoon_raw')
+
+        # yapf: disable. Yapf doesn't handle fluent interfaces well.
+        (ThreadAssemblyLineBuilder()
+         .source(RawPacketReplayer(self.path))
+         .into(RawPacketRecorder(copy_path))
+         .build().run())
+        # yapf: enable
+
+        self.assertEqual(list(RawRecording(copy_path).read_raw_packets()),
+                         self.raw_packets)
+
 
 class SampleAggregatorTest(unittest.TestCase):
     """Unit tests the transformers.SampleAggregator class."""
@@ -107,6 +272,35 @@ class SampleAggregatorTest(unittest.TestCase):
         self.assertEqual(sample_aggregator.num_samples, 3)
         self.assertAlmostEqual(sample_aggregator.sum_currents, 7.27408804442)
 
+    def test_transform_buffer_aggregates_columns(self):
+        sample_aggregator = SampleAggregator(start_after_seconds=.5)
+        sample_aggregator._transform_buffer(
+            create_columns([1.41421356237, 2.71828182846, 3.14159265359],
+                           [0.01, 0.99, 1.00]))
+
+        self.assertEqual(sample_aggregator.num_samples, 2)
+        self.assertAlmostEqual(sample_aggregator.sum_currents, 5.85987448205)
+
+
+class StatisticsAggregatorTest(unittest.TestCase):
+    """Unit tests the transformers.StatisticsAggregator class."""
+
+    def test_transform_buffer_gathers_statistics_after_start(self):
+        aggregator = StatisticsAggregator(start_after_seconds=1,
+                                          window_seconds=1)
+        aggregator._transform_buffer([
+            HvpmReading([5, 0, 0, 0, 0], 0.5),
+            HvpmReading([1, 0, 0, 0, 0], 1.0),
+            HvpmReading([2, 0, 0, 0, 0], 1.5),
+        ])
+        aggregator._transform_buffer(create_columns([3, 4], [2.0, 2.5]))
+
+        statistics = aggregator.statistics
+        self.assertEqual(statistics.num_samples, 4)
+        self.assertEqual(statistics.min_current, 1)
+        self.assertEqual(statistics.max_current, 4)
+        np.testing.assert_allclose(statistics.get_window_means(), [1.5, 3.5])
+
 
 class DownSamplerTest(unittest.TestCase):
     """Unit tests the DownSampler class."""
@@ -181,6 +375,22 @@ class DownSamplerTest(unittest.TestCase):
                 buffer[3].main_current,
             ]))
 
+    def test_transform_buffer_downsamples_columns_with_leftovers(self):
+        downsampler = DownSampler(3)
+        main_currents = [2, 4, 6, 8, 10, 12, 14]
+        sample_times = [.01, .03, .05, .07, .09, .11, .13]
+
+        first = downsampler._transform_buffer(
+            create_columns(main_currents[:4], sample_times[:4]))
+        second = downsampler._transform_buffer(
+            create_columns(main_currents[4:], sample_times[4:]))
+
+        self.assertTrue(is_reading_columns(first))
+        self.assertEqual(list(first.main_current), [4])
+        self.assertEqual(list(second.main_current), [10])
+        np.testing.assert_allclose(second.sample_time, [.09])
+        self.assertEqual(list(downsampler._leftovers.main_current), [14])
+
 
 if __name__ == '__main__':
     unittest.main()
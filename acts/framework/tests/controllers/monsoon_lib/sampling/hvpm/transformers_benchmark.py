@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks the object-based and columnar HVPM decode paths.
+
+Recorded packet dumps are replayed through both sets of transformers within a
+single thread, so only the host CPU cost of decoding is measured. A packet dump
+is a sequence of raw packets, as sent by the HVPM PacketCollector, each
+prefixed with its length as a little-endian uint16. Raw recordings written by
+an HvpmTransformer (see sampling.raw_recording) may be given as well. If no
+dump is given, packets are synthesized.
+
+Usage:
+    python3 transformers_benchmark.py [--dump packets.bin] [--seconds 60]
+"""
+
+import argparse
+import itertools
+import logging
+import struct
+import time
+
+import mock
+
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import BufferList
+from acts.controllers.monsoon_lib.sampling.engine.transformers import DownSampler
+from acts.controllers.monsoon_lib.sampling.engine.transformers import SampleAggregator
+from acts.controllers.monsoon_lib.sampling.enums import Channel
+from acts.controllers.monsoon_lib.sampling.enums import Granularity
+from acts.controllers.monsoon_lib.sampling.enums import Origin
+from acts.controllers.monsoon_lib.sampling.hvpm.calibrations import build_status_packet_attribute_name
+from acts.controllers.monsoon_lib.sampling.hvpm.packet import SampleType
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import CalibrationApplier
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import ColumnarCalibrationApplier
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import ColumnarPacketReader
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import ColumnarSampleChunker
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import PacketReader
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import SampleChunker
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecording
+from acts.controllers.monsoon_lib.sampling.raw_recording import is_raw_recording
+
+# The number of raw packets sent within a single buffer by PacketCollector.
+BUFFER_SIZE = 64
+
+# The HVPM sends 3 measurements per packet at 5000 samples per second.
+PACKETS_PER_SECOND = 5000 // 3
+
+
+def read_packet_dump(path):
+    """Reads the raw packets stored within a packet dump or raw recording."""
+    if is_raw_recording(path):
+        return list(RawRecording(path).read_raw_packets())
+    raw_packets = []
+    with open(path, 'rb') as f:
+        while True:
+            size_bytes = f.read(2)
+            if len(size_bytes) < 2:
+                return raw_packets
+            raw_packets.append(f.read(struct.unpack('<H', size_bytes)[0]))
+
+
+def synthesize_packets(seconds):
+    """Creates raw packets holding roughly the given seconds of samples."""
+    raw_packets = []
+    for i in range(int(seconds * PACKETS_PER_SECOND)):
+        raw_packet = struct.pack('<2dhBx', i * .0006, .0006, 0, 0)
+        for j in range(3):
+            # Monsoons send a calibration sample about every 10 samples.
+            if (i * 3 + j) % 10 == 0:
+                sample_type = (SampleType.ZERO_CAL if i % 2 else
+                               SampleType.REF_CAL)
+            else:
+                sample_type = SampleType.MEASUREMENT
+            values = [(i * 97 + k * 1013) % 65536 for k in range(8)]
+            raw_packet += struct.pack('>8H2B', *values, 0, sample_type)
+        raw_packets.append(raw_packet)
+    return raw_packets
+
+
+def create_status_packet():
+    """Creates a stand-in for the HVPM Monsoon status packet."""
+    status_packet = mock.Mock()
+    for channel, origin, granularity in itertools.product(
+            Channel.values, (Origin.SCALE, Origin.ZERO), Granularity.values):
+        if channel == Channel.AUX and origin == Origin.ZERO:
+            continue
+        name = build_status_packet_attribute_name(channel, origin, granularity)
+        setattr(status_packet, name, 100 + channel + granularity)
+    return status_packet
+
+
+def replay(raw_packets, reader, chunker, applier, downsample_factor):
+    """Replays the raw packets through the given transformers.
+
+    Returns:
+        A tuple of (seconds elapsed, number of readings aggregated).
+    """
+    downsampler = DownSampler(downsample_factor)
+    aggregator = SampleAggregator()
+
+    def calibrate(chunk):
+        readings = applier._transform_buffer(chunk)
+        if downsample_factor > 1:
+            readings = downsampler._transform_buffer(readings)
+        aggregator._transform_buffer(readings)
+
+    start_time = time.perf_counter()
+    for index in range(0, len(raw_packets), BUFFER_SIZE):
+        buffer = reader._transform_buffer(
+            list(raw_packets[index:index + BUFFER_SIZE]))
+        chunks = chunker._transform_buffer(buffer)
+        if not isinstance(chunks, BufferList):
+            chunks = [chunks]
+        for chunk in chunks:
+            calibrate(chunk)
+    if isinstance(chunker, SampleChunker):
+        # SampleChunker holds onto the last chunk until the end of stream.
+        calibrate(chunker._cut_new_buffer())
+    return time.perf_counter() - start_time, aggregator.num_samples
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the HVPM decode paths with a packet dump.')
+    parser.add_argument('--dump', help='The packet dump to replay.')
+    parser.add_argument(
+        '--seconds',
+        type=float,
+        default=60,
+        help='The seconds of samples to synthesize if no dump is given.')
+    parser.add_argument(
+        '--downsample',
+        type=int,
+        default=1,
+        help='The DownSampler factor to apply before aggregating.')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.dump:
+        raw_packets = read_packet_dump(args.dump)
+    else:
+        raw_packets = synthesize_packets(args.seconds)
+    status_packet = create_status_packet()
+
+    paths = [
+        ('object', PacketReader(), SampleChunker(),
+         CalibrationApplier(status_packet)),
+        ('columnar', ColumnarPacketReader(), ColumnarSampleChunker(),
+         ColumnarCalibrationApplier(status_packet)),
+    ]
+    print('Replaying %d packets.' % len(raw_packets))
+    for name, reader, chunker, applier in paths:
+        elapsed, num_readings = replay(raw_packets, reader, chunker, applier,
+                                       args.downsample)
+        print('%-8s %8.3fs %10d readings %12.0f packets/s' %
+              (name, elapsed, num_readings, len(raw_packets) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
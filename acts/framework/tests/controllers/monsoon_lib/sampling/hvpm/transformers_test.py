@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import itertools
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import mock
+import numpy as np
+
+from acts.controllers.monsoon_lib.sampling.common import is_reading_columns
+from acts.controllers.monsoon_lib.sampling.engine.assembly_line import ThreadAssemblyLineBuilder
+from acts.controllers.monsoon_lib.sampling.engine.transformers import SampleAggregator
+from acts.controllers.monsoon_lib.sampling.enums import Channel
+from acts.controllers.monsoon_lib.sampling.enums import Granularity
+from acts.controllers.monsoon_lib.sampling.enums import Origin
+from acts.controllers.monsoon_lib.sampling.hvpm.calibrations import build_status_packet_attribute_name
+from acts.controllers.monsoon_lib.sampling.hvpm.calibrations import get_status_packet_calibrations
+from acts.controllers.monsoon_lib.sampling.hvpm.packet import SampleType
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import CalibrationApplier
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import ColumnarCalibrationApplier
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import ColumnarPacketReader
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import ColumnarSampleChunker
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import HvpmReplayer
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import PacketReader
+from acts.controllers.monsoon_lib.sampling.hvpm.transformers import SampleChunker
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecordingWriter
+
+TRANSFORMERS_MODULE = 'acts.controllers.monsoon_lib.sampling.hvpm.transformers'
+
+
+def create_raw_packet(time_since_start, measurements, dropped_count=0):
+    """Creates a raw packet, as sent by the HVPM PacketCollector.
+
+    Args:
+        time_since_start: The time the packet was collected at.
+        measurements: A list of (values, sample_type) tuples, where values is
+            a list of the 8 uint16 measurement values.
+        dropped_count: The dropped count reported by the packet.
+    """
+    raw_packet = struct.pack('<2dhBx', time_since_start, .0006, dropped_count,
+                             0)
+    for values, sample_type in measurements:
+        raw_packet += struct.pack('>8H2B', *values, 0, sample_type)
+    return raw_packet
+
+
+def create_status_packet():
+    """Creates a stand-in for the HVPM Monsoon status packet."""
+    status_packet = mock.Mock()
+    for channel, origin, granularity in itertools.product(
+            Channel.values, (Origin.SCALE, Origin.ZERO), Granularity.values):
+        if channel == Channel.AUX and origin == Origin.ZERO:
+            continue
+        name = build_status_packet_attribute_name(channel, origin, granularity)
+        setattr(status_packet, name,
+                100 + 10 * channel + origin + granularity)
+    return status_packet
+
+
+def create_raw_packets():
+    """Returns raw packets with calibration samples mixed in."""
+    raw_packets = []
+    for i in range(60):
+        measurements = []
+        for j in range(3):
+            if (i * 3 + j) % 7 == 0:
+                measurements.append(([1000 + j] * 8, SampleType.ZERO_CAL))
+            elif (i * 3 + j) % 7 == 1:
+                measurements.append(([30000 + j] * 8, SampleType.REF_CAL))
+            else:
+                values = [(i * 97 + j * 31 + k * 1013) % 65536
+                          for k in range(8)]
+                measurements.append((values, SampleType.MEASUREMENT))
+        raw_packets.append(create_raw_packet(i * .0006, measurements))
+    return raw_packets
+
+
+class ColumnarPacketReaderTest(unittest.TestCase):
+    """Unit tests the ColumnarPacketReader class."""
+
+    def test_transform_buffer_matches_packet_reader(self):
+        raw_packets = create_raw_packets()
+
+        packets = PacketReader()._transform_buffer(list(raw_packets))
+        samples = ColumnarPacketReader()._transform_buffer(list(raw_packets))
+
+        expected = [sample for packet in packets for sample in packet]
+        self.assertEqual(len(samples), len(expected))
+        for sample, expected_sample in zip(samples, expected):
+            self.assertAlmostEqual(sample['sample_time'],
+                                   expected_sample.get_sample_time())
+            self.assertEqual(
+                list(sample['values']) + list(sample['gains']),
+                list(expected_sample.values))
+
+    def test_transform_buffer_skips_failed_reads(self):
+        raw_packet = create_raw_packet(1, [([0] * 8, 0)])
+
+        samples = ColumnarPacketReader()._transform_buffer(
+            [None, raw_packet, None])
+
+        self.assertEqual(len(samples), 1)
+
+    def test_transform_buffer_skips_malformed_packets(self):
+        raw_packet = create_raw_packet(1, [([0] * 8, 0)])
+
+        samples = ColumnarPacketReader()._transform_buffer(
+            [raw_packet + b'\x00', raw_packet])
+
+        self.assertEqual(len(samples), 1)
+
+    def test_transform_buffer_counts_dropped_packets_with_rollovers(self):
+        reader = ColumnarPacketReader()
+        raw_packets = [
+            create_raw_packet(2, [([0] * 8, 0)], dropped_count=5),
+            create_raw_packet(3, [([0] * 8, 0)], dropped_count=5),
+            create_raw_packet(4, [([0] * 8, 0)], dropped_count=2),
+        ]
+
+        reader._transform_buffer(raw_packets)
+
+        self.assertEqual(reader.rollover_count, 1)
+        self.assertEqual(reader.total_dropped_count, 2**16 + 2)
+
+    def test_transform_buffer_ignores_dropped_count_at_start(self):
+        reader = ColumnarPacketReader()
+        raw_packet = create_raw_packet(0, [([0] * 8, 0)], dropped_count=-1)
+
+        reader._transform_buffer([raw_packet])
+
+        self.assertEqual(reader.total_dropped_count, 0)
+
+
+class ColumnarSampleChunkerTest(unittest.TestCase):
+    """Unit tests the ColumnarSampleChunker class."""
+
+    def test_transform_buffer_drops_uncalibrated_samples(self):
+        measurement = ([0] * 8, SampleType.MEASUREMENT)
+        zero_cal = ([0] * 8, SampleType.ZERO_CAL)
+        ref_cal = ([0] * 8, SampleType.REF_CAL)
+        raw_packets = [create_raw_packet(0, [measurement] * 3)]
+        raw_packets += [create_raw_packet(0, [zero_cal, ref_cal, measurement])
+                        for _ in range(5)]
+
+        chunk = ColumnarSampleChunker()._transform_buffer(
+            ColumnarPacketReader()._transform_buffer(raw_packets))
+
+        # Only the measurement after the fifth calibration pair is calibrated.
+        self.assertEqual(len(chunk.samples), 1)
+
+    def test_transform_buffer_keeps_calibration_windows_between_buffers(self):
+        chunker = ColumnarSampleChunker()
+        reader = ColumnarPacketReader()
+        raw_packets = create_raw_packets()
+
+        expected = chunker._transform_buffer(
+            reader._transform_buffer(list(raw_packets)))
+        chunker = ColumnarSampleChunker()
+        first = chunker._transform_buffer(
+            reader._transform_buffer(list(raw_packets[:31])))
+        second = chunker._transform_buffer(
+            reader._transform_buffer(list(raw_packets[31:])))
+
+        for key in expected.calibration_data.get_keys():
+            np.testing.assert_array_equal(
+                np.concatenate((first.calibration_data.get(*key),
+                                second.calibration_data.get(*key))),
+                expected.calibration_data.get(*key))
+
+
+@mock.patch('%s.HVPM' % TRANSFORMERS_MODULE)
+class ColumnarCalibrationApplierTest(unittest.TestCase):
+    """Unit tests the ColumnarCalibrationApplier class."""
+
+    def setUp(self):
+        self.raw_packets = create_raw_packets()
+
+    def _set_up_hvpm(self, hvpm_mock):
+        hvpm_mock.Monsoon().fineThreshold = 32000
+        hvpm_mock.Monsoon().mainvoltageScale = 4
+        hvpm_mock.Monsoon().usbVoltageScale = 2
+
+    def test_transform_buffer_matches_calibration_applier(self, hvpm_mock):
+        self._set_up_hvpm(hvpm_mock)
+        status_packet = create_status_packet()
+        chunker = SampleChunker()
+        chunks = chunker._transform_buffer(
+            PacketReader()._transform_buffer(list(self.raw_packets)))
+        chunks.append(chunker._cut_new_buffer())
+        columnar_chunk = ColumnarSampleChunker()._transform_buffer(
+            ColumnarPacketReader()._transform_buffer(list(self.raw_packets)))
+        applier = CalibrationApplier(status_packet)
+        columnar_applier = ColumnarCalibrationApplier(status_packet)
+
+        readings = [
+            reading for chunk in chunks
+            for reading in applier._transform_buffer(chunk)
+        ]
+        columns = columnar_applier._transform_buffer(columnar_chunk)
+
+        self.assertGreater(len(readings), 0)
+        self.assertEqual(len(columns), len(readings))
+        for record, reading in zip(columns, readings):
+            for field in ['sample_time', 'main_current', 'usb_current',
+                          'aux_current', 'main_voltage', 'usb_voltage']:
+                self.assertAlmostEqual(record[field], getattr(reading, field))
+
+    def test_transform_buffer_empty_chunk_returns_empty_columns(
+            self, hvpm_mock):
+        self._set_up_hvpm(hvpm_mock)
+        chunk = ColumnarSampleChunker()._transform_buffer(
+            ColumnarPacketReader()._transform_buffer([]))
+
+        columns = ColumnarCalibrationApplier(
+            create_status_packet())._transform_buffer(chunk)
+
+        self.assertTrue(is_reading_columns(columns))
+        self.assertEqual(len(columns), 0)
+
+
+@mock.patch('%s.HVPM' % TRANSFORMERS_MODULE)
+@mock.patch('%s.ProcessAssemblyLineBuilder' % TRANSFORMERS_MODULE,
+            ThreadAssemblyLineBuilder)
+class HvpmReplayerTest(unittest.TestCase):
+    """Unit tests the HvpmReplayer class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'packets.monsoon_raw')
+        self.raw_packets = create_raw_packets()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_recording(self, metadata):
+        writer = RawRecordingWriter(self.path, metadata)
+        writer.open()
+        writer.write(self.raw_packets)
+        writer.close()
+
+    def test_replay_matches_decoding_the_packets(self, hvpm_mock):
+        hvpm_mock.Monsoon().fineThreshold = 32000
+        hvpm_mock.Monsoon().mainvoltageScale = 4
+        hvpm_mock.Monsoon().usbVoltageScale = 2
+        status_packet = create_status_packet()
+        self.write_recording({
+            'monsoon': 'hvpm',
+            'status_packet': get_status_packet_calibrations(status_packet),
+        })
+        columns = ColumnarCalibrationApplier(status_packet)._transform_buffer(
+            ColumnarSampleChunker()._transform_buffer(
+                ColumnarPacketReader()._transform_buffer(self.raw_packets)))
+        aggregator = SampleAggregator()
+
+        # yapf: disable. Yapf doesn't handle fluent interfaces well.
+        (ThreadAssemblyLineBuilder()
+         .source(HvpmReplayer(self.path, columnar=True))
+         .into(aggregator)
+         .build().run())
+        # yapf: enable
+
+        self.assertGreater(len(columns), 0)
+        self.assertEqual(aggregator.num_samples, len(columns))
+        self.assertAlmostEqual(aggregator.sum_currents,
+                               float(np.sum(columns.main_current)))
+
+    def test_replay_of_another_monsoon_raises(self, _):
+        self.write_recording({'monsoon': 'lvpm_stock'})
+
+        with self.assertRaises(ValueError):
+            HvpmReplayer(self.path)._transform(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
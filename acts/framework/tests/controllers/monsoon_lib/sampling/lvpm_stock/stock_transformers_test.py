@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import mock
+
+from acts.controllers.monsoon_lib.sampling.engine.transformers import RawPacketRecorder
+from acts.controllers.monsoon_lib.sampling.lvpm_stock.stock_transformers import PacketCollector
+from acts.controllers.monsoon_lib.sampling.lvpm_stock.stock_transformers import PacketReader
+from acts.controllers.monsoon_lib.sampling.lvpm_stock.stock_transformers import StockLvpmReplayer
+from acts.controllers.monsoon_lib.sampling.lvpm_stock.stock_transformers import StockLvpmSampler
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecordingWriter
+
+TRANSFORMERS_MODULE = (
+    'acts.controllers.monsoon_lib.sampling.lvpm_stock.stock_transformers')
+
+TIME_DATA_SIZE = struct.calcsize('dd')
+
+
+class PacketCollectorTest(unittest.TestCase):
+    """Tests stock_transformers.PacketCollector."""
+
+    def setUp(self):
+        self.collector = PacketCollector()
+        self.collector._monsoon_proxy = mock.Mock()
+        self.frame_reader = self.collector._monsoon_proxy.frame_reader
+
+    def test_transform_buffer_fills_the_buffer_with_each_read(self):
+        self.frame_reader.read_frames.side_effect = [[b'a', b'b'], [b'c']]
+
+        buffer = self.collector._transform_buffer([None] * 3)
+
+        self.assertEqual([packet[TIME_DATA_SIZE:] for packet in buffer],
+                         [b'a', b'b', b'c'])
+        self.assertEqual(self.frame_reader.read_frames.call_count, 2)
+
+    def test_transform_buffer_holds_packets_for_the_next_buffer(self):
+        self.frame_reader.read_frames.side_effect = [[b'a', b'b', b'c']]
+
+        first_buffer = self.collector._transform_buffer([None] * 2)
+        second_buffer = self.collector._transform_buffer([None])
+
+        self.assertEqual(first_buffer[1][TIME_DATA_SIZE:], b'b')
+        self.assertEqual(second_buffer[0][TIME_DATA_SIZE:], b'c')
+        self.assertEqual(self.frame_reader.read_frames.call_count, 1)
+
+    def test_transform_buffer_leaves_none_after_a_timeout(self):
+        self.frame_reader.read_frames.side_effect = [[b'a'], []]
+
+        buffer = self.collector._transform_buffer([None] * 3)
+
+        self.assertEqual(buffer[1:], [None, None])
+        self.assertEqual(PacketReader()._transform_buffer(buffer)[1:],
+                         [None, None])
+
+    def test_transform_buffer_spreads_the_time_of_the_read(self):
+        self.frame_reader.read_frames.side_effect = [[b'a', b'b']]
+
+        with mock.patch('time.time', side_effect=[10, 12.5]):
+            buffer = self.collector._transform_buffer([None] * 2)
+
+        time_data = [
+            struct.unpack('dd', packet[:TIME_DATA_SIZE]) for packet in buffer
+        ]
+        self.assertEqual(time_data, [(11.25, 1.25), (12.5, 1.25)])
+
+
+@mock.patch('%s.ProcessAssemblyLineBuilder' % TRANSFORMERS_MODULE)
+class StockLvpmSamplerTest(unittest.TestCase):
+    """Tests stock_transformers.StockLvpmSampler."""
+
+    def test_transform_records_raw_packets_if_given_a_path(self, builder):
+        StockLvpmSampler(1234, 10, raw_recording_path='path')._transform(None)
+
+        recorder = builder().source().into.call_args_list[0][0][0]
+        self.assertIsInstance(recorder, RawPacketRecorder)
+        self.assertEqual(recorder._writer.path, 'path')
+        self.assertEqual(recorder._writer.metadata, {
+            'monsoon': 'lvpm_stock',
+            'serial': 1234
+        })
+
+    def test_transform_does_not_record_by_default(self, builder):
+        StockLvpmSampler(1234, 10)._transform(None)
+
+        self.assertEqual(builder().source().into.call_count, 1)
+
+
+class StockLvpmReplayerTest(unittest.TestCase):
+    """Tests stock_transformers.StockLvpmReplayer."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'packets.monsoon_raw')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_replay_of_another_monsoon_raises(self):
+        writer = RawRecordingWriter(self.path, {'monsoon': 'hvpm'})
+        writer.open()
+        writer.close()
+
+        with self.assertRaises(ValueError):
+            StockLvpmReplayer(self.path)._transform(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
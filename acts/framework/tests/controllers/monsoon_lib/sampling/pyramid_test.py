@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from acts.controllers.monsoon_lib.sampling.pyramid import Pyramid
+from acts.controllers.monsoon_lib.sampling.pyramid import PyramidWriter
+from acts.controllers.monsoon_lib.sampling.pyramid import get_pyramid_path
+
+
+def expected_level(sample_times, currents, factor):
+    """Computes a pyramid level directly from the samples."""
+    starts = range(0, len(currents), factor)
+    return (np.array([sample_times[i] for i in starts]),
+            np.array([currents[i:i + factor].min() for i in starts]),
+            np.array([currents[i:i + factor].max() for i in starts]),
+            np.array([currents[i:i + factor].mean() for i in starts]))
+
+
+class PyramidTest(unittest.TestCase):
+    """Unit tests the PyramidWriter and Pyramid classes."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = get_pyramid_path(os.path.join(self.tmp_dir, 'a.capture'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_pyramid(self, sample_times, currents, levels, chunk_size):
+        writer = PyramidWriter(self.path, 5000, 4.2, levels)
+        writer.open()
+        for start in range(0, len(currents), chunk_size):
+            writer.write(sample_times[start:start + chunk_size],
+                         currents[start:start + chunk_size])
+        writer.close()
+        return Pyramid(self.path)
+
+    def test_levels_match_samples_across_chunks(self):
+        sample_times = np.arange(1000) / 5000
+        currents = np.random.RandomState(0).uniform(0, 1, 1000)
+
+        pyramid = self.write_pyramid(sample_times, currents, (1, 3, 6),
+                                     chunk_size=37)
+
+        self.assertEqual(sorted(pyramid.levels), [1, 3, 6])
+        for level in [1, 3, 6]:
+            records = pyramid.get_level(level).records
+            expected = expected_level(sample_times, currents, 2**level)
+            for column, values in zip(records.dtype.names, expected):
+                np.testing.assert_allclose(records[column], values,
+                                           err_msg=column)
+        self.assertEqual(pyramid.get_level(3).hz, 5000 / 8)
+
+    def test_select_level_returns_finest_level_that_fits(self):
+        sample_times = np.arange(1024) / 1024
+        pyramid = self.write_pyramid(sample_times, np.ones(1024), (2, 4, 6),
+                                     chunk_size=100)
+
+        self.assertEqual(pyramid.select_level(max_points=256), 2)
+        self.assertEqual(pyramid.select_level(max_points=100), 4)
+        self.assertEqual(pyramid.select_level(0, .25, max_points=100), 2)
+        self.assertEqual(pyramid.select_level(max_points=1), 6)
+
+    def test_get_time_range_returns_records_of_selected_level(self):
+        sample_times = np.arange(1024) / 1024
+        pyramid = self.write_pyramid(sample_times, sample_times, (2, 4),
+                                     chunk_size=1024)
+
+        level, records = pyramid.get_time_range(.5, 1, max_points=64)
+
+        self.assertEqual(level, 4)
+        self.assertEqual(len(records), 32)
+        self.assertEqual(records['sample_time'][0], .5)
+
+    def test_pyramid_without_levels_raises(self):
+        os.makedirs(self.path)
+
+        with self.assertRaises(ValueError):
+            Pyramid(self.path)
+
+    def test_writer_raises_on_non_positive_levels(self):
+        with self.assertRaises(ValueError):
+            PyramidWriter(self.path, 5000, 4.2, (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
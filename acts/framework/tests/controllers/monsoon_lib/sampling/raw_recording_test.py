@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+from acts.controllers.monsoon_lib.sampling import raw_recording
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecording
+from acts.controllers.monsoon_lib.sampling.raw_recording import RawRecordingWriter
+
+RAW_PACKETS = [b'\x00' * 16 + b'first', b'\x01' * 16 + b'second' * 30]
+
+
+class RawRecordingTest(unittest.TestCase):
+    """Unit tests the raw_recording module."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'packets.monsoon_raw')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_recording(self, *raw_packet_lists, metadata=None):
+        writer = RawRecordingWriter(self.path, metadata)
+        writer.open()
+        for raw_packets in raw_packet_lists:
+            writer.write(raw_packets)
+        writer.close()
+
+    def test_reader_returns_the_metadata(self):
+        self.write_recording(metadata={'monsoon': 'hvpm', 'serial': 1234})
+
+        self.assertEqual(RawRecording(self.path).metadata,
+                         {'monsoon': 'hvpm', 'serial': 1234})
+
+    def test_reader_returns_written_packets_in_order(self):
+        self.write_recording(RAW_PACKETS[:1], RAW_PACKETS[1:])
+
+        self.assertEqual(list(RawRecording(self.path).read_raw_packets()),
+                         RAW_PACKETS)
+
+    def test_writer_skips_failed_reads(self):
+        self.write_recording([None, RAW_PACKETS[0], None])
+
+        self.assertEqual(list(RawRecording(self.path).read_raw_packets()),
+                         RAW_PACKETS[:1])
+
+    def test_reader_ignores_partially_written_packet(self):
+        self.write_recording(RAW_PACKETS)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+
+        self.assertEqual(list(RawRecording(self.path).read_raw_packets()),
+                         RAW_PACKETS[:1])
+
+    def test_reader_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'0.000200000s 1.500000000000\n' * 4)
+
+        self.assertFalse(raw_recording.is_raw_recording(self.path))
+        with self.assertRaises(ValueError):
+            RawRecording(self.path)
+
+    def test_is_raw_recording(self):
+        self.write_recording(RAW_PACKETS)
+
+        self.assertTrue(raw_recording.is_raw_recording(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import unittest
+
+import numpy as np
+
+from acts.controllers.monsoon_lib.sampling.statistics import CurrentStatistics
+from acts.controllers.monsoon_lib.sampling.statistics import FixedBinHistogram
+from acts.controllers.monsoon_lib.sampling.statistics import QuantileSketch
+from acts.controllers.monsoon_lib.sampling.statistics import RunningMoments
+from acts.controllers.monsoon_lib.sampling.statistics import WindowedMeans
+
+
+class RunningMomentsTest(unittest.TestCase):
+    """Unit tests the RunningMoments class."""
+
+    def test_add_in_chunks_matches_numpy(self):
+        values = np.random.RandomState(0).normal(.2, .05, 10000)
+        moments = RunningMoments()
+
+        for chunk in np.array_split(values, 7):
+            moments.add(chunk)
+
+        self.assertEqual(moments.count, len(values))
+        self.assertAlmostEqual(moments.mean, np.mean(values))
+        self.assertAlmostEqual(moments.variance, np.var(values))
+        self.assertEqual(moments.min, np.min(values))
+        self.assertEqual(moments.max, np.max(values))
+
+    def test_empty_moments_have_zero_variance(self):
+        self.assertEqual(RunningMoments().variance, 0)
+
+
+class QuantileSketchTest(unittest.TestCase):
+    """Unit tests the QuantileSketch class."""
+
+    def test_get_quantile_is_within_relative_accuracy(self):
+        values = np.random.RandomState(0).lognormal(-3, 1, 20000)
+        sketch = QuantileSketch(relative_accuracy=.01)
+
+        for chunk in np.array_split(values, 5):
+            sketch.add(chunk)
+
+        for quantile in [0, .01, .5, .95, .99, 1]:
+            expected = np.quantile(values, quantile, method='lower')
+            self.assertLessEqual(
+                abs(sketch.get_quantile(quantile) - expected),
+                .01 * expected * 1.0001)
+
+    def test_get_quantile_handles_negative_and_zero_values(self):
+        sketch = QuantileSketch()
+        sketch.add([-2, -1, 0, 0, 1])
+
+        self.assertAlmostEqual(sketch.get_quantile(0), -2, delta=.02)
+        self.assertAlmostEqual(sketch.get_quantile(.25), -1, delta=.01)
+        self.assertEqual(sketch.get_quantile(.5), 0)
+        self.assertAlmostEqual(sketch.get_quantile(1), 1, delta=.01)
+
+    def test_get_quantile_returns_none_when_empty(self):
+        self.assertIsNone(QuantileSketch().get_quantile(.5))
+
+    def test_get_quantile_raises_on_invalid_quantile(self):
+        with self.assertRaises(ValueError):
+            QuantileSketch().get_quantile(1.5)
+
+
+class FixedBinHistogramTest(unittest.TestCase):
+    """Unit tests the FixedBinHistogram class."""
+
+    def test_add_counts_values_outside_of_range(self):
+        histogram = FixedBinHistogram(0, 1, 4)
+
+        histogram.add(np.array([-1, .1, .3, .3, .9, 2]))
+
+        self.assertEqual(list(histogram.counts), [1, 2, 0, 1])
+        self.assertEqual(histogram.underflow_count, 1)
+        self.assertEqual(histogram.overflow_count, 1)
+
+
+class WindowedMeansTest(unittest.TestCase):
+    """Unit tests the WindowedMeans class."""
+
+    def test_add_averages_values_across_chunks(self):
+        windows = WindowedMeans(window_seconds=.5)
+
+        windows.add(np.array([0, .2, .6]), np.array([1, 3, 5]))
+        windows.add(np.array([.8, 1.7]), np.array([7, 9]))
+
+        np.testing.assert_array_equal(windows.means[[0, 1, 3]], [2, 6, 9])
+        self.assertTrue(np.isnan(windows.means[2]))
+        self.assertEqual(list(windows.counts), [2, 2, 0, 1])
+
+
+class CurrentStatisticsTest(unittest.TestCase):
+    """Unit tests the CurrentStatistics class."""
+
+    def test_add_updates_every_statistic(self):
+        statistics = CurrentStatistics(window_seconds=1)
+
+        statistics.add([0, .5, 1], [.1, .2, .3])
+
+        self.assertEqual(statistics.num_samples, 3)
+        self.assertEqual(statistics.min_current, .1)
+        self.assertEqual(statistics.max_current, .3)
+        self.assertAlmostEqual(statistics.mean_current, .2)
+        self.assertAlmostEqual(statistics.get_percentile(50), .2, delta=.002)
+        self.assertEqual(statistics.histogram.counts.sum(), 3)
+        np.testing.assert_allclose(statistics.get_window_means(), [.15, .3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import queue
+import threading
+import time
+import unittest
+
+import mock
+
+from acts.controllers.sl4a_lib.event_dispatcher import EventDispatcher
+
+SHUTDOWN_EVENT = {'name': 'EventDispatcherShutdown'}
+
+
+def create_event(name, event_time=0):
+    return {'name': name, 'time': event_time, 'data': {}}
+
+
+class EventDispatcherTest(unittest.TestCase):
+    """Tests the event_dispatcher.EventDispatcher class."""
+
+    def setUp(self):
+        self.rpc_client = mock.Mock()
+        self.dispatcher = EventDispatcher('serial', self.rpc_client)
+        self.dispatcher._started = True
+
+    def test_poll_events_drains_pending_events_in_bulk(self):
+        """Tests poll_events() fetches pending events with eventPoll."""
+        self.rpc_client.eventWait.side_effect = [
+            create_event('A'), SHUTDOWN_EVENT
+        ]
+        self.rpc_client.eventPoll.return_value = [
+            create_event('B'), create_event('A', 1)
+        ]
+
+        self.dispatcher.poll_events()
+
+        self.assertEqual(self.rpc_client.eventWait.call_count, 2)
+        self.rpc_client.eventPoll.assert_called_once_with(
+            EventDispatcher.MAX_EVENTS_PER_POLL)
+        self.assertEqual(self.dispatcher.get_event_q('A').qsize(), 2)
+        self.assertEqual(self.dispatcher.get_event_q('B').qsize(), 1)
+
+    def test_poll_events_keeps_draining_full_polls(self):
+        """Tests poll_events() polls again while eventPoll returns a full
+        batch of events."""
+        full_batch = [create_event('A')] * EventDispatcher.MAX_EVENTS_PER_POLL
+        self.rpc_client.eventWait.side_effect = [
+            create_event('A'), SHUTDOWN_EVENT
+        ]
+        self.rpc_client.eventPoll.side_effect = [full_batch, []]
+
+        self.dispatcher.poll_events()
+
+        self.assertEqual(self.rpc_client.eventPoll.call_count, 2)
+        self.assertEqual(self.dispatcher.get_event_q('A').qsize(),
+                         EventDispatcher.MAX_EVENTS_PER_POLL + 1)
+
+    def test_poll_events_stops_on_shutdown_within_drained_events(self):
+        """Tests poll_events() stops when the shutdown event is drained."""
+        self.rpc_client.eventWait.return_value = create_event('A')
+        self.rpc_client.eventPoll.return_value = [SHUTDOWN_EVENT]
+
+        self.dispatcher.poll_events()
+
+        self.assertEqual(self.rpc_client.eventWait.call_count, 1)
+
+    def test_pop_events_wakes_when_matching_event_is_queued(self):
+        """Tests pop_events() returns as soon as a matching event arrives."""
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(
+            self.dispatcher.pop_events('Scan.*', 30)))
+        waiter.start()
+        time.sleep(.05)
+
+        start_time = time.time()
+        self.dispatcher._dispatch_event(create_event('Other'))
+        self.dispatcher._dispatch_event(create_event('ScanResult'))
+        waiter.join(5)
+
+        self.assertFalse(waiter.is_alive())
+        self.assertLess(time.time() - start_time, 1)
+        self.assertEqual(results, [[create_event('ScanResult')]])
+        self.assertEqual(self.dispatcher.get_event_q('Other').qsize(), 1)
+
+    def test_pop_events_raises_on_timeout(self):
+        """Tests pop_events() raises queue.Empty if no event matches."""
+        self.dispatcher._dispatch_event(create_event('Other'))
+
+        with self.assertRaises(queue.Empty):
+            self.dispatcher.pop_events('Scan.*', .01)
+
+    def test_pop_events_pops_one_event_per_name_sorted_by_time(self):
+        """Tests pop_events() pops the oldest event of each matching name."""
+        for event in [
+                create_event('ScanB', 2),
+                create_event('ScanA', 3),
+                create_event('ScanB', 4)
+        ]:
+            self.dispatcher._dispatch_event(event)
+
+        results = self.dispatcher.pop_events('Scan', 0)
+
+        self.assertEqual(results,
+                         [create_event('ScanB', 2),
+                          create_event('ScanA', 3)])
+
+    def test_matching_names_are_cached_and_updated(self):
+        """Tests pattern matches are computed once per event name."""
+        self.dispatcher._dispatch_event(create_event('ScanA'))
+        names = self.dispatcher._get_matching_names('Scan')
+
+        self.dispatcher._dispatch_event(create_event('ScanB'))
+        self.dispatcher._dispatch_event(create_event('Other'))
+
+        self.assertIs(self.dispatcher._get_matching_names('Scan'), names)
+        self.assertEqual(names, {'ScanA', 'ScanB'})
+
+        self.dispatcher.clear_all_events()
+
+        self.assertEqual(names, set())
+
+    def test_wait_for_event_waits_for_matching_event(self):
+        """Tests wait_for_event() returns the event matching the predicate."""
+        def queue_events():
+            time.sleep(.05)
+            self.dispatcher._dispatch_event(create_event('A', 1))
+            self.dispatcher._dispatch_event(create_event('A', 2))
+
+        threading.Thread(target=queue_events).start()
+
+        event = self.dispatcher.wait_for_event(
+            'A', lambda event: event['time'] == 2, timeout=5)
+
+        self.assertEqual(event, create_event('A', 2))
+
+    def test_listeners_are_called_without_consuming_events(self):
+        """Tests listeners are called with each event, which is still
+        queued."""
+        events = []
+        self.dispatcher.add_listener('A', events.append)
+
+        self.dispatcher._dispatch_event(create_event('A'))
+        self.dispatcher._dispatch_event(create_event('B'))
+
+        self.assertEqual(events, [create_event('A')])
+        self.assertEqual(self.dispatcher.get_event_q('A').qsize(), 1)
+
+    def test_removed_listeners_are_not_called(self):
+        """Tests remove_listener() stops calling the listener."""
+        events = []
+        self.dispatcher.add_listener('A', events.append)
+        self.dispatcher.remove_listener('A', events.append)
+
+        self.dispatcher._dispatch_event(create_event('A'))
+
+        self.assertEqual(events, [])
+
+    def test_failing_listeners_do_not_stop_dispatching(self):
+        """Tests an exception in a listener does not affect the others."""
+        events = []
+        self.dispatcher.add_listener('A', mock.Mock(side_effect=Exception))
+        self.dispatcher.add_listener('A', events.append)
+
+        self.assertTrue(self.dispatcher._dispatch_event(create_event('A')))
+
+        self.assertEqual(events, [create_event('A')])
+        self.assertEqual(self.dispatcher.get_event_q('A').qsize(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,9 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
+import json
+import socket
+import threading
 import unittest
 
 import mock
@@ -95,74 +98,109 @@ class RpcClientTest(unittest.TestCase):
         self.assertTrue(expected_connection in client._working_connections)
         self.assertEqual(len(client._free_connections), 0)
 
-    def test_get_free_connection_continues_upon_connection_taken(self):
+    def test_get_free_connection_waits_for_released_connection(self):
         """Tests rpc_client.RpcClient._get_free_connection().
 
-        Tests that if the free connection is taken while trying to acquire the
-        lock to reserve it, the thread gives up the lock and tries again.
+        Tests that if every connection is working, it waits for a connection to
+        be released instead of creating a new one.
         """
+        session = mock.Mock()
 
-        def empty_list():
-            client._free_connections.clear()
+        client = rpc_client.RpcClient(session.uid, session.adb.serial,
+                                      lambda _: mock.Mock(),
+                                      lambda _: mock.Mock(),
+                                      max_connections=1)
+        working_connection = client._get_free_connection()
+        result = []
+        waiter = threading.Thread(
+            target=lambda: result.append(client._get_free_connection()))
+        waiter.start()
+        waiter.join(.05)
+        self.assertTrue(waiter.is_alive())
+
+        client._release_working_connection(working_connection)
+        waiter.join(5)
+
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(result, [working_connection])
+        self.assertEqual(client._working_connections, [working_connection])
+        self.assertEqual(len(client._free_connections), 0)
 
-        def fail_on_wrong_execution():
-            self.fail('The program is not executing the expected path. '
-                      'Tried to return an available free client, ended up '
-                      'sleeping to wait for client instead.')
+    def test_get_free_connection_pipelines_onto_least_busy_connection(self):
+        """Tests rpc_client.RpcClient._get_free_connection().
 
+        Tests that with pipelining enabled, RPCs made while every connection is
+        working share the least busy working connection.
+        """
         session = mock.Mock()
 
         client = rpc_client.RpcClient(session.uid, session.adb.serial,
                                       lambda _: mock.Mock(),
-                                      lambda _: mock.Mock())
-        client._free_connections = mock.Mock()
-        client._lock = mock.MagicMock()
-        client._lock.acquire.side_effect = empty_list
-        client._free_connections = [mock.Mock()]
+                                      lambda _: mock.Mock(),
+                                      max_connections=2,
+                                      max_pipelined_requests=2)
+        connections = [client._get_free_connection() for _ in range(3)]
 
-        with mock.patch('time.sleep') as sleep_mock:
-            sleep_mock.side_effect = fail_on_wrong_execution
+        self.assertEqual(connections[2], connections[0])
+        self.assertEqual(client._request_counts[connections[0]], 2)
 
-            try:
-                client._get_free_connection()
-            except IndexError:
-                self.fail('Tried to pop free connection when another thread'
-                          'has taken it.')
-        # Assert that the lock has been freed.
-        self.assertEqual(client._lock.acquire.call_count,
-                         client._lock.release.call_count)
+        client._release_working_connection(connections[0])
 
-    def test_get_free_connection_sleep(self):
+        self.assertIn(connections[0], client._working_connections)
+        self.assertEqual(
+            client._get_pipelinable_connection(), connections[0])
+
+    def test_get_free_connection_does_not_pipeline_other_timeouts(self):
         """Tests rpc_client.RpcClient._get_free_connection().
 
-        Tests that if the free connection is taken, it will wait for a new one.
+        Tests that RPCs are only pipelined onto connections whose in-flight
+        RPCs use the same timeout, and that the timeout is restored once the
+        connection is freed.
         """
+        session = mock.Mock()
+
+        client = rpc_client.RpcClient(session.uid, session.adb.serial,
+                                      lambda _: mock.Mock(),
+                                      lambda _: mock.Mock(),
+                                      max_connections=2,
+                                      max_pipelined_requests=2)
+        default_connection = client._get_free_connection()
+        slow_connection = client._get_free_connection(timeout=30)
+
+        self.assertIs(client._get_free_connection(timeout=30), slow_connection)
+        slow_connection.set_timeout.assert_called_once_with(30)
+
+        client._release_working_connection(slow_connection)
+        self.assertEqual(slow_connection.set_timeout.call_count, 1)
+        client._release_working_connection(slow_connection)
+
+        slow_connection.set_timeout.assert_called_with(
+            rpc_client.SOCKET_TIMEOUT)
+        self.assertIn(slow_connection, client._free_connections)
+        self.assertFalse(default_connection.set_timeout.called)
+
+    def test_release_of_removed_pipelined_connection_is_ignored(self):
+        """Tests rpc_client.RpcClient._release_working_connection.
 
+        Tests that RPCs still pipelined on a connection removed after a
+        timeout can release it without error.
+        """
         session = mock.Mock()
 
         client = rpc_client.RpcClient(session.uid, session.adb.serial,
                                       lambda _: mock.Mock(),
-                                      lambda _: mock.Mock())
-        client._free_connections = []
-        client.max_connections = 0
-        client._lock = mock.MagicMock()
-        client._free_connections = []
+                                      lambda _: mock.Mock(),
+                                      max_connections=1,
+                                      max_pipelined_requests=2)
+        connection = client._get_free_connection()
+        client._get_free_connection()
 
-        with mock.patch('time.sleep') as sleep_mock:
-            sleep_mock.side_effect = BreakoutError()
-            try:
-                client._get_free_connection()
-            except BreakoutError:
-                # Assert that the lock has been freed.
-                self.assertEqual(client._lock.acquire.call_count,
-                                 client._lock.release.call_count)
-                # Asserts that the sleep has been called.
-                self.assertTrue(sleep_mock.called)
-                # Asserts that no changes to connections happened
-                self.assertEqual(len(client._free_connections), 0)
-                self.assertEqual(len(client._working_connections), 0)
-                return True
-        self.fail('Failed to hit sleep case')
+        client._close_timed_out_connection(connection)
+        client._release_working_connection(connection)
+
+        self.assertNotIn(connection, client._working_connections)
+        self.assertNotIn(connection, client._free_connections)
+        self.assertNotIn(connection, client._request_counts)
 
     def test_release_working_connection(self):
         """Tests rpc_client.RpcClient._release_working_connection.
@@ -214,5 +252,68 @@ class RpcClientTest(unittest.TestCase):
             kwarg2=2)
 
 
+class RpcClientBatchTest(unittest.TestCase):
+    """Tests rpc_client.RpcClient.batch()."""
+
+    def setUp(self):
+        self.connection = mock.Mock()
+        self.connection.get_new_ticket.side_effect = [1, 2, 3]
+        session = mock.Mock()
+        self.client = rpc_client.RpcClient(session.uid, session.adb.serial,
+                                           mock.Mock(),
+                                           lambda _: self.connection)
+        self.client._log = mock.Mock()
+
+    def set_responses(self, *responses):
+        self.connection.get_response_for.side_effect = lambda ticket: (
+            json.dumps(dict(id=ticket, **responses[ticket - 1])).encode())
+
+    def test_batch_sends_all_requests_at_once(self):
+        self.set_responses({'result': 'a', 'error': None},
+                           {'result': 'b', 'error': None})
+
+        results = self.client.batch(['first', ('second', 1, 'x')])
+
+        self.assertEqual(results, ['a', 'b'])
+        requests = self.connection.send_requests.call_args[0][0]
+        self.assertEqual([json.loads(request) for request in requests], [
+            {'id': 1, 'method': 'first', 'params': []},
+            {'id': 2, 'method': 'second', 'params': [1, 'x']},
+        ])
+        self.assertIn(self.connection, self.client._free_connections)
+
+    def test_batch_raises_first_error_after_reading_all_responses(self):
+        self.set_responses({'result': None, 'error': 'bad'},
+                           {'result': 'b', 'error': None})
+
+        with self.assertRaises(rpc_client.Sl4aApiError) as context:
+            self.client.batch(['first', 'second'])
+
+        self.assertEqual(context.exception.rpc_name, 'first')
+        self.assertEqual(self.connection.get_response_for.call_count, 2)
+
+    def test_batch_raises_protocol_error_on_no_response(self):
+        self.connection.get_response_for.return_value = b''
+
+        with self.assertRaises(rpc_client.Sl4aProtocolError):
+            self.client.batch(['first'])
+
+        self.assertTrue(self.client.on_error.called)
+
+    def test_batch_removes_connection_on_timeout(self):
+        self.connection.get_response_for.side_effect = socket.timeout()
+
+        with self.assertRaises(rpc_client.Sl4aRpcTimeoutError):
+            self.client.batch(['first'], timeout=1)
+
+        self.assertTrue(self.connection.close.called)
+        self.assertNotIn(self.connection, self.client._free_connections)
+        self.assertNotIn(self.connection, self.client._working_connections)
+
+    def test_batch_of_no_calls_returns_no_results(self):
+        self.assertEqual(self.client.batch([]), [])
+        self.assertFalse(self.connection.send_requests.called)
+
+
 if __name__ == '__main__':
     unittest.main()
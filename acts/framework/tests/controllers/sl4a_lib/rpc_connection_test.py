@@ -14,6 +14,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 import mock
+import threading
 import unittest
 
 from acts.controllers.sl4a_lib import rpc_client, rpc_connection
@@ -144,6 +145,71 @@ class RpcConnectionTest(unittest.TestCase):
         self.assertEqual(connection.get_new_ticket() + 1,
                          connection.get_new_ticket())
 
+    def test_send_requests_writes_all_requests_at_once(self):
+        """Tests rpc_connection.RpcConnection.send_requests().
+
+        Tests that all requests are sent within a single write.
+        """
+        connection = self.mock_rpc_connection(MOCK_RESP)
+        connection.send_requests(['{"id": 1}', '{"id": 2}'])
+        self.assertEqual(connection._socket_file.last_write,
+                         b'{"id": 1}\n{"id": 2}\n')
+
+    def test_get_response_for_hands_off_out_of_order_responses(self):
+        """Tests rpc_connection.RpcConnection.get_response_for().
+
+        Tests that responses read for other tickets are given to the threads
+        waiting on them.
+        """
+        connection = self.mock_rpc_connection()
+        connection._socket_file = mock.Mock()
+        connection._socket_file.readline.side_effect = [
+            b'{"id": 2, "result": "b"}', b'{"id": 1, "result": "a"}'
+        ]
+        responses = {}
+
+        def get_response(ticket):
+            responses[ticket] = connection.get_response_for(ticket)
+
+        waiters = [
+            threading.Thread(target=get_response, args=[ticket])
+            for ticket in (1, 2)
+        ]
+        for waiter in waiters:
+            waiter.start()
+        for waiter in waiters:
+            waiter.join(5)
+
+        self.assertEqual(responses, {
+            1: b'{"id": 1, "result": "a"}',
+            2: b'{"id": 2, "result": "b"}'
+        })
+        self.assertEqual(connection._responses, {})
+
+    def test_get_response_for_returns_stored_response(self):
+        """Tests rpc_connection.RpcConnection.get_response_for().
+
+        Tests that a response already read by another thread is returned
+        without reading from the socket.
+        """
+        connection = self.mock_rpc_connection()
+        connection._socket_file = mock.Mock()
+        connection._responses[3] = MOCK_RESP
+
+        self.assertEqual(connection.get_response_for(3), MOCK_RESP)
+        self.assertFalse(connection._socket_file.readline.called)
+
+    def test_get_response_for_returns_empty_response_on_close(self):
+        """Tests rpc_connection.RpcConnection.get_response_for().
+
+        Tests that an empty response is returned when the server closes the
+        connection, and that the read lock is released.
+        """
+        connection = self.mock_rpc_connection(b'')
+
+        self.assertEqual(connection.get_response_for(1), b'')
+        self.assertFalse(connection._is_reading)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import signal
+import stat
+import sys
+import tempfile
+import unittest
+
+from acts.controllers.utils_lib.ssh import connection
+from acts.controllers.utils_lib.ssh import settings
+from acts.libs.proc import job
+
+# Stands in for ssh by running the remote command on the local host. When
+# started as a master connection, it creates the control socket and idles.
+FAKE_SSH = '''#!%s
+import os
+import sys
+import time
+
+args = sys.argv[1:]
+if '-N' in args:
+    for arg in args:
+        if arg.startswith('ControlPath='):
+            open(arg[len('ControlPath='):], 'w').close()
+    while True:
+        time.sleep(1)
+os.execvp('sh', ['sh', '-c', args[-1]])
+''' % sys.executable
+
+
+class SshConnectionTest(unittest.TestCase):
+    """Tests acts.controllers.utils_lib.ssh.connection.SshConnection."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        fake_ssh = os.path.join(self.tmp_dir, 'ssh')
+        with open(fake_ssh, 'w') as f:
+            f.write(FAKE_SSH)
+        os.chmod(fake_ssh, os.stat(fake_ssh).st_mode | stat.S_IEXEC)
+        self.settings = settings.SshSettings('localhost', 'user',
+                                             connect_timeout=5,
+                                             executable=fake_ssh)
+        self.connection = connection.SshConnection(self.settings)
+
+    def tearDown(self):
+        self.connection.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def make_files(self, root, files):
+        for name, contents in files.items():
+            path = os.path.join(root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(contents)
+
+    def read_files(self, root):
+        files = {}
+        for dir_path, _, file_names in os.walk(root):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                with open(path) as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_run_batch_returns_the_result_of_each_command(self):
+        results = self.connection.run_batch(
+            ['echo one; echo err >&2', 'printf two', 'exit 3', 'echo $FOO'],
+            ignore_status=True,
+            env={'FOO': 'bar'})
+
+        self.assertEqual([r.stdout for r in results],
+                         ['one', 'two', '', 'bar'])
+        self.assertEqual([r.stderr for r in results], ['err', '', '', ''])
+        self.assertEqual([r.exit_status for r in results], [0, 0, 3, 0])
+
+    def test_run_batch_reuses_the_shell_session(self):
+        self.connection.run_batch(['true'])
+        session = self.connection._shell_session
+
+        self.connection.run_batch(['true'])
+
+        self.assertIs(self.connection._shell_session, session)
+
+    def test_run_batch_runs_commands_that_do_not_fit_in_a_pipe(self):
+        results = self.connection.run_batch(
+            ['head -c 200000 /dev/zero | tr "\\0" a'] * 3 +
+            ['echo %s' % ('b' * 70000)])
+
+        self.assertEqual([len(r.stdout) for r in results],
+                         [200000, 200000, 200000, 70000])
+
+    def test_run_batch_raises_on_failed_commands(self):
+        with self.assertRaises(job.Error) as context:
+            self.connection.run_batch(['true', 'exit 2', 'true'])
+
+        self.assertEqual(context.exception.result.exit_status, 2)
+
+    def test_run_batch_stops_at_the_first_failed_command(self):
+        path = os.path.join(self.tmp_dir, 'ran')
+
+        with self.assertRaises(job.Error):
+            self.connection.run_batch(['exit 2', 'touch %s' % path])
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.connection.run_batch(['echo ok'])[0].stdout,
+                         'ok')
+
+    def test_run_batch_raises_timeout_error(self):
+        with self.assertRaises(job.TimeoutError):
+            self.connection.run_batch(['sleep 5'], timeout=0.1)
+
+        self.assertEqual(self.connection.run_batch(['echo ok'])[0].stdout,
+                         'ok')
+
+    def test_run_batch_retries_on_a_new_session_if_the_shell_exited(self):
+        self.connection.run_batch(['true'])
+        session = self.connection._shell_session
+        os.killpg(session._proc.pid, signal.SIGKILL)
+        session._proc.wait()
+
+        results = self.connection.run_batch(['echo ok'])
+
+        self.assertEqual(results[0].stdout, 'ok')
+        self.assertIsNot(self.connection._shell_session, session)
+
+    def test_run_batch_raises_if_the_shell_exits_mid_batch(self):
+        with self.assertRaises(connection.Error):
+            self.connection.run_batch(['echo one', 'kill -9 $$'])
+
+    def test_send_files_and_pull_files(self):
+        local_dir = os.path.join(self.tmp_dir, 'local')
+        remote_dir = os.path.join(self.tmp_dir, 'remote')
+        pulled_dir = os.path.join(self.tmp_dir, 'pulled')
+        self.make_files(local_dir, {
+            'a.txt': 'a',
+            'b.txt': 'b',
+            'dir/c.txt': 'c',
+        })
+
+        self.connection.send_files([
+            os.path.join(local_dir, 'a.txt'),
+            os.path.join(local_dir, 'b.txt'),
+            os.path.join(local_dir, 'dir'),
+        ], remote_dir)
+        self.connection.pull_files([
+            os.path.join(remote_dir, 'a.txt'),
+            os.path.join(remote_dir, 'dir'),
+        ], pulled_dir)
+
+        self.assertEqual(self.read_files(remote_dir), {
+            'a.txt': 'a',
+            'b.txt': 'b',
+            'dir/c.txt': 'c',
+        })
+        self.assertEqual(self.read_files(pulled_dir), {
+            'a.txt': 'a',
+            'dir/c.txt': 'c',
+        })
+
+    def test_pull_files_raises_on_missing_files(self):
+        with self.assertRaises(job.Error):
+            self.connection.pull_files(
+                [os.path.join(self.tmp_dir, 'missing')], self.tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,7 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
+import inspect
 import threading
 import unittest
 from unittest import TestCase
@@ -141,6 +142,118 @@ class EventBusTest(TestCase):
         for subscription in mock_subscriptions:
             subscription.deliver.assert_called_once_with(mock_event)
 
+    def test_register_subscription_keeps_insertion_order_for_ties(self):
+        """Tests that subscriptions are sorted by order, then by insertion."""
+        mock_type = Mock()
+        bus = event_bus._event_bus
+        subscriptions = [EventSubscription(mock_type, lambda _: None, order=o)
+                         for o in (1, 0, 1, 2, 0)]
+
+        for subscription in subscriptions:
+            event_bus.register_subscription(subscription)
+
+        self.assertEqual(bus._subscriptions[mock_type],
+                         [subscriptions[i] for i in (1, 4, 0, 2, 3)])
+
+    def test_post_delivers_to_more_specific_type_first_for_ties(self):
+        """Tests that ties in order are delivered to subtypes first."""
+        class ChildEvent(Event):
+            pass
+
+        delivered = []
+        event_bus.register(Event, lambda _: delivered.append('base'))
+        event_bus.register(ChildEvent, lambda _: delivered.append('child'))
+        event_bus.register(Event, lambda _: delivered.append('first'),
+                           order=-1)
+
+        event_bus.post(ChildEvent())
+
+        self.assertEqual(delivered, ['first', 'child', 'base'])
+
+    @patch('acts.event.event_bus.inspect.getmro', wraps=inspect.getmro)
+    def test_post_reuses_the_dispatch_list_of_an_event_type(self, getmro):
+        """Tests that the subscribers of an event type are only looked up on
+        the first post.
+        """
+        func = Mock()
+        event_bus.register(Event, func)
+
+        event_bus.post(Event())
+        event_bus.post(Event())
+
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(getmro.call_count, 1)
+
+    def test_register_invalidates_the_dispatch_list(self):
+        """Tests that subscriptions registered after a post receive events."""
+        event_bus.post(Event())
+        func = Mock()
+        event_bus.register(Event, func)
+
+        event_bus.post(Event())
+
+        self.assertEqual(func.call_count, 1)
+
+    def test_unregister_invalidates_the_dispatch_list(self):
+        """Tests that unregistered subscriptions do not receive events."""
+        func = Mock()
+        registration_id = event_bus.register(Event, func)
+        event_bus.post(Event())
+        event_bus.unregister(registration_id)
+
+        event_bus.post(Event())
+
+        self.assertEqual(func.call_count, 1)
+
+    def test_post_does_not_wait_for_asynchronous_subscriptions(self):
+        """Tests that asynchronous subscriptions do not block the poster."""
+        release = threading.Event()
+        delivered = []
+
+        def slow_func(event):
+            release.wait()
+            delivered.append(event)
+
+        event_bus.register(Event, slow_func, asynchronous=True)
+        event = Event()
+
+        event_bus.post(event)
+        self.assertEqual(delivered, [])
+        release.set()
+
+        self.assertTrue(event_bus.flush(timeout=5))
+        self.assertEqual(delivered, [event])
+
+    def test_asynchronous_subscription_receives_events_in_order(self):
+        """Tests that each asynchronous subscription receives events in the
+        order they were posted.
+        """
+        delivered = [[], []]
+        event_bus.register(Event, delivered[0].append, asynchronous=True)
+        event_bus.register(Event, delivered[1].append, asynchronous=True)
+        events = [Event() for _ in range(100)]
+
+        for event in events:
+            event_bus.post(event)
+
+        self.assertTrue(event_bus.flush(timeout=5))
+        self.assertEqual(delivered, [events, events])
+
+    @patch('acts.event.event_bus.logging')
+    def test_asynchronous_subscription_errors_are_logged(self, logging):
+        """Tests that errors from asynchronous subscriptions are logged instead
+        of raised, and do not stop later deliveries.
+        """
+        func = Mock(side_effect=[Exception, None])
+        event_bus.register(Event, func, asynchronous=True)
+
+        event_bus.post(Event())
+        event_bus.post(Event())
+
+        self.assertTrue(event_bus.flush(timeout=5))
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(logging.exception.call_count, 1)
+
     @patch('acts.event.event_bus._event_bus.unregister')
     def test_unregister_all_from_list(self, unregister):
         """Tests unregistering from a list unregisters the specified list."""
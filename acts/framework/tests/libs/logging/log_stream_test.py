@@ -15,6 +15,9 @@
 #   limitations under the License.
 import logging
 import os
+import shutil
+import tempfile
+import threading
 import unittest
 
 import mock
@@ -379,6 +382,122 @@ class LogStreamTest(unittest.TestCase):
         self.assertEqual(len(created_log_stream.logger.handlers), 1)
 
 
+class AsyncLogStreamTest(unittest.TestCase):
+    """Tests the asynchronous mode of _LogStream."""
+
+    def setUp(self):
+        log_stream._log_streams = dict()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for stream in log_stream._log_streams.values():
+            stream.cleanup()
+        shutil.rmtree(self.tmp_dir)
+
+    def create_stream(self, log_styles=LogStyles.LOG_DEBUG +
+                      LogStyles.TESTCASE_LOG, **kwargs):
+        log = log_stream.create_logger(self._testMethodName,
+                                       base_path=self.tmp_dir,
+                                       log_styles=log_styles,
+                                       asynchronous=True,
+                                       **kwargs)
+        log.setLevel(logging.DEBUG)
+        return log_stream._log_streams[self._testMethodName]
+
+    def read_log(self, directory):
+        with open(os.path.join(directory,
+                               '%s_debug.txt' % self._testMethodName)) as f:
+            return f.read().splitlines()
+
+    def block_writer(self, stream):
+        """Blocks the writer thread until the returned event is set."""
+        started = threading.Event()
+        unblocked = threading.Event()
+
+        def block():
+            started.set()
+            unblocked.wait()
+
+        stream._writer.submit(block)
+        started.wait()
+        self.addCleanup(unblocked.set)
+        return unblocked
+
+    def test_records_are_written_by_the_writer_thread(self):
+        stream = self.create_stream()
+        lines = ['line %d' % i for i in range(100)]
+
+        for line in lines:
+            stream.logger.debug(line)
+        stream.flush()
+
+        self.assertEqual(self.read_log(self.tmp_dir), lines)
+        self.assertEqual(stream.logger.handlers[1].__class__.__name__,
+                         '_QueueHandler')
+
+    def test_messages_are_formatted_when_logged(self):
+        stream = self.create_stream()
+        unblocked = self.block_writer(stream)
+        values = ['before']
+
+        stream.logger.debug('%s', values)
+        values[0] = 'after'
+        unblocked.set()
+        stream.flush()
+
+        self.assertEqual(self.read_log(self.tmp_dir), ["['before']"])
+
+    def test_update_handlers_moves_files_in_order_with_records(self):
+        stream = self.create_stream()
+        new_dir = os.path.join(self.tmp_dir, 'test_case')
+        os.makedirs(new_dir)
+        stream._LogStream__get_current_output_dir = lambda: new_dir
+        unblocked = self.block_writer(stream)
+
+        stream.logger.debug('before')
+        stream.update_handlers(context.NewTestCaseContextEvent())
+        stream.logger.debug('after')
+        unblocked.set()
+        stream.flush()
+
+        self.assertEqual(self.read_log(self.tmp_dir), ['before'])
+        self.assertEqual(self.read_log(new_dir), ['after'])
+
+    def test_records_below_warning_are_dropped_when_the_queue_is_full(self):
+        stream = self.create_stream(max_queue_size=2)
+        unblocked = self.block_writer(stream)
+
+        for i in range(5):
+            stream.logger.debug('line %d', i)
+
+        self.assertEqual(log_stream.get_queue_stats(self._testMethodName),
+                         log_stream.LogQueueStats(queue_depth=2,
+                                                  max_queue_size=2,
+                                                  dropped_records=3))
+        unblocked.set()
+        stream.flush()
+        self.assertEqual(self.read_log(self.tmp_dir), ['line 0', 'line 1'])
+
+    def test_cleanup_writes_the_queued_records(self):
+        stream = self.create_stream()
+        unblocked = self.block_writer(stream)
+        stream.logger.debug('line')
+        unblocked.set()
+
+        stream.cleanup()
+
+        self.assertEqual(self.read_log(self.tmp_dir), ['line'])
+        self.assertEqual(len(stream.logger.handlers), 1)
+
+    @mock.patch('os.makedirs')
+    def test_get_queue_stats_is_none_if_not_asynchronous(self, *_):
+        log_stream.create_logger(self._testMethodName,
+                                 log_styles=LogStyles.LOG_INFO +
+                                 LogStyles.TO_ACTS_LOG)
+
+        self.assertIsNone(log_stream.get_queue_stats(self._testMethodName))
+
+
 class LogStreamModuleTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from acts.libs.pcap import pcap_scanner
+from acts.libs.pcap.pcap_scanner import PcapFormatError
+from acts.libs.pcap.pcap_scanner import PcapFrame
+from acts.libs.pcap.pcap_scanner import PcapScanner
+from acts.libs.pcap.pcap_scanner import mac_to_bytes
+
+BROADCAST = 'ff:ff:ff:ff:ff:ff'
+AP = '02:00:00:00:00:01'
+STA = '02:00:00:00:00:02'
+OTHER = '02:00:00:00:00:03'
+
+
+def dot11(frame_type, subtype, *addresses, flags=0):
+    """Returns an 802.11 header with the given addresses."""
+    header = struct.pack('<BBH', (subtype << 4) | (frame_type << 2), flags, 0)
+    header += b''.join(mac_to_bytes(mac) for mac in addresses[:3])
+    if len(addresses) > 2:
+        header += b'\x00\x00'
+    if len(addresses) > 3:
+        header += mac_to_bytes(addresses[3])
+    return header + b'payload'
+
+
+def radiotap(frame):
+    return struct.pack('<BBHI', 0, 0, 8, 0) + frame
+
+
+BEACON = dot11(0, 8, BROADCAST, AP, AP)
+ACK = dot11(1, 13, STA)
+RTS = dot11(1, 11, AP, STA)
+WDS_DATA = dot11(2, 0, AP, STA, OTHER, OTHER, flags=3)
+
+
+def pcap(frames, linktype=pcap_scanner.LINKTYPE_IEEE802_11_RADIOTAP,
+         endian='<'):
+    data = struct.pack(endian + 'IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535,
+                       linktype)
+    for i, frame in enumerate(frames):
+        data += struct.pack(endian + 'IIII', 1000 + i, 500000, len(frame),
+                            len(frame))
+        data += frame
+    return data
+
+
+def pcapng_block(block_type, body):
+    body += b'\x00' * (-len(body) % 4)
+    length = len(body) + 12
+    return (struct.pack('<II', block_type, length) + body +
+            struct.pack('<I', length))
+
+
+def pcapng(frames, linktype=pcap_scanner.LINKTYPE_IEEE802_11_RADIOTAP):
+    data = pcapng_block(0x0a0d0d0a,
+                        struct.pack('<IHHq', 0x1a2b3c4d, 1, 0, -1))
+    # Nanosecond timestamps, through the if_tsresol option.
+    options = struct.pack('<HHB3x', 9, 1, 9) + struct.pack('<HH', 0, 0)
+    data += pcapng_block(1, struct.pack('<HHI', linktype, 0, 0) + options)
+    for i, frame in enumerate(frames):
+        timestamp = (1000 + i) * 10**9 + 500
+        data += pcapng_block(
+            6,
+            struct.pack('<IIIII', 0, timestamp >> 32, timestamp & 0xffffffff,
+                        len(frame), len(frame)) + frame)
+    return data
+
+
+class PcapScannerTest(unittest.TestCase):
+    """Tests acts.libs.pcap.pcap_scanner."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def scan(self, data):
+        path = os.path.join(self.tmp_dir, 'capture')
+        with open(path, 'wb') as f:
+            f.write(data)
+        scanner = PcapScanner(path)
+        self.addCleanup(scanner.close)
+        return scanner
+
+    def test_frames_decodes_the_802_11_headers(self):
+        scanner = self.scan(pcap([radiotap(BEACON), radiotap(ACK)]))
+
+        self.assertEqual(list(scanner.frames()), [
+            PcapFrame(24, 1000.5, 'management', 8, BROADCAST, AP, AP, None),
+            PcapFrame(24 + 16 + len(radiotap(BEACON)), 1001.5, 'control', 13,
+                      STA, None, None, None),
+        ])
+
+    def test_frames_decodes_the_fourth_address_of_wds_frames(self):
+        scanner = self.scan(pcap([WDS_DATA],
+                                 linktype=pcap_scanner.LINKTYPE_IEEE802_11))
+
+        frame, = scanner.frames()
+        self.assertEqual(frame.frame_type, 'data')
+        self.assertEqual(frame.addr4, OTHER)
+
+    def test_frames_decodes_ethernet_headers(self):
+        frame = mac_to_bytes(AP) + mac_to_bytes(STA) + b'\x08\x00payload'
+        scanner = self.scan(pcap([frame],
+                                 linktype=pcap_scanner.LINKTYPE_ETHERNET))
+
+        self.assertEqual(list(scanner.frames()), [
+            PcapFrame(24, 1000.5, 'ethernet', 0x0800, AP, STA, None, None)
+        ])
+
+    def test_frames_reads_big_endian_pcap(self):
+        scanner = self.scan(pcap([radiotap(RTS)], endian='>'))
+
+        frame, = scanner.frames()
+        self.assertEqual((frame.addr1, frame.addr2), (AP, STA))
+
+    def test_frames_reads_pcapng(self):
+        scanner = self.scan(pcapng([radiotap(BEACON), radiotap(RTS)]))
+
+        frames = list(scanner.frames())
+        self.assertEqual([frame.addr2 for frame in frames], [AP, STA])
+        self.assertAlmostEqual(frames[1].timestamp, 1001 + 500e-9)
+
+    def test_frames_stops_at_a_truncated_record(self):
+        scanner = self.scan(pcap([radiotap(BEACON), radiotap(RTS)])[:-3])
+
+        self.assertEqual(len(list(scanner.frames())), 1)
+
+    def test_frames_of_an_empty_capture(self):
+        self.assertEqual(list(self.scan(b'').frames()), [])
+
+    def test_frames_raises_on_other_files(self):
+        with self.assertRaises(PcapFormatError):
+            list(self.scan(b'not a capture').frames())
+
+    def test_find_frames_matches_every_criterion(self):
+        scanner = self.scan(
+            pcap([radiotap(BEACON),
+                  radiotap(RTS),
+                  radiotap(ACK),
+                  radiotap(WDS_DATA)]))
+
+        def find(**criteria):
+            return [(frame.frame_type, frame.subtype)
+                    for frame in scanner.find_frames(**criteria)]
+
+        self.assertEqual(find(addr2=AP), [('management', 8)])
+        self.assertEqual(find(addr2=STA), [('control', 11), ('data', 0)])
+        self.assertEqual(find(addr2=STA, frame_type='data'), [('data', 0)])
+        self.assertEqual(find(addr=STA),
+                         [('control', 11), ('control', 13), ('data', 0)])
+        self.assertEqual(find(addr4=OTHER), [('data', 0)])
+        self.assertEqual(find(addr1=OTHER), [])
+
+    def test_has_frame(self):
+        scanner = self.scan(pcap([radiotap(BEACON)]))
+
+        self.assertTrue(scanner.has_frame(addr2=AP.upper()))
+        self.assertFalse(scanner.has_frame(addr=STA))
+
+    def test_find_frames_uses_the_index(self):
+        scanner = self.scan(pcap([radiotap(BEACON), radiotap(RTS)]))
+        scanner.build_index()
+        scanner._records = None
+
+        self.assertEqual([frame.subtype for frame in scanner.find_frames(
+            addr=AP)], [8, 11])
+        self.assertEqual(
+            [frame.subtype for frame in scanner.find_frames(addr1=AP)], [11])
+        self.assertFalse(scanner.has_frame(addr=OTHER))
+
+
+if __name__ == '__main__':
+    unittest.main()
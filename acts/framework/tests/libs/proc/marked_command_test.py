@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import subprocess
+import unittest
+
+from acts.libs.proc import marked_command
+
+
+class MarkedCommandTest(unittest.TestCase):
+    """Tests for acts.libs.proc.marked_command."""
+
+    def run_script(self, *marked_commands):
+        return subprocess.run(
+            ['sh'],
+            input=''.join(m.script for m in marked_commands).encode(),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+
+    def test_script_ends_output_with_markers(self):
+        marked = marked_command.MarkedCommand('echo out; echo err >&2; '
+                                              'exit 3')
+
+        result = self.run_script(marked)
+
+        stdout, status_line = result.stdout.split(marked.stdout_end)
+        self.assertEqual(stdout, b'out\n')
+        self.assertEqual(marked_command.parse_exit_status(status_line), 3)
+        self.assertEqual(result.stderr, b'err\n' + marked.stderr_end)
+
+    def test_script_does_not_change_the_shell_or_read_its_stdin(self):
+        first = marked_command.MarkedCommand('cd /; X=1; cat')
+        second = marked_command.MarkedCommand('echo "$X"; pwd')
+
+        result = self.run_script(first, second)
+
+        second_stdout = result.stdout.split(first.stdout_end)[1]
+        second_stdout = second_stdout.split(b'\n', 1)[1]
+        self.assertEqual(second_stdout.split(second.stdout_end)[0],
+                         b'\n%s\n' % os.getcwd().encode())
+
+    def test_script_skips_the_command_after_a_failure(self):
+        failed = marked_command.MarkedCommand('exit 3')
+        skipped = marked_command.MarkedCommand('echo skipped',
+                                               skip_after_failure=True)
+
+        result = self.run_script(failed, skipped)
+
+        stdout, status_line = result.stdout.split(failed.stdout_end)[1].split(
+            b'\n', 1)[1].split(skipped.stdout_end)
+        self.assertEqual(stdout, b'')
+        self.assertEqual(marked_command.parse_exit_status(status_line), 3)
+
+    def test_script_runs_the_command_after_a_success(self):
+        succeeded = marked_command.MarkedCommand('true')
+        next_command = marked_command.MarkedCommand('echo ran',
+                                                    skip_after_failure=True)
+
+        result = self.run_script(succeeded, next_command)
+
+        self.assertIn(b'ran\n' + next_command.stdout_end, result.stdout)
+
+    def test_parse_exit_status_rejects_invalid_lines(self):
+        with self.assertRaises(ValueError):
+            marked_command.parse_exit_status(b'abc\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
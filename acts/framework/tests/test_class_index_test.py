@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from acts import test_class_index
+from acts.test_class_index import TestClassIndex
+
+SOURCE = '''
+import IntegrationTest
+from acts.base_test import BaseTestClass
+from other_test import ImportedTest
+from other_test import Original as AliasedTest
+
+
+class FooTest(BaseTestClass):
+    class NestedTest(BaseTestClass):
+        pass
+
+
+class Helper(object):
+    pass
+
+
+GeneratedTest = type('GeneratedTest', (BaseTestClass,), {})
+__PrivateTest = None
+'''
+
+
+class FindTestClassNamesTest(unittest.TestCase):
+    """Tests test_class_index.find_test_class_names."""
+
+    def test_finds_top_level_names_ending_with_test(self):
+        self.assertEqual(test_class_index.find_test_class_names(SOURCE),
+                         ['AliasedTest', 'FooTest', 'GeneratedTest',
+                          'ImportedTest'])
+
+    def test_raises_on_invalid_source(self):
+        with self.assertRaises(SyntaxError):
+            test_class_index.find_test_class_names('class FooTest(:')
+
+
+class TestClassIndexTest(unittest.TestCase):
+    """Tests test_class_index.TestClassIndex."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.tmp_dir, 'cache', 'index.json')
+        self.module_path = os.path.join(self.tmp_dir, 'FooTest.py')
+        self.write_module('class FooTest(object):\n    pass\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_module(self, source, mtime_ns=None):
+        with open(self.module_path, 'w') as f:
+            f.write(source)
+        if mtime_ns is not None:
+            os.utime(self.module_path, ns=(mtime_ns, mtime_ns))
+
+    def test_get_test_class_names_parses_new_modules(self):
+        index = TestClassIndex(self.index_path)
+
+        self.assertEqual(index.get_test_class_names(self.module_path),
+                         ['FooTest'])
+
+    def test_get_test_class_names_returns_none_for_invalid_modules(self):
+        self.write_module('class FooTest(:')
+        index = TestClassIndex(self.index_path)
+
+        self.assertIsNone(index.get_test_class_names(self.module_path))
+
+    def test_get_test_class_names_uses_saved_entries(self):
+        index = TestClassIndex(self.index_path)
+        index.get_test_class_names(self.module_path)
+        index.save()
+
+        index = TestClassIndex(self.index_path)
+        index.load()
+        with patch('acts.test_class_index.find_test_class_names') as find:
+            class_names = index.get_test_class_names(self.module_path)
+
+        self.assertEqual(class_names, ['FooTest'])
+        self.assertFalse(find.called)
+
+    def test_get_test_class_names_reparses_modified_modules(self):
+        self.write_module('class FooTest(object):\n    pass\n', mtime_ns=1)
+        index = TestClassIndex(self.index_path)
+        index.get_test_class_names(self.module_path)
+        self.write_module('class BarTest(object):\n    pass\n', mtime_ns=2)
+
+        self.assertEqual(index.get_test_class_names(self.module_path),
+                         ['BarTest'])
+
+    def test_load_ignores_entries_of_other_versions(self):
+        index = TestClassIndex(self.index_path)
+        index.get_test_class_names(self.module_path)
+        with patch('acts.test_class_index.INDEX_VERSION',
+                   test_class_index.INDEX_VERSION + 1):
+            index.save()
+
+        index.load()
+
+        self.assertEqual(index._entries, {})
+
+    def test_load_ignores_corrupt_index(self):
+        os.makedirs(os.path.dirname(self.index_path))
+        with open(self.index_path, 'w') as f:
+            f.write('{"version": ')
+        index = TestClassIndex(self.index_path)
+
+        index.load()
+
+        self.assertEqual(index._entries, {})
+
+    def test_save_does_not_write_unmodified_index(self):
+        index = TestClassIndex(self.index_path)
+        index.load()
+
+        index.save()
+
+        self.assertFalse(os.path.exists(self.index_path))
+
+    def test_clear_deletes_the_index(self):
+        index = TestClassIndex(self.index_path)
+        index.get_test_class_names(self.module_path)
+        index.save()
+
+        index.clear()
+        index.load()
+
+        self.assertFalse(os.path.exists(self.index_path))
+        self.assertEqual(index._entries, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks the time TestRunner takes to find the test classes to run.
+
+A directory of generated test modules is searched for a single test class.
+Each module sleeps on import to stand in for the cost of importing its
+dependencies. The search is timed when importing every module, as TestRunner
+did before the test class index, with an empty index, and with a warm index.
+
+Usage:
+    python3 test_runner_benchmark.py [--modules 500] [--import-cost-ms 5]
+"""
+
+import argparse
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from mobly.config_parser import TestRunConfig
+
+from acts import test_runner
+
+MODULE_SOURCE = '''import time
+
+from acts.base_test import BaseTestClass
+
+time.sleep(%f)
+
+
+class %s(BaseTestClass):
+    def test_nothing(self):
+        pass
+'''
+
+
+def write_test_modules(test_path, num_modules, import_cost):
+    """Writes the generated test modules, returning their names."""
+    names = []
+    for i in range(num_modules):
+        name = 'Benchmark%04dTest' % i
+        with open(os.path.join(test_path, name + '.py'), 'w') as f:
+            f.write(MODULE_SOURCE % (import_cost, name))
+        names.append(name)
+    return names
+
+
+def unload_modules(names):
+    for name in names:
+        sys.modules.pop(name, None)
+    importlib.invalidate_caches()
+
+
+def time_import_all(test_path, names):
+    """Imports every test module, returning seconds elapsed."""
+    start_time = time.perf_counter()
+    sys.path.append(test_path)
+    for name in names:
+        importlib.import_module(name)
+    return time.perf_counter() - start_time
+
+
+def time_import_test_modules(runner, test_path):
+    """Runs TestRunner.import_test_modules, returning seconds elapsed."""
+    start_time = time.perf_counter()
+    runner.import_test_modules([test_path])
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmarks finding test classes at startup.')
+    parser.add_argument('--modules', type=int, default=500,
+                        help='The number of test modules to generate.')
+    parser.add_argument('--import-cost-ms', type=float, default=5,
+                        help='The time each test module takes to import.')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        test_path = os.path.join(tmp_dir, 'tests')
+        os.makedirs(test_path)
+        names = write_test_modules(test_path, args.modules,
+                                   args.import_cost_ms / 1000)
+
+        config = TestRunConfig()
+        config.testbed_name = 'BenchmarkTestBed'
+        config.log_path = os.path.join(tmp_dir, 'logs')
+        config.controller_configs = {}
+        config.user_params = {}
+        runner = test_runner.TestRunner(config, [(names[-1], None)])
+        runner.test_class_index_path = os.path.join(tmp_dir, 'index.json')
+
+        print('Finding 1 of %d test classes.' % args.modules)
+        print('%-12s %8.3fs' % ('import all',
+                                time_import_all(test_path, names)))
+        unload_modules(names)
+        print('%-12s %8.3fs' % ('cold index',
+                                time_import_test_modules(runner, test_path)))
+        unload_modules(names)
+        print('%-12s %8.3fs' % ('warm index',
+                                time_import_test_modules(runner, test_path)))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,7 @@
 
 import os
 import shutil
+import sys
 import tempfile
 import unittest
 
@@ -121,6 +122,73 @@ class TestRunnerTest(unittest.TestCase):
             os.path.join(self.tmp_dir, self.base_mock_test_config.testbed_name,
                          expected_timestamp))
 
+    @patch('acts.test_runner.event_bus')
+    @patch('acts.test_runner.logger')
+    @patch.object(test_runner.TestRunner, 'dump_config')
+    @patch.object(test_runner.TestRunner, '_write_results_to_file')
+    def test_stop_warns_if_event_bus_flush_times_out(self, *mocks):
+        event_bus = mocks[-1]
+        event_bus.flush.return_value = False
+        tr = test_runner.TestRunner(self.base_mock_test_config, [])
+        tr.log = Mock()
+        tr.usage_publisher = Mock()
+        tr.running = True
+
+        tr.stop()
+
+        event_bus.flush.assert_called_once_with(
+            timeout=test_runner.EVENT_BUS_FLUSH_TIMEOUT)
+        self.assertTrue(tr.log.warning.called)
+        self.assertFalse(tr.running)
+
+    def write_test_modules(self, modules):
+        """Writes the given {module name: source} test modules to a test path.
+
+        Returns:
+            The test path.
+        """
+        test_path = os.path.join(self.tmp_dir, 'tests')
+        os.makedirs(test_path)
+        for name, source in modules.items():
+            with open(os.path.join(test_path, name + '.py'), 'w') as f:
+                f.write(source)
+            self.addCleanup(sys.modules.pop, name, None)
+        return test_path
+
+    @patch.object(test_runner.TestRunner, 'dump_config')
+    def test_import_test_modules_only_imports_modules_on_run_list(self, *_):
+        test_path = self.write_test_modules({
+            'RunListIndexTest': 'class RunListIndexTest(object):\n    pass\n',
+            'OtherIndexTest': 'class OtherIndexTest(object):\n    pass\n',
+        })
+        tr = test_runner.TestRunner(self.base_mock_test_config,
+                                    [('RunList*', None)])
+        tr.test_class_index_path = os.path.join(self.tmp_dir, 'index.json')
+
+        test_classes = tr.import_test_modules([test_path])
+
+        self.assertEqual(list(test_classes), ['RunListIndexTest'])
+        self.assertNotIn('OtherIndexTest', sys.modules)
+        self.assertTrue(os.path.exists(tr.test_class_index_path))
+
+    @patch.object(test_runner.TestRunner, 'dump_config')
+    def test_import_test_modules_imports_all_modules_if_unindexed(self, *_):
+        test_path = self.write_test_modules({
+            'StaticIndexTest': 'class StaticIndexTest(object):\n    pass\n',
+            'dynamic_index_test': ('DynamicIndex = type("DynamicIndexTest", '
+                                   '(object,), {})\n'
+                                   'globals()["DynamicIndexTest"] = '
+                                   'DynamicIndex\n'),
+        })
+        tr = test_runner.TestRunner(self.base_mock_test_config,
+                                    [('DynamicIndexTest', None)])
+        tr.test_class_index_path = os.path.join(self.tmp_dir, 'index.json')
+
+        test_classes = tr.import_test_modules([test_path])
+
+        self.assertIn('DynamicIndexTest', test_classes)
+        self.assertIn('StaticIndexTest', test_classes)
+
 
 if __name__ == '__main__':
     unittest.main()
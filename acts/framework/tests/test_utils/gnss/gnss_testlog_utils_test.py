@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+import mock
+import pandas
+
+from acts.test_utils.gnss import gnss_testlog_utils
+from acts.test_utils.gnss.gnss_testlog_utils import CONFIG_GPSAPILOG
+from acts.test_utils.gnss.gnss_testlog_utils import CONFIG_GPSTTFFLOG
+from acts.test_utils.gnss.gnss_testlog_utils import get_literal_prefix
+from acts.test_utils.gnss.gnss_testlog_utils import parse_gpsapilog_to_df
+from acts.test_utils.gnss.gnss_testlog_utils import parse_gpsapilog_to_df_v2
+from acts.test_utils.gnss.gnss_testlog_utils import parse_log_to_df
+
+GPSAPILOG_RECORD = '''2020/06/01 10:00:%02d Read: 1024 bytes
+Fix: true Type: GPS SV: %d C/No: 30.5 Elevation: 45.0 Azimuth: 120.0 \
+Signal: L1 Frequency: 1575.42 EPH: true ALM: true
+History Avg Top4 : 31.0
+Current Avg Top4 : 32.0
+History Avg : 28.0
+Current Avg : 29.0
+L5 used in fix: false
+L5 engaging rate: 0.00%%
+Provider: gps
+Latitude: 25.04
+Longitude: 121.56
+Altitude: -3.5
+Time: 2020/06/01 10:00:%02d
+Speed: 0.5
+Bearing: 90.0
+Unmatched line: History Avg : 1.0
+'''
+
+
+def parse_log_naively(filename, configs):
+    """Parses the log with every pattern on every line, as a reference."""
+    datalists = {key: [] for key in configs}
+    with open(filename, 'r') as fid:
+        for rownumber, line in enumerate(fid, 1):
+            for key, regex_string in configs.items():
+                matched = re.search(regex_string, line)
+                if matched:
+                    datalists[key].append(
+                        dict(matched.groupdict(), rownumber=rownumber))
+    return datalists
+
+
+class GnssTestlogUtilsTest(unittest.TestCase):
+    """Tests acts.test_utils.gnss.gnss_testlog_utils."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'gpsapi.txt')
+        with open(self.filename, 'w') as fid:
+            fid.write('Log header\n')
+            for second in range(20):
+                fid.write(GPSAPILOG_RECORD % (second, second, second))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assert_parsed_data_equal(self, parsed_data, datalists):
+        self.assertEqual(set(parsed_data), set(datalists))
+        for key, datalist in datalists.items():
+            expected = [dict(data) for data in datalist]
+            for data in expected:
+                data.pop('rownumber')
+            self.assertEqual(parsed_data[key].to_dict('records'), expected)
+            self.assertEqual(
+                list(parsed_data[key].index),
+                [data['rownumber'] for data in datalist])
+
+    def test_get_literal_prefix(self):
+        self.assertEqual(get_literal_prefix(r'^Speed:\s+(?P<Speed>\d+)'),
+                         ('Speed:', True))
+        self.assertEqual(get_literal_prefix(r'^C\/No:\s+'), ('C/No:', True))
+        self.assertEqual(get_literal_prefix(r'^(?P<date>\d+)'), ('', True))
+        self.assertEqual(get_literal_prefix(r'Loop:(?P<loop>\d+)'),
+                         ('Loop:', False))
+
+    def test_get_literal_prefix_drops_optional_characters(self):
+        self.assertEqual(get_literal_prefix(r'^Fixes?:'), ('Fixe', True))
+        self.assertEqual(get_literal_prefix(r'^ab{0,1}c'), ('a', True))
+
+    def test_get_literal_prefix_handles_alternatives(self):
+        self.assertEqual(get_literal_prefix(r'^Speed:|Bearing:'), ('', True))
+        self.assertEqual(get_literal_prefix(r'^a\|b'), ('a|b', True))
+
+    def test_parse_log_to_df_matches_every_pattern_on_every_line(self):
+        parsed_data = parse_log_to_df(self.filename, CONFIG_GPSAPILOG)
+
+        self.assert_parsed_data_equal(
+            parsed_data, parse_log_naively(self.filename, CONFIG_GPSAPILOG))
+
+    def test_parse_log_to_df_searches_patterns_without_line_start(self):
+        configs = dict(CONFIG_GPSTTFFLOG, avg=r'Avg\s+:\s+(?P<avg>\d+\.\d+)')
+
+        parsed_data = parse_log_to_df(self.filename, configs)
+
+        self.assert_parsed_data_equal(parsed_data,
+                                      parse_log_naively(self.filename,
+                                                        configs))
+        self.assertEqual(len(parsed_data['avg']), 60)
+
+    def test_parse_log_to_df_in_chunks(self):
+        parsed_data = parse_log_to_df(self.filename,
+                                      CONFIG_GPSAPILOG,
+                                      processes=3,
+                                      chunk_size=1000)
+
+        self.assert_parsed_data_equal(
+            parsed_data, parse_log_naively(self.filename, CONFIG_GPSAPILOG))
+
+    def test_get_log_chunks_ends_chunks_at_line_boundaries(self):
+        chunks = gnss_testlog_utils.get_log_chunks(self.filename, 1000)
+
+        with open(self.filename, 'rb') as fid:
+            data = fid.read()
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(data))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b'\n')
+
+    def test_parse_log_to_df_loads_cached_data(self):
+        cache_dir = os.path.join(self.tmp_dir, 'cache')
+        expected = parse_log_to_df(self.filename,
+                                   CONFIG_GPSAPILOG,
+                                   cache_dir=cache_dir)
+
+        with mock.patch.object(gnss_testlog_utils,
+                               'LogLineDispatcher') as dispatcher:
+            parsed_data = parse_log_to_df(self.filename,
+                                          CONFIG_GPSAPILOG,
+                                          cache_dir=cache_dir)
+
+        self.assertFalse(dispatcher.called)
+        for key in expected:
+            pandas.testing.assert_frame_equal(parsed_data[key], expected[key])
+
+    def test_parse_log_to_df_parses_again_if_the_log_changed(self):
+        cache_dir = os.path.join(self.tmp_dir, 'cache')
+        parse_log_to_df(self.filename, CONFIG_GPSAPILOG, cache_dir=cache_dir)
+        with open(self.filename, 'a') as fid:
+            fid.write('Speed: 1.5\n')
+
+        parsed_data = parse_log_to_df(self.filename,
+                                      CONFIG_GPSAPILOG,
+                                      cache_dir=cache_dir)
+
+        self.assertEqual(len(parsed_data['Speed']), 21)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_parse_log_to_df_ignores_corrupt_cache_files(self):
+        cache_dir = os.path.join(self.tmp_dir, 'cache')
+        parse_log_to_df(self.filename, CONFIG_GPSAPILOG, cache_dir=cache_dir)
+        cache_file = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        with open(cache_file, 'wb') as fid:
+            fid.write(b'corrupt')
+
+        parsed_data = parse_log_to_df(self.filename,
+                                      CONFIG_GPSAPILOG,
+                                      cache_dir=cache_dir)
+
+        self.assertEqual(len(parsed_data['Speed']), 20)
+
+    def test_parse_gpsapilog_to_df_adds_last_phone_time(self):
+        timestamp_df, sv_info_df, _, loc_info_df = parse_gpsapilog_to_df(
+            self.filename)
+
+        self.assertEqual(list(sv_info_df['time_row_num']),
+                         list(timestamp_df.index))
+        self.assertEqual(list(sv_info_df['phone_time']),
+                         list(timestamp_df['phone_time']))
+        self.assertEqual(list(loc_info_df['gnsstime']),
+                         list(timestamp_df['phone_time']))
+
+    def test_parse_gpsapilog_to_df_v2_adds_last_phone_time(self):
+        timestamp_df, sv_info_df, sv_stat_df, _ = parse_gpsapilog_to_df_v2(
+            self.filename)
+
+        self.assertEqual(list(sv_info_df['phone_time']),
+                         list(timestamp_df['phone_time']))
+        self.assertEqual(len(sv_stat_df), 20)
+        self.assertEqual(list(sv_info_df['SV']), list(range(20)))
+
+
+if __name__ == '__main__':
+    unittest.main()
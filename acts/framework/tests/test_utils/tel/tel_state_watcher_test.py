@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2020 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import threading
+import time
+import unittest
+
+import mock
+
+from acts.controllers.sl4a_lib.event_dispatcher import EventDispatcher
+from acts.test_utils.tel import tel_state_watcher
+from acts.test_utils.tel.tel_defines import EventCallStateChanged
+from acts.test_utils.tel.tel_defines import EventServiceStateChanged
+from acts.test_utils.tel.tel_state_watcher import get_state_watcher
+from acts.test_utils.tel.tel_state_watcher import state_change_events
+from acts.test_utils.tel.tel_state_watcher import wait_for_devices_in_state
+
+EVENTS = (EventServiceStateChanged, EventCallStateChanged)
+
+
+def create_event(name):
+    return {'name': name, 'time': 0, 'data': {}}
+
+
+class FakeAndroidDevice(object):
+    def __init__(self, serial):
+        self.serial = serial
+        self.droid = mock.Mock()
+        self.droid.subscriptionGetDefaultSubId.return_value = 1
+        self.log = mock.Mock()
+        self.ed = self.create_dispatcher()
+        self.in_state = False
+
+    def create_dispatcher(self):
+        dispatcher = EventDispatcher(self.serial, mock.Mock())
+        dispatcher._started = True
+        return dispatcher
+
+
+class TelStateWatcherTest(unittest.TestCase):
+    """Tests acts.test_utils.tel.tel_state_watcher."""
+
+    def setUp(self):
+        # Poll quickly without events, and never with them.
+        for name, value in [('WAIT_TIME_BETWEEN_STATE_CHECK', 0.05),
+                            ('WAIT_TIME_BETWEEN_STATE_CHECK_WITH_EVENTS', 60)]:
+            patcher = mock.patch.object(tel_state_watcher, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.ads = [FakeAndroidDevice('serial%d' % i) for i in range(3)]
+
+    def change_state_later(self, ad, event_name=EventServiceStateChanged):
+        def change_state():
+            time.sleep(0.1)
+            ad.in_state = True
+            ad.ed._dispatch_event(create_event(event_name))
+
+        thread = threading.Thread(target=change_state)
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def test_state_change_events_are_declared_on_the_function(self):
+        @state_change_events(*EVENTS)
+        def check(log, ad):
+            return True
+
+        self.assertEqual(tel_state_watcher.get_state_change_events(check),
+                         EVENTS)
+        self.assertEqual(
+            tel_state_watcher.get_state_change_events(lambda log, ad: True),
+            ())
+
+    def test_wait_returns_true_if_already_in_state(self):
+        self.assertTrue(
+            wait_for_devices_in_state(self.ads, 10, lambda ad: True, EVENTS))
+
+    def test_wait_wakes_up_on_a_state_change_event(self):
+        ad = self.ads[0]
+        self.change_state_later(ad)
+
+        start_time = time.time()
+        self.assertTrue(
+            wait_for_devices_in_state([ad], 30, lambda ad: ad.in_state,
+                                      EVENTS))
+        self.assertLess(time.time() - start_time, 5)
+
+    def test_wait_ignores_other_events(self):
+        ad = self.ads[0]
+        self.change_state_later(ad, event_name='OtherEvent')
+
+        start_time = time.time()
+        self.assertTrue(
+            wait_for_devices_in_state([ad], 0.5, lambda ad: ad.in_state,
+                                      EVENTS))
+        # The state is only checked again once the wait times out.
+        self.assertGreater(time.time() - start_time, 0.4)
+
+    def test_wait_does_not_consume_events(self):
+        ad = self.ads[0]
+        self.change_state_later(ad)
+        queue_sizes = []
+
+        def check(ad):
+            queue_sizes.append(
+                ad.ed.get_event_q(EventServiceStateChanged).qsize())
+            return ad.in_state
+
+        wait_for_devices_in_state([ad], 30, check, EVENTS)
+
+        self.assertEqual(queue_sizes[-1], 1)
+
+    def test_wait_stops_tracking_and_clears_events_when_done(self):
+        ad = self.ads[0]
+        self.change_state_later(ad)
+
+        wait_for_devices_in_state([ad], 30, lambda ad: ad.in_state, EVENTS)
+
+        ad.droid.telephonyStopTrackingServiceStateChangeForSubscription.\
+            assert_called_once_with(1)
+        ad.droid.telephonyStopTrackingCallStateChangeForSubscription.\
+            assert_called_once_with(1)
+        self.assertEqual(ad.ed.get_event_q(EventServiceStateChanged).qsize(),
+                         0)
+
+    def test_wait_keeps_tracking_while_another_wait_tracks(self):
+        ad = self.ads[0]
+        stop_tracking = (
+            ad.droid.telephonyStopTrackingServiceStateChangeForSubscription)
+        ad.ed._dispatch_event(create_event(EventServiceStateChanged))
+
+        with get_state_watcher(ad).watch(EVENTS, threading.Event()):
+            wait_for_devices_in_state([ad], 0, lambda ad: True, EVENTS)
+
+            self.assertFalse(stop_tracking.called)
+            self.assertEqual(
+                ad.ed.get_event_q(EventServiceStateChanged).qsize(), 1)
+
+        stop_tracking.assert_called_once_with(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
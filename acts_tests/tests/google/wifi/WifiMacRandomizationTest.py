@@ -30,7 +30,6 @@ from acts.test_decorators import test_tracker_info
 from acts.test_utils.tel.tel_test_utils import WIFI_CONFIG_APBAND_2G
 from acts.test_utils.tel.tel_test_utils import WIFI_CONFIG_APBAND_5G
 from acts.test_utils.wifi.WifiBaseTest import WifiBaseTest
-from scapy.all import *
 from acts.controllers.ap_lib import hostapd_constants
 
 WifiEnums = wutils.WifiEnums
@@ -238,21 +237,6 @@ class WifiMacRandomizationTest(WifiBaseTest):
                                       'forgetting networ. Old MAC = %s New MAC'
                                       ' = %s' % (rand_mac1, rand_mac2))
 
-    def verify_mac_not_found_in_pcap(self, mac, packets):
-        for pkt in packets:
-            self.log.debug("Packet Summary = %s" % pkt.summary())
-            if mac in pkt.summary():
-                raise signals.TestFailure("Caught Factory MAC in packet sniffer."
-                                          "Packet = %s" % pkt.show())
-
-    def verify_mac_is_found_in_pcap(self, mac, packets):
-        for pkt in packets:
-            self.log.debug("Packet Summary = %s" % pkt.summary())
-            if mac in pkt.summary():
-                return
-        raise signals.TestFailure("Did not find MAC = %s in packet sniffer."
-                                  % mac)
-
     def get_sta_mac_address(self):
         """Gets the current MAC address being used for client mode."""
         out = self.dut.adb.shell("ifconfig wlan0")
@@ -283,8 +267,7 @@ class WifiMacRandomizationTest(WifiBaseTest):
              hostapd_constants.BAND_2G.upper())
         time.sleep(SHORT_TIMEOUT)
         wutils.stop_pcap(self.packet_capture, self.pcap_procs, False)
-        packets = rdpcap(pcap_fname)
-        self.verify_mac_is_found_in_pcap(self.sta_factory_mac, packets)
+        wutils.verify_mac_is_found_in_pcap(self.sta_factory_mac, pcap_fname)
 
     @test_tracker_info(uuid="d9e64202-02d5-421a-967c-42e45f1f7f91")
     def test_mac_randomization_wpapsk(self):
@@ -471,11 +454,12 @@ class WifiMacRandomizationTest(WifiBaseTest):
         pcap_fname = '%s_%s.pcap' % \
             (self.pcap_procs[hostapd_constants.BAND_2G][1],
              hostapd_constants.BAND_2G.upper())
-        packets = rdpcap(pcap_fname)
-        self.verify_mac_not_found_in_pcap(self.soft_ap_factory_mac, packets)
-        self.verify_mac_not_found_in_pcap(self.sta_factory_mac, packets)
-        self.verify_mac_is_found_in_pcap(softap_mac, packets)
-        self.verify_mac_is_found_in_pcap(self.get_sta_mac_address(), packets)
+        wutils.verify_mac_not_found_in_pcap(
+            self.soft_ap_factory_mac, pcap_fname)
+        wutils.verify_mac_not_found_in_pcap(self.sta_factory_mac, pcap_fname)
+        wutils.verify_mac_is_found_in_pcap(softap_mac, pcap_fname)
+        wutils.verify_mac_is_found_in_pcap(
+            self.get_sta_mac_address(), pcap_fname)
 
     @test_tracker_info(uuid="3ca3f911-29f1-41fb-b836-4d25eac1669f")
     def test_roaming_mac_randomization(self):
@@ -517,8 +501,8 @@ class WifiMacRandomizationTest(WifiBaseTest):
             2. Connect to 5GHz network.
             3. Send link probes.
             4. Stop the sniffer.
-            5. Invoke scapy to read the .pcap file.
-            6. Read each packet summary and make sure Factory MAC is not used.
+            5. Scan the .pcap file.
+            6. Make sure Factory MAC is not used in any frame.
 
         """
         self.pcap_procs = wutils.start_pcap(
@@ -532,9 +516,9 @@ class WifiMacRandomizationTest(WifiBaseTest):
              hostapd_constants.BAND_5G.upper())
         wutils.stop_pcap(self.packet_capture, self.pcap_procs, False)
         time.sleep(SHORT_TIMEOUT)
-        packets = rdpcap(pcap_fname)
-        self.verify_mac_not_found_in_pcap(self.sta_factory_mac, packets)
-        self.verify_mac_is_found_in_pcap(self.get_sta_mac_address(), packets)
+        wutils.verify_mac_not_found_in_pcap(self.sta_factory_mac, pcap_fname)
+        wutils.verify_mac_is_found_in_pcap(
+            self.get_sta_mac_address(), pcap_fname)
 
     @test_tracker_info(uuid="1c2cc0fd-a340-40c4-b679-6acc5f526451")
     def test_check_mac_in_wifi_scan(self):
@@ -544,8 +528,8 @@ class WifiMacRandomizationTest(WifiBaseTest):
           1. Configure and start the sniffer on both bands.
           2. Perform a full scan.
           3. Stop the sniffer.
-          4. Invoke scapy to read the .pcap file.
-          5. Read each packet summary and make sure Factory MAC is not used.
+          4. Scan the .pcap file.
+          5. Make sure Factory MAC is not used in any frame.
 
         """
         self.pcap_procs = wutils.start_pcap(
@@ -556,5 +540,4 @@ class WifiMacRandomizationTest(WifiBaseTest):
         pcap_fname = '%s_%s.pcap' % \
             (self.pcap_procs[hostapd_constants.BAND_2G][1],
              hostapd_constants.BAND_2G.upper())
-        packets = rdpcap(pcap_fname)
-        self.verify_mac_not_found_in_pcap(self.sta_factory_mac, packets)
+        wutils.verify_mac_not_found_in_pcap(self.sta_factory_mac, pcap_fname)
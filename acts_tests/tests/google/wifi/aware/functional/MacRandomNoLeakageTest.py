@@ -14,6 +14,8 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import re
+
 from acts import asserts
 from acts.test_decorators import test_tracker_info
 from acts.test_utils.net import connectivity_const as cconsts
@@ -24,7 +26,6 @@ from acts.test_utils.wifi.aware import aware_test_utils as autils
 from acts.test_utils.wifi import wifi_test_utils as wutils
 from acts.test_utils.wifi.aware.AwareBaseTest import AwareBaseTest
 from acts.test_utils.wifi.WifiBaseTest import WifiBaseTest
-from scapy.all import *
 
 
 class MacRandomNoLeakageTest(AwareBaseTest, WifiBaseTest):
@@ -62,12 +63,8 @@ class MacRandomNoLeakageTest(AwareBaseTest, WifiBaseTest):
 
     def verify_mac_no_leakage(self, pcap_procs, factory_mac_addresses, mac_addresses):
         # Get 2G and 5G pcaps
-        pcap_fname = '%s_%s.pcap' % (pcap_procs[BAND_5G][1], BAND_5G.upper())
-        pcap_5g = rdpcap(pcap_fname)
-
-        pcap_fname = '%s_%s.pcap' % (pcap_procs[BAND_2G][1], BAND_2G.upper())
-        pcap_2g = rdpcap(pcap_fname)
-        pcaps = pcap_5g + pcap_2g
+        pcaps = ['%s_%s.pcap' % (pcap_procs[band][1], band.upper())
+                 for band in (BAND_5G, BAND_2G)]
 
         # Verify factory MAC is not leaked in both 2G and 5G pcaps
         for mac in factory_mac_addresses: